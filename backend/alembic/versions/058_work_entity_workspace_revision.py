@@ -0,0 +1,30 @@
+"""Add project workspace revision counter
+
+Revision ID: 058_workspace_revision
+Revises: 057_email_outbox
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "058_workspace_revision"
+down_revision = "057_email_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "work_entities",
+        sa.Column(
+            "workspace_revision",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("work_entities", "workspace_revision")
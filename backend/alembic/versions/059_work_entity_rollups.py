@@ -0,0 +1,131 @@
+"""Add write-maintained project summary rollups
+
+Revision ID: 059_work_entity_rollups
+Revises: 058_workspace_revision
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "059_work_entity_rollups"
+down_revision = "058_workspace_revision"
+branch_labels = None
+depends_on = None
+
+
+# Matches datetime.isoformat() of a UTC value, as written by the application.
+DUE_KEY_SQL = """
+    to_char(due_at AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS')
+    || CASE
+        WHEN date_trunc('second', due_at) = due_at THEN ''
+        ELSE to_char(due_at AT TIME ZONE 'UTC', '.US')
+    END
+    || '+00:00'
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "work_entity_rollups",
+        sa.Column("entity_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("native_tasks", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("native_milestones", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("artifacts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("done_items", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "counts_by_status",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.Column(
+            "open_due_counts",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["entity_id"],
+            ["work_entities.id"],
+            name="fk_work_entity_rollups_entity",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("entity_id"),
+    )
+    op.execute(
+        f"""
+        WITH items AS (
+            SELECT entity_id, status, forecast_due_at AS due_at,
+                   status = 'done' AS is_done, 'task' AS kind
+            FROM work_entity_tasks
+            WHERE status <> 'cancelled'
+            UNION ALL
+            SELECT entity_id, status, forecast_at AS due_at,
+                   status = 'achieved' AS is_done, 'milestone' AS kind
+            FROM work_entity_milestones
+            WHERE status <> 'cancelled'
+        ),
+        totals AS (
+            SELECT entity_id,
+                   count(*) FILTER (WHERE kind = 'task') AS native_tasks,
+                   count(*) FILTER (WHERE kind = 'milestone') AS native_milestones,
+                   count(*) FILTER (WHERE is_done) AS done_items
+            FROM items
+            GROUP BY entity_id
+        ),
+        statuses AS (
+            SELECT entity_id, jsonb_object_agg(status, item_count) AS counts
+            FROM (
+                SELECT entity_id, status, count(*) AS item_count
+                FROM items
+                GROUP BY entity_id, status
+            ) grouped
+            GROUP BY entity_id
+        ),
+        dues AS (
+            SELECT entity_id, jsonb_object_agg(due_key, item_count) AS counts
+            FROM (
+                SELECT entity_id, {DUE_KEY_SQL} AS due_key, count(*) AS item_count
+                FROM items
+                WHERE NOT is_done AND due_at IS NOT NULL
+                GROUP BY entity_id, due_key
+            ) grouped
+            GROUP BY entity_id
+        ),
+        artifacts AS (
+            SELECT entity_id, count(*) AS item_count
+            FROM work_entity_artifacts
+            WHERE status <> 'archived'
+            GROUP BY entity_id
+        )
+        INSERT INTO work_entity_rollups (
+            entity_id, native_tasks, native_milestones, artifacts, done_items,
+            counts_by_status, open_due_counts, updated_at
+        )
+        SELECT e.id,
+               COALESCE(totals.native_tasks, 0),
+               COALESCE(totals.native_milestones, 0),
+               COALESCE(artifacts.item_count, 0),
+               COALESCE(totals.done_items, 0),
+               COALESCE(statuses.counts, '{{}}'::jsonb),
+               COALESCE(dues.counts, '{{}}'::jsonb),
+               now()
+        FROM work_entities e
+        LEFT JOIN totals ON totals.entity_id = e.id
+        LEFT JOIN statuses ON statuses.entity_id = e.id
+        LEFT JOIN dues ON dues.entity_id = e.id
+        LEFT JOIN artifacts ON artifacts.entity_id = e.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("work_entity_rollups")
@@ -0,0 +1,69 @@
+"""Add per-user WIP counter and queue stats row
+
+Revision ID: 060_queue_counters
+Revises: 059_work_entity_rollups
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "060_queue_counters"
+down_revision = "059_work_entity_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "wip_count",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+    )
+    op.execute(
+        """
+        UPDATE users AS u
+        SET wip_count = counts.wip
+        FROM (
+            SELECT assignee_id, count(*) AS wip
+            FROM tasks
+            WHERE status = 'in_progress' AND assignee_id IS NOT NULL
+            GROUP BY assignee_id
+        ) AS counts
+        WHERE counts.assignee_id = u.id
+        """
+    )
+
+    op.create_table(
+        "queue_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "critical_in_queue",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.execute(
+        """
+        INSERT INTO queue_stats (id, critical_in_queue)
+        SELECT 1, count(*)
+        FROM tasks
+        WHERE status = 'in_queue' AND priority = 'critical'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("queue_stats")
+    op.drop_column("users", "wip_count")
@@ -0,0 +1,30 @@
+"""Add queue version to queue stats
+
+Revision ID: 061_queue_snapshot_version
+Revises: 060_queue_counters
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "061_queue_snapshot_version"
+down_revision = "060_queue_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "queue_stats",
+        sa.Column(
+            "queue_version",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("queue_stats", "queue_version")
@@ -0,0 +1,29 @@
+"""Index task completion and creation time for calibration aggregates
+
+Revision ID: 062_task_calibration_indexes
+Revises: 061_queue_snapshot_version
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "062_task_calibration_indexes"
+down_revision = "061_queue_snapshot_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_tasks_done_completed_at",
+        "tasks",
+        ["completed_at"],
+        postgresql_where=sa.text("status = 'done'"),
+    )
+    op.create_index("ix_tasks_created_at", "tasks", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_created_at", table_name="tasks")
+    op.drop_index("ix_tasks_done_completed_at", table_name="tasks")
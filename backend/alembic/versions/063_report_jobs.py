@@ -0,0 +1,133 @@
+"""Add durable report jobs
+
+Revision ID: 063_report_jobs
+Revises: 062_task_calibration_indexes
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "063_report_jobs"
+down_revision = "062_task_calibration_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("kind", sa.String(length=40), nullable=False),
+        sa.Column(
+            "params",
+            postgresql.JSONB(),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.Column("dedup_key", sa.String(length=64), nullable=False),
+        sa.Column("requested_by_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column(
+            "status",
+            sa.String(length=20),
+            nullable=False,
+            server_default=sa.text("'pending'"),
+        ),
+        sa.Column(
+            "progress",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "attempt_count",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "max_attempts",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("3"),
+        ),
+        sa.Column(
+            "available_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.Column("lease_token", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("result_gzip", sa.LargeBinary(), nullable=True),
+        sa.Column("result_etag", sa.String(length=64), nullable=True),
+        sa.Column("result_size", sa.Integer(), nullable=True),
+        sa.Column("last_error", sa.String(length=120), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint(
+            "status IN ('pending', 'processing', 'done', 'failed')",
+            name="ck_report_jobs_status",
+        ),
+        sa.CheckConstraint(
+            "progress BETWEEN 0 AND 100",
+            name="ck_report_jobs_progress",
+        ),
+        sa.CheckConstraint(
+            "attempt_count >= 0 AND max_attempts >= 1 AND attempt_count <= max_attempts",
+            name="ck_report_jobs_attempts",
+        ),
+        sa.CheckConstraint(
+            "(status = 'processing' AND lease_token IS NOT NULL AND lease_expires_at IS NOT NULL) "
+            "OR (status <> 'processing' AND lease_token IS NULL AND lease_expires_at IS NULL)",
+            name="ck_report_jobs_lease_state",
+        ),
+        sa.CheckConstraint(
+            "status <> 'done' OR (result_gzip IS NOT NULL AND result_etag IS NOT NULL)",
+            name="ck_report_jobs_done_state",
+        ),
+        sa.ForeignKeyConstraint(
+            ["requested_by_id"],
+            ["users.id"],
+            name="fk_report_jobs_requested_by",
+            ondelete="SET NULL",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_report_jobs_active_dedup",
+        "report_jobs",
+        ["dedup_key"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'processing')"),
+    )
+    op.create_index(
+        "ix_report_jobs_dedup_finished",
+        "report_jobs",
+        ["dedup_key", "finished_at"],
+    )
+    op.create_index(
+        "ix_report_jobs_claim",
+        "report_jobs",
+        ["status", "available_at", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_jobs_claim", table_name="report_jobs")
+    op.drop_index("ix_report_jobs_dedup_finished", table_name="report_jobs")
+    op.drop_index("uq_report_jobs_active_dedup", table_name="report_jobs")
+    op.drop_table("report_jobs")
@@ -0,0 +1,238 @@
+"""Partition append-only event tables by month, add BRIN time indexes
+
+Revision ID: 064_event_partitions
+Revises: 063_report_jobs
+
+Existing data is not copied: the old table is renamed to <table>_legacy and
+attached as the partition for everything before the next month, so the
+upgrade costs one scan (bound check) and one build of the (id, time) key.
+Monthly partitions after it are created here for PREMAKE_MONTHS and then by
+python -m app.maintenance.event_partitions.
+"""
+
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "064_event_partitions"
+down_revision = "063_report_jobs"
+branch_labels = None
+depends_on = None
+
+
+# Таблица -> столбец времени, по которому секционируем помесячно.
+PARTITIONED = {
+    "activity_events": "occurred_at",
+    "notifications": "created_at",
+    "task_review_events": "created_at",
+    "work_entity_events": "created_at",
+}
+# Только BRIN: глобально уникальный idempotency_key (и внешний ключ
+# user_attention_items.event_id) несовместимы с секционированием по времени.
+BRIN_ONLY = {
+    "q_transactions": "created_at",
+    "communication_events": "created_at",
+}
+PREMAKE_MONTHS = 3
+
+
+def _add_month(value: datetime) -> datetime:
+    return value.replace(year=value.year + value.month // 12, month=value.month % 12 + 1)
+
+
+def _timestamp(value: datetime) -> str:
+    return f"'{value.isoformat()}'"
+
+
+def _brin_name(table: str, column: str) -> str:
+    return f"ix_{table}_{column}_brin"
+
+
+def _renamed(name: str, suffix: str) -> str:
+    return f"{name[:63 - len(suffix)]}{suffix}"
+
+
+def _table_definition(table: str) -> tuple[str, list[tuple[str, str]], list[tuple[str, str]]]:
+    bind = op.get_bind()
+    primary_key = bind.scalar(
+        sa.text(
+            """
+            SELECT conname FROM pg_constraint
+            WHERE conrelid = CAST(:table AS regclass) AND contype = 'p'
+            """
+        ),
+        {"table": table},
+    )
+    indexes = bind.execute(
+        sa.text(
+            """
+            SELECT i.relname, pg_get_indexdef(x.indexrelid)
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = CAST(:table AS regclass) AND NOT x.indisprimary
+            ORDER BY i.relname
+            """
+        ),
+        {"table": table},
+    ).all()
+    foreign_keys = bind.execute(
+        sa.text(
+            """
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'
+            ORDER BY conname
+            """
+        ),
+        {"table": table},
+    ).all()
+    return primary_key, [tuple(row) for row in indexes], [tuple(row) for row in foreign_keys]
+
+
+def _partition_table(table: str, column: str, bound: datetime) -> None:
+    legacy = f"{table}_legacy"
+    op.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+    primary_key, indexes, foreign_keys = _table_definition(table)
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {primary_key} TO {legacy}_pkey")
+    for name, _definition in indexes:
+        op.execute(f"ALTER INDEX {name} RENAME TO {_renamed(name, '_legacy')}")
+
+    op.execute(
+        f"CREATE TABLE {table} "
+        f"(LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE) "
+        f"PARTITION BY RANGE ({column})"
+    )
+    # Ключ секционирования обязан входить в первичный ключ.
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {primary_key} PRIMARY KEY (id, {column})")
+    # Определения сняты до переименования и указывают на новое имя родителя;
+    # при ATTACH совпадающие индексы и внешние ключи legacy подключаются без перестроения.
+    for _name, definition in indexes:
+        op.execute(definition)
+    for name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+    op.execute(
+        f"ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_bound "
+        f"CHECK ({column} IS NOT NULL AND {column} < {_timestamp(bound)})"
+    )
+    op.execute(
+        f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+        f"FOR VALUES FROM (MINVALUE) TO ({_timestamp(bound)})"
+    )
+    op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {legacy}_bound")
+
+    start = bound
+    for _ in range(PREMAKE_MONTHS):
+        end = _add_month(start)
+        op.execute(
+            f"CREATE TABLE {table}_p{start:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ({_timestamp(start)}) TO ({_timestamp(end)})"
+        )
+        start = end
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _unpartition_table(table: str, column: str) -> None:
+    partitioned = f"{table}_partitioned"
+    op.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+    primary_key, indexes, foreign_keys = _table_definition(table)
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+    op.execute(f"ALTER TABLE {partitioned} RENAME CONSTRAINT {primary_key} TO {partitioned}_pkey")
+    for name, _definition in indexes:
+        op.execute(f"ALTER INDEX {name} RENAME TO {_renamed(name, '_partitioned')}")
+
+    op.execute(
+        f"CREATE TABLE {table} "
+        f"(LIKE {partitioned} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+    )
+    op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {primary_key} PRIMARY KEY (id)")
+    for _name, definition in indexes:
+        op.execute(definition.replace(" ON ONLY ", " ON ", 1))
+    for name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    op.execute(f"DROP TABLE {partitioned}")
+
+
+def upgrade() -> None:
+    op.execute("UPDATE notifications SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column(
+        "notifications",
+        "created_at",
+        existing_type=sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+    )
+    op.alter_column(
+        "activity_events",
+        "occurred_at",
+        existing_type=sa.DateTime(timezone=True),
+        existing_nullable=False,
+        server_default=sa.func.now(),
+    )
+
+    now = datetime.now(timezone.utc)
+    bound = _add_month(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0))
+    for table, column in PARTITIONED.items():
+        _partition_table(table, column, bound)
+
+    for table, column in {**PARTITIONED, **BRIN_ONLY}.items():
+        op.create_index(_brin_name(table, column), table, [column], postgresql_using="brin")
+
+    op.create_table(
+        "event_archives",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("table_name", sa.String(length=63), nullable=False),
+        sa.Column("partition_name", sa.String(length=63), nullable=False),
+        sa.Column("range_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("range_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("path", sa.String(length=500), nullable=False),
+        sa.Column("row_count", sa.BigInteger(), nullable=False),
+        sa.Column("byte_size", sa.BigInteger(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.CheckConstraint("range_start < range_end", name="ck_event_archives_range"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("table_name", "partition_name", name="uq_event_archives_partition"),
+    )
+    op.create_index(
+        "ix_event_archives_table_range",
+        "event_archives",
+        ["table_name", "range_start", "range_end"],
+    )
+
+
+def downgrade() -> None:
+    # Выгруженные в архив месяцы обратно не загружаются.
+    op.drop_index("ix_event_archives_table_range", table_name="event_archives")
+    op.drop_table("event_archives")
+
+    for table, column in {**PARTITIONED, **BRIN_ONLY}.items():
+        op.drop_index(_brin_name(table, column), table_name=table)
+    for table, column in PARTITIONED.items():
+        _unpartition_table(table, column)
+
+    op.alter_column(
+        "activity_events",
+        "occurred_at",
+        existing_type=sa.DateTime(timezone=True),
+        existing_nullable=False,
+        server_default=None,
+    )
+    op.alter_column(
+        "notifications",
+        "created_at",
+        existing_type=sa.DateTime(timezone=True),
+        nullable=True,
+        server_default=sa.func.now(),
+    )
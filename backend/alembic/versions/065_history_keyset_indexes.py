@@ -0,0 +1,75 @@
+"""Index history feeds for (scope, time, id) keyset pagination
+
+Revision ID: 065_history_keyset_indexes
+Revises: 064_event_partitions
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "065_history_keyset_indexes"
+down_revision = "064_event_partitions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Курсор ленты — (created_at, id); строк без времени быть не должно.
+    op.execute("UPDATE q_transactions SET created_at = to_timestamp(0) WHERE created_at IS NULL")
+    op.alter_column(
+        "q_transactions",
+        "created_at",
+        existing_type=sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+    )
+    op.create_index(
+        "ix_q_transactions_user_created_id",
+        "q_transactions",
+        ["user_id", "created_at", "id"],
+    )
+    op.drop_index("ix_work_entity_events_entity_created", table_name="work_entity_events")
+    op.create_index(
+        "ix_work_entity_events_entity_created_id",
+        "work_entity_events",
+        ["entity_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_task_review_events_task_created_id",
+        "task_review_events",
+        ["task_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_personal_task_events_task_created_id",
+        "personal_task_events",
+        ["task_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_task_acceptance_criterion_events_criterion_created_id",
+        "task_acceptance_criterion_events",
+        ["criterion_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_task_acceptance_criterion_events_criterion_created_id",
+        table_name="task_acceptance_criterion_events",
+    )
+    op.drop_index("ix_personal_task_events_task_created_id", table_name="personal_task_events")
+    op.drop_index("ix_task_review_events_task_created_id", table_name="task_review_events")
+    op.drop_index("ix_work_entity_events_entity_created_id", table_name="work_entity_events")
+    op.create_index(
+        "ix_work_entity_events_entity_created",
+        "work_entity_events",
+        ["entity_id", "created_at"],
+    )
+    op.drop_index("ix_q_transactions_user_created_id", table_name="q_transactions")
+    op.alter_column(
+        "q_transactions",
+        "created_at",
+        existing_type=sa.DateTime(timezone=True),
+        nullable=True,
+        server_default=None,
+    )
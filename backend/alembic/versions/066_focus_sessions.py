@@ -0,0 +1,107 @@
+"""Materialize focus sessions and backfill them from focus activity events
+
+Revision ID: 066_focus_sessions
+Revises: 065_history_keyset_indexes
+
+Каждый focus_start в activity_events становится сессией, закрытой ближайшим
+следующим событием фокуса той же задачи: пауза дает засчитанные секунды
+(added_seconds) и причину, новый старт без паузы — сессию без времени
+(returned). Последний старт остается открытым, только если задача сейчас в
+фокусе. Месяцы, уже выгруженные в event_archives, не восстанавливаются.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "066_focus_sessions"
+down_revision = "065_history_keyset_indexes"
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_SQL = r"""
+WITH ordered AS (
+    SELECT
+        e.actor_id,
+        e.task_id,
+        e.event_type,
+        e.occurred_at,
+        lead(e.event_type) OVER w AS next_type,
+        lead(e.occurred_at) OVER w AS next_at,
+        lead(e.metadata) OVER w AS next_metadata
+    FROM activity_events e
+    WHERE e.task_id IS NOT NULL
+      AND e.event_type IN ('focus_start', 'focus_pause', 'focus_auto_pause')
+    WINDOW w AS (PARTITION BY e.task_id ORDER BY e.occurred_at, e.id)
+)
+INSERT INTO focus_sessions (id, user_id, task_id, started_at, ended_at, seconds, end_reason)
+SELECT
+    gen_random_uuid(),
+    o.actor_id,
+    o.task_id,
+    o.occurred_at,
+    CASE
+        WHEN o.next_type IS NOT NULL THEN o.next_at
+        WHEN t.focus_started_at IS NOT NULL THEN NULL
+        ELSE o.occurred_at
+    END,
+    CASE
+        WHEN o.next_type IN ('focus_pause', 'focus_auto_pause')
+             AND o.next_metadata ->> 'added_seconds' ~ '^[0-9]+$'
+        THEN (o.next_metadata ->> 'added_seconds')::integer
+        ELSE 0
+    END,
+    CASE
+        WHEN o.next_type = 'focus_pause' AND o.next_metadata ->> 'source' = 'submit_for_review'
+        THEN 'submit_for_review'
+        WHEN o.next_type = 'focus_pause' THEN 'pause'
+        WHEN o.next_type = 'focus_auto_pause' THEN coalesce(o.next_metadata ->> 'reason', 'four_hour_limit')
+        WHEN o.next_type IS NULL AND t.focus_started_at IS NOT NULL THEN NULL
+        ELSE 'returned'
+    END
+FROM ordered o
+JOIN tasks t ON t.id = o.task_id
+WHERE o.event_type = 'focus_start'
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "focus_sessions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("task_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ended_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("seconds", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("end_reason", sa.String(length=40), nullable=True),
+        sa.CheckConstraint("seconds >= 0", name="ck_focus_sessions_seconds"),
+        sa.CheckConstraint(
+            "(ended_at IS NULL) = (end_reason IS NULL)",
+            name="ck_focus_sessions_end",
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["task_id"], ["tasks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(BACKFILL_SQL)
+    op.create_index("ix_focus_sessions_user_started", "focus_sessions", ["user_id", "started_at"])
+    op.create_index("ix_focus_sessions_user_ended", "focus_sessions", ["user_id", "ended_at"])
+    op.create_index("ix_focus_sessions_task", "focus_sessions", ["task_id"])
+    op.create_index(
+        "uq_focus_sessions_task_open",
+        "focus_sessions",
+        ["task_id"],
+        unique=True,
+        postgresql_where=sa.text("ended_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_focus_sessions_task_open", table_name="focus_sessions")
+    op.drop_index("ix_focus_sessions_task", table_name="focus_sessions")
+    op.drop_index("ix_focus_sessions_user_ended", table_name="focus_sessions")
+    op.drop_index("ix_focus_sessions_user_started", table_name="focus_sessions")
+    op.drop_table("focus_sessions")
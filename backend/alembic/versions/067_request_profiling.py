@@ -0,0 +1,27 @@
+"""Add per-user request profiling window
+
+Revision ID: 067_request_profiling
+Revises: 066_focus_sessions
+
+Пока users.profiling_until в будущем, каждый запрос пользователя снимается
+сэмплирующим профилировщиком (app.core.profiler). Включает только admin.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "067_request_profiling"
+down_revision = "066_focus_sessions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("profiling_until", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "profiling_until")
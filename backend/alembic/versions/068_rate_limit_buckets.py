@@ -0,0 +1,34 @@
+"""Shared token buckets for the rate limiter
+
+Revision ID: 068_rate_limit_buckets
+Revises: 067_request_profiling
+
+Ведра app.core.rate_limit (RATE_LIMIT_BACKEND=postgres), общие для всех
+воркеров. UNLOGGED: запись без WAL, после аварийного рестарта таблица пуста —
+лимиты просто начинаются заново. На реплику такие таблицы не попадают.
+"""
+
+from alembic import op
+
+revision = "068_rate_limit_buckets"
+down_revision = "067_request_profiling"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE UNLOGGED TABLE rate_limit_buckets (
+            key text PRIMARY KEY,
+            tokens double precision NOT NULL,
+            allowed boolean NOT NULL,
+            updated_at timestamptz NOT NULL
+        ) WITH (fillfactor = 70)
+        """
+    )
+    op.execute("CREATE INDEX ix_rate_limit_buckets_updated_at ON rate_limit_buckets (updated_at)")
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_buckets")
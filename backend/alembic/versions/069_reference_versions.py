@@ -0,0 +1,42 @@
+"""Per-table versions of rarely changing reference data
+
+Revision ID: 069_reference_versions
+Revises: 068_rate_limit_buckets
+
+Строка на справочник (каталог, магазин, праздники, база знаний). Версию
+поднимает services/reference_data в той же транзакции, что и изменение;
+кеш справочников и ETag ответов сверяются с ней одним чтением таблицы.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "069_reference_versions"
+down_revision = "068_rate_limit_buckets"
+branch_labels = None
+depends_on = None
+
+REFERENCES = ("catalog", "shop", "holidays", "knowledge")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reference_versions",
+        sa.Column("name", sa.String(32), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.execute(
+        "INSERT INTO reference_versions (name) VALUES "
+        + ", ".join(f"('{name}')" for name in REFERENCES)
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("reference_versions")
@@ -0,0 +1,85 @@
+"""Maintained per-user unread counters for notification and attention badges
+
+Revision ID: 070_user_badge_counters
+Revises: 069_reference_versions
+
+Строка на пользователя: бейджи читаются поиском по первичному ключу вместо
+четырех COUNT(*) на опрос. Ведется services/badge_counters; здесь
+заполняется пересчетом по текущим данным.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "070_user_badge_counters"
+down_revision = "069_reference_versions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_badge_counters",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("unread_notifications", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("unread_direct", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("unread_important", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("unread_threads", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.CheckConstraint(
+            "unread_notifications >= 0 AND unread_direct >= 0 "
+            "AND unread_important >= 0 AND unread_threads >= 0",
+            name="ck_user_badge_counters_non_negative",
+        ),
+    )
+    op.execute(
+        """
+        INSERT INTO user_badge_counters (
+            user_id, unread_notifications, unread_direct, unread_important, unread_threads
+        )
+        SELECT
+            u.id,
+            COALESCE(n.unread, 0),
+            COALESCE(a.direct, 0),
+            COALESCE(a.important, 0),
+            COALESCE(t.threads, 0)
+        FROM users AS u
+        LEFT JOIN (
+            SELECT user_id, count(*) AS unread
+            FROM notifications
+            WHERE NOT is_read
+            GROUP BY user_id
+        ) AS n ON n.user_id = u.id
+        LEFT JOIN (
+            SELECT
+                user_id,
+                count(*) FILTER (WHERE kind = 'direct') AS direct,
+                count(*) FILTER (WHERE kind = 'important') AS important
+            FROM user_attention_items
+            WHERE NOT is_read
+            GROUP BY user_id
+        ) AS a ON a.user_id = u.id
+        LEFT JOIN (
+            SELECT user_id, count(*) AS threads
+            FROM message_thread_participants
+            WHERE unread_count > 0
+            GROUP BY user_id
+        ) AS t ON t.user_id = u.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_badge_counters")
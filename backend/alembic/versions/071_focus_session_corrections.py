@@ -0,0 +1,53 @@
+"""Record focus time corrections as signed focus_sessions rows
+
+Revision ID: 071_focus_session_corrections
+Revises: 070_user_badge_counters
+
+Коррекция active_seconds пишется строкой time_corrected с разницей
+new - old, поэтому ck_focus_sessions_seconds допускает для нее
+отрицательное значение. Прошлые коррекции восстанавливаются из событий
+focus_time_corrected; месяцы, уже выгруженные в event_archives, — нет.
+"""
+
+from alembic import op
+
+
+revision = "071_focus_session_corrections"
+down_revision = "070_user_badge_counters"
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_SQL = r"""
+INSERT INTO focus_sessions (id, user_id, task_id, started_at, ended_at, seconds, end_reason)
+SELECT
+    gen_random_uuid(),
+    coalesce(t.assignee_id, e.actor_id),
+    e.task_id,
+    e.occurred_at,
+    e.occurred_at,
+    (e.metadata ->> 'new_seconds')::integer - (e.metadata ->> 'old_seconds')::integer,
+    'time_corrected'
+FROM activity_events e
+JOIN tasks t ON t.id = e.task_id
+WHERE e.event_type = 'focus_time_corrected'
+  AND e.metadata ->> 'old_seconds' ~ '^[0-9]+$'
+  AND e.metadata ->> 'new_seconds' ~ '^[0-9]+$'
+  AND e.metadata ->> 'new_seconds' <> e.metadata ->> 'old_seconds'
+"""
+
+
+def upgrade() -> None:
+    op.drop_constraint("ck_focus_sessions_seconds", "focus_sessions", type_="check")
+    op.create_check_constraint(
+        "ck_focus_sessions_seconds",
+        "focus_sessions",
+        "seconds >= 0 OR end_reason = 'time_corrected'",
+    )
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM focus_sessions WHERE end_reason = 'time_corrected'")
+    op.drop_constraint("ck_focus_sessions_seconds", "focus_sessions", type_="check")
+    op.create_check_constraint("ck_focus_sessions_seconds", "focus_sessions", "seconds >= 0")
@@ -1,18 +1,25 @@
-"""Зависимости API: get_db, get_current_user, require_role."""
+"""Зависимости API: get_db, get_read_db, get_loader, get_current_user, require_role, rate limits."""
+import asyncio
+import json
+import logging
 from collections.abc import AsyncGenerator
 from typing import Callable
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, HTTPException, Request, WebSocket, WebSocketDisconnect, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import AsyncSessionLocal
+from app.database import AsyncSessionLocal, AuxSessionLocal, read_only_session
+from app.services.entity_loader import EntityLoader, entity_loader, loader_stats
 from app.models.user import User, UserRole
+from app.core import profiler
+from app.core.rate_limit import rate_limiter, retry_after_header
 from app.core.security import decode_access_token, is_temporary_password_valid
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+logger = logging.getLogger("dpms.entity_loader")
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -25,9 +32,35 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
+            stats = loader_stats(session)
+            if stats is not None and stats.requested:
+                logger.debug(
+                    "entity_loader requested=%d hits=%d queries=%d rows=%d",
+                    stats.requested,
+                    stats.hits,
+                    stats.queries,
+                    stats.rows,
+                )
             await session.close()
 
 
+async def get_read_db(db: AsyncSession = Depends(get_db)) -> AsyncGenerator[AsyncSession, None]:
+    """Сессия только для чтения (реплика при DATABASE_REPLICA_URL) для дашбордов и аналитики."""
+    async with read_only_session(db) as session:
+        yield session
+
+
+async def get_report_db(db: AsyncSession = Depends(get_db)) -> AsyncGenerator[AsyncSession, None]:
+    """Как get_read_db, но с одним снимком данных на все запросы отчета."""
+    async with read_only_session(db, snapshot=True) as session:
+        yield session
+
+
+def get_loader(db: AsyncSession = Depends(get_db)) -> EntityLoader:
+    """Загрузчик сущностей по id, общий для запроса (живет в сессии get_db)."""
+    return entity_loader(db)
+
+
 async def get_current_user(
     request: Request,
     token: str | None = Depends(oauth2_scheme),
@@ -130,9 +163,125 @@ async def _get_authenticated_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     request.state.token_auth_version = token_auth_version
+    if user.profiling_until is not None:
+        profiler.activate(user)
     return user
 
 
+async def authenticate_ws_token(token: str, db: AsyncSession) -> User:
+    """Проверка JWT для WebSocket: те же правила, что у get_current_user."""
+    payload = decode_access_token(token)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Невалидный токен")
+    token_auth_version = payload.get("ver", 0)
+    if type(token_auth_version) is not int or token_auth_version < 0:
+        raise HTTPException(status_code=401, detail="Невалидный токен")
+    sub = payload.get("sub")
+    try:
+        user_id = UUID(sub) if isinstance(sub, str) else sub
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Невалидный токен")
+    user = (
+        await db.execute(select(User).where(User.id == user_id))
+    ).scalar_one_or_none()
+    if (
+        user is None
+        or not user.is_active
+        or user.auth_version != token_auth_version
+        or user.password_change_required
+    ):
+        raise HTTPException(status_code=401, detail="Сессия недоступна")
+    return user
+
+
+async def accept_authenticated_websocket(websocket: WebSocket) -> User | None:
+    """
+    Принять WebSocket и дождаться первого кадра {"type": "auth", "token": ...}.
+
+    JWT не передается в URL, чтобы не попадать в логи прокси. При любой
+    ошибке соединение закрывается с кодом 1008 и возвращается None.
+    """
+    if not await websocket_connect_allowed(websocket):
+        return None
+    await websocket.accept()
+    try:
+        auth_raw = await asyncio.wait_for(websocket.receive_text(), timeout=10)
+        auth_message = json.loads(auth_raw)
+    except (asyncio.TimeoutError, WebSocketDisconnect, RuntimeError, json.JSONDecodeError):
+        await websocket.close(code=1008)
+        return None
+    if (
+        not isinstance(auth_message, dict)
+        or auth_message.get("type") != "auth"
+        or not isinstance(auth_message.get("token"), str)
+    ):
+        await websocket.close(code=1008)
+        return None
+    # Отдельный пул: волна переподключений сокетов не выбирает соединения API.
+    async with AuxSessionLocal() as db:
+        try:
+            user = await authenticate_ws_token(auth_message["token"], db)
+        except HTTPException:
+            await websocket.close(code=1008)
+            return None
+    if not await websocket_connect_allowed(websocket, user):
+        return None
+    return user
+
+
+def client_ip(connection: Request | WebSocket) -> str:
+    return connection.client.host if connection.client else "unknown"
+
+
+async def enforce_rate_limit(
+    rule: str,
+    key: str,
+    detail: str = "Слишком много запросов. Подождите немного.",
+) -> None:
+    """429 с Retry-After, если ведро правила rule для ключа key пусто."""
+    decision = await rate_limiter.hit(rule, key)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers=retry_after_header(decision),
+        )
+
+
+def rate_limit_by_ip(rule: str, detail: str = "Слишком много запросов. Подождите немного.") -> Callable:
+    """Dependency factory: лимит rule на IP клиента."""
+
+    async def _rate_limit_by_ip(request: Request) -> None:
+        await enforce_rate_limit(rule, f"ip:{client_ip(request)}", detail)
+
+    return _rate_limit_by_ip
+
+
+def rate_limit_by_user(rule: str, detail: str = "Слишком много запросов. Подождите немного.") -> Callable:
+    """Dependency factory: лимит rule на текущего пользователя."""
+
+    async def _rate_limit_by_user(user: User = Depends(get_current_user)) -> User:
+        await enforce_rate_limit(rule, f"user:{user.id}", detail)
+        return user
+
+    return _rate_limit_by_user
+
+
+async def websocket_connect_allowed(websocket: WebSocket, user: User | None = None) -> bool:
+    """
+    Лимит подключений WebSocket: до accept — по IP, после авторизации — по пользователю.
+    При превышении сокет закрывается с 1013 (try again later), возвращается False.
+    """
+    if user is None:
+        decision = await rate_limiter.hit("ws_connect_ip", f"ip:{client_ip(websocket)}")
+    else:
+        decision = await rate_limiter.hit("ws_connect_user", f"user:{user.id}")
+    if not decision.allowed:
+        await websocket.close(code=1013)
+        return False
+    return True
+
+
 def require_role(*allowed_roles: str) -> Callable:
     """
     Dependency factory: require_role("admin", "teamlead").
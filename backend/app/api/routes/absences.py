@@ -2,10 +2,12 @@
 from datetime import date
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, Response
+from fastapi import APIRouter, Depends, Query, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, require_task_workspace_role
+from app.core.http_cache import conditional_json_response
 from app.models.user import User
 from app.schemas.absence import AbsenceCreate, AbsenceRead, AbsenceUpdate, HolidayCreate, HolidayRead, HolidayUpdate
 from app.services.absences import (
@@ -18,8 +20,10 @@ from app.services.absences import (
     update_absence,
     update_holiday,
 )
+from app.services.reference_data import REFERENCE_HOLIDAYS, reference_etag, reference_payload_cache
 
 router = APIRouter()
+_holiday_list_adapter = TypeAdapter(list[HolidayRead])
 
 
 @router.get("", response_model=list[AbsenceRead])
@@ -46,13 +50,19 @@ async def post_absence(
 
 @router.get("/holidays", response_model=list[HolidayRead])
 async def get_holidays(
+    request: Request,
     date_from: date = Query(..., alias="from"),
     date_to: date = Query(..., alias="to"),
     _: User = Depends(require_task_workspace_role("admin", "teamlead")),
     db: AsyncSession = Depends(get_db),
 ):
-    """Global non-working days that reduce plan for everyone."""
-    return await list_holidays(db, date_from, date_to)
+    """Global non-working days that reduce plan for everyone (ETag by holidays version)."""
+    etag = await reference_etag(db, REFERENCE_HOLIDAYS, "list", date_from, date_to)
+
+    async def build() -> bytes:
+        return _holiday_list_adapter.dump_json(await list_holidays(db, date_from, date_to))
+
+    return await conditional_json_response(request, etag, build, cache=reference_payload_cache)
 
 
 @router.post("/holidays", response_model=HolidayRead)
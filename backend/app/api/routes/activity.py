@@ -32,6 +32,7 @@ async def activity_events(
     end_date: date | None = Query(None),
     event_type: str | None = Query(None),
     limit: int = Query(200, ge=1, le=500),
+    cursor: str | None = Query(None, description="next_cursor предыдущей страницы"),
     user: User = Depends(require_task_workspace_role("admin", "teamlead")),
     db: AsyncSession = Depends(get_db),
 ):
@@ -45,4 +46,5 @@ async def activity_events(
         end=_end_exclusive(end_date),
         event_type=event_type,
         limit=limit,
+        cursor=cursor,
     )
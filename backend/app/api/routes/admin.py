@@ -1,15 +1,25 @@
 """API админки: закрытие периода, история периодов, оценка лиг. Все эндпоинты — только admin."""
+import asyncio
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, require_role
 from app.models.user import User
+from app.core.loop_monitor import loop_monitor
 from app.schemas.admin import (
+    LoopMonitorReport,
     PeriodSnapshotResponse,
+    ProfilingWindowRequest,
+    ProfilingWindowResponse,
+    RequestProfileDetail,
+    RequestProfileSummary,
+    RolloverPreviewResponse,
     RolloverRequest,
     RolloverResponse,
 )
@@ -19,9 +29,11 @@ from app.services.admin import (
     cancel_period_closure,
     get_period_details,
     get_period_history,
+    preview_rollover_period,
     rollover_period,
 )
-from app.services.leagues import evaluate_league_change, apply_league_changes
+from app.services.leagues import evaluate_league_change, evaluate_league_changes, apply_league_changes
+from app.services.request_profiles import list_profiles, load_folded, load_profile
 
 router = APIRouter()
 
@@ -37,6 +49,16 @@ async def rollover_period_route(
     return RolloverResponse(**result)
 
 
+@router.get("/rollover-period/preview", response_model=RolloverPreviewResponse)
+async def preview_rollover_period_route(
+    period: str | None = Query(None, description="YYYY-MM, по умолчанию прошлый месяц"),
+    user: User = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Dry-run закрытия периода: снимки и списания по каждому сотруднику без записи."""
+    return await preview_rollover_period(db, user.id, period=period)
+
+
 @router.post("/period-close/auto", response_model=RolloverResponse)
 async def auto_close_previous_period_route(
     user: User = Depends(require_role("admin")),
@@ -88,8 +110,7 @@ async def league_evaluation_route(
         ev = await evaluate_league_change(db, user_id)
         return [ev] if ev.full_name else []
     result = await db.execute(select(User).where(User.is_active.is_(True)))
-    users = result.scalars().all()
-    return [await evaluate_league_change(db, u.id) for u in users]
+    return await evaluate_league_changes(db, list(result.scalars().all()))
 
 
 @router.post("/apply-league-changes", response_model=list[LeagueChange])
@@ -99,3 +120,91 @@ async def apply_league_changes_route(
 ):
     """Применить изменения лиг. Только admin."""
     return await apply_league_changes(db, user.id)
+
+
+@router.get("/loop-monitor", response_model=LoopMonitorReport)
+async def loop_monitor_report(
+    top: int = Query(20, ge=1, le=100),
+    user: User = Depends(require_role("admin")),
+):
+    """Лаг event loop и главные блокирующие call sites этого процесса (LOOP_MONITOR_ENABLED)."""
+    return loop_monitor.report(top=top)
+
+
+@router.post("/loop-monitor/reset", response_model=LoopMonitorReport)
+async def loop_monitor_reset(user: User = Depends(require_role("admin"))):
+    """Сбросить накопленные замеры и нарушителей (например, после выкладки исправления)."""
+    loop_monitor.reset()
+    return loop_monitor.report()
+
+
+@router.get("/profiling/users", response_model=list[ProfilingWindowResponse])
+async def profiling_windows(
+    user: User = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Пользователи с открытым окном профилирования запросов."""
+    result = await db.execute(
+        select(User)
+        .where(User.profiling_until > datetime.now(timezone.utc))
+        .order_by(User.profiling_until)
+    )
+    return [
+        ProfilingWindowResponse(user_id=item.id, full_name=item.full_name, profiling_until=item.profiling_until)
+        for item in result.scalars().all()
+    ]
+
+
+@router.put("/profiling/users/{user_id}", response_model=ProfilingWindowResponse)
+async def set_profiling_window(
+    user_id: UUID,
+    body: ProfilingWindowRequest,
+    user: User = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Профилировать все запросы пользователя ближайшие minutes минут (0 — выключить).
+
+    Профили появляются в GET /profiling/profiles после ответа на каждый запрос.
+    """
+    target = await db.get(User, user_id)
+    if target is None:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
+    target.profiling_until = (
+        datetime.now(timezone.utc) + timedelta(minutes=body.minutes) if body.minutes else None
+    )
+    await db.flush()
+    return ProfilingWindowResponse(user_id=target.id, full_name=target.full_name, profiling_until=target.profiling_until)
+
+
+@router.get("/profiling/profiles", response_model=list[RequestProfileSummary])
+async def request_profiles(
+    user_id: str | None = Query(None, description="Только профили этого пользователя"),
+    user: User = Depends(require_role("admin")),
+):
+    """Снятые профили запросов, новые первыми (хранятся PROFILE_RETENTION_HOURS, не больше PROFILE_MAX_ENTRIES)."""
+    items = await asyncio.to_thread(list_profiles)
+    if user_id:
+        items = [item for item in items if item.get("user_id") == user_id]
+    return items
+
+
+@router.get("/profiling/profiles/{profile_id}", response_model=RequestProfileDetail)
+async def request_profile_detail(profile_id: str, user: User = Depends(require_role("admin"))):
+    """Профиль запроса с SQL-запросами и их временем."""
+    profile = await asyncio.to_thread(load_profile, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Профиль не найден")
+    return profile
+
+
+@router.get("/profiling/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+async def request_profile_folded(profile_id: str, user: User = Depends(require_role("admin"))):
+    """Collapsed stacks профиля: открывается в speedscope или flamegraph.pl."""
+    folded = await asyncio.to_thread(load_folded, profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Профиль не найден")
+    return PlainTextResponse(
+        folded,
+        headers={"Content-Disposition": f'attachment; filename="dpms-profile-{profile_id}.folded"'},
+    )
@@ -1,11 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user, get_current_user_for_password_setup
+from app.api.deps import get_db, get_current_user, get_current_user_for_password_setup, rate_limit_by_ip, rate_limit_by_user
 from app.core.security import (
     create_access_token,
     get_password_hash,
@@ -20,7 +18,8 @@ from app.schemas.user import AuthenticatedUserRead, SidebarMenuOrderUpdate
 from app.services.activity import record_activity_event
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+
+LIMIT_DETAIL = "Слишком много попыток. Подождите минуту."
 
 
 def _user_to_read(user: User) -> AuthenticatedUserRead:
@@ -139,8 +138,11 @@ def _clean_sidebar_menu_order(value: dict | None) -> dict | None:
     return {"groups": cleaned_groups, "items": cleaned_items, "item_labels": cleaned_item_labels}
 
 
-@router.post("/login", response_model=TokenResponse)
-@limiter.limit("5/minute")
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit_by_ip("login", LIMIT_DETAIL))],
+)
 async def login(
     request: Request,
     body: LoginRequest,
@@ -179,8 +181,8 @@ async def login(
     )
 
 
-@router.post("/set-password")
-@limiter.limit("5/minute")
+# Временный пароль: get_current_user здесь не пройдет, поэтому ключ — IP.
+@router.post("/set-password", dependencies=[Depends(rate_limit_by_ip("password", LIMIT_DETAIL))])
 async def set_password(
     request: Request,
     body: SetPasswordRequest,
@@ -232,8 +234,7 @@ async def set_password(
     return {"message": "Пароль установлен. Войдите снова", "reauth_required": True}
 
 
-@router.post("/change-password")
-@limiter.limit("5/minute")
+@router.post("/change-password", dependencies=[Depends(rate_limit_by_user("password", LIMIT_DETAIL))])
 async def change_password(
     request: Request,
     body: ChangePasswordRequest,
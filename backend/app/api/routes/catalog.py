@@ -1,20 +1,49 @@
 """API каталога операций. GET — task workspace; изменения — только admin."""
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, require_task_workspace_access, require_task_workspace_role
+from app.core.http_cache import conditional_json_response
 from app.models.user import User
 from app.models.catalog import CatalogItem, CatalogCategory, Complexity
 from app.schemas.catalog import CatalogItemCreate, CatalogItemRead, CatalogItemUpdate
+from app.services.reference_data import (
+    REFERENCE_CATALOG,
+    CatalogEntry,
+    catalog_entries,
+    reference_etag,
+    reference_payload_cache,
+)
 
 router = APIRouter()
+_catalog_list_adapter = TypeAdapter(list[CatalogItemRead])
+
+
+def _matches(
+    entry: CatalogEntry,
+    category: CatalogCategory | None,
+    complexity: Complexity | None,
+    is_active: bool | None,
+    search: str | None,
+) -> bool:
+    if category is not None and entry.category != category:
+        return False
+    if complexity is not None and entry.complexity != complexity:
+        return False
+    if is_active is not None and entry.is_active != is_active:
+        return False
+    if search:
+        return search in entry.name.casefold() or search in (entry.description or "").casefold()
+    return True
 
 
 @router.get("", response_model=list[CatalogItemRead])
 async def list_catalog(
+    request: Request,
     category: CatalogCategory | None = Query(None),
     complexity: Complexity | None = Query(None),
     is_active: bool | None = Query(None),
@@ -22,24 +51,21 @@ async def list_catalog(
     _: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
 ):
-    """Справочник операций с фильтрами."""
-    stmt = select(CatalogItem).order_by(CatalogItem.sort_order.asc(), CatalogItem.name.asc())
-    if category is not None:
-        stmt = stmt.where(CatalogItem.category == category)
-    if complexity is not None:
-        stmt = stmt.where(CatalogItem.complexity == complexity)
-    if is_active is not None:
-        stmt = stmt.where(CatalogItem.is_active == is_active)
-    if search and search.strip():
-        search_term = f"%{search.strip()}%"
-        stmt = stmt.where(
-            or_(
-                CatalogItem.name.ilike(search_term),
-                CatalogItem.description.ilike(search_term),
-            )
+    """Справочник операций с фильтрами (из кеша справочников, ETag по версии каталога)."""
+    search_term = search.strip().casefold() if search and search.strip() else None
+    etag = await reference_etag(db, REFERENCE_CATALOG, "list", category, complexity, is_active, search_term)
+
+    async def build() -> bytes:
+        entries = await catalog_entries(db)
+        return _catalog_list_adapter.dump_json(
+            [
+                CatalogItemRead.model_validate(entry)
+                for entry in entries
+                if _matches(entry, category, complexity, is_active, search_term)
+            ]
         )
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+
+    return await conditional_json_response(request, etag, build, cache=reference_payload_cache)
 
 
 @router.post("", response_model=CatalogItemRead)
@@ -68,15 +94,20 @@ async def create_catalog_item(
 @router.get("/{item_id}", response_model=CatalogItemRead)
 async def get_catalog_item(
     item_id: UUID,
+    request: Request,
     _: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
 ):
     """Одна позиция каталога."""
-    result = await db.execute(select(CatalogItem).where(CatalogItem.id == item_id))
-    item = result.scalar_one_or_none()
-    if not item:
+    entry = next((entry for entry in await catalog_entries(db) if entry.id == item_id), None)
+    if entry is None:
         raise HTTPException(status_code=404, detail="Catalog item not found")
-    return item
+    etag = await reference_etag(db, REFERENCE_CATALOG, "item", item_id)
+
+    async def build() -> CatalogItemRead:
+        return CatalogItemRead.model_validate(entry)
+
+    return await conditional_json_response(request, etag, build)
 
 
 @router.patch("/{item_id}", response_model=CatalogItemRead)
@@ -46,20 +46,20 @@ from app.schemas.competency import (
     DevelopmentPlanItemRead,
     DevelopmentPlanItemUpdate,
     DevelopmentPlanAdminSummaryResponse,
-    DevelopmentPlanAdminSummaryUser,
     DevelopmentPlanImportRequest,
     DevelopmentPlanImportResponse,
     DevelopmentPlanPromptResponse,
-    DevelopmentPlanReportAssessment,
     DevelopmentPlanReportResponse,
-    DevelopmentPlanRoadmapPoint,
 )
 from app.services.competencies import (
     active_attempt,
     attempt_for_user_or_admin,
+    build_development_plan_admin_report,
     can_use_constructor,
     can_use_development,
+    competency_titles_by_id,
     create_or_get_active_attempt,
+    development_report_for_user,
     ensure_builtin_competencies,
     ensure_constructor_access,
     ensure_development_access,
@@ -67,6 +67,8 @@ from app.services.competencies import (
     finish_attempt,
     get_competency_or_404,
     latest_attempt,
+    latest_completed_attempts_for_user,
+    plan_items_for_user,
     questions_for_competency,
     save_answer,
     to_utc,
@@ -332,13 +334,6 @@ def _normalize_competency_title(value: str) -> str:
     return text_value
 
 
-async def _competency_titles(db: AsyncSession, competency_ids: set[UUID]) -> dict[UUID, str]:
-    if not competency_ids:
-        return {}
-    comp_result = await db.execute(select(Competency).where(Competency.id.in_(competency_ids)))
-    return {item.id: item.title for item in comp_result.scalars().all()}
-
-
 def _plan_item_read(item: IndividualDevelopmentPlanItem, competency_titles: dict[UUID, str]) -> DevelopmentPlanItemRead:
     return DevelopmentPlanItemRead(
         id=item.id,
@@ -355,32 +350,6 @@ def _plan_item_read(item: IndividualDevelopmentPlanItem, competency_titles: dict
     )
 
 
-async def _plan_items_for_user(db: AsyncSession, user_id: UUID) -> list[IndividualDevelopmentPlanItem]:
-    result = await db.execute(
-        select(IndividualDevelopmentPlanItem)
-        .where(IndividualDevelopmentPlanItem.user_id == user_id)
-        .order_by(IndividualDevelopmentPlanItem.created_at.desc())
-    )
-    return list(result.scalars().all())
-
-
-async def _latest_completed_attempts_for_user(db: AsyncSession, user_id: UUID) -> list[tuple[CompetencyAttempt, Competency]]:
-    result = await db.execute(
-        select(CompetencyAttempt, Competency)
-        .join(Competency, Competency.id == CompetencyAttempt.competency_id)
-        .where(
-            CompetencyAttempt.user_id == user_id,
-            CompetencyAttempt.status == "completed",
-            Competency.is_active.is_(True),
-        )
-        .order_by(CompetencyAttempt.completed_at.desc().nullslast(), CompetencyAttempt.started_at.desc())
-    )
-    latest_by_competency: dict[UUID, tuple[CompetencyAttempt, Competency]] = {}
-    for attempt, competency in result.all():
-        latest_by_competency.setdefault(competency.id, (attempt, competency))
-    return list(latest_by_competency.values())
-
-
 def _build_development_prompt(user: User, attempts: list[tuple[CompetencyAttempt, Competency]]) -> str:
     assessment_lines = []
     for attempt, competency in attempts:
@@ -442,69 +411,6 @@ def _build_development_prompt(user: User, attempts: list[tuple[CompetencyAttempt
     )
 
 
-async def _development_report_for_user(db: AsyncSession, user: User) -> DevelopmentPlanReportResponse:
-    attempts = await _latest_completed_attempts_for_user(db, user.id)
-    items = await _plan_items_for_user(db, user.id)
-    competency_titles = await _competency_titles(db, {item.competency_id for item in items if item.competency_id})
-
-    status_counts = {status: 0 for status in ("planned", "in_progress", "done", "cancelled")}
-    for item in items:
-        status_counts[item.status] = status_counts.get(item.status, 0) + 1
-    active_total = len([item for item in items if item.status != "cancelled"])
-    progress_percent = round(status_counts.get("done", 0) / active_total * 100) if active_total else 0
-
-    assessments = [
-        DevelopmentPlanReportAssessment(
-            attempt_id=attempt.id,
-            competency_id=competency.id,
-            competency_title=competency.title,
-            source=competency.source,
-            score_ib=attempt.score_ib,
-            score_ich=attempt.score_ich,
-            is_overused=attempt.is_overused,
-            interpretation_text=attempt.interpretation_text,
-            completed_at=attempt.completed_at,
-            retake_allowed_at=attempt.retake_allowed_at,
-        )
-        for attempt, competency in attempts
-    ]
-    roadmap: list[DevelopmentPlanRoadmapPoint] = [
-        DevelopmentPlanRoadmapPoint(
-            title=f"Оценка: {assessment.competency_title}",
-            description=f"ИБ {assessment.score_ib or '—'}, ИЧ {assessment.score_ich or '—'}",
-            status="assessment_completed",
-            completed_at=assessment.completed_at,
-        )
-        for assessment in assessments
-    ]
-    roadmap.extend(
-        DevelopmentPlanRoadmapPoint(
-            id=item.id,
-            title=item.goal,
-            description=item.action_text,
-            status=item.status,
-            due_at=item.due_at,
-            completed_at=item.updated_at if item.status == "done" else None,
-        )
-        for item in sorted(items, key=lambda item: (item.due_at or item.created_at, item.created_at))
-    )
-
-    return DevelopmentPlanReportResponse(
-        user_id=user.id,
-        full_name=user.full_name,
-        email=user.email,
-        completed_assessments_count=len(assessments),
-        plan_total=len(items),
-        plan_planned=status_counts.get("planned", 0),
-        plan_in_progress=status_counts.get("in_progress", 0),
-        plan_done=status_counts.get("done", 0),
-        plan_cancelled=status_counts.get("cancelled", 0),
-        progress_percent=progress_percent,
-        assessments=assessments,
-        roadmap=roadmap,
-    )
-
-
 @router.get("/access", response_model=CompetencyAccess)
 async def access(current_user: User = Depends(get_current_user)):
     """Current user's competency feature access."""
@@ -709,8 +615,8 @@ async def list_plan_items(
 ):
     """Current user's individual development plan items."""
     ensure_development_access(current_user)
-    items = await _plan_items_for_user(db, current_user.id)
-    competency_titles = await _competency_titles(db, {item.competency_id for item in items if item.competency_id})
+    items = await plan_items_for_user(db, current_user.id)
+    competency_titles = await competency_titles_by_id(db, {item.competency_id for item in items if item.competency_id})
     return [_plan_item_read(item, competency_titles) for item in items]
 
 
@@ -721,7 +627,7 @@ async def development_plan_ai_prompt(
 ):
     """Build standardized prompt for cloud LLM-based IPR planning."""
     ensure_development_access(current_user)
-    attempts = await _latest_completed_attempts_for_user(db, current_user.id)
+    attempts = await latest_completed_attempts_for_user(db, current_user.id)
     return DevelopmentPlanPromptResponse(
         prompt=_build_development_prompt(current_user, attempts),
         completed_assessments_count=len(attempts),
@@ -760,7 +666,7 @@ async def import_ai_development_plan(
         competency_by_title[_normalize_competency_title(competency.title)] = competency
     latest_attempts = {
         competency.id: attempt
-        for attempt, competency in await _latest_completed_attempts_for_user(db, current_user.id)
+        for attempt, competency in await latest_completed_attempts_for_user(db, current_user.id)
     }
 
     source_items = data.get("items") or []
@@ -828,7 +734,7 @@ async def import_ai_development_plan(
     await db.flush()
     for item in imported:
         await db.refresh(item)
-    competency_titles = await _competency_titles(db, {item.competency_id for item in imported if item.competency_id})
+    competency_titles = await competency_titles_by_id(db, {item.competency_id for item in imported if item.competency_id})
     return DevelopmentPlanImportResponse(
         imported_count=len(imported),
         skipped_count=skipped_count,
@@ -844,7 +750,7 @@ async def my_development_plan_report(
 ):
     """Current user's development roadmap report."""
     ensure_development_access(current_user)
-    return await _development_report_for_user(db, current_user)
+    return await development_report_for_user(db, current_user)
 
 
 @router.get("/development-plan/admin/report", response_model=DevelopmentPlanAdminSummaryResponse | DevelopmentPlanReportResponse)
@@ -856,87 +762,7 @@ async def admin_development_plan_report(
     """Admin aggregate report or selected employee roadmap."""
     if current_user.role != UserRole.admin:
         raise HTTPException(status_code=403, detail="Доступно только администратору")
-    if user_id:
-        user_result = await db.execute(select(User).where(User.id == user_id, User.is_active.is_(True)))
-        user = user_result.scalar_one_or_none()
-        if not user:
-            raise HTTPException(status_code=404, detail="Сотрудник не найден")
-        return await _development_report_for_user(db, user)
-
-    users_result = await db.execute(select(User).where(User.is_active.is_(True)).order_by(User.full_name))
-    users = [user for user in users_result.scalars().all() if can_use_development(user)]
-    if not users:
-        return DevelopmentPlanAdminSummaryResponse(
-            total_enabled_users=0,
-            users_with_completed_assessments=0,
-            completed_assessments_count=0,
-            users_with_plan=0,
-            plan_total=0,
-            plan_planned=0,
-            plan_in_progress=0,
-            plan_done=0,
-            plan_cancelled=0,
-            users=[],
-        )
-    attempts_result = await db.execute(
-        select(CompetencyAttempt).where(
-            CompetencyAttempt.user_id.in_([user.id for user in users]),
-            CompetencyAttempt.status == "completed",
-        )
-    )
-    attempts = list(attempts_result.scalars().all())
-    items_result = await db.execute(
-        select(IndividualDevelopmentPlanItem).where(
-            IndividualDevelopmentPlanItem.user_id.in_([user.id for user in users])
-        )
-    )
-    items = list(items_result.scalars().all())
-
-    attempts_by_user: dict[UUID, list[CompetencyAttempt]] = {}
-    for attempt in attempts:
-        attempts_by_user.setdefault(attempt.user_id, []).append(attempt)
-    items_by_user: dict[UUID, list[IndividualDevelopmentPlanItem]] = {}
-    for item in items:
-        items_by_user.setdefault(item.user_id, []).append(item)
-
-    status_totals = {status: 0 for status in ("planned", "in_progress", "done", "cancelled")}
-    user_rows: list[DevelopmentPlanAdminSummaryUser] = []
-    for user in users:
-        user_items = items_by_user.get(user.id, [])
-        done_count = len([item for item in user_items if item.status == "done"])
-        in_progress_count = len([item for item in user_items if item.status == "in_progress"])
-        active_total = len([item for item in user_items if item.status != "cancelled"])
-        progress_percent = round(done_count / active_total * 100) if active_total else 0
-        for item in user_items:
-            status_totals[item.status] = status_totals.get(item.status, 0) + 1
-        activity_values = [attempt.completed_at for attempt in attempts_by_user.get(user.id, []) if attempt.completed_at]
-        activity_values.extend([item.updated_at for item in user_items if item.updated_at])
-        user_rows.append(
-            DevelopmentPlanAdminSummaryUser(
-                user_id=user.id,
-                full_name=user.full_name,
-                email=user.email,
-                completed_assessments_count=len(attempts_by_user.get(user.id, [])),
-                plan_total=len(user_items),
-                plan_done=done_count,
-                plan_in_progress=in_progress_count,
-                progress_percent=progress_percent,
-                last_activity_at=max(activity_values) if activity_values else None,
-            )
-        )
-
-    return DevelopmentPlanAdminSummaryResponse(
-        total_enabled_users=len(users),
-        users_with_completed_assessments=len([user for user in users if attempts_by_user.get(user.id)]),
-        completed_assessments_count=len(attempts),
-        users_with_plan=len([user for user in users if items_by_user.get(user.id)]),
-        plan_total=len(items),
-        plan_planned=status_totals.get("planned", 0),
-        plan_in_progress=status_totals.get("in_progress", 0),
-        plan_done=status_totals.get("done", 0),
-        plan_cancelled=status_totals.get("cancelled", 0),
-        users=user_rows,
-    )
+    return await build_development_plan_admin_report(db, user_id)
 
 
 @router.post("/development-plan/my", response_model=DevelopmentPlanItemRead)
@@ -2,10 +2,11 @@
 from datetime import datetime, timezone, timedelta
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_task_workspace_role
+from app.api.deps import get_db, get_read_db, require_task_workspace_role
+from app.database import read_only_session
 from app.models.user import User
 from app.models.transaction import QTransaction, WalletType
 from app.schemas.dashboard import CapacityGauge, TeamSummary, PeriodStats, BurndownData
@@ -17,16 +18,16 @@ from app.services.analytics import (
     get_period_stats,
     get_burndown_data,
 )
-from app.services.calibration import get_teamlead_accuracy
+from app.services.calibration import get_calibration_overview, get_teamlead_accuracy
 from app.services.queue import run_dashboard_maintenance
 from app.services.focus import auto_pause_stale_focuses, get_focus_statuses
 from app.services.absences import absence_dates_by_user, month_bounds_for
 from app.services.planning import effective_plan_for_user
-from app.models.task import Task, TaskStatus
-from app.models.catalog import CatalogItem
 
 router = APIRouter()
 
+WEEK_SECONDS = 7 * 24 * 3600
+
 
 @router.get("/capacity", response_model=CapacityGauge)
 async def capacity(
@@ -35,7 +36,8 @@ async def capacity(
 ):
     """Метрика «Стакан»: загрузка vs ёмкость команды."""
     await run_dashboard_maintenance(db)
-    return await get_capacity_gauge(db)
+    async with read_only_session(db) as read_db:
+        return await get_capacity_gauge(read_db)
 
 
 @router.get("/team-summary", response_model=TeamSummary)
@@ -45,7 +47,8 @@ async def team_summary(
 ):
     """Сводка по команде (по лигам, earned vs target, in_progress_q, is_at_risk)."""
     await run_dashboard_maintenance(db)
-    return await get_team_summary(db)
+    async with read_only_session(db) as read_db:
+        return await get_team_summary(read_db)
 
 
 @router.get("/plan-fact", response_model=TeamSummary)
@@ -55,7 +58,8 @@ async def plan_fact(
 ):
     """План/факт по сотрудникам (то же что team-summary)."""
     await run_dashboard_maintenance(db)
-    return await get_team_summary(db)
+    async with read_only_session(db) as read_db:
+        return await get_team_summary(read_db)
 
 
 @router.get("/period-stats", response_model=PeriodStats)
@@ -65,7 +69,8 @@ async def period_stats(
 ):
     """Статистика текущего месяца для дашборда руководителя."""
     await run_dashboard_maintenance(db)
-    return await get_period_stats(db)
+    async with read_only_session(db) as read_db:
+        return await get_period_stats(read_db)
 
 
 @router.get("/burndown", response_model=BurndownData)
@@ -75,14 +80,15 @@ async def burndown(
 ):
     """Данные для графика burn-down текущего месяца."""
     await run_dashboard_maintenance(db)
-    return await get_burndown_data(db)
+    async with read_only_session(db) as read_db:
+        return await get_burndown_data(read_db)
 
 
 @router.get("/capacity-history")
 async def capacity_history(
     weeks: int = Query(default=6, ge=1, le=12),
     user: User = Depends(require_task_workspace_role("admin", "teamlead")),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     История ёмкости команды за последние N недель.
@@ -108,20 +114,27 @@ async def capacity_history(
         1: "янв", 2: "фев", 3: "мар", 4: "апр", 5: "май", 6: "июн",
         7: "июл", 8: "авг", 9: "сен", 10: "окт", 11: "ноя", 12: "дек",
     }
+    # Все недели одним запросом: номер недели i — транзакции в (now - (i+1) нед., now - i нед.].
+    week_index = (
+        func.ceil(func.extract("epoch", bindparam("now", now) - QTransaction.created_at) / WEEK_SECONDS) - 1
+    ).label("week_index")
+    earned_result = await db.execute(
+        select(week_index, func.sum(QTransaction.amount))
+        .where(
+            QTransaction.wallet_type == WalletType.main,
+            QTransaction.amount > 0,
+            QTransaction.created_at >= now - timedelta(weeks=weeks),
+            QTransaction.created_at < now,
+        )
+        .group_by(week_index)
+    )
+    earned_by_week = {int(index): float(total or 0) for index, total in earned_result.all()}
+
     points = []
     for i in range(weeks - 1, -1, -1):
         week_end = now - timedelta(weeks=i)
         week_start = week_end - timedelta(weeks=1)
-
-        earned_result = await db.execute(
-            select(func.sum(QTransaction.amount)).where(
-                QTransaction.wallet_type == WalletType.main,
-                QTransaction.amount > 0,
-                QTransaction.created_at >= week_start,
-                QTransaction.created_at < week_end,
-            )
-        )
-        earned = float(earned_result.scalar() or 0)
+        earned = earned_by_week.get(i, 0.0)
         percent = round(earned / total_capacity * 100, 0) if total_capacity > 0 else 0
 
         start_day = week_start.day
@@ -144,7 +157,10 @@ async def focus_status(
     db: AsyncSession = Depends(get_db),
 ):
     """Статусы фокуса всех исполнителей (для дашборда тимлида/админа)."""
-    await auto_pause_stale_focuses(db)
+    if await auto_pause_stale_focuses(db):
+        # Свои автопаузы: общий результат ведущего мог посчитаться до них.
+        await db.commit()
+        return await get_focus_statuses.fresh(db)
     return await get_focus_statuses(db)
 
 
@@ -152,7 +168,7 @@ async def focus_status(
 async def calibration(
     period: str = Query(default="", description="YYYY-MM, пусто = текущий"),
     user: User = Depends(require_task_workspace_role("admin")),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Калибровочный отчёт:
@@ -160,193 +176,13 @@ async def calibration(
     2. Точность оценщиков
     3. Популярность операций каталога
     """
-    now = datetime.now(timezone.utc)
-    use_period_filter = True
-    if period and period.lower() == "all":
-        start = None
-        end = None
-        use_period_filter = False
-    elif period:
-        try:
-            year, month = int(period[:4]), int(period[5:7])
-            start = datetime(year, month, 1, tzinfo=timezone.utc)
-            end = (
-                datetime(year, month + 1, 1, tzinfo=timezone.utc)
-                if month < 12
-                else datetime(year + 1, 1, 1, tzinfo=timezone.utc)
-            )
-        except (ValueError, IndexError):
-            start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            end = now
-    else:
-        start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        end = now
-
-    # --- 1. Калибровка по задачам ---
-    done_stmt = select(Task).where(
-        Task.status == TaskStatus.done,
-        Task.started_at.isnot(None),
-        Task.completed_at.isnot(None),
-    )
-    if use_period_filter and start is not None and end is not None:
-        done_stmt = done_stmt.where(
-            Task.completed_at >= start,
-            Task.completed_at < end,
-        )
-    done_stmt = done_stmt.order_by(Task.completed_at.desc())
-    done_result = await db.execute(done_stmt)
-    done_list = list(done_result.scalars().all())
-
-    user_ids = set()
-    for t in done_list:
-        if t.assignee_id:
-            user_ids.add(t.assignee_id)
-        if t.estimator_id:
-            user_ids.add(t.estimator_id)
-    users_map = {}
-    if user_ids:
-        u_res = await db.execute(select(User.id, User.full_name).where(User.id.in_(user_ids)))
-        users_map = {row.id: row.full_name for row in u_res.all()}
-
-    task_calibrations = []
-    for t in done_list:
-        # Продуктивное время: сначала active_seconds, для старых задач — wall-clock
-        if getattr(t, "active_seconds", 0) and t.active_seconds > 0:
-            actual_hours = t.active_seconds / 3600
-        else:
-            actual_hours = (t.completed_at - t.started_at).total_seconds() / 3600
-        estimated_hours = float(t.estimated_q)
-        deviation_pct = (
-            round((actual_hours - estimated_hours) / estimated_hours * 100, 0)
-            if estimated_hours > 0
-            else 0
-        )
-        task_calibrations.append({
-            "task_id": str(t.id),
-            "title": t.title,
-            "task_type": t.task_type.value,
-            "complexity": t.complexity.value,
-            "estimated_q": float(t.estimated_q),
-            "actual_hours": round(actual_hours, 1),
-            "deviation_pct": int(deviation_pct),
-            "assignee_name": users_map.get(t.assignee_id, "—"),
-            "estimator_name": users_map.get(t.estimator_id, "—"),
-            "tags": t.tags or [],
-        })
-
-    # --- 2. Калибровка по оценщикам ---
-    estimator_stats: dict = {}
-    for tc in task_calibrations:
-        name = tc["estimator_name"]
-        if name == "—":
-            continue
-        if name not in estimator_stats:
-            estimator_stats[name] = {
-                "tasks": 0,
-                "total_deviation": 0.0,
-                "overestimates": 0,
-                "underestimates": 0,
-            }
-        s = estimator_stats[name]
-        s["tasks"] += 1
-        s["total_deviation"] += tc["deviation_pct"]
-        if tc["deviation_pct"] > 10:
-            s["underestimates"] += 1
-        elif tc["deviation_pct"] < -10:
-            s["overestimates"] += 1
-
-    estimator_calibrations = []
-    for name, s in estimator_stats.items():
-        avg_dev = round(s["total_deviation"] / s["tasks"], 0) if s["tasks"] > 0 else 0
-        accuracy = max(0, 100 - abs(avg_dev))
-        bias = "завышает" if avg_dev < -10 else "занижает" if avg_dev > 10 else "точно"
-        estimator_calibrations.append({
-            "estimator_name": name,
-            "tasks_count": s["tasks"],
-            "avg_deviation_pct": int(avg_dev),
-            "accuracy_pct": int(accuracy),
-            "bias": bias,
-            "overestimates": s["overestimates"],
-            "underestimates": s["underestimates"],
-        })
-
-    # --- 3. Популярность операций каталога ---
-    all_tasks_stmt = select(Task).where(Task.estimation_details.isnot(None))
-    if use_period_filter and start is not None and end is not None:
-        all_tasks_stmt = all_tasks_stmt.where(
-            Task.created_at >= start,
-            Task.created_at < end,
-        )
-    all_tasks_result = await db.execute(all_tasks_stmt)
-    all_with_details = list(all_tasks_result.scalars().all())
-    total_tasks_with_breakdown = 0
-    widget_usage: dict[str, int] = {}
-
-    catalog_result = await db.execute(select(CatalogItem.id, CatalogItem.name))
-    catalog_id_to_name = {str(row.id): row.name for row in catalog_result.all()}
-
-    for t in all_with_details:
-        details = t.estimation_details
-        if not isinstance(details, dict):
-            continue
-        breakdown = details.get("breakdown", [])
-        if not breakdown:
-            continue
-        total_tasks_with_breakdown += 1
-        seen_names: set[str] = set()
-        for item in breakdown:
-            if not isinstance(item, dict):
-                continue
-            name = item.get("name")
-            if not name and item.get("catalog_id"):
-                name = catalog_id_to_name.get(str(item["catalog_id"]), "Unknown")
-            if not name:
-                name = "Unknown"
-            if name not in seen_names:
-                widget_usage[name] = widget_usage.get(name, 0) + 1
-                seen_names.add(name)
-
-    widget_popularity = sorted(
-        [
-            {
-                "name": name,
-                "tasks_count": count,
-                "usage_percent": round(count / total_tasks_with_breakdown * 100, 0)
-                if total_tasks_with_breakdown > 0
-                else 0,
-            }
-            for name, count in widget_usage.items()
-        ],
-        key=lambda x: x["tasks_count"],
-        reverse=True,
-    )
-
-    total_tasks = len(task_calibrations)
-    avg_deviation = (
-        round(sum(tc["deviation_pct"] for tc in task_calibrations) / total_tasks, 0)
-        if total_tasks > 0
-        else 0
-    )
-    accurate_count = sum(1 for tc in task_calibrations if abs(tc["deviation_pct"]) <= 15)
-    accuracy_overall = round(accurate_count / total_tasks * 100, 0) if total_tasks > 0 else 0
-
-    period_display = "all" if (period and period.lower() == "all") else (period or now.strftime("%Y-%m"))
-    return CalibrationReportNew(
-        period=period_display,
-        total_tasks_analyzed=total_tasks,
-        overall_accuracy_pct=int(accuracy_overall),
-        avg_deviation_pct=int(avg_deviation),
-        task_calibrations=task_calibrations,
-        estimator_calibrations=estimator_calibrations,
-        widget_popularity=widget_popularity,
-        total_tasks_with_breakdown=total_tasks_with_breakdown,
-    )
+    return await get_calibration_overview(db, period)
 
 
 @router.get("/teamlead-accuracy", response_model=list[TeamleadAccuracy])
 async def teamlead_accuracy(
     user: User = Depends(require_task_workspace_role("admin")),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Точность оценок тимлидов. Только admin."""
     return await get_teamlead_accuracy(db)
@@ -3,11 +3,13 @@ import re
 from datetime import datetime, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, require_task_workspace_access, require_task_workspace_role
+from app.core.http_cache import conditional_json_response
 from app.models.knowledge import KnowledgeArticle, KnowledgeStatus
 from app.models.user import User
 from app.schemas.knowledge import (
@@ -15,8 +17,15 @@ from app.schemas.knowledge import (
     KnowledgeArticleRead,
     KnowledgeArticleUpdate,
 )
+from app.services.reference_data import (
+    REFERENCE_KNOWLEDGE,
+    knowledge_articles,
+    reference_etag,
+    reference_payload_cache,
+)
 
 router = APIRouter()
+_article_list_adapter = TypeAdapter(list[KnowledgeArticleRead])
 
 
 def _can_manage(user: User) -> bool:
@@ -60,52 +69,70 @@ async def _get_article_by_id_or_404(db: AsyncSession, article_id: UUID) -> Knowl
     return article
 
 
+def _visible(article: KnowledgeArticleRead, manager: bool, status_filter: KnowledgeStatus | None) -> bool:
+    if not manager:
+        return article.status == KnowledgeStatus.published
+    return status_filter is None or article.status == status_filter
+
+
+def _matches_search(article: KnowledgeArticleRead, search: str) -> bool:
+    return any(search in value.casefold() for value in (article.title, article.summary, article.body))
+
+
 @router.get("", response_model=list[KnowledgeArticleRead])
 async def list_knowledge_articles(
+    request: Request,
     section: str | None = Query(None),
     status_filter: KnowledgeStatus | None = Query(None, alias="status"),
     search: str | None = Query(None),
     user: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
 ):
-    """Список статей базы знаний."""
+    """Список статей базы знаний (кеш справочников, ETag по версии базы знаний)."""
     manager = _can_manage(user)
-    stmt = select(KnowledgeArticle)
-    if manager:
-        if status_filter is not None:
-            stmt = stmt.where(KnowledgeArticle.status == status_filter)
-    else:
-        stmt = stmt.where(KnowledgeArticle.status == KnowledgeStatus.published)
-    if section and section.strip():
-        stmt = stmt.where(KnowledgeArticle.section == section.strip())
-    if search and search.strip():
-        pattern = f"%{search.strip()}%"
-        stmt = stmt.where(
-            or_(
-                KnowledgeArticle.title.ilike(pattern),
-                KnowledgeArticle.summary.ilike(pattern),
-                KnowledgeArticle.body.ilike(pattern),
-            )
-        )
-    stmt = stmt.order_by(KnowledgeArticle.sort_order.asc(), KnowledgeArticle.title.asc())
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+    section = section.strip() if section and section.strip() else None
+    search_term = search.strip().casefold() if search and search.strip() else None
+    etag = await reference_etag(
+        db,
+        REFERENCE_KNOWLEDGE,
+        "list",
+        manager,
+        status_filter.value if manager and status_filter is not None else None,
+        section,
+        search_term,
+    )
+
+    async def build() -> bytes:
+        articles = [
+            article
+            for article in await knowledge_articles(db)
+            if _visible(article, manager, status_filter)
+            and (section is None or article.section == section)
+            and (search_term is None or _matches_search(article, search_term))
+        ]
+        return _article_list_adapter.dump_json(articles)
+
+    return await conditional_json_response(request, etag, build, cache=reference_payload_cache)
 
 
 @router.get("/{slug}", response_model=KnowledgeArticleRead)
 async def get_knowledge_article(
     slug: str,
+    request: Request,
     user: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
 ):
     """Одна статья базы знаний по slug."""
-    result = await db.execute(select(KnowledgeArticle).where(KnowledgeArticle.slug == slug))
-    article = result.scalar_one_or_none()
-    if not article:
-        raise HTTPException(status_code=404, detail="Статья не найдена")
-    if article.status != KnowledgeStatus.published and not _can_manage(user):
+    manager = _can_manage(user)
+    article = next((article for article in await knowledge_articles(db) if article.slug == slug), None)
+    if article is None or (article.status != KnowledgeStatus.published and not manager):
         raise HTTPException(status_code=404, detail="Статья не найдена")
-    return article
+    etag = await reference_etag(db, REFERENCE_KNOWLEDGE, "article", article.id)
+
+    async def build() -> KnowledgeArticleRead:
+        return article
+
+    return await conditional_json_response(request, etag, build)
 
 
 @router.post("", response_model=KnowledgeArticleRead)
@@ -1,7 +1,6 @@
 """Focused attention inbox and subject-based correspondence API."""
 from __future__ import annotations
 
-import asyncio
 import json
 import uuid
 from datetime import datetime, timezone
@@ -12,9 +11,7 @@ from sqlalchemy import and_, or_, select, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
-from app.core.security import decode_access_token
-from app.database import AsyncSessionLocal
+from app.api.deps import accept_authenticated_websocket, get_current_user, get_db
 from app.models.contact import Contact
 from app.models.messages import MessagePost, MessageThread, MessageThreadParticipant
 from app.models.quick_note import QuickNote
@@ -32,6 +29,7 @@ from app.schemas.messages import (
     MessageThreadRead,
 )
 from app.services.attention_realtime import AttentionConnection, attention_hub
+from app.services.badge_counters import touch_badges
 from app.services.email_outbox import enqueue_message_notification
 from app.services.messages import (
     get_attention_summary,
@@ -588,6 +586,7 @@ async def create_thread(
         recipient=recipient,
         sender_name=current_user.full_name,
     )
+    touch_badges(db, [recipient.id])
     await db.commit()
     await attention_hub.send_to_users(
         [current_user.id, recipient.id],
@@ -715,6 +714,7 @@ async def create_post(
             recipient=recipient,
             sender_name=current_user.full_name,
         )
+    touch_badges(db, [user.id for user in other_users])
     await db.commit()
     await attention_hub.send_to_users(
         [user.id for _, user in participant_rows],
@@ -736,6 +736,8 @@ async def read_thread(
     previous = participant.unread_count
     participant.unread_count = 0
     participant.last_read_at = datetime.now(timezone.utc)
+    if previous:
+        touch_badges(db, [current_user.id])
     await db.commit()
     if previous:
         await attention_hub.send_to_user(
@@ -745,54 +747,12 @@ async def read_thread(
     return {"read": True, "thread_id": str(thread_id)}
 
 
-async def _authenticate_ws_user(token: str, db: AsyncSession) -> User:
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Невалидный токен")
-    token_auth_version = payload.get("ver", 0)
-    if type(token_auth_version) is not int or token_auth_version < 0:
-        raise HTTPException(status_code=401, detail="Невалидный токен")
-    sub = payload.get("sub")
-    try:
-        user_id = UUID(sub) if isinstance(sub, str) else sub
-    except (TypeError, ValueError):
-        raise HTTPException(status_code=401, detail="Невалидный токен")
-    user = (
-        await db.execute(select(User).where(User.id == user_id))
-    ).scalar_one_or_none()
-    if (
-        user is None
-        or not user.is_active
-        or user.auth_version != token_auth_version
-        or user.password_change_required
-    ):
-        raise HTTPException(status_code=401, detail="Сессия недоступна")
-    return user
-
-
 @router.websocket("/live")
 async def messages_live(websocket: WebSocket) -> None:
     """User-level resync hints; the JWT is accepted only in the first frame."""
-    await websocket.accept()
-    try:
-        auth_raw = await asyncio.wait_for(websocket.receive_text(), timeout=10)
-        auth_message = json.loads(auth_raw)
-    except (asyncio.TimeoutError, WebSocketDisconnect, RuntimeError, json.JSONDecodeError):
-        await websocket.close(code=1008)
-        return
-    if (
-        not isinstance(auth_message, dict)
-        or auth_message.get("type") != "auth"
-        or not isinstance(auth_message.get("token"), str)
-    ):
-        await websocket.close(code=1008)
+    user = await accept_authenticated_websocket(websocket)
+    if user is None:
         return
-    async with AsyncSessionLocal() as db:
-        try:
-            user = await _authenticate_ws_user(auth_message["token"], db)
-        except HTTPException:
-            await websocket.close(code=1008)
-            return
 
     connection = AttentionConnection(websocket=websocket)
     attention_hub.add(user.id, connection)
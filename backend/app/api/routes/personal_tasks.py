@@ -3,13 +3,13 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Response, UploadFile
 from fastapi.responses import FileResponse
 from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import get_current_user, get_db, require_task_workspace_access
+from app.api.deps import get_current_user, get_db, rate_limit_by_user, require_task_workspace_access
 from app.models.deadline_tracker import DeadlineTracker
 from app.models.personal_task import PersonalTask, PersonalTaskCheckpoint, PersonalTaskEvent
 from app.models.personal_task_artifact import (
@@ -39,6 +39,7 @@ from app.schemas.personal_task import (
 from app.schemas.task import TaskRead
 from app.services.activity import record_activity_event
 from app.services.attachments import stored_attachment_path
+from app.services.pagination import keyset_page, set_cursor_header
 from app.services.personal_task_artifacts import (
     add_artifact_version,
     clean_optional,
@@ -683,17 +684,25 @@ async def update_personal_task(
 @router.get("/{task_id}/events", response_model=list[PersonalTaskEventRead])
 async def list_personal_task_events(
     task_id: UUID,
+    response: Response,
+    limit: int = Query(200, ge=1, le=500),
+    cursor: str | None = Query(None, description="значение заголовка X-Next-Cursor предыдущей страницы"),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Read task timeline."""
+    """Read task timeline, newest first, page by page."""
     await _get_owned_task_or_404(db, task_id, user.id)
-    result = await db.execute(
-        select(PersonalTaskEvent)
-        .where(PersonalTaskEvent.task_id == task_id)
-        .order_by(PersonalTaskEvent.created_at.desc(), PersonalTaskEvent.id.desc())
+    page = await keyset_page(
+        db,
+        select(PersonalTaskEvent).where(PersonalTaskEvent.task_id == task_id),
+        time_column=PersonalTaskEvent.created_at,
+        id_column=PersonalTaskEvent.id,
+        limit=limit,
+        cursor=cursor,
+        scalars=True,
     )
-    return result.scalars().all()
+    set_cursor_header(response, page)
+    return page.rows
 
 
 @router.post("/{task_id}/events", response_model=PersonalTaskEventRead)
@@ -900,6 +909,7 @@ async def list_personal_task_artifacts(
     "/{task_id}/artifacts",
     response_model=PersonalTaskArtifactRead,
     status_code=201,
+    dependencies=[Depends(rate_limit_by_user("upload"))],
 )
 async def create_personal_task_artifact(
     task_id: UUID,
@@ -954,6 +964,7 @@ async def create_personal_task_artifact(
     "/{task_id}/artifacts/{artifact_id}/versions",
     response_model=PersonalTaskArtifactRead,
     status_code=201,
+    dependencies=[Depends(rate_limit_by_user("upload"))],
 )
 async def create_personal_task_artifact_version(
     task_id: UUID,
@@ -8,21 +8,26 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db, require_task_workspace_access, require_task_workspace_role
 from app.models.user import User, UserRole
 from app.schemas.queue import (
+    AssignBatchRequest,
     AssignRequest,
     AssignCandidate,
+    QueueBatchItemResult,
     QueueTaskResponse,
     PullRequest,
     SubmitRequest,
+    ValidateBatchRequest,
     ValidateRequest,
 )
 from app.schemas.task import TaskRead
+from app.services.queue_snapshot import queue_view_response
 from app.services.queue import (
     assign_task,
+    assign_tasks_batch,
     get_assign_candidates,
-    get_available_tasks,
     pull_task,
     submit_for_review,
     validate_task,
+    validate_tasks_batch,
 )
 
 router = APIRouter()
@@ -42,7 +47,7 @@ async def queue_list(
     db: AsyncSession = Depends(get_db),
 ):
     """Задачи в очереди. category=proactive — только проактивные, !proactive — обычные."""
-    return await get_available_tasks(db, user.id, category=category)
+    return await queue_view_response(db, user, category=category)
 
 
 @router.post("/pull", response_model=TaskRead)
@@ -98,6 +103,16 @@ async def queue_validate(
     return task
 
 
+@router.post("/validate-batch", response_model=list[QueueBatchItemResult])
+async def queue_validate_batch(
+    body: ValidateBatchRequest,
+    user: User = Depends(require_task_workspace_access),
+    db: AsyncSession = Depends(get_db),
+):
+    """Принять/вернуть пакет задач в одной транзакции; результат по каждой позиции."""
+    return await validate_tasks_batch(db, user.id, body.items)
+
+
 @router.post("/assign", response_model=TaskRead)
 async def queue_assign(
     body: AssignRequest,
@@ -112,6 +127,16 @@ async def queue_assign(
     return task
 
 
+@router.post("/assign-batch", response_model=list[QueueBatchItemResult])
+async def queue_assign_batch(
+    body: AssignBatchRequest,
+    user: User = Depends(require_task_workspace_role("teamlead", "admin")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Назначить пакет задач в одной транзакции; результат по каждой позиции."""
+    return await assign_tasks_batch(db, user.id, body.items, body.comment)
+
+
 @router.get("/candidates/{task_id}", response_model=list[AssignCandidate])
 async def queue_candidates(
     task_id: UUID,
@@ -10,8 +10,8 @@ from sqlalchemy import or_, select
 from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
-from app.database import AsyncSessionLocal
+from app.api.deps import get_current_user, get_db, rate_limit_by_user, websocket_connect_allowed
+from app.database import AuxSessionLocal
 from app.api.routes.contacts import has_accepted_contact
 from app.core.security import decode_access_token
 from app.models.quick_note import QuickNote
@@ -474,7 +474,7 @@ async def list_note_attachments(
     )
     return list(result.scalars().all())
 
-@router.post("/{note_id}/attachments", response_model=QuickNoteAttachmentRead)
+@router.post("/{note_id}/attachments", response_model=QuickNoteAttachmentRead, dependencies=[Depends(rate_limit_by_user("upload"))])
 async def upload_note_attachment(
     note_id: UUID,
     file: UploadFile = File(...),
@@ -626,6 +626,8 @@ async def quick_note_live(websocket: WebSocket, note_id: UUID) -> None:
     (owner or active share) the connection joins the in-memory hub and is
     notified of the current active users. Ping/pong keeps idle sockets alive.
     """
+    if not await websocket_connect_allowed(websocket):
+        return
     await websocket.accept()
     try:
         auth_raw = await asyncio.wait_for(websocket.receive_text(), timeout=10)
@@ -645,7 +647,7 @@ async def quick_note_live(websocket: WebSocket, note_id: UUID) -> None:
         await websocket.close(code=1008)
         return
     token = auth_msg["token"]
-    async with AsyncSessionLocal() as db:
+    async with AuxSessionLocal() as db:
         try:
             user = await _authenticate_ws_user(token, db)
             has_access = await _user_has_note_access(db, note_id, user.id)
@@ -655,12 +657,14 @@ async def quick_note_live(websocket: WebSocket, note_id: UUID) -> None:
     if not has_access:
         await websocket.close(code=1008)
         return
+    if not await websocket_connect_allowed(websocket, user):
+        return
 
     hub = await hub_registry.get_or_create(note_id)
     connection = QuickNoteConnection(websocket=websocket, user_id=user.id)
     hub.add(user.id, connection)
     try:
-        async with AsyncSessionLocal() as db:
+        async with AuxSessionLocal() as db:
             still_has_access = await _user_has_note_access(db, note_id, user.id)
     except Exception:
         hub.remove(user.id, connection)
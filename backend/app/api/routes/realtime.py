@@ -0,0 +1,88 @@
+"""Единый WebSocket-канал: подписка на темы queue / notifications / focus / dashboard."""
+from __future__ import annotations
+
+import json
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from app.api.deps import accept_authenticated_websocket
+from app.models.user import User, UserRole
+from app.services.realtime import (
+    TOPIC_DASHBOARD,
+    TOPIC_FOCUS,
+    TOPIC_NOTIFICATIONS,
+    TOPIC_QUEUE,
+    TOPICS,
+    RealtimeConnection,
+    realtime_hub,
+)
+
+router = APIRouter()
+
+
+def _allowed_topics(user: User) -> set[str]:
+    """Те же ограничения, что у REST-эндпоинтов, которые клиент перечитает по событию."""
+    allowed = {TOPIC_NOTIFICATIONS}
+    if user.role == UserRole.admin or user.task_workspace_enabled:
+        allowed.add(TOPIC_QUEUE)
+        if user.role in (UserRole.admin, UserRole.teamlead):
+            allowed |= {TOPIC_FOCUS, TOPIC_DASHBOARD}
+    return allowed
+
+
+@router.websocket("/live")
+async def realtime_live(websocket: WebSocket) -> None:
+    """
+    Push-канал вместо опроса: сервер шлет topic.changed с версией темы,
+    клиент перечитывает REST-данные только после реального изменения.
+
+    Протокол: {"type": "auth", "token"} первым кадром, затем
+    {"type": "subscribe", "topics": [...]} (можно повторять — набор
+    заменяется) и {"type": "ping"}.
+    """
+    user = await accept_authenticated_websocket(websocket)
+    if user is None:
+        return
+
+    allowed = _allowed_topics(user)
+    connection = RealtimeConnection(websocket=websocket, user_id=user.id)
+    realtime_hub.add(connection)
+    try:
+        # Все отправки — под send_lock: хаб может публиковать в этот сокет параллельно.
+        async with connection.send_lock:
+            await websocket.send_text(json.dumps({"type": "ready", "topics": sorted(allowed)}))
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(message, dict):
+                continue
+            if message.get("type") == "ping":
+                async with connection.send_lock:
+                    await websocket.send_text(json.dumps({"type": "pong"}))
+            elif message.get("type") == "subscribe":
+                requested = message.get("topics")
+                if not isinstance(requested, list):
+                    continue
+                wanted = {topic for topic in requested if isinstance(topic, str) and topic in TOPICS}
+                granted = wanted & allowed
+                connection.topics = granted
+                async with connection.send_lock:
+                    await websocket.send_text(
+                        json.dumps(
+                            {
+                                "type": "subscribed",
+                                "topics": sorted(granted),
+                                "denied": sorted(wanted - granted),
+                                "versions": realtime_hub.versions(granted),
+                            }
+                        )
+                    )
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        pass
+    finally:
+        realtime_hub.remove(connection)
@@ -1,16 +1,20 @@
 """API отчётов за период. Только admin/teamlead."""
+import gzip
 from datetime import date
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_task_workspace_role
+from app.api.deps import ensure_task_workspace_access, get_current_user, get_db, get_report_db, require_task_workspace_role
+from app.core.http_cache import etag_matches
+from app.models.report_job import ReportJob
 from app.models.user import User
 from app.schemas.activity import EmployeePeriodSummary
-from app.schemas.reports import EmployeeScorecardResponse, PeriodReport
+from app.schemas.reports import EmployeeScorecardResponse, PeriodReport, ReportJobCreate, ReportJobRead
 from app.services.activity import generate_employee_period_summary
+from app.services.report_jobs import REPORT_KINDS, get_report_job, load_report_result, submit_report_job
 from app.services.reports import generate_employee_scorecard, generate_period_report
 
 router = APIRouter()
@@ -22,7 +26,7 @@ async def get_employee_summary(
     start_date: date = Query(...),
     end_date: date = Query(...),
     user: User = Depends(require_task_workspace_role("admin", "teamlead")),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_report_db),
 ):
     """Сводка по сотруднику за дату или период."""
     if end_date < start_date:
@@ -45,7 +49,7 @@ async def get_employee_scorecard(
     start_date: date = Query(...),
     end_date: date = Query(...),
     user: User = Depends(require_task_workspace_role("admin", "teamlead")),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_report_db),
 ):
     """Рейтинг сотрудников за период: прозрачная scorecard v1."""
     if end_date < start_date:
@@ -53,11 +57,92 @@ async def get_employee_scorecard(
     return await generate_employee_scorecard(db, start_date=start_date, end_date=end_date)
 
 
+def _ensure_report_kind_access(user: User, kind: str) -> None:
+    spec = REPORT_KINDS[kind]
+    if spec.task_workspace:
+        ensure_task_workspace_access(user)
+    if user.role not in spec.roles:
+        raise HTTPException(status_code=403, detail="Недостаточно прав")
+
+
+async def _job_for_user(db: AsyncSession, job_id: UUID, user: User) -> ReportJob:
+    """Задачи общие для всех, кому доступен вид отчета: дедупликация не смотрит на автора."""
+    job = await get_report_job(db, job_id)
+    if job is None or job.kind not in REPORT_KINDS:
+        raise HTTPException(status_code=404, detail="Задача отчёта не найдена")
+    _ensure_report_kind_access(user, job.kind)
+    return job
+
+
+@router.post("/jobs", response_model=ReportJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def create_report_job(
+    body: ReportJobCreate,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Поставить отчёт в очередь; одинаковый запрос возвращает уже идущий или свежий расчёт."""
+    _ensure_report_kind_access(user, body.kind)
+    try:
+        job, deduplicated = await submit_report_job(
+            db,
+            kind=body.kind,
+            params=body.params,
+            requested_by_id=user.id,
+        )
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=422,
+            detail=exc.errors(include_url=False, include_context=False),
+        )
+    return ReportJobRead.model_validate(job).model_copy(update={"deduplicated": deduplicated})
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobRead)
+async def read_report_job(
+    job_id: UUID,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Статус и прогресс задачи отчёта."""
+    return await _job_for_user(db, job_id, user)
+
+
+@router.get("/jobs/{job_id}/result")
+async def download_report_job_result(
+    job_id: UUID,
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Готовый отчёт (JSON). ETag — хеш содержимого, повторная загрузка отвечает 304;
+    клиенту с Accept-Encoding: gzip отдаются сохранённые сжатые байты без распаковки.
+    """
+    job = await _job_for_user(db, job_id, user)
+    if job.status != "done" or not job.result_etag:
+        raise HTTPException(status_code=409, detail="Отчёт ещё не готов")
+    etag = f'"{job.result_etag}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    data = await load_report_result(db, job.id)
+    if data is None:
+        raise HTTPException(status_code=409, detail="Отчёт ещё не готов")
+    if "gzip" in request.headers.get("accept-encoding", "").lower():
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=data, media_type="application/json", headers=headers)
+    return Response(content=gzip.decompress(data), media_type="application/json", headers=headers)
+
+
 @router.get("/{period}", response_model=PeriodReport)
 async def get_period_report(
     period: str,
     user: User = Depends(require_task_workspace_role("admin", "teamlead")),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_report_db),
 ):
     """Отчёт за период (YYYY-MM)."""
     return await generate_period_report(db, period)
@@ -1,11 +1,13 @@
 """API магазина бонусов. purchase, purchases, approve защищены JWT."""
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import TypeAdapter
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, require_task_workspace_access, require_task_workspace_role
+from app.core.http_cache import conditional_json_response
 from app.models.user import User
 from app.models.shop import ShopItem
 from app.schemas.shop import (
@@ -22,8 +24,10 @@ from app.services.shop import (
     purchase_item,
     reject_purchase,
 )
+from app.services.reference_data import REFERENCE_SHOP, reference_etag, reference_payload_cache
 
 router = APIRouter()
+_shop_list_adapter = TypeAdapter(list[ShopItemResponse])
 
 
 def _purchase_actor_id(user: User, body_user_id: UUID | None) -> UUID:
@@ -40,12 +44,17 @@ def _decision_actor_id(user: User, body_user_id: UUID | None) -> UUID:
 
 @router.get("", response_model=list[ShopItemResponse])
 async def list_shop_items(
+    request: Request,
     _: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
 ):
-    """Список активных товаров."""
-    items = await get_shop_items(db)
-    return items
+    """Список активных товаров (ETag по версии справочника магазина)."""
+    etag = await reference_etag(db, REFERENCE_SHOP, "list")
+
+    async def build() -> bytes:
+        return _shop_list_adapter.dump_json(await get_shop_items(db))
+
+    return await conditional_json_response(request, etag, build, cache=reference_payload_cache)
 
 
 @router.post("/purchase", response_model=PurchaseResponse)
@@ -1,13 +1,12 @@
 """API задач. Все эндпоинты защищены JWT."""
-from datetime import datetime, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from fastapi.responses import FileResponse
 from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_task_workspace_access, require_task_workspace_role
+from app.api.deps import get_db, get_loader, get_report_db, rate_limit_by_user, require_task_workspace_access, require_task_workspace_role
 from app.models.attachment import TaskAttachment
 from app.models.user import User, UserRole
 from app.models.task import Task, TaskPriority, TaskReviewEvent, TaskStatus, TaskType
@@ -18,7 +17,6 @@ from app.schemas.task import (
     TaskAttachmentRead,
     TaskReviewEventRead,
     TaskTagSuggestion,
-    TaskExportRow,
     TasksExport,
     TaskImportCommitResponse,
     TaskImportPreview,
@@ -31,19 +29,24 @@ from app.schemas.task import (
 from app.schemas.task_acceptance import (
     AcceptanceCriteriaReviewRequest,
     AcceptanceCriteriaSubmitRequest,
+    AcceptanceCriterionEventRead,
     AcceptanceCriterionRevisionRequest,
     AcceptancePlanUpdate,
     TaskAcceptanceRead,
 )
 from app.services.attachments import attachment_path, save_task_attachment
+from app.services.entity_loader import EntityLoader
 from app.services.activity import record_activity_event
 from app.services.queue import create_bugfix
+from app.services.reports import generate_tasks_export
 from app.services.focus import start_focus, pause_focus, correct_active_time
+from app.services.pagination import keyset_page, set_cursor_header
 from app.services.task_import import commit_task_import, preview_task_import
 from app.services.task_policy import ensure_critical_priority_allowed, resolve_task_estimator_id
 from app.services.task_acceptance import (
     get_task_acceptance,
     initialize_acceptance_plan,
+    list_criterion_events,
     replace_acceptance_plan,
     review_acceptance_criteria,
     revise_acceptance_decision,
@@ -53,9 +56,8 @@ from app.services.task_acceptance import (
 router = APIRouter()
 
 
-async def _get_task_or_404(db: AsyncSession, task_id: UUID) -> Task:
-    result = await db.execute(select(Task).where(Task.id == task_id))
-    task = result.scalar_one_or_none()
+async def _get_task_or_404(loader: EntityLoader, task_id: UUID) -> Task:
+    task = await loader.load(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
@@ -149,69 +151,13 @@ async def export_tasks(
     assignee_id: UUID | None = Query(None),
     category: str | None = Query(None, description="task_type: widget, etl, api, docs"),
     user: User = Depends(require_task_workspace_role("admin", "teamlead")),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_report_db),
 ):
     """Экспорт завершённых задач за период (admin/teamlead)."""
-    try:
-        year, month = int(period[:4]), int(period[5:7])
-        start = datetime(year, month, 1, tzinfo=timezone.utc)
-        if month == 12:
-            end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
-        else:
-            end = datetime(year, month + 1, 1, tzinfo=timezone.utc)
-    except (ValueError, IndexError):
-        raise HTTPException(status_code=400, detail="Некорректный период (ожидается YYYY-MM)")
-    stmt = (
-        select(Task)
-        .where(Task.completed_at >= start, Task.completed_at < end)
-        .order_by(Task.completed_at)
-    )
-    if assignee_id is not None:
-        stmt = stmt.where(Task.assignee_id == assignee_id)
-    if category is not None:
-        from app.models.task import TaskType
-        try:
-            stmt = stmt.where(Task.task_type == TaskType(category))
-        except ValueError:
-            pass
-    result = await db.execute(stmt)
-    tasks = list(result.scalars().all())
-    user_ids = set()
-    for t in tasks:
-        if t.assignee_id:
-            user_ids.add(t.assignee_id)
-        if t.validator_id:
-            user_ids.add(t.validator_id)
-    users_map: dict[UUID, str] = {}
-    if user_ids:
-        u_res = await db.execute(select(User.id, User.full_name).where(User.id.in_(user_ids)))
-        users_map = {row.id: row.full_name for row in u_res.all()}
-    rows: list[TaskExportRow] = []
-    total_q = 0.0
-    for t in tasks:
-        duration_hours = None
-        if t.started_at and t.completed_at:
-            delta = t.completed_at - t.started_at
-            duration_hours = round(delta.total_seconds() / 3600, 1)
-        rows.append(
-            TaskExportRow(
-                title=t.title,
-                category=t.task_type.value,
-                complexity=t.complexity.value,
-                estimated_q=float(t.estimated_q),
-                assignee_name=users_map.get(t.assignee_id) if t.assignee_id else "",
-                started_at=t.started_at.isoformat() if t.started_at else None,
-                completed_at=t.completed_at.isoformat() if t.completed_at else None,
-                duration_hours=duration_hours,
-                validator_name=users_map.get(t.validator_id) if t.validator_id else None,
-                status=t.status.value,
-            )
-        )
-        total_q += float(t.estimated_q)
-    return TasksExport(period=period, rows=rows, total_tasks=len(rows), total_q=round(total_q, 1))
+    return await generate_tasks_export(db, period, assignee_id=assignee_id, category=category)
 
 
-@router.post("/import/preview", response_model=TaskImportPreview)
+@router.post("/import/preview", response_model=TaskImportPreview, dependencies=[Depends(rate_limit_by_user("upload"))])
 async def preview_tasks_import(
     file: UploadFile = File(...),
     user: User = Depends(require_task_workspace_role("admin", "teamlead")),
@@ -221,7 +167,7 @@ async def preview_tasks_import(
     return await preview_task_import(db, file, user)
 
 
-@router.post("/import", response_model=TaskImportCommitResponse)
+@router.post("/import", response_model=TaskImportCommitResponse, dependencies=[Depends(rate_limit_by_user("upload"))])
 async def import_tasks(
     file: UploadFile = File(...),
     user: User = Depends(require_task_workspace_role("admin", "teamlead")),
@@ -236,6 +182,7 @@ async def get_task(
     task_id: UUID,
     user: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """Детали задачи."""
     from app.services.focus import auto_pause_stale_focuses
@@ -243,7 +190,7 @@ async def get_task(
 
     await auto_pause_stale_focuses(db)
     await check_overdue_tasks(db)
-    task = await _get_task_or_404(db, task_id)
+    task = await _get_task_or_404(loader, task_id)
     data = TaskRead.model_validate(task, from_attributes=True)
     if task.due_date:
         data.deadline_zone = compute_deadline_zone(task)
@@ -253,19 +200,29 @@ async def get_task(
 @router.get("/{task_id}/review-events", response_model=list[TaskReviewEventRead])
 async def list_task_review_events(
     task_id: UUID,
+    response: Response,
+    limit: int = Query(200, ge=1, le=500),
+    cursor: str | None = Query(None, description="значение заголовка X-Next-Cursor предыдущей страницы"),
     user: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
-    """История сдач, возвратов и приемок задачи."""
-    await _get_task_or_404(db, task_id)
-    result = await db.execute(
+    """История сдач, возвратов и приемок задачи (в хронологическом порядке, по страницам)."""
+    await _get_task_or_404(loader, task_id)
+    page = await keyset_page(
+        db,
         select(TaskReviewEvent, User)
         .outerjoin(User, TaskReviewEvent.actor_id == User.id)
-        .where(TaskReviewEvent.task_id == task_id)
-        .order_by(TaskReviewEvent.created_at.asc())
+        .where(TaskReviewEvent.task_id == task_id),
+        time_column=TaskReviewEvent.created_at,
+        id_column=TaskReviewEvent.id,
+        limit=limit,
+        cursor=cursor,
+        descending=False,
     )
+    set_cursor_header(response, page)
     events: list[TaskReviewEventRead] = []
-    for event, actor in result.all():
+    for event, actor in page.rows:
         events.append(
             TaskReviewEventRead(
                 id=event.id,
@@ -295,6 +252,25 @@ async def get_acceptance_plan(
     return await get_task_acceptance(db, task_id, user)
 
 
+@router.get(
+    "/{task_id}/acceptance/criteria/{criterion_id}/events",
+    response_model=list[AcceptanceCriterionEventRead],
+)
+async def list_acceptance_criterion_events(
+    task_id: UUID,
+    criterion_id: UUID,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="events_next_cursor критерия или X-Next-Cursor"),
+    user: User = Depends(require_task_workspace_access),
+    db: AsyncSession = Depends(get_db),
+):
+    """Older criterion events, newest first, beyond those embedded in the acceptance plan."""
+    events, page = await list_criterion_events(db, task_id, criterion_id, limit=limit, cursor=cursor)
+    set_cursor_header(response, page)
+    return events
+
+
 @router.put("/{task_id}/acceptance-plan", response_model=TaskAcceptanceRead)
 async def update_acceptance_plan(
     task_id: UUID,
@@ -344,9 +320,10 @@ async def list_task_attachments(
     task_id: UUID,
     user: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """Список вложений задачи."""
-    await _get_task_or_404(db, task_id)
+    await _get_task_or_404(loader, task_id)
     result = await db.execute(
         select(TaskAttachment)
         .where(TaskAttachment.task_id == task_id)
@@ -355,15 +332,16 @@ async def list_task_attachments(
     return list(result.scalars().all())
 
 
-@router.post("/{task_id}/attachments", response_model=TaskAttachmentRead)
+@router.post("/{task_id}/attachments", response_model=TaskAttachmentRead, dependencies=[Depends(rate_limit_by_user("upload"))])
 async def upload_task_attachment(
     task_id: UUID,
     file: UploadFile = File(...),
     user: User = Depends(require_task_workspace_role("admin", "teamlead")),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """Загрузить файл к задаче до взятия её в работу."""
-    task = await _get_task_or_404(db, task_id)
+    task = await _get_task_or_404(loader, task_id)
     return await save_task_attachment(db, task=task, uploader=user, upload=file)
 
 
@@ -373,9 +351,10 @@ async def get_task_attachment_content(
     attachment_id: UUID,
     user: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """Вернуть файл вложения задачи."""
-    await _get_task_or_404(db, task_id)
+    await _get_task_or_404(loader, task_id)
     result = await db.execute(
         select(TaskAttachment).where(
             TaskAttachment.id == attachment_id,
@@ -2,7 +2,7 @@
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -24,6 +24,7 @@ from app.schemas.leagues import LeagueProgress
 from app.services.analytics import get_user_progress, get_run_rate
 from app.services.planning import add_months
 from app.services.leagues import get_league_progress as get_league_progress_svc
+from app.services.pagination import keyset_page, set_cursor_header
 from app.services.user_admin_audit import (
     TEMPORARY_PASSWORD_EVENT,
     USER_CREATED_EVENT,
@@ -81,6 +82,7 @@ async def list_users_for_admin(
 async def get_user_admin_history(
     user_id: UUID,
     limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="next_cursor предыдущей страницы"),
     _: User = Depends(require_role("admin")),
     db: AsyncSession = Depends(get_db),
 ):
@@ -92,6 +94,7 @@ async def get_user_admin_history(
         db,
         target_user_id=user_id,
         limit=limit,
+        cursor=cursor,
     )
 
 
@@ -361,12 +364,15 @@ async def get_user_run_rate(
 @router.get("/{user_id}/transactions", response_model=list[QTransactionRead])
 async def get_user_transactions(
     user_id: UUID,
+    response: Response,
     wallet_type: str | None = Query(None, description="main | karma"),
     direction: str | None = Query(None, description="credit | debit"),
+    limit: int = Query(200, ge=1, le=500),
+    cursor: str | None = Query(None, description="значение заголовка X-Next-Cursor предыдущей страницы"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """История операций. Свои — всегда; чужие — только admin/teamlead."""
+    """История операций (новые сверху, по страницам). Свои — всегда; чужие — только admin/teamlead."""
     from app.api.deps import get_current_user
 
     if current_user.id != user_id and current_user.role.value not in ("admin", "teamlead"):
@@ -385,6 +391,14 @@ async def get_user_transactions(
         stmt = stmt.where(QTransaction.amount > 0)
     elif direction == "debit":
         stmt = stmt.where(QTransaction.amount < 0)
-    stmt = stmt.order_by(QTransaction.created_at.desc())
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+    page = await keyset_page(
+        db,
+        stmt,
+        time_column=QTransaction.created_at,
+        id_column=QTransaction.id,
+        limit=limit,
+        cursor=cursor,
+        scalars=True,
+    )
+    set_cursor_header(response, page)
+    return page.rows
@@ -3,9 +3,9 @@ from datetime import datetime, timezone
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -44,6 +44,7 @@ from app.schemas.work_entity import (
     WorkEntityType,
     WorkEntityUpdate,
 )
+from app.services.pagination import keyset_page, legacy_cursor, set_cursor_header
 from app.services.work_entities import (
     build_entity_summary,
     get_entity_access,
@@ -2067,7 +2068,9 @@ async def delete_work_entity_member(
 @router.get("/{entity_id}/events", response_model=list[WorkEntityEventRead])
 async def list_work_entity_events(
     entity_id: UUID,
+    response: Response,
     limit: int = Query(100, ge=1, le=300),
+    cursor: str | None = Query(None, description="значение заголовка X-Next-Cursor предыдущей страницы"),
     before_created_at: datetime | None = None,
     before_id: UUID | None = None,
     user: User = Depends(require_task_workspace_access),
@@ -2079,30 +2082,17 @@ async def list_work_entity_events(
             status_code=400,
             detail="Для курсора события требуется дата",
         )
-    stmt = (
+    page = await keyset_page(
+        db,
         select(WorkEntityEvent, User)
         .outerjoin(User, User.id == WorkEntityEvent.actor_id)
-        .where(WorkEntityEvent.entity_id == entity_id)
+        .where(WorkEntityEvent.entity_id == entity_id),
+        time_column=WorkEntityEvent.created_at,
+        id_column=WorkEntityEvent.id,
+        limit=limit,
+        cursor=cursor or legacy_cursor(before_created_at, before_id),
     )
-    if before_created_at is not None:
-        cursor_filter = WorkEntityEvent.created_at < before_created_at
-        if before_id is not None:
-            cursor_filter = or_(
-                cursor_filter,
-                and_(
-                    WorkEntityEvent.created_at == before_created_at,
-                    WorkEntityEvent.id < before_id,
-                ),
-            )
-        stmt = stmt.where(cursor_filter)
-    rows = (
-        await db.execute(
-            stmt.order_by(
-                WorkEntityEvent.created_at.desc(),
-                WorkEntityEvent.id.desc(),
-            ).limit(limit)
-        )
-    ).all()
+    set_cursor_header(response, page)
     return [
         WorkEntityEventRead(
             id=event.id,
@@ -2125,5 +2115,5 @@ async def list_work_entity_events(
             ),
             created_at=event.created_at,
         )
-        for event, actor in rows
+        for event, actor in page.rows
     ]
@@ -4,13 +4,14 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy import and_, func, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_task_workspace_access
+from app.api.deps import get_db, get_loader, require_task_workspace_access
+from app.core.http_cache import conditional_json_response
 from app.models.user import User
 from app.models.work_entity import (
     WorkEntity,
@@ -47,6 +48,7 @@ from app.schemas.work_entity import (
     WorkEntityTaskUpdate,
     WorkEntityWorkspaceRead,
 )
+from app.services.entity_loader import EntityLoader
 from app.services.execution_contracts import (
     create_execution_contract,
     list_execution_contract_options,
@@ -82,6 +84,8 @@ from app.services.work_entity_workspace import (
     validate_milestone_baseline,
     validate_stage,
     validate_task_dates,
+    workspace_etag,
+    workspace_payload_cache,
     would_create_dependency_cycle,
 )
 
@@ -118,29 +122,22 @@ def _change_rows(
     return rows
 
 
-async def _user_label(db: AsyncSession, user_id: UUID | None) -> str | None:
+async def _user_label(loader: EntityLoader, user_id: UUID | None) -> str | None:
     if user_id is None:
         return None
-    return (
-        await db.execute(select(User.full_name).where(User.id == user_id))
-    ).scalar_one_or_none() or str(user_id)
+    user = await loader.load(User, user_id)
+    return user.full_name if user else str(user_id)
 
 
 async def _stage_label(
-    db: AsyncSession,
+    loader: EntityLoader,
     entity_id: UUID,
     stage_id: UUID | None,
 ) -> str | None:
     if stage_id is None:
         return None
-    return (
-        await db.execute(
-            select(WorkEntityStage.title).where(
-                WorkEntityStage.id == stage_id,
-                WorkEntityStage.entity_id == entity_id,
-            )
-        )
-    ).scalar_one_or_none() or str(stage_id)
+    stage = await loader.load(WorkEntityStage, stage_id)
+    return stage.title if stage and stage.entity_id == entity_id else str(stage_id)
 
 
 def _event_payload(
@@ -340,21 +337,35 @@ async def _workspace_artifact_read(
 @router.get("/{entity_id}/workspace", response_model=WorkEntityWorkspaceRead)
 async def get_work_entity_workspace(
     entity_id: UUID,
+    request: Request,
     user: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
 ):
     entity, access_role = await _entity_access_or_404(db, entity_id, user)
-    return await build_workspace(db, entity, access_role, user)
+    etag = await workspace_etag(db, entity, access_role, user, view="workspace")
+    return await conditional_json_response(
+        request,
+        etag,
+        lambda: build_workspace(db, entity, access_role, user),
+        cache=workspace_payload_cache,
+    )
 
 
 @router.get("/{entity_id}/map", response_model=WorkEntityMapRead)
 async def get_work_entity_map(
     entity_id: UUID,
+    request: Request,
     user: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
 ):
     entity, access_role = await _entity_access_or_404(db, entity_id, user)
-    return await build_project_map(db, entity, access_role, user)
+    etag = await workspace_etag(db, entity, access_role, user, view="map")
+    return await conditional_json_response(
+        request,
+        etag,
+        lambda: build_project_map(db, entity, access_role, user),
+        cache=workspace_payload_cache,
+    )
 
 
 @router.post(
@@ -784,6 +795,7 @@ async def update_work_entity_task(
     body: WorkEntityTaskUpdate,
     user: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     await lock_entity_state(db)
     entity, access_role = await _entity_access_or_404(db, entity_id, user)
@@ -894,10 +906,13 @@ async def update_work_entity_task(
         against_baseline=False,
     )
     display_changes: dict[str, tuple[object, object]] = {}
+    # Прежнее и новое значение подписей уходят одним запросом на модель.
+    loader.prime(WorkEntityStage, [task.stage_id, changes.get("stage_id")])
+    loader.prime(User, [task.assignee_id, changes.get("assignee_id")])
     if "stage_id" in changes:
         next_stage = await validate_stage(db, entity.id, changes["stage_id"])
         display_changes["stage_id"] = (
-            await _stage_label(db, entity.id, task.stage_id),
+            await _stage_label(loader, entity.id, task.stage_id),
             next_stage.title if next_stage else None,
         )
     next_assignee = None
@@ -908,7 +923,7 @@ async def update_work_entity_task(
             changes["assignee_id"],
         )
         display_changes["assignee_id"] = (
-            await _user_label(db, task.assignee_id),
+            await _user_label(loader, task.assignee_id),
             next_assignee.full_name if next_assignee else None,
         )
     next_status = changes.get("status", task.status)
@@ -1264,6 +1279,7 @@ async def update_work_entity_milestone(
     body: WorkEntityMilestoneUpdate,
     user: User = Depends(require_task_workspace_access),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     await lock_entity_state(db)
     entity, access_role = await _editable_entity_or_404(db, entity_id, user)
@@ -1294,10 +1310,12 @@ async def update_work_entity_milestone(
             detail="Обоснуйте ключевую или критическую контрольную точку",
         )
     display_changes: dict[str, tuple[object, object]] = {}
+    loader.prime(WorkEntityStage, [milestone.stage_id, changes.get("stage_id")])
+    loader.prime(User, [milestone.decision_owner_id, changes.get("decision_owner_id")])
     if "stage_id" in changes:
         next_stage = await validate_stage(db, entity.id, changes["stage_id"])
         display_changes["stage_id"] = (
-            await _stage_label(db, entity.id, milestone.stage_id),
+            await _stage_label(loader, entity.id, milestone.stage_id),
             next_stage.title if next_stage else None,
         )
     if "decision_owner_id" in changes:
@@ -1307,7 +1325,7 @@ async def update_work_entity_milestone(
             changes["decision_owner_id"],
         )
         display_changes["decision_owner_id"] = (
-            await _user_label(db, milestone.decision_owner_id),
+            await _user_label(loader, milestone.decision_owner_id),
             next_decision_owner.full_name if next_decision_owner else None,
         )
     next_status = changes.get("status", milestone.status)
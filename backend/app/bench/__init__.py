@@ -0,0 +1 @@
+"""Нагрузочный стенд: генератор данных масштаба продакшена и HTTP-бенчмарк."""
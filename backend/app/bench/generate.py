@@ -0,0 +1,656 @@
+"""
+Synthetic large-tenant data for load and query-plan benchmarks.
+
+Запуск: python -m app.bench.generate --users 1000 --tasks 200000 --projects 500 --messages 1e6
+
+Строки пишутся COPY (asyncpg copy_records_to_table) в одной транзакции,
+без ORM. Все идентификаторы, тексты, распределения статусов и даты выводятся
+из --seed и --as-of, поэтому один и тот же запуск дает одну и ту же базу:
+результаты бенчмарков разных релизов сравнимы. Пользователи стенда — это
+email вида bench-<seed>-<n>@dpms-bench.local с общим паролем --password;
+повторный запуск с тем же seed отказывается работать поверх старых данных.
+
+После загрузки пересчитываются счетчики очереди и rollups проектов (те же
+процедуры, что python -m app.maintenance.* --repair) и выполняется ANALYZE.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import enum
+import itertools
+import logging
+import random
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import DateTime, Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.security import get_password_hash
+from app.database import AsyncSessionLocal, engine
+from app.models.catalog import Complexity
+from app.models.contact import Contact
+from app.models.messages import MessagePost, MessageThread, MessageThreadParticipant
+from app.models.task import Task, TaskPriority, TaskStatus, TaskType
+from app.models.transaction import QTransaction, WalletType
+from app.models.user import League, User, UserRole
+from app.models.work_entity import WorkEntity, WorkEntityLink, WorkEntityMember, WorkEntityTask
+from app.services.badge_counters import verify_badge_counters
+from app.services.queue_counters import verify_queue_counters
+from app.services.work_entity_rollups import verify_entity_rollups
+from app.workers.badge_counters import recount_once as recount_badge_rows
+
+
+logger = logging.getLogger("dpms.bench.generate")
+
+COPY_CHUNK = 50_000
+EMAIL_DOMAIN = "dpms-bench.local"
+HISTORY_DAYS = 365
+CONTACTS_PER_USER = 6
+POSTS_PER_THREAD = 40
+
+# Веса статусов очереди: основная масса — закрытая история, хвост — живая работа.
+TASK_STATUS_WEIGHTS = {
+    TaskStatus.done: 70,
+    TaskStatus.cancelled: 4,
+    TaskStatus.in_queue: 10,
+    TaskStatus.new: 4,
+    TaskStatus.estimated: 5,
+    TaskStatus.in_progress: 4,
+    TaskStatus.review: 3,
+}
+TASK_TYPE_WEIGHTS = {
+    TaskType.widget: 45,
+    TaskType.etl: 20,
+    TaskType.api: 12,
+    TaskType.docs: 8,
+    TaskType.bugfix: 10,
+    TaskType.proactive: 5,
+}
+PRIORITY_WEIGHTS = {
+    TaskPriority.low: 15,
+    TaskPriority.medium: 60,
+    TaskPriority.high: 20,
+    TaskPriority.critical: 5,
+}
+COMPLEXITY_Q = {
+    Complexity.S: (0.5, 2.0),
+    Complexity.M: (1.0, 4.0),
+    Complexity.L: (3.0, 8.0),
+    Complexity.XL: (6.0, 16.0),
+}
+LEAGUE_MPW = {League.C: 70, League.B: 80, League.A: 90}
+WIP_BY_LEAGUE = {League.C: 2, League.B: 3, League.A: 4}
+ACTIVITY_STATUS_WEIGHTS = {
+    "planned": 35,
+    "in_progress": 20,
+    "waiting": 5,
+    "blocked": 3,
+    "review": 7,
+    "done": 27,
+    "cancelled": 3,
+}
+
+TITLE_VERBS = ("Собрать", "Доработать", "Проверить", "Перенести", "Оптимизировать", "Настроить", "Описать")
+TITLE_OBJECTS = (
+    "дашборд продаж", "ETL выгрузку", "отчет по KPI", "витрину клиентов", "фильтры периода",
+    "API справочников", "сводную таблицу", "карту регионов", "документацию по витрине", "алерты SLA",
+)
+PROJECT_TOPICS = (
+    "Аналитика продаж", "Миграция хранилища", "Отчетность руководства", "Портал данных",
+    "Качество данных", "Мониторинг SLA", "Финансовая витрина", "Операционные дашборды",
+)
+MESSAGE_WORDS = (
+    "посмотри", "пожалуйста", "выгрузку", "за", "прошлую", "неделю", "цифры", "расходятся", "с",
+    "отчетом", "поправил", "фильтр", "готово", "к", "проверке", "завтра", "созвон", "по", "витрине",
+    "спасибо", "уточни", "источник", "данных", "сроки", "сдвигаются", "на", "день",
+)
+
+
+def _weighted(rng: random.Random, weights: dict[Any, int]) -> Any:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _count(value: str) -> int:
+    """Количество строк: допускает запись 1e6."""
+    number = float(value)
+    if number < 0 or number != int(number):
+        raise argparse.ArgumentTypeError(f"expected a non-negative integer, got {value}")
+    return int(number)
+
+
+class Ids:
+    """Детерминированные UUID v4 из общего генератора seed."""
+
+    def __init__(self, rng: random.Random):
+        self._rng = rng
+
+    def next(self) -> uuid.UUID:
+        return uuid.UUID(int=self._rng.getrandbits(128), version=4)
+
+
+@dataclass
+class _CopyPlan:
+    """Колонки COPY: переданные в строке плюс недостающие с Python-default модели.
+
+    Колонки только с server_default (task_number, created_at сообщений)
+    в COPY не попадают и заполняются базой.
+    """
+
+    table: Table
+    columns: list[str]
+    defaults: dict[str, Any]
+
+    @classmethod
+    def build(cls, table: Table, provided: Iterable[str], ids: Ids, anchor: datetime) -> "_CopyPlan":
+        provided = list(provided)
+        unknown = set(provided) - set(table.columns.keys())
+        if unknown:
+            raise ValueError(f"{table.name}: unknown columns {sorted(unknown)}")
+        columns = list(provided)
+        defaults: dict[str, Any] = {}
+        for column in table.columns:
+            if column.name in provided:
+                continue
+            default = column.default
+            if default is None:
+                if not column.nullable and column.server_default is None:
+                    raise ValueError(f"{table.name}.{column.name} is required")
+                continue
+            if isinstance(column.type, DateTime):
+                value: Any = anchor
+            elif column.primary_key:
+                value = ids  # новый id на каждую строку
+            elif default.is_scalar:
+                value = default.arg
+            elif default.is_callable:
+                value = default.arg(None)
+            else:
+                raise ValueError(f"{table.name}.{column.name}: SQL default is not supported by COPY")
+            columns.append(column.name)
+            defaults[column.name] = value
+        return cls(table=table, columns=columns, defaults=defaults)
+
+    def record(self, row: dict[str, Any]) -> tuple:
+        values = []
+        for name in self.columns:
+            value = row[name] if name in row else self.defaults[name]
+            if isinstance(value, Ids):
+                value = value.next()
+            elif isinstance(value, enum.Enum):
+                value = value.name
+            elif isinstance(value, list):
+                value = list(value)
+            values.append(value)
+        return tuple(values)
+
+
+@dataclass
+class _Stats:
+    rows: dict[str, int] = field(default_factory=dict)
+    seconds: dict[str, float] = field(default_factory=dict)
+
+
+class Copier:
+    def __init__(self, conn: AsyncConnection, ids: Ids, anchor: datetime):
+        self.conn = conn
+        self.ids = ids
+        self.anchor = anchor
+        self.stats = _Stats()
+
+    async def copy(self, model: type, rows: Iterable[dict[str, Any]]) -> int:
+        table: Table = model.__table__
+        iterator = iter(rows)
+        first = next(iterator, None)
+        if first is None:
+            return 0
+        plan = _CopyPlan.build(table, first.keys(), self.ids, self.anchor)
+        raw = (await self.conn.get_raw_connection()).driver_connection
+        started = time.perf_counter()
+        written = 0
+        chunks = _chunks(itertools.chain([first], iterator), COPY_CHUNK)
+        for chunk in chunks:
+            await raw.copy_records_to_table(
+                table.name,
+                records=[plan.record(row) for row in chunk],
+                columns=plan.columns,
+            )
+            written += len(chunk)
+        elapsed = time.perf_counter() - started
+        self.stats.rows[table.name] = self.stats.rows.get(table.name, 0) + written
+        self.stats.seconds[table.name] = self.stats.seconds.get(table.name, 0.0) + elapsed
+        logger.info("copy table=%s rows=%d seconds=%.2f", table.name, written, elapsed)
+        return written
+
+
+def _chunks(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+@dataclass
+class BenchUser:
+    id: uuid.UUID
+    role: UserRole
+    league: League
+
+
+@dataclass
+class Tenant:
+    users: list[BenchUser]
+    executors: list[BenchUser]
+    teamleads: list[BenchUser]
+    contacts: list[tuple[uuid.UUID, uuid.UUID]]
+    projects: list[tuple[uuid.UUID, list[uuid.UUID]]] = field(default_factory=list)
+
+
+class Generator:
+    def __init__(self, *, seed: int, anchor: datetime, password_hash: str):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.ids = Ids(self.rng)
+        self.anchor = anchor
+        self.password_hash = password_hash
+
+    def email(self, index: int) -> str:
+        return f"bench-{self.seed}-{index}@{EMAIL_DOMAIN}"
+
+    def moment(self, max_days: int = HISTORY_DAYS) -> datetime:
+        return self.anchor - timedelta(seconds=self.rng.randrange(max_days * 86400))
+
+    def title(self) -> str:
+        return f"{self.rng.choice(TITLE_VERBS)} {self.rng.choice(TITLE_OBJECTS)}"
+
+    def sentence(self, words: int) -> str:
+        text = " ".join(self.rng.choice(MESSAGE_WORDS) for _ in range(words))
+        return text[:1].upper() + text[1:] + "."
+
+    # --- пользователи и контакты ---
+
+    def tenant(self, count: int) -> tuple[Tenant, list[dict[str, Any]]]:
+        members: list[BenchUser] = []
+        rows: list[dict[str, Any]] = []
+        for index in range(count):
+            if index % 100 == 0:
+                role = UserRole.admin
+            elif index % 10 == 1:
+                role = UserRole.teamlead
+            else:
+                role = UserRole.executor
+            league = _weighted(self.rng, {League.C: 40, League.B: 40, League.A: 20})
+            user = BenchUser(id=self.ids.next(), role=role, league=league)
+            members.append(user)
+            created_at = self.moment()
+            rows.append({
+                "id": user.id,
+                "full_name": f"Bench {self.seed}-{index}",
+                "email": self.email(index),
+                "league": league,
+                "role": role,
+                "mpw": 0 if role == UserRole.admin else LEAGUE_MPW[league],
+                "wip_limit": WIP_BY_LEAGUE[league],
+                "quality_score": round(self.rng.uniform(70, 100), 1),
+                "task_workspace_enabled": True,
+                "can_link_queue_tasks_to_projects": role != UserRole.executor,
+                "is_active": True,
+                "password_hash": self.password_hash,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        executors = [user for user in members if user.role == UserRole.executor] or members
+        teamleads = [user for user in members if user.role != UserRole.executor]
+        # Кольцо: каждый связан с несколькими следующими, пары уникальны.
+        reach = min(CONTACTS_PER_USER, max((len(members) - 1) // 2, 0))
+        contacts = [
+            (members[index].id, members[(index + step) % len(members)].id)
+            for index in range(len(members))
+            for step in range(1, reach + 1)
+        ]
+        return Tenant(members, executors, teamleads, contacts), rows
+
+    def contact_rows(self, tenant: Tenant) -> Iterator[dict[str, Any]]:
+        for requester_id, recipient_id in tenant.contacts:
+            created_at = self.moment()
+            yield {
+                "id": self.ids.next(),
+                "requester_id": requester_id,
+                "recipient_id": recipient_id,
+                "status": "accepted",
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    # --- проекты ---
+
+    def project_rows(self, tenant: Tenant, count: int, members_out: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        for index in range(count):
+            owner = self.rng.choice(tenant.users)
+            entity_id = self.ids.next()
+            created_at = self.moment()
+            starts_at = created_at + timedelta(days=self.rng.randrange(0, 14))
+            due_at = starts_at + timedelta(days=self.rng.randrange(30, 240))
+            team = {
+                user.id
+                for user in self.rng.sample(tenant.users, k=min(len(tenant.users), self.rng.randint(2, 8)))
+                if user.id != owner.id
+            }
+            for user_id in sorted(team):
+                members_out.append({
+                    "id": self.ids.next(),
+                    "entity_id": entity_id,
+                    "user_id": user_id,
+                    "role": _weighted(self.rng, {"participant": 70, "editor": 20, "viewer": 10}),
+                    "created_by_id": owner.id,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+            tenant.projects.append((entity_id, [owner.id, *sorted(team)]))
+            yield {
+                "id": entity_id,
+                "owner_id": owner.id,
+                "entity_type": "project",
+                "title": f"{self.rng.choice(PROJECT_TOPICS)} #{index + 1}",
+                "description": self.sentence(12),
+                "status": _weighted(self.rng, {"active": 70, "draft": 10, "paused": 8, "done": 12}),
+                "visibility": "shared",
+                "starts_at": starts_at,
+                "due_at": due_at,
+                "target_due_at": due_at,
+                "tags": ["bench"],
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    def activity_rows(self, tenant: Tenant, per_project: int) -> Iterator[dict[str, Any]]:
+        for entity_id, team in tenant.projects:
+            for position in range(per_project):
+                status = _weighted(self.rng, ACTIVITY_STATUS_WEIGHTS)
+                created_at = self.moment()
+                starts_at = created_at + timedelta(days=self.rng.randrange(0, 30))
+                due_at = starts_at + timedelta(days=self.rng.randrange(1, 45))
+                yield {
+                    "id": self.ids.next(),
+                    "entity_id": entity_id,
+                    "title": self.title(),
+                    "status": status,
+                    "priority": _weighted(self.rng, {"low": 20, "medium": 55, "high": 20, "critical": 5}),
+                    "assignee_id": self.rng.choice(team),
+                    "created_by_id": team[0],
+                    "baseline_starts_at": starts_at,
+                    "baseline_due_at": due_at,
+                    "forecast_starts_at": starts_at,
+                    "forecast_due_at": due_at + timedelta(days=self.rng.randrange(0, 10)),
+                    "actual_starts_at": starts_at if status != "planned" else None,
+                    "actual_due_at": due_at if status == "done" else None,
+                    "position": position,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+
+    # --- очередь ---
+
+    def task_rows(
+        self,
+        tenant: Tenant,
+        count: int,
+        transactions_out: list[dict[str, Any]],
+        links_out: list[dict[str, Any]],
+    ) -> Iterator[dict[str, Any]]:
+        for _ in range(count):
+            status = _weighted(self.rng, TASK_STATUS_WEIGHTS)
+            task_type = _weighted(self.rng, TASK_TYPE_WEIGHTS)
+            complexity = self.rng.choice(list(Complexity))
+            low, high = COMPLEXITY_Q[complexity]
+            estimated_q = Decimal(str(round(self.rng.uniform(low, high), 1)))
+            estimator = self.rng.choice(tenant.teamleads)
+            created_at = self.moment()
+            row: dict[str, Any] = {
+                "id": self.ids.next(),
+                "title": self.title(),
+                "description": self.sentence(20),
+                "task_type": task_type,
+                "complexity": complexity,
+                "estimated_q": estimated_q,
+                "priority": _weighted(self.rng, PRIORITY_WEIGHTS),
+                "status": status,
+                "min_league": _weighted(self.rng, {League.C: 60, League.B: 30, League.A: 10}),
+                "estimator_id": estimator.id,
+                "is_proactive": task_type == TaskType.proactive,
+                "assignee_id": None,
+                "validator_id": None,
+                "started_at": None,
+                "completed_at": None,
+                "validated_at": None,
+                "active_seconds": 0,
+                "tags": [task_type.value],
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+            if status in (TaskStatus.in_progress, TaskStatus.review, TaskStatus.done):
+                assignee = self.rng.choice(tenant.executors)
+                started_at = created_at + timedelta(hours=self.rng.randrange(1, 72))
+                row.update(
+                    assignee_id=assignee.id,
+                    started_at=started_at,
+                    active_seconds=int(float(estimated_q) * self.rng.randrange(1800, 5400)),
+                    updated_at=started_at,
+                )
+                if status != TaskStatus.in_progress:
+                    completed_at = started_at + timedelta(hours=self.rng.randrange(1, 96))
+                    row.update(completed_at=completed_at, updated_at=completed_at)
+                if status == TaskStatus.done:
+                    validated_at = row["completed_at"] + timedelta(hours=self.rng.randrange(1, 48))
+                    row.update(validator_id=estimator.id, validated_at=validated_at, updated_at=validated_at)
+                    transactions_out.append({
+                        "id": self.ids.next(),
+                        "user_id": assignee.id,
+                        "amount": estimated_q,
+                        "wallet_type": WalletType.main,
+                        "reason": f"Задача принята: {row['title']}",
+                        "task_id": row["id"],
+                        "created_at": validated_at,
+                    })
+            if tenant.projects and self.rng.random() < 0.2:
+                entity_id, _team = self.rng.choice(tenant.projects)
+                links_out.append({
+                    "id": self.ids.next(),
+                    "entity_id": entity_id,
+                    "task_id": row["id"],
+                    "relation_type": "contains",
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+            yield row
+
+    # --- переписка ---
+
+    def message_rows(
+        self,
+        tenant: Tenant,
+        messages: int,
+        participants_out: list[dict[str, Any]],
+        posts_out: list[dict[str, Any]],
+    ) -> Iterator[dict[str, Any]]:
+        if not tenant.contacts or not messages:
+            return
+        threads = max(1, messages // POSTS_PER_THREAD)
+        for index in range(threads):
+            first, second = tenant.contacts[index % len(tenant.contacts)]
+            thread_id = self.ids.next()
+            posts = messages // threads + (1 if index < messages % threads else 0)
+            created_at = self.moment()
+            at = created_at
+            last_author = first
+            for _ in range(posts):
+                at += timedelta(seconds=self.rng.randrange(30, 6 * 3600))
+                last_author = self.rng.choice((first, second))
+                posts_out.append({
+                    "id": self.ids.next(),
+                    "thread_id": thread_id,
+                    "author_id": last_author,
+                    "body": self.sentence(self.rng.randint(3, 24)),
+                    "request_id": self.ids.next(),
+                    "created_at": at,
+                })
+            for user_id in (first, second):
+                unread = 0 if user_id == last_author else self.rng.choice((0, 0, 0, 1, 2, 5))
+                participants_out.append({
+                    "id": self.ids.next(),
+                    "thread_id": thread_id,
+                    "user_id": user_id,
+                    "unread_count": unread,
+                    "last_read_at": at if unread == 0 else None,
+                    "joined_at": created_at,
+                })
+            yield {
+                "id": thread_id,
+                "subject": f"{self.title()} ({index + 1})",
+                "created_by_id": first,
+                "request_id": self.ids.next(),
+                "created_at": created_at,
+                "updated_at": at,
+            }
+
+
+async def _drain(copier: Copier, model: type, buffer: list[dict[str, Any]]) -> None:
+    """Сбросить побочные строки, накопленные генератором родительской таблицы."""
+    await copier.copy(model, buffer)
+    buffer.clear()
+
+
+async def _copy_with_side_rows(
+    copier: Copier,
+    model: type,
+    rows: Iterator[dict[str, Any]],
+    side: list[tuple[type, list[dict[str, Any]]]],
+    *,
+    chunk_size: int = COPY_CHUNK,
+) -> None:
+    # Родители идут порциями, дети — следом за каждой порцией: память ограничена размером порции.
+    for chunk in _chunks(rows, chunk_size):
+        await copier.copy(model, chunk)
+        for side_model, buffer in side:
+            await _drain(copier, side_model, buffer)
+
+
+async def generate(
+    *,
+    users: int,
+    tasks: int,
+    projects: int,
+    messages: int,
+    activities_per_project: int,
+    seed: int,
+    as_of: date,
+    password: str,
+) -> _Stats:
+    if users < 2:
+        raise SystemExit("--users must be at least 2")
+    anchor = datetime.combine(as_of, dt_time(hour=12), tzinfo=timezone.utc)
+    generator = Generator(seed=seed, anchor=anchor, password_hash=get_password_hash(password))
+
+    async with engine.connect() as conn:
+        existing = await conn.scalar(
+            select(func.count(User.id)).where(User.email.like(f"bench-{seed}-%@{EMAIL_DOMAIN}"))
+        )
+        if existing:
+            raise SystemExit(f"Seed {seed} is already loaded ({existing} users); use another --seed or a fresh database.")
+
+        copier = Copier(conn, generator.ids, anchor)
+        tenant, user_rows = generator.tenant(users)
+        await copier.copy(User, user_rows)
+        await copier.copy(Contact, generator.contact_rows(tenant))
+
+        members: list[dict[str, Any]] = []
+        await _copy_with_side_rows(
+            copier, WorkEntity, generator.project_rows(tenant, projects, members), [(WorkEntityMember, members)]
+        )
+        await copier.copy(WorkEntityTask, generator.activity_rows(tenant, activities_per_project))
+
+        transactions: list[dict[str, Any]] = []
+        links: list[dict[str, Any]] = []
+        await _copy_with_side_rows(
+            copier,
+            Task,
+            generator.task_rows(tenant, tasks, transactions, links),
+            [(QTransaction, transactions), (WorkEntityLink, links)],
+        )
+
+        participants: list[dict[str, Any]] = []
+        posts: list[dict[str, Any]] = []
+        await _copy_with_side_rows(
+            copier,
+            MessageThread,
+            generator.message_rows(tenant, messages, participants, posts),
+            [(MessageThreadParticipant, participants), (MessagePost, posts)],
+            chunk_size=max(1, COPY_CHUNK // POSTS_PER_THREAD),
+        )
+        await conn.commit()
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        queue_drifts = await verify_queue_counters(db, repair=True)
+        rollup_drifts = await verify_entity_rollups(db, repair=True)
+        badge_drifts = await verify_badge_counters(db, repair=True)
+        await db.commit()
+    # Пользователи стенда без строки счётчиков — сразу, не дожидаясь воркера.
+    badge_rows = await recount_badge_rows()
+    logger.info(
+        "counters_repaired queue=%d rollups=%d badges=%d badge_rows=%d seconds=%.2f",
+        len(queue_drifts),
+        len(rollup_drifts),
+        len(badge_drifts),
+        badge_rows,
+        time.perf_counter() - started,
+    )
+
+    async with engine.connect() as conn:
+        autocommit = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table_name in copier.stats.rows:
+            await autocommit.execute(text(f'ANALYZE "{table_name}"'))
+    return copier.stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=_count, default=1000)
+    parser.add_argument("--tasks", type=_count, default=200_000, help="задачи очереди")
+    parser.add_argument("--projects", type=_count, default=500)
+    parser.add_argument("--activities-per-project", type=_count, default=20, help="задачи внутри проекта")
+    parser.add_argument("--messages", type=_count, default=1_000_000, help="сообщения в переписках")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(), help="дата «сейчас» для истории")
+    parser.add_argument("--password", default="bench-password", help="общий пароль пользователей стенда")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    started = time.perf_counter()
+    stats = asyncio.run(
+        generate(
+            users=args.users,
+            tasks=args.tasks,
+            projects=args.projects,
+            messages=args.messages,
+            activities_per_project=args.activities_per_project,
+            seed=args.seed,
+            as_of=args.as_of,
+            password=args.password,
+        )
+    )
+    total_rows = sum(stats.rows.values())
+    elapsed = time.perf_counter() - started
+    for table_name, rows in stats.rows.items():
+        seconds = stats.seconds[table_name]
+        print(f"{table_name:<32} {rows:>10} rows {seconds:>8.2f} s {rows / seconds if seconds else 0:>10.0f} rows/s")
+    print(f"Generated {total_rows} rows for seed {args.seed} in {elapsed:.1f} s.")
+
+
+if __name__ == "__main__":
+    main()
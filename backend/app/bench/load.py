@@ -0,0 +1,360 @@
+"""
+HTTP load benchmark against a running backend (local uvicorn).
+
+Запуск: python -m app.bench.load --base-url http://127.0.0.1:8000 --users 50 --duration 60 --out bench.json
+Зависимости: pip install -r requirements-bench.txt (httpx в образ не ставится).
+
+Виртуальные пользователи — пользователи стенда из python -m app.bench.generate
+(--seed тот же). Токены выпускаются напрямую тем же ключом, что и у API
+(логин ограничен rate limit), поэтому скрипт запускается рядом с backend с
+теми же настройками. Каждый виртуальный пользователь крутит смесь сценариев:
+опрос очереди, открытие дашборда (только teamlead/admin), правка задачи
+проекта в workspace, отправка сообщения в переписку. Латентность пишется по
+шаблонам маршрутов; итог — p50/p95/p99 на маршрут в JSON (--out), а с
+--compare предыдущий JSON печатается рядом для сравнения релизов.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import subprocess
+import time
+import uuid
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import select
+
+from app.bench.generate import EMAIL_DOMAIN
+from app.core.security import create_access_token
+from app.database import AsyncSessionLocal
+from app.models.messages import MessageThreadParticipant
+from app.models.user import User, UserRole
+from app.models.work_entity import WorkEntity, WorkEntityTask
+
+
+logger = logging.getLogger("dpms.bench.load")
+
+DEFAULT_MIX = {
+    "queue_poll": 45,
+    "dashboard_open": 15,
+    "workspace_edit": 20,
+    "message_post": 20,
+}
+PERCENTILES = (50, 95, 99)
+SAMPLE_PER_USER = 20
+
+
+@dataclass
+class VirtualUser:
+    id: uuid.UUID
+    role: UserRole
+    token: str
+    threads: list[uuid.UUID] = field(default_factory=list)
+    project_tasks: list[tuple[uuid.UUID, uuid.UUID]] = field(default_factory=list)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+@dataclass
+class RouteSamples:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.routes: dict[str, RouteSamples] = {}
+        self.scenarios: Counter = Counter()
+        self.recording = False
+
+    def add(self, route: str, seconds: float, status: int | None) -> None:
+        if not self.recording:
+            return
+        samples = self.routes.setdefault(route, RouteSamples())
+        samples.latencies.append(seconds)
+        if status is None:
+            samples.errors += 1
+            samples.statuses["error"] += 1
+        else:
+            samples.statuses[str(status)] += 1
+            if status >= 400:
+                samples.errors += 1
+
+
+def percentile(sorted_values: list[float], rank: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(rank / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Harness:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+
+    async def call(
+        self,
+        user: VirtualUser,
+        method: str,
+        route: str,
+        path: str,
+        **kwargs: Any,
+    ) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=user.headers, **kwargs)
+        except httpx.HTTPError as exc:
+            self.recorder.add(f"{method} {route}", time.perf_counter() - started, None)
+            logger.debug("request_failed route=%s error=%s", route, exc)
+            return None
+        self.recorder.add(f"{method} {route}", time.perf_counter() - started, response.status_code)
+        return response
+
+    # --- сценарии ---
+
+    async def queue_poll(self, user: VirtualUser) -> None:
+        await self.call(user, "GET", "/api/queue", "/api/queue")
+
+    async def dashboard_open(self, user: VirtualUser) -> None:
+        # Страница дашборда запрашивает виджеты параллельно.
+        await asyncio.gather(
+            self.call(user, "GET", "/api/dashboard/capacity", "/api/dashboard/capacity"),
+            self.call(user, "GET", "/api/dashboard/team-summary", "/api/dashboard/team-summary"),
+            self.call(user, "GET", "/api/dashboard/capacity-history", "/api/dashboard/capacity-history"),
+            self.call(user, "GET", "/api/dashboard/focus-status", "/api/dashboard/focus-status"),
+        )
+
+    async def workspace_edit(self, user: VirtualUser) -> None:
+        entity_id, task_id = self.rng.choice(user.project_tasks)
+        await self.call(
+            user,
+            "GET",
+            "/api/work-entities/{entity_id}/workspace",
+            f"/api/work-entities/{entity_id}/workspace",
+        )
+        await self.call(
+            user,
+            "PATCH",
+            "/api/work-entities/{entity_id}/tasks/{task_id}",
+            f"/api/work-entities/{entity_id}/tasks/{task_id}",
+            json={"next_step": f"Нагрузочный шаг {self.rng.randrange(1_000_000)}"},
+        )
+
+    async def message_post(self, user: VirtualUser) -> None:
+        thread_id = self.rng.choice(user.threads)
+        await self.call(user, "GET", "/api/messages/threads", "/api/messages/threads")
+        await self.call(
+            user,
+            "POST",
+            "/api/messages/threads/{thread_id}/posts",
+            f"/api/messages/threads/{thread_id}/posts",
+            json={"body": "Нагрузочное сообщение", "request_id": str(uuid.uuid4())},
+        )
+
+    def scenarios_for(self, user: VirtualUser, mix: dict[str, int]) -> dict[str, int]:
+        available = {
+            "queue_poll": True,
+            "dashboard_open": user.role in (UserRole.teamlead, UserRole.admin),
+            "workspace_edit": bool(user.project_tasks),
+            "message_post": bool(user.threads),
+        }
+        return {name: weight for name, weight in mix.items() if weight > 0 and available[name]}
+
+    async def run_user(
+        self,
+        user: VirtualUser,
+        mix: dict[str, int],
+        deadline: float,
+        think_seconds: float,
+    ) -> None:
+        weights = self.scenarios_for(user, mix)
+        if not weights:
+            return
+        actions: dict[str, Callable[[VirtualUser], Awaitable[None]]] = {
+            name: getattr(self, name) for name in weights
+        }
+        names, values = list(weights), list(weights.values())
+        while time.perf_counter() < deadline:
+            name = self.rng.choices(names, weights=values)[0]
+            await actions[name](user)
+            if self.recorder.recording:
+                self.recorder.scenarios[name] += 1
+            if think_seconds:
+                await asyncio.sleep(self.rng.uniform(0, think_seconds))
+
+
+async def load_virtual_users(seed: int, count: int, rng: random.Random) -> list[VirtualUser]:
+    async with AsyncSessionLocal() as db:
+        users = list(
+            (
+                await db.execute(
+                    select(User)
+                    .where(User.email.like(f"bench-{seed}-%@{EMAIL_DOMAIN}"), User.is_active.is_(True))
+                    .order_by(User.email)
+                )
+            ).scalars()
+        )
+        if not users:
+            raise SystemExit(f"No bench users for seed {seed}; run python -m app.bench.generate first.")
+        chosen = rng.sample(users, k=min(count, len(users)))
+        by_id = {
+            user.id: VirtualUser(
+                id=user.id,
+                role=user.role,
+                token=create_access_token({"sub": str(user.id), "ver": user.auth_version}),
+            )
+            for user in chosen
+        }
+        ids = list(by_id)
+
+        thread_rows = await db.execute(
+            select(MessageThreadParticipant.user_id, MessageThreadParticipant.thread_id)
+            .where(MessageThreadParticipant.user_id.in_(ids))
+        )
+        for user_id, thread_id in thread_rows:
+            if len(by_id[user_id].threads) < SAMPLE_PER_USER:
+                by_id[user_id].threads.append(thread_id)
+
+        # Правки — только в своих проектах: владелец может менять любую задачу.
+        task_rows = await db.execute(
+            select(WorkEntity.owner_id, WorkEntityTask.entity_id, WorkEntityTask.id)
+            .join(WorkEntityTask, WorkEntityTask.entity_id == WorkEntity.id)
+            .where(WorkEntity.owner_id.in_(ids), WorkEntity.status.not_in(("done", "archived")))
+        )
+        for owner_id, entity_id, task_id in task_rows:
+            if len(by_id[owner_id].project_tasks) < SAMPLE_PER_USER:
+                by_id[owner_id].project_tasks.append((entity_id, task_id))
+    return list(by_id.values())
+
+
+def summarize(recorder: Recorder, seconds: float) -> dict[str, Any]:
+    routes: dict[str, Any] = {}
+    for route, samples in sorted(recorder.routes.items()):
+        ordered = sorted(samples.latencies)
+        routes[route] = {
+            "count": len(ordered),
+            "errors": samples.errors,
+            "rps": round(len(ordered) / seconds, 2) if seconds else 0.0,
+            **{f"p{rank}_ms": round(percentile(ordered, rank) * 1000, 2) for rank in PERCENTILES},
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+            "statuses": dict(sorted(samples.statuses.items())),
+        }
+    return routes
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_report(result: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    header = f"{'route':<52} {'count':>7} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8}"
+    if baseline is not None:
+        header += f" {'p95 was':>8} {'Δp95':>7}"
+    print(header)
+    previous = (baseline or {}).get("routes", {})
+    for route, stats in result["routes"].items():
+        line = (
+            f"{route:<52} {stats['count']:>7} {stats['errors']:>5} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+        )
+        if baseline is not None:
+            old = previous.get(route)
+            if old and old.get("p95_ms"):
+                change = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+                line += f" {old['p95_ms']:>8.1f} {change:>+6.0f}%"
+            else:
+                line += f" {'-':>8} {'new':>7}"
+        print(line)
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    users = await load_virtual_users(args.seed, args.users, rng)
+    mix = dict(DEFAULT_MIX)
+    for item in args.mix or []:
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX or not weight.isdigit():
+            raise SystemExit(f"Bad --mix item {item!r}; expected one of {sorted(DEFAULT_MIX)}=<weight>")
+        mix[name] = int(weight)
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        harness = Harness(client, recorder, rng)
+        if args.warmup:
+            warmup_deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(harness.run_user(user, mix, warmup_deadline, args.think) for user in users))
+        recorder.recording = True
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(harness.run_user(user, mix, deadline, args.think) for user in users))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "seconds": round(elapsed, 2),
+            "base_url": args.base_url,
+            "virtual_users": len(users),
+            "seed": args.seed,
+            "mix": mix,
+            "think_seconds": args.think,
+            "revision": args.label or _git_revision(),
+        },
+        "scenarios": dict(sorted(recorder.scenarios.items())),
+        "routes": summarize(recorder, elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=50, help="виртуальные пользователи (параллельно)")
+    parser.add_argument("--duration", type=float, default=60.0, help="секунды замера")
+    parser.add_argument("--warmup", type=float, default=5.0, help="секунды прогрева без записи")
+    parser.add_argument("--think", type=float, default=0.5, help="пауза между сценариями, до N секунд")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1, help="seed генератора: выбирает пользователей стенда")
+    parser.add_argument("--mix", action="append", metavar="SCENARIO=WEIGHT", help="переопределить вес сценария")
+    parser.add_argument("--label", help="метка релиза в результате (по умолчанию git HEAD)")
+    parser.add_argument("--out", type=Path, help="сохранить результат в JSON")
+    parser.add_argument("--compare", type=Path, help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    result = asyncio.run(run(args))
+    print_report(result, baseline)
+    if args.out:
+        args.out.write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
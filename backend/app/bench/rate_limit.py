@@ -0,0 +1,101 @@
+"""
+Microbenchmark of the rate limiter backends (app.core.rate_limit).
+
+Запуск:
+    python -m app.bench.rate_limit --backend memory --checks 200000
+    python -m app.bench.rate_limit --backend postgres --checks 20000 --concurrency 16
+
+Каждая проверка — hit() правила bench на одном из --keys ключей (ключи
+выбираются по кругу, часть ведер пустеет — проверяются обе ветки). Печатает
+проверок в секунду, p50/p95/p99 латентности и долю отказов; для postgres еще
+число SQL на проверку (ожидается ровно 1 — один round trip). Ведра бенчмарка
+(префикс bench:) удаляются после прогона.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import event, text
+
+from app.bench.load import percentile
+from app.config import settings
+from app.core.rate_limit import RateLimiter
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = None
+    if args.backend == "postgres":
+        from app.database import _create_engine
+
+        engine = _create_engine(
+            settings.DATABASE_URL,
+            pool_label="rate_limit_bench",
+            pool_size=args.concurrency,
+            max_overflow=0,
+            pool_pre_ping=False,
+        ).execution_options(isolation_level="AUTOCOMMIT")
+        # Падаем сразу: иначе бэкенд молча уйдет в fallback и замер будет про память.
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1 FROM rate_limit_buckets LIMIT 1"))
+    limiter = RateLimiter()
+    limiter.configure(backend=args.backend, rules={"bench": args.rule}, engine=engine)
+
+    statements = 0
+    if engine is not None:
+
+        def count(*_args) -> None:
+            nonlocal statements
+            statements += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+    latencies: list[float] = []
+    limited = 0
+    queue = iter(range(args.checks))
+
+    async def worker() -> None:
+        nonlocal limited
+        for number in queue:
+            started = time.perf_counter()
+            decision = await limiter.hit("bench", f"bench:{number % args.keys}")
+            latencies.append(time.perf_counter() - started)
+            limited += not decision.allowed
+
+    # Прогрев: соединения пула и подготовленный оператор.
+    for number in range(min(args.keys, 100)):
+        await limiter.hit("bench", f"bench:warmup:{number}")
+    statements = 0
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"backend={args.backend} rule={args.rule} keys={args.keys} concurrency={args.concurrency}")
+    print(f"checks={len(latencies)} wall={wall:.2f}s rate={len(latencies) / wall:,.0f}/s limited={limited / len(latencies):.1%}")
+    print(
+        "latency_us "
+        + " ".join(f"p{rank}={percentile(latencies, rank) * 1e6:.1f}" for rank in (50, 95, 99))
+        + f" max={latencies[-1] * 1e6:.1f}"
+    )
+    if engine is not None:
+        print(f"sql_per_check={statements / len(latencies):.2f}")
+        async with engine.connect() as connection:
+            await connection.execute(text("DELETE FROM rate_limit_buckets WHERE key LIKE 'bench:%'"))
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=("memory", "postgres"), default="memory")
+    parser.add_argument("--checks", type=int, default=100_000)
+    parser.add_argument("--keys", type=int, default=1000, help="разных ключей (IP/пользователей)")
+    parser.add_argument("--concurrency", type=int, default=8, help="параллельных проверок")
+    parser.add_argument("--rule", default="100/minute")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
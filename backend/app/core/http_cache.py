@@ -0,0 +1,83 @@
+"""Conditional GET helpers: ETag validators and a bounded payload cache."""
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+
+def weak_etag(*parts: object) -> str:
+    """Build a weak validator from values that fully describe a payload."""
+    digest = hashlib.sha256(
+        "|".join("" if part is None else str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of If-None-Match against the current validator."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {item.strip() for item in header.split(",")}
+    if "*" in candidates:
+        return True
+    bare = etag.removeprefix("W/")
+    return any(item.removeprefix("W/") == bare for item in candidates)
+
+
+class PayloadCache:
+    """Process-local LRU of serialized JSON bodies keyed by their ETag."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(max_entries, 0)
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str) -> bytes | None:
+        body = self._items.get(etag)
+        if body is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(etag)
+        self.hits += 1
+        return body
+
+    def put(self, etag: str, body: bytes) -> None:
+        if not self.max_entries:
+            return
+        self._items[etag] = body
+        self._items.move_to_end(etag)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+async def conditional_json_response(
+    request: Request,
+    etag: str,
+    build: Callable[[], Awaitable[BaseModel | bytes]],
+    *,
+    cache: PayloadCache | None = None,
+) -> Response:
+    """
+    Answer 304 when the client already holds ``etag``, otherwise serve the
+    cached body or build, serialize and remember it. ``build`` may return an
+    already serialized JSON body (e.g. a list dumped through a TypeAdapter).
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    body = cache.get(etag) if cache is not None else None
+    if body is None:
+        payload = await build()
+        body = payload if isinstance(payload, bytes) else payload.model_dump_json().encode()
+        if cache is not None:
+            cache.put(etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
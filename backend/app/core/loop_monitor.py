@@ -0,0 +1,266 @@
+"""
+Event-loop lag monitor (opt-in, LOOP_MONITOR_ENABLED).
+
+Heartbeat-корутина просыпается каждые LOOP_MONITOR_INTERVAL_MS и меряет,
+насколько позже срока ее разбудил цикл: это и есть лаг, который видят все
+запросы процесса. Сторожевой поток следит за временем последнего удара:
+если цикл молчит дольше LOOP_MONITOR_THRESHOLD_MS, он снимает стек потока
+цикла (sys._current_frames) — на вершине лежит блокирующий вызов. Стеки
+группируются по ближайшему кадру кода приложения (call site), длительность
+стопа дописывает heartbeat, когда цикл отпустит.
+
+С LOOP_MONITOR_ASYNCIO_DEBUG дополнительно включается debug-режим asyncio
+(slow_callback_duration = порог): его предупреждения «Executing … took …»
+тоже попадают в список нарушителей. Debug-режим заметно дороже — только
+для диагностики.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from types import FrameType
+
+from app.core.metrics import LOOP_LAG, LOOP_STALLS
+
+logger = logging.getLogger("dpms.loop_monitor")
+
+APP_DIR = Path(__file__).resolve().parent.parent
+STACK_DEPTH = 20
+MAX_OFFENDERS = 100
+LAG_HISTORY = 3000
+
+
+@dataclass
+class Offender:
+    site: str
+    source: str
+    stack: list[str]
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seen: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def add(self, seconds: float) -> None:
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+def _frame_label(filename: str, lineno: int, name: str) -> str:
+    path = Path(filename)
+    try:
+        shown = path.resolve().relative_to(APP_DIR.parent).as_posix()
+    except ValueError:
+        shown = filename
+    return f"{shown}:{lineno} in {name}"
+
+
+def _describe(frame: FrameType) -> tuple[str, list[str]]:
+    """Call site (ближайший кадр app/, не считая монитора) и стек от вершины."""
+    frames: list[tuple[str, int, str]] = []
+    current: FrameType | None = frame
+    while current is not None and len(frames) < STACK_DEPTH:
+        code = current.f_code
+        frames.append((code.co_filename, current.f_lineno, code.co_name))
+        current = current.f_back
+    site = None
+    for filename, lineno, name in frames:
+        if filename.startswith(str(APP_DIR)) and not filename.endswith("loop_monitor.py"):
+            site = _frame_label(filename, lineno, name)
+            break
+    stack = [_frame_label(*item) for item in frames]
+    return site or (stack[0] if stack else "<unknown>"), stack
+
+
+class _AsyncioSlowCallbackHandler(logging.Handler):
+    """Предупреждения asyncio debug «Executing %s took %.3f seconds»."""
+
+    def __init__(self, monitor: "LoopMonitor"):
+        super().__init__(level=logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not record.msg.startswith("Executing") or not isinstance(record.args, tuple) or len(record.args) != 2:
+            return
+        handle, seconds = record.args
+        site = str(handle)[:300]
+        self.monitor._record(site, "asyncio_debug", [site], float(seconds))
+
+
+class LoopMonitor:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.interval = 0.1
+        self.threshold = 0.1
+        self.asyncio_debug = False
+        self.started_at: datetime | None = None
+        self._lags: deque[float] = deque(maxlen=LAG_HISTORY)
+        self._offenders: dict[tuple[str, str], Offender] = {}
+        self._stalls = 0
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._beat_number = 0
+        # (номер удара, ключ нарушителя): стоп, снятый сторожем и еще не закрытый heartbeat.
+        self._pending: tuple[int, tuple[str, str]] | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+        self._debug_handler: logging.Handler | None = None
+
+    def start(self, *, interval_ms: int, threshold_ms: int, asyncio_debug: bool = False) -> None:
+        if self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.asyncio_debug = asyncio_debug
+        self.started_at = datetime.now(timezone.utc)
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._heartbeat(), name="dpms-loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="dpms-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        if asyncio_debug:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+            self._debug_handler = _AsyncioSlowCallbackHandler(self)
+            logging.getLogger("asyncio").addHandler(self._debug_handler)
+        self.enabled = True
+        logger.info(
+            "loop_monitor_started interval_ms=%d threshold_ms=%d asyncio_debug=%s",
+            interval_ms,
+            threshold_ms,
+            asyncio_debug,
+        )
+
+    async def stop(self) -> None:
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._debug_handler is not None:
+            logging.getLogger("asyncio").removeHandler(self._debug_handler)
+            asyncio.get_running_loop().set_debug(False)
+            self._debug_handler = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            with self._lock:
+                self._lags.append(lag)
+                self._last_beat = now
+                self._beat_number += 1
+                pending, self._pending = self._pending, None
+                if pending is not None:
+                    offender = self._offenders.get(pending[1])
+                    if offender is not None:
+                        offender.add(lag)
+            LOOP_LAG.observe(lag)
+
+    def _watch(self) -> None:
+        poll = max(self.threshold / 4, 0.005)
+        while not self._stop.wait(poll):
+            with self._lock:
+                stalled = time.monotonic() - self._last_beat - self.interval
+                beat = self._beat_number
+                already = self._pending is not None and self._pending[0] == beat
+            if stalled < self.threshold or already:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id or -1)
+            if frame is None:
+                continue
+            site, stack = _describe(frame)
+            del frame
+            key = self._record(site, "watchdog", stack, None)
+            with self._lock:
+                if self._beat_number == beat:
+                    self._pending = (beat, key)
+
+    def _record(self, site: str, source: str, stack: list[str], seconds: float | None) -> tuple[str, str]:
+        key = (source, site)
+        with self._lock:
+            offender = self._offenders.get(key)
+            if offender is None:
+                if len(self._offenders) >= MAX_OFFENDERS:
+                    # Вытесняем самого «легкого»: список ограничен и держит главных нарушителей.
+                    lightest = min(self._offenders, key=lambda item: self._offenders[item].total_seconds)
+                    del self._offenders[lightest]
+                offender = self._offenders[key] = Offender(site=site, source=source, stack=stack)
+            offender.count += 1
+            offender.stack = stack
+            offender.last_seen = datetime.now(timezone.utc)
+            if seconds is not None:
+                offender.add(seconds)
+            self._stalls += 1
+        LOOP_STALLS.inc(source)
+        return key
+
+    def reset(self) -> None:
+        with self._lock:
+            self._lags.clear()
+            self._offenders.clear()
+            self._stalls = 0
+            self._pending = None
+
+    def report(self, *, top: int = 20) -> dict:
+        with self._lock:
+            lags = sorted(self._lags)
+            offenders = sorted(
+                self._offenders.values(),
+                key=lambda item: (item.total_seconds, item.count),
+                reverse=True,
+            )[:top]
+            stalls = self._stalls
+
+        def percentile(rank: float) -> float:
+            if not lags:
+                return 0.0
+            return lags[min(len(lags) - 1, max(0, round(rank / 100 * len(lags)) - 1))]
+
+        return {
+            "enabled": self.enabled,
+            "started_at": self.started_at,
+            "interval_ms": round(self.interval * 1000),
+            "threshold_ms": round(self.threshold * 1000),
+            "asyncio_debug": self.asyncio_debug,
+            "samples": len(lags),
+            "stalls": stalls,
+            "lag_ms": {
+                "p50": round(percentile(50) * 1000, 2),
+                "p95": round(percentile(95) * 1000, 2),
+                "p99": round(percentile(99) * 1000, 2),
+                "max": round((lags[-1] if lags else 0.0) * 1000, 2),
+            },
+            "offenders": [
+                {
+                    "site": item.site,
+                    "source": item.source,
+                    "count": item.count,
+                    "total_ms": round(item.total_seconds * 1000, 1),
+                    "max_ms": round(item.max_seconds * 1000, 1),
+                    "last_seen": item.last_seen,
+                    "stack": item.stack,
+                }
+                for item in offenders
+            ],
+        }
+
+
+loop_monitor = LoopMonitor()
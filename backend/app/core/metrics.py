@@ -0,0 +1,406 @@
+"""
+Process-local metrics in Prometheus text format (/metrics).
+
+Без внешних зависимостей и сервисов: счетчики живут в памяти процесса,
+Prometheus (или curl) забирает их с /metrics. Метки маршрутов — шаблоны
+путей FastAPI (/api/tasks/{task_id}), поэтому число рядов ограничено числом
+роутов; запросы мимо роутов идут под одной меткой.
+
+- MetricsMiddleware: латентность, статус, число SQL и время в БД на запрос;
+- instrument_engine: события SQLAlchemy (время каждого запроса) и gauges пула;
+- MeteredAsyncQueuePool: ожидание выдачи соединения из пула.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+QUERY_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+ROLLOVER_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+INF_BUCKET = 'le="+Inf"'
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Значения снимаются при выдаче /metrics функцией set_function."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._functions: list[Callable[[], dict[LabelValues, float]]] = []
+
+    def set_function(self, function: Callable[[], dict[LabelValues, float]]) -> None:
+        self._functions.append(function)
+
+    def render(self) -> list[str]:
+        values: dict[LabelValues, float] = {}
+        for function in self._functions:
+            values.update(function())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+@dataclass
+class _HistogramSeries:
+    buckets: list[int]
+    total: float = 0.0
+    count: int = 0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.bounds = tuple(buckets)
+        self._series: dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = _HistogramSeries(buckets=[0] * len(self.bounds))
+            for index, bound in enumerate(self.bounds):
+                if value <= bound:
+                    series.buckets[index] += 1
+                    break
+            series.total += value
+            series.count += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [
+                (labels, list(series.buckets), series.total, series.count)
+                for labels, series in sorted(self._series.items())
+            ]
+        lines = self._header()
+        for labels, buckets, total, count in items:
+            cumulative = 0
+            for bound, hits in zip(self.bounds, buckets):
+                cumulative += hits
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, INF_BUCKET)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+HTTP_REQUESTS = Counter(
+    "dpms_http_requests_total",
+    "HTTP requests by route template and status.",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = Histogram(
+    "dpms_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+HTTP_DB_QUERIES = Histogram(
+    "dpms_http_request_db_queries",
+    "SQL statements issued per HTTP request.",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_DB_SECONDS = Histogram(
+    "dpms_http_request_db_seconds",
+    "Time spent executing SQL per HTTP request.",
+    ("method", "route"),
+)
+DB_QUERIES = Counter("dpms_db_queries_total", "SQL statements executed by the process.")
+DB_QUERY_SECONDS = Histogram(
+    "dpms_db_query_duration_seconds",
+    "Single SQL statement execution time.",
+    buckets=QUERY_LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "dpms_db_pool_checkout_wait_seconds",
+    "Time to obtain a connection from the pool (including opening a new one).",
+    ("pool",),
+    buckets=POOL_WAIT_BUCKETS,
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "dpms_db_pool_connections",
+    "Pool connections by state at scrape time.",
+    ("pool", "state"),
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "dpms_websocket_connections",
+    "Open WebSocket connections per hub.",
+    ("hub",),
+)
+DB_READ_SESSIONS = Counter(
+    "dpms_db_read_sessions_total",
+    "Read-only sessions by target (replica, primary, primary_fallback when the replica lags or is down).",
+    ("target",),
+)
+DB_REPLICA_LAG = Gauge(
+    "dpms_db_replica_lag_seconds",
+    "Replica replay lag at the last check (absent without DATABASE_REPLICA_URL).",
+)
+RATE_LIMIT_CHECKS = Counter(
+    "dpms_rate_limit_checks_total",
+    "Rate limiter checks by rule and result (allowed, limited).",
+    ("rule", "result"),
+)
+RATE_LIMIT_BACKEND_ERRORS = Counter(
+    "dpms_rate_limit_backend_errors_total",
+    "Shared-store rate limit checks that fell back to process memory.",
+)
+REFERENCE_CACHE_READS = Counter(
+    "dpms_reference_cache_reads_total",
+    "Reference data reads: hit (cached version), load (version changed), bypass (own uncommitted write).",
+    ("reference", "result"),
+)
+SINGLE_FLIGHT_CALLS = Counter(
+    "dpms_single_flight_calls_total",
+    "Single-flight calls: leader computed, shared an in-flight result, reused a fresh one.",
+    ("function", "result"),
+)
+LOOP_LAG = Histogram(
+    "dpms_event_loop_lag_seconds",
+    "Event-loop heartbeat delay (loop monitor, when enabled).",
+    buckets=LOOP_LAG_BUCKETS,
+)
+LOOP_STALLS = Counter(
+    "dpms_event_loop_stalls_total",
+    "Event-loop stalls over the monitor threshold by detector.",
+    ("source",),
+)
+PERIOD_ROLLOVERS = Counter(
+    "dpms_period_rollovers_total",
+    "Period closures by mode and result (closed, rejected by validation, failed).",
+    ("mode", "result"),
+)
+PERIOD_ROLLOVER_SECONDS = Histogram(
+    "dpms_period_rollover_duration_seconds",
+    "Period closure time up to the flush (commit is done by the caller).",
+    ("mode",),
+    buckets=ROLLOVER_BUCKETS,
+)
+PERIOD_ROLLOVER_USERS = Counter(
+    "dpms_period_rollover_users_total",
+    "Users processed by period closures, by mode.",
+    ("mode",),
+)
+
+REGISTRY: list[_Metric] = [
+    HTTP_REQUESTS,
+    HTTP_LATENCY,
+    HTTP_DB_QUERIES,
+    HTTP_DB_SECONDS,
+    DB_QUERIES,
+    DB_QUERY_SECONDS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_CONNECTIONS,
+    WEBSOCKET_CONNECTIONS,
+    DB_READ_SESSIONS,
+    DB_REPLICA_LAG,
+    RATE_LIMIT_CHECKS,
+    RATE_LIMIT_BACKEND_ERRORS,
+    SINGLE_FLIGHT_CALLS,
+    REFERENCE_CACHE_READS,
+    LOOP_LAG,
+    LOOP_STALLS,
+    PERIOD_ROLLOVERS,
+    PERIOD_ROLLOVER_SECONDS,
+    PERIOD_ROLLOVER_USERS,
+]
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class _RequestDbUsage:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+_request_db_usage: ContextVar[_RequestDbUsage | None] = ContextVar("dpms_request_db_usage", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._dpms_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_dpms_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    DB_QUERIES.inc()
+    DB_QUERY_SECONDS.observe(elapsed)
+    usage = _request_db_usage.get()
+    if usage is not None:
+        usage.queries += 1
+        usage.seconds += elapsed
+
+
+def instrument_engine(engine: Engine, *, pool_label: str = "main") -> None:
+    """Повесить учет SQL на движок (sync_engine для async) и gauges его пула."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    if isinstance(engine.pool, MeteredAsyncQueuePool):
+        engine.pool.metrics_label = pool_label
+
+    def pool_state() -> dict[LabelValues, float]:
+        pool = engine.pool
+        if not isinstance(pool, AsyncAdaptedQueuePool):
+            return {}
+        return {
+            (pool_label, "checked_out"): pool.checkedout(),
+            (pool_label, "idle"): pool.checkedin(),
+            (pool_label, "overflow"): max(pool.overflow(), 0),
+            (pool_label, "size"): pool.size(),
+        }
+
+    DB_POOL_CONNECTIONS.set_function(pool_state)
+
+
+class MeteredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, замеряющий ожидание выдачи соединения."""
+
+    metrics_label = "main"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, self.metrics_label)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+
+def _route_label(scope: dict[str, Any]) -> str:
+    """Шаблон пути: значения path_params заменяются на {имя} посегментно."""
+    if scope.get("endpoint") is None:
+        return UNMATCHED_ROUTE
+    names = {str(value): name for name, value in (scope.get("path_params") or {}).items()}
+    if not names:
+        return scope.get("path") or UNMATCHED_ROUTE
+    return "/".join(
+        "{" + names[segment] + "}" if segment in names else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+class MetricsMiddleware:
+    """ASGI middleware: HTTP-запросы по шаблонам маршрутов; WebSocket пропускаются."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        usage = _RequestDbUsage()
+        token = _request_db_usage.set(usage)
+        started = time.perf_counter()
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db_usage.reset(token)
+            method = scope.get("method", "")
+            route = _route_label(scope)
+            HTTP_REQUESTS.inc(method, route, str(status))
+            HTTP_LATENCY.observe(elapsed, method, route)
+            HTTP_DB_QUERIES.observe(usage.queries, method, route)
+            HTTP_DB_SECONDS.observe(usage.seconds, method, route)
@@ -0,0 +1,309 @@
+"""
+Сэмплирующий профилировщик отдельных запросов (только stdlib).
+
+Admin включает профилирование пользователю на N минут (users.profiling_until,
+PUT /api/admin/profiling/users/{id}); пока окно открыто, каждый HTTP-запрос
+этого пользователя снимается целиком:
+
+- ProfilingMiddleware кладет в contextvar пустой слот, _get_authenticated_user
+  после проверки токена вызывает activate() — профиль стартует, если окно
+  пользователя открыто и свободен один из PROFILE_MAX_CONCURRENT слотов;
+- поток-сэмплер каждые PROFILE_SAMPLE_INTERVAL_MS снимает стек потока цикла
+  (sys._current_frames). Если на цикле выполняется задача запроса, пишется ее
+  стек, иначе — цепочка await задачи с листом [await] или [await: loop busy]
+  (цикл занят чужой задачей): так видно и CPU, и ожидание БД, и чужие стопы;
+- SQL (текст без параметров и время) пишут события движка, как в metrics.
+
+Стеки сворачиваются в collapsed-формат («frame;frame;frame count»), который
+открывают flamegraph.pl, speedscope и inferno. Хранение — app.services.request_profiles.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.core.metrics import _route_label
+
+logger = logging.getLogger("dpms.profiler")
+
+APP_DIR = Path(__file__).resolve().parent.parent
+STACK_DEPTH = 96
+SQL_STATEMENT_LIMIT = 4000
+
+
+def _frame_label(code, lineno: int) -> str:
+    filename = code.co_filename
+    try:
+        shown = Path(filename).resolve().relative_to(APP_DIR.parent).as_posix()
+    except ValueError:
+        _, marker, tail = filename.rpartition("site-packages/")
+        shown = tail if marker else filename
+    # ';' разделяет кадры collapsed-формата.
+    return f"{code.co_name} ({shown}:{lineno})".replace(";", ",")
+
+
+def _running_stack(frame: FrameType | None, root: FrameType | None) -> list[str]:
+    """Стек потока цикла от корутины запроса (root) до вершины; кадры цикла отбрасываются."""
+    frames: list[str] = []
+    while frame is not None and len(frames) < STACK_DEPTH:
+        frames.append(_frame_label(frame.f_code, frame.f_lineno))
+        if frame is root:
+            break
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _await_chain(coro: Any) -> list[str]:
+    """Цепочка await приостановленной задачи: от корневой корутины до ожидаемого."""
+    frames: list[str] = []
+    while coro is not None and len(frames) < STACK_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(_frame_label(frame.f_code, frame.f_lineno))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames
+
+
+@dataclass
+class RequestProfile:
+    method: str
+    path: str
+    user_id: str
+    user_email: str
+    interval: float
+    max_seconds: float
+    max_sql: int
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    route: str | None = None
+    status: int = 500
+    duration_ms: float = 0.0
+    stacks: Counter[str] = field(default_factory=Counter)
+    samples: int = 0
+    awaiting_samples: int = 0
+    truncated: bool = False
+    sql: list[dict] = field(default_factory=list)
+    sql_count: int = 0
+    sql_ms: float = 0.0
+
+    def add_sql(self, statement: str, seconds: float) -> None:
+        self.sql_count += 1
+        self.sql_ms += seconds * 1000
+        if len(self.sql) < self.max_sql:
+            self.sql.append({"statement": statement[:SQL_STATEMENT_LIMIT], "ms": round(seconds * 1000, 3)})
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def meta(self) -> dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "user_id": self.user_id,
+            "user_email": self.user_email,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 2),
+            "sample_interval_ms": round(self.interval * 1000, 2),
+            "samples": self.samples,
+            "awaiting_samples": self.awaiting_samples,
+            "truncated": self.truncated,
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_ms, 2),
+            "sql": self.sql,
+        }
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, profile: RequestProfile, loop: asyncio.AbstractEventLoop, task: asyncio.Task):
+        super().__init__(name="dpms-request-profiler", daemon=True)
+        self.profile = profile
+        self.loop = loop
+        self.task = task
+        self.loop_thread_id = threading.get_ident()
+        self.root = task.get_coro().cr_frame
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def run(self) -> None:
+        deadline = time.monotonic() + self.profile.max_seconds
+        while not self.stop_event.wait(self.profile.interval):
+            if time.monotonic() > deadline:
+                self.profile.truncated = True
+                return
+            try:
+                self._sample()
+            except Exception:  # стек меняется под ногами: пропускаем сэмпл, не роняя поток
+                logger.debug("profiler_sample_failed", exc_info=True)
+
+    def _sample(self) -> None:
+        running = asyncio.current_task(self.loop)
+        if running is self.task:
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = _running_stack(frame, self.root)
+            del frame
+            awaiting = False
+        else:
+            stack = _await_chain(self.task.get_coro())
+            stack.append("[await]" if running is None else "[await: loop busy]")
+            awaiting = True
+        if not stack:
+            return
+        with self.lock:
+            if self.closed:
+                return
+            self.profile.stacks[";".join(stack)] += 1
+            self.profile.samples += 1
+            self.profile.awaiting_samples += awaiting
+
+    def finish(self) -> None:
+        self.stop_event.set()
+        # Не ждем поток (join блокировал бы цикл): после closed сэмплы не пишутся.
+        with self.lock:
+            self.closed = True
+
+
+@dataclass
+class _Slot:
+    method: str
+    path: str
+    profile: RequestProfile | None = None
+    sampler: _Sampler | None = None
+
+
+_current_slot: ContextVar[_Slot | None] = ContextVar("dpms_profile_slot", default=None)
+_active_lock = threading.Lock()
+_active_count = 0
+
+
+def profiling_window_open(profiling_until: datetime | None) -> bool:
+    return profiling_until is not None and profiling_until > datetime.now(timezone.utc)
+
+
+def activate(user) -> None:
+    """Начать профиль текущего запроса, если у пользователя открыто окно профилирования."""
+    global _active_count
+    slot = _current_slot.get()
+    if slot is None or slot.profile is not None or not profiling_window_open(user.profiling_until):
+        return
+    task = asyncio.current_task()
+    if task is None:
+        return
+    with _active_lock:
+        if _active_count >= settings.PROFILE_MAX_CONCURRENT:
+            logger.info("profiler_skipped_busy user_id=%s path=%s", user.id, slot.path)
+            return
+        _active_count += 1
+    slot.profile = RequestProfile(
+        method=slot.method,
+        path=slot.path,
+        user_id=str(user.id),
+        user_email=user.email,
+        interval=settings.PROFILE_SAMPLE_INTERVAL_MS / 1000,
+        max_seconds=settings.PROFILE_MAX_SECONDS,
+        max_sql=settings.PROFILE_MAX_SQL,
+    )
+    slot.sampler = _Sampler(slot.profile, asyncio.get_running_loop(), task)
+    slot.sampler.start()
+
+
+def _release(slot: _Slot) -> RequestProfile | None:
+    global _active_count
+    if slot.profile is None or slot.sampler is None:
+        return None
+    slot.sampler.finish()
+    with _active_lock:
+        _active_count -= 1
+    return slot.profile
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    slot = _current_slot.get()
+    if slot is not None and slot.profile is not None and context is not None:
+        context._dpms_profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_dpms_profile_started", None)
+    slot = _current_slot.get()
+    if started is None or slot is None or slot.profile is None:
+        return
+    slot.profile.add_sql(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """SQL профилируемых запросов (только текст и время: параметры не сохраняются)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: слот профиля на каждый HTTP-запрос, сохранение после ответа."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        slot = _Slot(method=scope.get("method", ""), path=scope.get("path", ""))
+        token = _current_slot.set(slot)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_slot.reset(token)
+            profile = _release(slot)
+            if profile is not None:
+                profile.duration_ms = (time.perf_counter() - started) * 1000
+                profile.status = status
+                profile.route = _route_label(scope)
+                await _store(profile)
+
+
+async def _store(profile: RequestProfile) -> None:
+    from app.services.request_profiles import save_profile
+
+    try:
+        profile_id = await asyncio.to_thread(save_profile, profile)
+    except OSError:
+        logger.exception("profiler_save_failed path=%s", profile.path)
+        return
+    logger.info(
+        "profiler_saved id=%s user_id=%s %s %s status=%d duration_ms=%.1f samples=%d sql=%d",
+        profile_id,
+        profile.user_id,
+        profile.method,
+        profile.path,
+        profile.status,
+        profile.duration_ms,
+        profile.samples,
+        profile.sql_count,
+    )
@@ -0,0 +1,165 @@
+"""
+Token bucket rate limiter с общим для всех воркеров хранилищем.
+
+Правило «N/период» — ведро емкостью N, которое наполняется со скоростью
+N/период; каждая проверка забирает один токен. Ключ — правило плюс
+«ip:<адрес>» или «user:<id>».
+
+Бэкенды (RATE_LIMIT_BACKEND):
+- memory — словарь процесса: лимиты на процесс, сбрасываются рестартом;
+- postgres — UNLOGGED-таблица rate_limit_buckets: одна проверка — один
+  INSERT ... ON CONFLICT DO UPDATE ... RETURNING в autocommit, то есть один
+  round trip; атомарность дает блокировка строки на upsert. Если база
+  недоступна, проверка уходит в memory (лимит слабее, но вход не ломается).
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import RATE_LIMIT_BACKEND_ERRORS, RATE_LIMIT_CHECKS
+
+logger = logging.getLogger("dpms.rate_limit")
+
+PERIOD_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+MEMORY_MAX_KEYS = 50_000
+PRUNE_INTERVAL_SECONDS = 600
+# Ведро, не тронутое дольше суток, давно полное: строку можно удалить.
+PRUNE_IDLE = "1 day"
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    capacity: float
+    refill_per_second: float
+
+    @classmethod
+    def parse(cls, rule: str) -> "RateLimit":
+        """«5/minute», «30/hour», «10/second»."""
+        amount, _, period = rule.partition("/")
+        seconds = PERIOD_SECONDS.get(period.strip().lower().rstrip("s"))
+        if seconds is None or not amount.strip().isdigit() or int(amount) <= 0:
+            raise ValueError(f"Invalid rate limit rule: {rule!r}")
+        return cls(capacity=float(amount), refill_per_second=int(amount) / seconds)
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+def _decision(allowed: bool, tokens: float, limit: RateLimit) -> Decision:
+    retry_after = 0.0 if allowed else max(0.0, (1 - tokens) / limit.refill_per_second)
+    return Decision(allowed=allowed, remaining=max(0.0, tokens), retry_after=retry_after)
+
+
+class MemoryBuckets:
+    def __init__(self) -> None:
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: RateLimit) -> Decision:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated) * limit.refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > MEMORY_MAX_KEYS:
+                self._prune()
+        return _decision(allowed, tokens, limit)
+
+    def _prune(self) -> None:
+        # Самые давние ведра первыми: они либо полные, либо принадлежат ушедшим клиентам.
+        for key, _ in sorted(self._buckets.items(), key=lambda item: item[1][1])[: len(self._buckets) // 2]:
+            del self._buckets[key]
+
+
+# Пополнение ведра на момент проверки; now() стабилен в пределах оператора.
+_REFILLED = (
+    "least(CAST(:capacity AS double precision), "
+    "b.tokens + CAST(extract(epoch FROM now() - b.updated_at) AS double precision) "
+    "* CAST(:rate AS double precision))"
+)
+HIT_SQL = text(
+    f"""
+    INSERT INTO rate_limit_buckets AS b (key, tokens, allowed, updated_at)
+    VALUES (CAST(:key AS text), CAST(:capacity AS double precision) - 1, true, now())
+    ON CONFLICT (key) DO UPDATE SET
+        allowed = {_REFILLED} >= 1,
+        tokens = CASE WHEN {_REFILLED} >= 1 THEN {_REFILLED} - 1 ELSE {_REFILLED} END,
+        updated_at = now()
+    RETURNING b.allowed, b.tokens
+    """
+)
+
+PRUNE_SQL = text(f"DELETE FROM rate_limit_buckets WHERE updated_at < now() - interval '{PRUNE_IDLE}'")
+
+
+class PostgresBuckets:
+    def __init__(self, engine: AsyncEngine, fallback: MemoryBuckets):
+        self.engine = engine
+        self.fallback = fallback
+        self._pruned_at = time.monotonic()
+
+    async def hit(self, key: str, limit: RateLimit) -> Decision:
+        try:
+            async with self.engine.connect() as connection:
+                allowed, tokens = (
+                    await connection.execute(
+                        HIT_SQL,
+                        {"key": key, "capacity": limit.capacity, "rate": limit.refill_per_second},
+                    )
+                ).one()
+                if time.monotonic() - self._pruned_at > PRUNE_INTERVAL_SECONDS:
+                    self._pruned_at = time.monotonic()
+                    await connection.execute(PRUNE_SQL)
+        except Exception as error:
+            logger.warning("rate_limit_fallback=memory error=%s", type(error).__name__)
+            RATE_LIMIT_BACKEND_ERRORS.inc()
+            return await self.fallback.hit(key, limit)
+        return _decision(bool(allowed), float(tokens), limit)
+
+
+class RateLimiter:
+    def __init__(self) -> None:
+        self.memory = MemoryBuckets()
+        self.backend: MemoryBuckets | PostgresBuckets = self.memory
+        self.backend_name = "memory"
+        self._rules: dict[str, RateLimit] = {}
+
+    def configure(self, *, backend: str, rules: dict[str, str], engine: AsyncEngine | None = None) -> None:
+        self._rules = {name: RateLimit.parse(rule) for name, rule in rules.items()}
+        backend = backend.strip().lower()
+        if backend == "postgres":
+            if engine is None:
+                raise RuntimeError("RATE_LIMIT_BACKEND=postgres needs a database engine")
+            self.backend = PostgresBuckets(engine, self.memory)
+        elif backend == "memory":
+            self.backend = self.memory
+        else:
+            raise RuntimeError(f"RATE_LIMIT_BACKEND must be memory or postgres, got {backend!r}")
+        self.backend_name = backend
+
+    async def hit(self, rule: str, key: str) -> Decision:
+        limit = self._rules[rule]
+        decision = await self.backend.hit(f"{rule}:{key}", limit)
+        RATE_LIMIT_CHECKS.inc(rule, "allowed" if decision.allowed else "limited")
+        return decision
+
+
+rate_limiter = RateLimiter()
+
+
+def retry_after_header(decision: Decision) -> dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(decision.retry_after)))}
@@ -0,0 +1,130 @@
+"""
+Single-flight: одновременные одинаковые вызовы тяжелой функции — одно вычисление.
+
+@single_flight("name") на async-функцию сервиса вида f(db, *args): пока идет
+вычисление с теми же аргументами (db не входит в ключ), остальные вызовы ждут
+его результат вместо N копий тех же запросов к БД. Результат отдается всем
+как есть — декорируются функции, чей ответ не зависит от вызывающего и не
+мутируется после возврата.
+
+Это не кеш: по умолчанию результат живет ровно до конца вычисления.
+reuse_seconds (или SINGLE_FLIGHT_REUSE_SECONDS) добавляет короткое окно, в
+которое только что посчитанный результат отдается без пересчета.
+
+Вызывающий, который сам только что изменил данные (своя незакоммиченная или
+только что закоммиченная запись), зовет f.fresh(db, ...): расчет идет в его
+сессии, а окно reuse сбрасывается, чтобы другие не получили результат до записи.
+
+Отмена ведущего вызова (клиент закрыл соединение) не роняет ожидающих: один
+из них повторяет вычисление в своей сессии. Исключение ведущего получают все
+ожидающие — это та же ошибка на тех же данных.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from app.config import settings
+from app.core.metrics import SINGLE_FLIGHT_CALLS
+
+R = TypeVar("R")
+
+
+class _LeaderCancelled(Exception):
+    """Ведущий вызов отменен: ожидающие повторяют попытку."""
+
+
+class SingleFlight:
+    def __init__(self, name: str, reuse_seconds: float | None = None):
+        self.name = name
+        self.reuse_seconds = reuse_seconds
+        self._inflight: dict[Any, asyncio.Future] = {}
+        self._recent: dict[Any, tuple[float, Any]] = {}
+        self._generation = 0
+
+    @property
+    def window(self) -> float:
+        return settings.SINGLE_FLIGHT_REUSE_SECONDS if self.reuse_seconds is None else self.reuse_seconds
+
+    def forget(self) -> None:
+        """Сбросить окно reuse; уже идущие вычисления в него тоже не попадут."""
+        self._generation += 1
+        self._recent.clear()
+
+    async def run(self, key: Any, compute: Callable[[], Awaitable[R]]) -> R:
+        while True:
+            recent = self._recent.get(key)
+            if recent is not None:
+                if time.monotonic() < recent[0]:
+                    SINGLE_FLIGHT_CALLS.inc(self.name, "reused")
+                    return recent[1]
+                del self._recent[key]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                try:
+                    # shield: отмена ожидающего не должна отменять общий future.
+                    result = await asyncio.shield(future)
+                except _LeaderCancelled:
+                    continue
+                SINGLE_FLIGHT_CALLS.inc(self.name, "shared")
+                return result
+
+            return await self._lead(key, compute)
+
+    async def _lead(self, key: Any, compute: Callable[[], Awaitable[R]]) -> R:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        SINGLE_FLIGHT_CALLS.inc(self.name, "leader")
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            if self.window > 0 and generation == self._generation:
+                self._recent[key] = (time.monotonic() + self.window, result)
+            return result
+        finally:
+            del self._inflight[key]
+            # Помечаем исключение прочитанным: без ожидающих asyncio писал бы «never retrieved».
+            if not future.cancelled():
+                future.exception()
+
+
+def single_flight(
+    name: str,
+    *,
+    reuse_seconds: float | None = None,
+) -> Callable[[Callable[..., Awaitable[R]]], Callable[..., Awaitable[R]]]:
+    """Декоратор для async f(db, *args, **kwargs); ключ — аргументы после db."""
+
+    def decorate(function: Callable[..., Awaitable[R]]) -> Callable[..., Awaitable[R]]:
+        flight = SingleFlight(name, reuse_seconds)
+
+        @functools.wraps(function)
+        async def wrapper(db, *args, **kwargs) -> R:
+            key = (args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return await function(db, *args, **kwargs)
+            return await flight.run(key, lambda: function(db, *args, **kwargs))
+
+        async def fresh(db, *args, **kwargs) -> R:
+            flight.forget()
+            return await function(db, *args, **kwargs)
+
+        wrapper.single_flight = flight  # type: ignore[attr-defined]
+        wrapper.fresh = fresh  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorate
@@ -1,21 +1,104 @@
 """SQLAlchemy async engine и сессия."""
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from sqlalchemy import event, text
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import settings
+from app.core import profiler
+from app.core.metrics import DB_READ_SESSIONS, DB_REPLICA_LAG, MeteredAsyncQueuePool, instrument_engine
 from app.models import Base
 
-_connect_args: dict = {}
-if settings.DB_SCHEMA:
-    _connect_args["server_settings"] = {"search_path": f"{settings.DB_SCHEMA},public"}
+logger = logging.getLogger("dpms.database")
+
+POOL_MODES = {"direct", "pgbouncer"}
+
+
+def _connect_args() -> dict:
+    connect_args: dict = {}
+    if settings.DB_SCHEMA:
+        # За PgBouncer startup-параметр search_path должен быть в track_extra_parameters.
+        connect_args["server_settings"] = {"search_path": f"{settings.DB_SCHEMA},public"}
+    mode = settings.DB_POOL_MODE.strip().lower()
+    if mode not in POOL_MODES:
+        raise RuntimeError(f"DB_POOL_MODE must be one of {sorted(POOL_MODES)}, got {settings.DB_POOL_MODE!r}")
+    if mode == "pgbouncer":
+        # Transaction pooling: следующий запрос может попасть на другое серверное
+        # соединение, где подготовленного оператора нет (или есть чужой с тем же
+        # именем). Кеши asyncpg и диалекта выключены, имена уникальны.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    return connect_args
+
+
+def _create_engine(
+    url: str,
+    *,
+    pool_label: str,
+    pool_size: int,
+    max_overflow: int,
+    pool_pre_ping: bool | None = None,
+) -> AsyncEngine:
+    created = create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        future=True,
+        connect_args=_connect_args(),
+        poolclass=MeteredAsyncQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING if pool_pre_ping is None else pool_pre_ping,
+    )
+    instrument_engine(created.sync_engine, pool_label=pool_label)
+    profiler.instrument_engine(created.sync_engine)
+    return created
+
+
+engine = _create_engine(
+    settings.DATABASE_URL,
+    pool_label="main",
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
 
-engine = create_async_engine(
+# Пул WebSocket-авторизации и воркера писем: отдельный и маленький, чтобы
+# всплеск переподключений сокетов или рассылка не выбирали пул API.
+aux_engine = _create_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    connect_args=_connect_args,
+    pool_label="aux",
+    pool_size=settings.DB_AUX_POOL_SIZE,
+    max_overflow=settings.DB_AUX_MAX_OVERFLOW,
 )
 
+replica_engine: AsyncEngine | None = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = _create_engine(
+        settings.DATABASE_REPLICA_URL,
+        pool_label="replica",
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+
+# Общий лимитер (app.core.rate_limit): autocommit и без pre-ping, чтобы проверка
+# стоила один round trip; оборванное соединение — ошибка проверки и fallback в память.
+rate_limit_engine: AsyncEngine | None = None
+if settings.RATE_LIMIT_BACKEND.strip().lower() == "postgres":
+    rate_limit_engine = _create_engine(
+        settings.DATABASE_URL,
+        pool_label="rate_limit",
+        pool_size=settings.RATE_LIMIT_POOL_SIZE,
+        max_overflow=settings.RATE_LIMIT_POOL_SIZE,
+        pool_pre_ping=False,
+    ).execution_options(isolation_level="AUTOCOMMIT")
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -23,3 +106,108 @@ AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
     autoflush=False,
 )
+
+AuxSessionLocal = async_sessionmaker(
+    aux_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+# Отставание реплики: 0, если все полученное WAL уже применено (иначе простаивающий
+# primary выглядел бы как растущий лаг по pg_last_xact_replay_timestamp).
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """
+    Выбор движка для сессий только для чтения.
+
+    Лаг реплики проверяется не чаще раза в REPLICA_LAG_CHECK_SECONDS одним
+    запросом; пока идет проверка, остальные берут прошлый результат. Реплика
+    недоступна или отстает больше REPLICA_MAX_LAG_SECONDS — читаем с primary.
+    """
+
+    def __init__(self, replica: AsyncEngine | None):
+        self.replica = replica
+        self.lag: float | None = None
+        self.healthy = False
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def use_replica(self) -> bool:
+        if self.replica is None:
+            return False
+        if time.monotonic() - self._checked_at >= settings.REPLICA_LAG_CHECK_SECONDS and not self._lock.locked():
+            async with self._lock:
+                await self._check()
+        return self.healthy and self.lag is not None and self.lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+    async def _check(self) -> None:
+        self._checked_at = time.monotonic()
+        try:
+            async with self.replica.connect() as connection:
+                lag = await asyncio.wait_for(connection.scalar(REPLICA_LAG_SQL), timeout=2)
+        except Exception as error:
+            if self.healthy:
+                logger.warning("replica_unavailable error=%s", type(error).__name__)
+            self.healthy = False
+            return
+        self.lag = float(lag or 0)
+        self.healthy = True
+        if self.lag > settings.REPLICA_MAX_LAG_SECONDS:
+            logger.warning("replica_lagging lag_seconds=%.1f", self.lag)
+
+
+replica_router = ReplicaRouter(replica_engine)
+if replica_engine is not None:
+    DB_REPLICA_LAG.set_function(
+        lambda: {(): replica_router.lag} if replica_router.healthy and replica_router.lag is not None else {}
+    )
+
+
+@asynccontextmanager
+async def read_only_session(
+    primary: AsyncSession | None = None,
+    *,
+    snapshot: bool = False,
+) -> AsyncIterator[AsyncSession]:
+    """
+    Сессия в транзакции READ ONLY: на реплике, если она в порядке, иначе на primary.
+
+    primary — сессия запроса (get_db): ее транзакция (проверка токена, обслуживание
+    очереди) фиксируется, соединение возвращается в пул, а при чтении с primary
+    сессия переиспользуется — второе соединение на запрос не берется. Фиксирует
+    ее потом сам get_db.
+
+    snapshot=True — один снимок на все запросы отчета: на primary SERIALIZABLE
+    READ ONLY DEFERRABLE (ждет безопасный снимок и дальше не платит за SSI и не
+    получает serialization failure), на реплике REPEATABLE READ (SERIALIZABLE
+    на hot standby недоступен).
+    """
+    if primary is not None and primary.in_transaction():
+        await primary.commit()
+    if await replica_router.use_replica():
+        DB_READ_SESSIONS.inc("replica")
+        session, owned = AsyncSessionLocal(bind=replica_engine), True
+        mode = "ISOLATION LEVEL REPEATABLE READ, READ ONLY" if snapshot else "READ ONLY"
+    else:
+        DB_READ_SESSIONS.inc("primary_fallback" if replica_engine is not None else "primary")
+        session, owned = (primary, False) if primary is not None else (AsyncSessionLocal(), True)
+        mode = "ISOLATION LEVEL SERIALIZABLE, READ ONLY, DEFERRABLE" if snapshot else "READ ONLY"
+    try:
+        await session.execute(text(f"SET TRANSACTION {mode}"))
+        yield session
+    finally:
+        if owned:
+            await session.rollback()
+            await session.close()
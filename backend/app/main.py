@@ -1,16 +1,21 @@
-"""FastAPI приложение DPMS: CORS, lifespan, роуты, rate limiting."""
+"""FastAPI приложение DPMS: CORS, lifespan, роуты, rate limiting, метрики."""
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from fastapi.responses import PlainTextResponse
 
 from app.config import settings
-from app.api.routes import absences, activity, admin, auth, calculator, catalog, client_events, competencies, contacts, dashboard, deadline_trackers, feedback, knowledge, messages, notifications, personal_tasks, project_cockpit, queue, quick_notes, reports, shop, tasks, users, work_entities, work_entity_workspace
-from app.database import AsyncSessionLocal
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import WEBSOCKET_CONNECTIONS, MetricsMiddleware, render_metrics
+from app.core.profiler import ProfilingMiddleware
+from app.core.rate_limit import rate_limiter
+from app.api.routes import absences, activity, admin, auth, calculator, catalog, client_events, competencies, contacts, dashboard, deadline_trackers, feedback, knowledge, messages, notifications, personal_tasks, project_cockpit, queue, quick_notes, realtime, reports, shop, tasks, users, work_entities, work_entity_workspace
+from app.database import AsyncSessionLocal, rate_limit_engine
+from app.services.attention_realtime import attention_hub
+from app.services.pagination import CURSOR_HEADER
+from app.services.quick_note_realtime import hub_registry as quick_note_hubs
+from app.services.realtime import realtime_hub
 from app.services.competencies import ensure_builtin_competencies
 
 
@@ -20,11 +25,27 @@ async def lifespan(app: FastAPI):
     async with AsyncSessionLocal() as session:
         await ensure_builtin_competencies(session)
         await session.commit()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start(
+            interval_ms=settings.LOOP_MONITOR_INTERVAL_MS,
+            threshold_ms=settings.LOOP_MONITOR_THRESHOLD_MS,
+            asyncio_debug=settings.LOOP_MONITOR_ASYNCIO_DEBUG,
+        )
     yield
-    # shutdown при необходимости
+    await loop_monitor.stop()
 
 
-limiter = Limiter(key_func=get_remote_address)
+rate_limiter.configure(
+    backend=settings.RATE_LIMIT_BACKEND,
+    engine=rate_limit_engine,
+    rules={
+        "login": settings.RATE_LIMIT_LOGIN,
+        "password": settings.RATE_LIMIT_PASSWORD,
+        "ws_connect_ip": settings.RATE_LIMIT_WS_CONNECT_IP,
+        "ws_connect_user": settings.RATE_LIMIT_WS_CONNECT_USER,
+        "upload": settings.RATE_LIMIT_UPLOAD,
+    },
+)
 
 app = FastAPI(
     title=settings.APP_TITLE,
@@ -32,16 +53,6 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-app.state.limiter = limiter
-
-
-@app.exception_handler(RateLimitExceeded)
-async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-    return JSONResponse(
-        status_code=429,
-        content={"detail": "Слишком много попыток. Подождите минуту."},
-    )
-
 
 import os
 _cors_origins = os.getenv("CORS_ORIGINS", "*").split(",")
@@ -51,12 +62,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[CURSOR_HEADER],
 )
 
+# Профиль снимается только у пользователей с открытым окном профилирования (users.profiling_until).
+app.add_middleware(ProfilingMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    WEBSOCKET_CONNECTIONS.set_function(
+        lambda: {
+            ("attention",): attention_hub.connection_count(),
+            ("quick_notes",): quick_note_hubs.connection_count(),
+            ("realtime",): realtime_hub.connection_count(),
+        }
+    )
+
 # Роуты
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(notifications.router, prefix="/api/notifications", tags=["notifications"])
 app.include_router(messages.router, prefix="/api/messages", tags=["messages"])
+app.include_router(realtime.router, prefix="/api/realtime", tags=["realtime"])
 app.include_router(activity.router, prefix="/api/activity", tags=["activity"])
 app.include_router(client_events.router, prefix="/api/client-events", tags=["client-events"])
 app.include_router(contacts.router, prefix="/api/contacts", tags=["contacts"])
@@ -85,3 +111,11 @@ app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
 async def health():
     """Проверка доступности API."""
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Метрики процесса в формате Prometheus (латентность роутов, SQL, пул, WebSocket)."""
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1 @@
+"""Operator maintenance commands: consistency checks and repairs."""
@@ -0,0 +1,58 @@
+"""
+Verify per-user badge counters (user_badge_counters) against a recount.
+
+Запуск: python -m app.maintenance.badge_counters [--repair]
+Расходящиеся строки с --repair пересчитываются под той же блокировкой, что и
+у воркера app.workers.badge_counters (он же делает эту сверку по расписанию),
+поэтому запуск безопасен на работающей системе. Строки, удаленные записью и
+еще не пересчитанные воркером, расхождением не считаются. Exit code 1 means
+drift was found (and, with --repair, fixed).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from app.database import AsyncSessionLocal
+from app.services.badge_counters import verify_badge_counters
+
+
+logger = logging.getLogger("dpms.maintenance.badge_counters")
+
+
+async def run(*, repair: bool) -> int:
+    async with AsyncSessionLocal() as db:
+        drifts = await verify_badge_counters(db, repair=repair)
+        if repair:
+            await db.commit()
+    for drift in drifts:
+        logger.warning(
+            "badge_counter_drift user_id=%s field=%s stored=%d expected=%d",
+            drift.user_id,
+            drift.field,
+            drift.stored,
+            drift.expected,
+        )
+    logger.info(
+        "badge_counter_verify drift_count=%d repaired=%s",
+        len(drifts),
+        bool(repair and drifts),
+    )
+    return 1 if drifts else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="recount drifted users under the counter row lock",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    raise SystemExit(asyncio.run(run(repair=args.repair)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Create upcoming monthly partitions of the event journals; archive old months.
+
+Запуск: python -m app.maintenance.event_partitions [--archive] [--before YYYY-MM] [--dry-run]
+Без --archive только досоздает секции на EVENT_PARTITION_PREMAKE_MONTHS вперед
+(запускать по расписанию, например ежедневно). С --archive месяцы старше
+EVENT_PARTITION_HOT_MONTHS (или раньше --before) выгружаются в EVENT_ARCHIVE_DIR;
+секция _legacy (история до секционирования) остается в БД.
+Exit code 1 means some partition could not be created or archived.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services.event_partitions import (
+    PARTITIONED_TABLES,
+    add_months,
+    archive_partition,
+    ensure_partitions,
+    list_partitions,
+    month_start,
+    partition_name,
+    partitions_to_archive,
+    planned_partitions,
+    utc_now,
+)
+
+
+logger = logging.getLogger("dpms.maintenance.event_partitions")
+
+
+async def _ensure(table: str, *, now: datetime, dry_run: bool) -> bool:
+    async with AsyncSessionLocal() as db:
+        try:
+            if dry_run:
+                planned = planned_partitions(
+                    await list_partitions(db, table),
+                    now=now,
+                    months_ahead=settings.EVENT_PARTITION_PREMAKE_MONTHS,
+                )
+                created = [partition_name(table, start) for start, _end in planned]
+            else:
+                created = await ensure_partitions(db, table, now=now)
+                await db.commit()
+        except Exception as error:
+            await db.rollback()
+            logger.error("event_partition_create=failed table=%s error_code=%s", table, type(error).__name__)
+            return False
+    logger.info(
+        "event_partitions table=%s %s=%s",
+        table,
+        "would_create" if dry_run else "created",
+        ",".join(created) or "-",
+    )
+    return True
+
+
+async def _archive(table: str, *, before: datetime, dry_run: bool) -> bool:
+    async with AsyncSessionLocal() as db:
+        candidates = await partitions_to_archive(db, table, before=before)
+    ok = True
+    for partition in candidates:
+        if dry_run:
+            logger.info("event_partition_archive=planned table=%s partition=%s", table, partition.name)
+            continue
+        async with AsyncSessionLocal() as db:
+            try:
+                archive = await archive_partition(db, table, partition)
+                await db.commit()
+            except Exception as error:
+                await db.rollback()
+                logger.error(
+                    "event_partition_archive=failed table=%s partition=%s error_code=%s",
+                    table,
+                    partition.name,
+                    type(error).__name__,
+                )
+                ok = False
+                continue
+        logger.info(
+            "event_partition_archive=done table=%s partition=%s rows=%d bytes=%d",
+            table,
+            partition.name,
+            archive.row_count if archive else 0,
+            archive.byte_size if archive else 0,
+        )
+    return ok
+
+
+async def run(*, archive: bool, before: datetime | None, dry_run: bool) -> int:
+    now = utc_now()
+    ok = True
+    for table in PARTITIONED_TABLES:
+        ok = await _ensure(table, now=now, dry_run=dry_run) and ok
+    if archive:
+        cutoff = before or add_months(month_start(now), -settings.EVENT_PARTITION_HOT_MONTHS)
+        logger.info("event_partition_archive cutoff=%s", cutoff.isoformat())
+        for table in PARTITIONED_TABLES:
+            ok = await _archive(table, before=cutoff, dry_run=dry_run) and ok
+    return 0 if ok else 1
+
+
+def _month(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m").replace(tzinfo=timezone.utc)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="detach months older than the hot window into gzip NDJSON archives",
+    )
+    parser.add_argument(
+        "--before",
+        type=_month,
+        help="archive months that end on or before this month start (YYYY-MM)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only report partitions that would be created or archived",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    raise SystemExit(
+        asyncio.run(run(archive=args.archive or args.before is not None, before=args.before, dry_run=args.dry_run))
+    )
+
+
+if __name__ == "__main__":
+    main()
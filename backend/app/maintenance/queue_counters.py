@@ -0,0 +1,54 @@
+"""
+Verify per-user WIP counters and the critical-in-queue count against tasks.
+
+Запуск: python -m app.maintenance.queue_counters [--repair]
+Exit code 1 means drift was found (and, with --repair, fixed).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from app.database import AsyncSessionLocal
+from app.services.queue_counters import verify_queue_counters
+
+
+logger = logging.getLogger("dpms.maintenance.queue_counters")
+
+
+async def run(*, repair: bool) -> int:
+    async with AsyncSessionLocal() as db:
+        drifts = await verify_queue_counters(db, repair=repair)
+        if repair:
+            await db.commit()
+    for drift in drifts:
+        logger.warning(
+            "queue_counter_drift scope=%s key=%s stored=%d expected=%d",
+            drift.scope,
+            drift.key,
+            drift.stored,
+            drift.expected,
+        )
+    logger.info(
+        "queue_counter_verify drift_count=%d repaired=%s",
+        len(drifts),
+        bool(repair and drifts),
+    )
+    return 1 if drifts else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="rewrite drifted counters from the recomputed values",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    raise SystemExit(asyncio.run(run(repair=args.repair)))
+
+
+if __name__ == "__main__":
+    main()
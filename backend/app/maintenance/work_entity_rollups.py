@@ -0,0 +1,54 @@
+"""
+Verify project summary rollups against a full recomputation.
+
+Запуск: python -m app.maintenance.work_entity_rollups [--repair]
+Exit code 1 means drift was found (and, with --repair, fixed).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+
+from app.database import AsyncSessionLocal
+from app.services.work_entity_rollups import verify_entity_rollups
+
+
+logger = logging.getLogger("dpms.maintenance.work_entity_rollups")
+
+
+async def run(*, repair: bool) -> int:
+    async with AsyncSessionLocal() as db:
+        drifts = await verify_entity_rollups(db, repair=repair)
+        if repair:
+            await db.commit()
+    for drift in drifts:
+        logger.warning(
+            "rollup_drift entity_id=%s stored=%s expected=%s",
+            drift.entity_id,
+            json.dumps(drift.stored, sort_keys=True),
+            json.dumps(drift.expected, sort_keys=True),
+        )
+    logger.info(
+        "rollup_verify drift_count=%d repaired=%s",
+        len(drifts),
+        bool(repair and drifts),
+    )
+    return 1 if drifts else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="rewrite drifted rows from the recomputed values",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    raise SystemExit(asyncio.run(run(repair=args.repair)))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ class Base(DeclarativeBase):
 from app.models.user import User
 from app.models.catalog import CatalogItem
 from app.models.task import (
+    QueueStats,
     Task,
     TaskAcceptanceCriterion,
     TaskAcceptanceCriterionEvent,
@@ -25,8 +26,13 @@ from app.models.knowledge import KnowledgeArticle
 from app.models.absence import GlobalHoliday, UserAbsence
 from app.models.transaction import QTransaction
 from app.models.shop import ShopItem, Purchase, PeriodSnapshot, PeriodClosure
+from app.models.reference_version import ReferenceVersion
 from app.models.notification import Notification
+from app.models.badge_counter import UserBadgeCounter
 from app.models.email_outbox import EmailOutbox
+from app.models.report_job import ReportJob
+from app.models.event_archive import EventArchive
+from app.models.focus_session import FocusSession
 from app.models.messages import (
     CommunicationEvent,
     MessagePost,
@@ -54,6 +60,7 @@ from app.models.work_entity import (
     WorkEntityLink,
     WorkEntityMember,
     WorkEntityMilestone,
+    WorkEntityRollup,
     WorkEntityScheduleDependency,
     WorkEntityStage,
     WorkEntityTask,
@@ -75,6 +82,7 @@ __all__ = [
     "User",
     "CatalogItem",
     "Task",
+    "QueueStats",
     "TaskAcceptanceCriterion",
     "TaskAcceptanceCriterionEvent",
     "TaskReviewEvent",
@@ -87,8 +95,13 @@ __all__ = [
     "Purchase",
     "PeriodSnapshot",
     "PeriodClosure",
+    "ReferenceVersion",
     "Notification",
+    "UserBadgeCounter",
     "EmailOutbox",
+    "ReportJob",
+    "EventArchive",
+    "FocusSession",
     "CommunicationEvent",
     "UserAttentionItem",
     "MessageThread",
@@ -115,6 +128,7 @@ __all__ = [
     "WorkEntityStage",
     "WorkEntityTask",
     "WorkEntityMilestone",
+    "WorkEntityRollup",
     "WorkEntityScheduleDependency",
     "WorkEntityArtifact",
     "Competency",
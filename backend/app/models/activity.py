@@ -2,7 +2,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -13,6 +13,10 @@ class ActivityEvent(Base):
     """Append-only lightweight journal of user actions."""
 
     __tablename__ = "activity_events"
+    __table_args__ = (
+        Index("ix_activity_events_occurred_at_brin", "occurred_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -37,8 +41,13 @@ class ActivityEvent(Base):
         DateTime(timezone=True),
         nullable=False,
         default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        primary_key=True,
         index=True,
     )
 
+    # Ключ секционирования входит в первичный ключ таблицы; ORM-идентичность — по id.
+    __mapper_args__ = {"primary_key": [id]}
+
     actor = relationship("User", foreign_keys=[actor_id])
     task = relationship("Task", foreign_keys=[task_id])
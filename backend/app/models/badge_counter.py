@@ -0,0 +1,37 @@
+"""Счётчики бейджей пользователя одной строкой; ведутся services/badge_counters."""
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import CheckConstraint, DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class UserBadgeCounter(Base):
+    """Непрочитанные уведомления, события внимания и треды пользователя."""
+
+    __tablename__ = "user_badge_counters"
+    __table_args__ = (
+        CheckConstraint(
+            "unread_notifications >= 0 AND unread_direct >= 0 "
+            "AND unread_important >= 0 AND unread_threads >= 0",
+            name="ck_user_badge_counters_non_negative",
+        ),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    unread_notifications: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    unread_direct: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    unread_important: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    unread_threads: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
@@ -0,0 +1,36 @@
+"""Catalog of event-table partitions detached into gzip NDJSON archives."""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, CheckConstraint, DateTime, Index, String, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class EventArchive(Base):
+    """Один выгруженный месяц (секция) журнальной таблицы: файл и его границы."""
+
+    __tablename__ = "event_archives"
+    __table_args__ = (
+        CheckConstraint("range_start < range_end", name="ck_event_archives_range"),
+        UniqueConstraint("table_name", "partition_name", name="uq_event_archives_partition"),
+        Index("ix_event_archives_table_range", "table_name", "range_start", "range_end"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    table_name: Mapped[str] = mapped_column(String(63), nullable=False)
+    partition_name: Mapped[str] = mapped_column(String(63), nullable=False)
+    # [range_start, range_end) по столбцу времени; для legacy-секции начало — самая ранняя строка.
+    range_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    range_end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    path: Mapped[str] = mapped_column(String(500), nullable=False)
+    row_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    byte_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -0,0 +1,58 @@
+"""Materialized focus sessions: one row per continuous focus on a task."""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import CheckConstraint, DateTime, ForeignKey, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class FocusSession(Base):
+    """
+    Отрезок фокуса пользователя на задаче: от focus_start до паузы.
+
+    seconds — засчитанное в active_seconds время (с потолком 4ч и с учетом
+    коррекции), поэтому не обязано совпадать с ended_at - started_at.
+    Открытая сессия (ended_at IS NULL) у задачи не больше одной.
+    Коррекция времени пишется отдельной строкой time_corrected с разницей
+    (может быть отрицательной): сумма seconds по задаче равна active_seconds.
+    """
+
+    __tablename__ = "focus_sessions"
+    __table_args__ = (
+        CheckConstraint(
+            "seconds >= 0 OR end_reason = 'time_corrected'",
+            name="ck_focus_sessions_seconds",
+        ),
+        CheckConstraint(
+            "(ended_at IS NULL) = (end_reason IS NULL)",
+            name="ck_focus_sessions_end",
+        ),
+        Index("ix_focus_sessions_user_started", "user_id", "started_at"),
+        Index("ix_focus_sessions_user_ended", "user_id", "ended_at"),
+        Index("ix_focus_sessions_task", "task_id"),
+        Index(
+            "uq_focus_sessions_task_open",
+            "task_id",
+            unique=True,
+            postgresql_where=text("ended_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+    )
+    task_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False
+    )
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    seconds: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # pause | submit_for_review | started_another_task | pulled_another_task | four_hour_limit | returned
+    # | time_corrected
+    end_reason: Mapped[str | None] = mapped_column(String(40), nullable=True)
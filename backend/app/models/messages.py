@@ -7,6 +7,7 @@ from sqlalchemy import (
     CheckConstraint,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -23,6 +24,9 @@ class CommunicationEvent(Base):
     """Immutable event shown to one or more users through attention items."""
 
     __tablename__ = "communication_events"
+    __table_args__ = (
+        Index("ix_communication_events_created_at_brin", "created_at", postgresql_using="brin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -0,0 +1,21 @@
+"""Версии справочников: строка на справочник, ведется services/reference_data."""
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class ReferenceVersion(Base):
+    """Растет при любом изменении справочника; ключ кеша справочников и ETag ответов."""
+
+    __tablename__ = "reference_versions"
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import Boolean, CheckConstraint, DateTime, Enum, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint, text
+from sqlalchemy import BigInteger, Boolean, CheckConstraint, DateTime, Enum, ForeignKey, Index, Integer, Numeric, String, Text, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -202,9 +202,29 @@ class Task(Base):
         return "green"
 
 
+class QueueStats(Base):
+    """Счётчики очереди одной строкой (id=1); ведутся services/queue_counters."""
+
+    __tablename__ = "queue_stats"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    critical_in_queue: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Растет при любом изменении задач в очереди; ключ общего снимка очереди
+    queue_version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+
 class TaskReviewEvent(Base):
     """Событие приемочного цикла задачи."""
     __tablename__ = "task_review_events"
+    __table_args__ = (
+        Index("ix_task_review_events_created_at_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -229,7 +249,15 @@ class TaskReviewEvent(Base):
     result_comment: Mapped[str | None] = mapped_column(Text, nullable=True)
     brief_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     brief_feedback: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=datetime.utcnow,
+        server_default=func.now(),
+    )
+
+    # Ключ секционирования входит в первичный ключ таблицы; ORM-идентичность — по id.
+    __mapper_args__ = {"primary_key": [id]}
 
 
 class TaskAcceptanceCriterion(Base):
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Numeric, String
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Numeric, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -21,6 +21,9 @@ class QTransaction(Base):
     """Запись в журнале начислений/списаний Q. Только INSERT, без UPDATE/DELETE."""
 
     __tablename__ = "q_transactions"
+    __table_args__ = (
+        Index("ix_q_transactions_created_at_brin", "created_at", postgresql_using="brin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -46,7 +49,12 @@ class QTransaction(Base):
         unique=True,
         index=True,
     )
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        server_default=func.now(),
+    )
 
     user = relationship("User", back_populates="transactions")
     task = relationship("Task", back_populates="transactions")
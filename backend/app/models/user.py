@@ -47,6 +47,8 @@ class User(Base):
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), nullable=False)
     mpw: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # план на месяц в Q
     wip_limit: Mapped[int] = mapped_column(Integer, nullable=False, default=2)
+    # Задачи в работе; ведётся services/queue_counters при переходах статусов
+    wip_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     is_new_employee: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     task_workspace_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     can_link_queue_tasks_to_projects: Mapped[bool] = mapped_column(
@@ -72,6 +74,8 @@ class User(Base):
         nullable=True,
     )
     sidebar_menu_order: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # До этого момента запросы пользователя профилируются (app.core.profiler); ставит admin
+    profiling_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -3,6 +3,7 @@ import uuid
 from datetime import datetime, timezone
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
     DateTime,
@@ -13,6 +14,7 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    func,
     text,
 )
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
@@ -145,6 +147,13 @@ class WorkEntity(Base):
         nullable=True,
     )
     schedule_revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Bumped with every audit event; validates cached workspace/map payloads.
+    workspace_revision: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default=text("0"),
+    )
     tags: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False, default=list)
     details_json: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     archived_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -911,6 +920,10 @@ class WorkEntityEvent(Base):
     """Audit trail for entity, member, and link changes."""
 
     __tablename__ = "work_entity_events"
+    __table_args__ = (
+        Index("ix_work_entity_events_created_at_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -944,6 +957,37 @@ class WorkEntityEvent(Base):
     payload: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         default=utc_now,
+        server_default=func.now(),
         index=True,
     )
+
+    # Ключ секционирования входит в первичный ключ таблицы; ORM-идентичность — по id.
+    __mapper_args__ = {"primary_key": [id]}
+
+
+class WorkEntityRollup(Base):
+    """Write-maintained native item counters for the project summary."""
+
+    __tablename__ = "work_entity_rollups"
+
+    entity_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("work_entities.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    native_tasks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    native_milestones: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    artifacts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    done_items: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # {status: count} over non-cancelled tasks and milestones.
+    counts_by_status: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    # {UTC ISO due timestamp: count} over open tasks and milestones; overdue
+    # totals and the next due date are derived from it at read time.
+    open_due_counts: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=utc_now,
+        onupdate=utc_now,
+    )
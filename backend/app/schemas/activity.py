@@ -21,6 +21,11 @@ class ActivityEventListResponse(BaseModel):
     items: list[ActivityEventRead]
     total: int
     limit: int
+    # Оценка планировщика, если лента не уместилась в первую страницу.
+    total_is_estimate: bool = False
+    next_cursor: str | None = None
+    # События раньше этой границы выгружены в архив и в ленту не попадают.
+    archived_until: datetime | None = None
 
 
 class FocusActivitySummary(BaseModel):
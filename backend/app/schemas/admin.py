@@ -3,7 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class RolloverRequest(BaseModel):
@@ -20,6 +20,24 @@ class RolloverResponse(BaseModel):
     total_karma_burned: float
 
 
+class RolloverPreviewRow(BaseModel):
+    """Снимок и списание сотрудника, которые запишет закрытие периода."""
+    user_id: UUID
+    full_name: str
+    league: str
+    mpw: Decimal
+    earned_main: float
+    earned_karma: float
+    tasks_completed: int
+    rollover_burn: float
+    carry_over: float
+
+
+class RolloverPreviewResponse(RolloverResponse):
+    """Dry-run закрытия периода: ничего не записывается."""
+    rows: list[RolloverPreviewRow]
+
+
 class PeriodSnapshotResponse(BaseModel):
     """Снимок сотрудника за период."""
     id: UUID
@@ -45,3 +63,75 @@ class PeriodHistoryItem(BaseModel):
     users_count: int
     total_main_reset: float
     total_karma_burned: float
+
+
+class LoopLagPercentiles(BaseModel):
+    """Лаг event loop по последним ударам heartbeat, мс."""
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class LoopOffender(BaseModel):
+    """Call site, на котором сторож застал заблокированный цикл (или медленный callback asyncio debug)."""
+    site: str
+    source: str
+    count: int
+    total_ms: float
+    max_ms: float
+    last_seen: datetime
+    stack: list[str]
+
+
+class LoopMonitorReport(BaseModel):
+    """Состояние монитора event loop процесса, обслужившего запрос."""
+    enabled: bool
+    started_at: datetime | None
+    interval_ms: int
+    threshold_ms: int
+    asyncio_debug: bool
+    samples: int
+    stalls: int
+    lag_ms: LoopLagPercentiles
+    offenders: list[LoopOffender]
+
+
+class ProfilingWindowRequest(BaseModel):
+    """Окно профилирования запросов пользователя; 0 — выключить."""
+    minutes: int = Field(ge=0, le=240)
+
+
+class ProfilingWindowResponse(BaseModel):
+    user_id: UUID
+    full_name: str
+    profiling_until: datetime | None
+
+
+class RequestProfileSummary(BaseModel):
+    """Сводка снятого профиля; стеки — GET .../{id}/folded."""
+    id: str
+    started_at: datetime
+    method: str
+    path: str
+    route: str | None
+    user_id: str
+    user_email: str
+    status: int
+    duration_ms: float
+    sample_interval_ms: float
+    samples: int
+    awaiting_samples: int
+    truncated: bool
+    sql_count: int
+    sql_ms: float
+
+
+class ProfiledStatement(BaseModel):
+    statement: str
+    ms: float
+
+
+class RequestProfileDetail(RequestProfileSummary):
+    """Профиль с SQL-запросами в порядке выполнения (без параметров, до PROFILE_MAX_SQL)."""
+    sql: list[ProfiledStatement]
@@ -49,6 +49,7 @@ class EstimatorCalibration(BaseModel):
     bias: str  # "точно" | "завышает" | "занижает"
     overestimates: int
     underestimates: int
+    median_deviation_pct: int | None = None
 
 
 class WidgetPopularityItem(BaseModel):
@@ -58,6 +59,14 @@ class WidgetPopularityItem(BaseModel):
     usage_percent: int
 
 
+class DeviationDistribution(BaseModel):
+    """Перцентили отклонения факта от оценки, %."""
+    p25: float
+    p50: float
+    p75: float
+    p90: float
+
+
 class CalibrationReportNew(BaseModel):
     """Новый калибровочный отчёт: задачи, оценщики, популярность операций."""
     period: str
@@ -68,6 +77,7 @@ class CalibrationReportNew(BaseModel):
     estimator_calibrations: list[EstimatorCalibration]
     widget_popularity: list[WidgetPopularityItem]
     total_tasks_with_breakdown: int
+    deviation_distribution: DeviationDistribution | None = None
 
 
 class TeamleadAccuracy(BaseModel):
@@ -81,3 +81,38 @@ class ValidateRequest(BaseModel):
     task_id: UUID
     approved: bool
     comment: str | None = None
+
+
+MAX_BATCH_ITEMS = 200
+
+
+class AssignBatchItem(BaseModel):
+    task_id: UUID
+    executor_id: UUID
+
+
+class AssignBatchRequest(BaseModel):
+    """Назначить несколько задач одним запросом."""
+    items: list[AssignBatchItem] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+    comment: str | None = None
+
+
+class ValidateBatchItem(BaseModel):
+    task_id: UUID
+    approved: bool
+    comment: str | None = None
+
+
+class ValidateBatchRequest(BaseModel):
+    """Принять или вернуть несколько задач одним запросом."""
+    items: list[ValidateBatchItem] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class QueueBatchItemResult(BaseModel):
+    """Итог по одной позиции пакета: ошибки позиции не откатывают остальные."""
+    task_id: UUID
+    ok: bool
+    status_code: int
+    detail: str | None = None
+    task_status: str | None = None
+    assignee_id: UUID | None = None
@@ -1,5 +1,18 @@
 """Схемы отчётов за период."""
-from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Any, Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+PERIOD_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+ReportJobKind = Literal[
+    "period_report",
+    "employee_scorecard",
+    "employee_summary",
+    "development_plan_admin",
+    "tasks_export",
+]
 
 
 class PerformerSummary(BaseModel):
@@ -78,3 +91,55 @@ class EmployeeScorecardResponse(BaseModel):
     generated_at: str
     weights: dict[str, float]
     rows: list[EmployeeScorecardRow]
+
+
+class PeriodReportParams(BaseModel):
+    period: str = Field(..., pattern=PERIOD_PATTERN)
+
+
+class DateRangeParams(BaseModel):
+    start_date: date
+    end_date: date
+
+    @model_validator(mode="after")
+    def validate_dates(self) -> "DateRangeParams":
+        if self.end_date < self.start_date:
+            raise ValueError("Дата окончания не может быть раньше даты начала")
+        return self
+
+
+class EmployeeSummaryParams(DateRangeParams):
+    user_id: UUID
+
+
+class DevelopmentPlanReportParams(BaseModel):
+    user_id: UUID | None = None
+
+
+class TasksExportParams(BaseModel):
+    period: str = Field(..., pattern=PERIOD_PATTERN)
+    assignee_id: UUID | None = None
+    category: str | None = None
+
+
+class ReportJobCreate(BaseModel):
+    kind: ReportJobKind
+    params: dict[str, Any] = Field(default_factory=dict)
+
+
+class ReportJobRead(BaseModel):
+    id: UUID
+    kind: str
+    params: dict[str, Any]
+    status: str
+    progress: int
+    attempt_count: int
+    last_error: str | None = None
+    result_etag: str | None = None
+    result_size: int | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    deduplicated: bool = False
+
+    model_config = {"from_attributes": True}
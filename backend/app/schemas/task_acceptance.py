@@ -176,6 +176,8 @@ class AcceptanceCriterionRead(BaseModel):
     return_count: int
     decision_change_count: int
     events: list[AcceptanceCriterionEventRead] = Field(default_factory=list)
+    # Курсор на более ранние события (GET .../acceptance/criteria/{id}/events).
+    events_next_cursor: str | None = None
 
     model_config = {"from_attributes": True}
 
@@ -136,3 +136,5 @@ class AdminUserAuditHistoryRead(BaseModel):
     items: list[AdminUserAuditEventRead]
     total: int
     limit: int
+    total_is_estimate: bool = False
+    next_cursor: str | None = None
@@ -1148,4 +1148,3 @@ class WorkEntityMapRead(BaseModel):
     range_end: datetime
     nodes: list[WorkEntityMapNode]
     edges: list[WorkEntityMapEdge]
-    generated_at: datetime
@@ -14,6 +14,7 @@ from app.models.shop import PeriodSnapshot
 from app.models.user import User
 from app.schemas.absence import AbsenceCreate, AbsenceRead, AbsenceUpdate, HolidayCreate, HolidayRead, HolidayUpdate
 from app.services.planning import working_days_between
+from app.services.reference_data import plan_holiday_dates
 
 MAX_ABSENCE_SPAN_DAYS = 366
 
@@ -92,14 +93,7 @@ async def _ensure_no_overlap(
 
 
 async def _holiday_dates_between(db: AsyncSession, start: date, end: date) -> set[date]:
-    result = await db.execute(
-        select(GlobalHoliday.holiday_date).where(
-            GlobalHoliday.affects_plan.is_(True),
-            GlobalHoliday.holiday_date >= start,
-            GlobalHoliday.holiday_date <= end,
-        )
-    )
-    return {row.holiday_date for row in result.all() if row.holiday_date.weekday() < 5}
+    return await plan_holiday_dates(db, start, end)
 
 
 async def _ensure_holiday_unique(
@@ -2,12 +2,11 @@
 from __future__ import annotations
 
 import uuid
-from collections import defaultdict
 from datetime import date, datetime, time, timedelta, timezone
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.activity import ActivityEvent
@@ -21,12 +20,12 @@ from app.schemas.activity import (
     FocusActivitySummary,
 )
 from app.services.absences import absence_dates_for_user
+from app.services.event_partitions import archived_activity_events, archived_until
+from app.services.focus_sessions import FocusStats, focus_stats_by_task, focus_stats_by_user
+from app.services.pagination import feed_total, keyset_page
 from app.services.planning import working_days_in_month
+from app.services.report_jobs import ProgressCallback, report_stage
 
-FOCUS_START_EVENTS = {"focus_start"}
-FOCUS_PAUSE_EVENTS = {"focus_pause"}
-FOCUS_AUTO_PAUSE_EVENTS = {"focus_auto_pause"}
-FOCUS_SECONDS_EVENTS = FOCUS_PAUSE_EVENTS | FOCUS_AUTO_PAUSE_EVENTS | {"focus_time_corrected"}
 PUBLIC_METADATA_KEYS = {
     "active_seconds",
     "added_seconds",
@@ -46,6 +45,8 @@ PUBLIC_METADATA_KEYS = {
     "status",
     "target_release",
 }
+# События по задачам сотрудника, совершенные другими (сводка за период).
+RELATED_EVENT_TYPES = ("task_assigned", "task_rejected", "task_verified")
 
 
 def _to_utc(value: datetime) -> datetime:
@@ -131,10 +132,10 @@ async def list_activity_events(
     end: datetime | None = None,
     event_type: str | None = None,
     limit: int = 200,
+    cursor: str | None = None,
 ) -> ActivityEventListResponse:
     limit = min(max(limit, 1), 500)
-    stmt = select(ActivityEvent).order_by(ActivityEvent.occurred_at.desc())
-    count_stmt = select(func.count(ActivityEvent.id))
+    stmt = select(ActivityEvent)
 
     filters = []
     if user_id is not None:
@@ -147,11 +148,24 @@ async def list_activity_events(
         filters.append(ActivityEvent.event_type == event_type)
     if filters:
         stmt = stmt.where(*filters)
-        count_stmt = count_stmt.where(*filters)
 
-    result = await db.execute(stmt.limit(limit))
-    events = list(result.scalars().all())
-    total = int((await db.execute(count_stmt)).scalar() or 0)
+    page = await keyset_page(
+        db,
+        stmt,
+        time_column=ActivityEvent.occurred_at,
+        id_column=ActivityEvent.id,
+        limit=limit,
+        cursor=cursor,
+        scalars=True,
+    )
+    events = page.rows
+    total, total_is_estimate = await feed_total(
+        db,
+        stmt,
+        page,
+        first_page=cursor is None,
+        table=None if filters else ActivityEvent.__tablename__,
+    )
     actor_ids = {event.actor_id for event in events}
     task_ids = {event.task_id for event in events if event.task_id}
 
@@ -165,10 +179,21 @@ async def list_activity_events(
         task_result = await db.execute(select(Task).where(Task.id.in_(task_ids)))
         tasks = {task.id: task for task in task_result.scalars().all()}
 
+    # Keyset-лента идет только по БД; выгруженные в архив месяцы помечаются.
+    archived_before = await archived_until(
+        db,
+        ActivityEvent.__tablename__,
+        _to_utc(start) if start is not None else None,
+        _to_utc(end) if end is not None else None,
+    )
+
     return ActivityEventListResponse(
         items=[_event_to_read(event, actors.get(event.actor_id), tasks.get(event.task_id)) for event in events],
         total=total,
         limit=limit,
+        total_is_estimate=total_is_estimate,
+        next_cursor=page.next_cursor,
+        archived_until=archived_before,
     )
 
 
@@ -227,48 +252,21 @@ def effective_target_for_date_range(
     return target.quantize(Decimal("0.1"), rounding=ROUND_HALF_UP)
 
 
-def _metadata_int(event: ActivityEvent, key: str) -> int:
-    data = event.event_data or {}
-    try:
-        return int(data.get(key) or 0)
-    except (TypeError, ValueError):
-        return 0
-
-
-def _summarize_focus(events: list[ActivityEvent]) -> FocusActivitySummary:
-    starts = [event for event in events if event.event_type in FOCUS_START_EVENTS]
-    pauses = [event for event in events if event.event_type in FOCUS_PAUSE_EVENTS]
-    auto_pauses = [event for event in events if event.event_type in FOCUS_AUTO_PAUSE_EVENTS]
-    task_ids = {event.task_id for event in starts + pauses + auto_pauses if event.task_id}
-    total_seconds = sum(_metadata_int(event, "added_seconds") for event in events if event.event_type in FOCUS_SECONDS_EVENTS)
-    avg_pauses = round((len(pauses) + len(auto_pauses)) / len(task_ids), 2) if task_ids else 0.0
+def _summarize_focus(stats: FocusStats) -> FocusActivitySummary:
+    avg_pauses = round((stats.pauses + stats.auto_pauses) / stats.tasks, 2) if stats.tasks else 0.0
     return FocusActivitySummary(
-        total_focus_seconds=total_seconds,
-        total_focus_hours=round(total_seconds / 3600, 2),
-        focus_start_count=len(starts),
-        focus_pause_count=len(pauses),
-        focus_auto_pause_count=len(auto_pauses),
-        focused_tasks_count=len(task_ids),
+        total_focus_seconds=stats.seconds,
+        total_focus_hours=round(stats.seconds / 3600, 2),
+        focus_start_count=stats.starts,
+        focus_pause_count=stats.pauses,
+        focus_auto_pause_count=stats.auto_pauses,
+        focused_tasks_count=stats.tasks,
         avg_pauses_per_task=avg_pauses,
     )
 
 
-def _task_focus_counts(events: list[ActivityEvent]) -> dict[uuid.UUID, dict[str, int]]:
-    counts: dict[uuid.UUID, dict[str, int]] = defaultdict(lambda: {"focus_sessions": 0, "pause_count": 0, "auto_pause_count": 0})
-    for event in events:
-        if not event.task_id:
-            continue
-        if event.event_type in FOCUS_START_EVENTS:
-            counts[event.task_id]["focus_sessions"] += 1
-        elif event.event_type in FOCUS_PAUSE_EVENTS:
-            counts[event.task_id]["pause_count"] += 1
-        elif event.event_type in FOCUS_AUTO_PAUSE_EVENTS:
-            counts[event.task_id]["auto_pause_count"] += 1
-    return counts
-
-
-def _task_to_summary(task: Task, focus_counts: dict[uuid.UUID, dict[str, int]]) -> EmployeeSummaryTask:
-    counts = focus_counts.get(task.id, {})
+def _task_to_summary(task: Task, focus_by_task: dict[uuid.UUID, FocusStats]) -> EmployeeSummaryTask:
+    focus = focus_by_task.get(task.id) or FocusStats()
     return EmployeeSummaryTask(
         id=task.id,
         task_number=task.task_number,
@@ -281,9 +279,9 @@ def _task_to_summary(task: Task, focus_counts: dict[uuid.UUID, dict[str, int]])
         completed_at=task.completed_at,
         validated_at=task.validated_at,
         active_seconds=int(task.active_seconds or 0),
-        focus_sessions=counts.get("focus_sessions", 0),
-        pause_count=counts.get("pause_count", 0),
-        auto_pause_count=counts.get("auto_pause_count", 0),
+        focus_sessions=focus.starts,
+        pause_count=focus.pauses,
+        auto_pause_count=focus.auto_pauses,
         result_url=task.result_url,
     )
 
@@ -294,6 +292,7 @@ async def generate_employee_period_summary(
     user_id: uuid.UUID,
     start_date: date,
     end_date: date,
+    progress: ProgressCallback | None = None,
 ) -> EmployeePeriodSummary:
     start, end = date_window(start_date, end_date)
     user_result = await db.execute(select(User).where(User.id == user_id))
@@ -319,13 +318,33 @@ async def generate_employee_period_summary(
             ActivityEvent.actor_id != user_id,
             ActivityEvent.occurred_at >= start,
             ActivityEvent.occurred_at < end,
-            ActivityEvent.event_type.in_(("task_assigned", "task_rejected", "task_verified")),
+            ActivityEvent.event_type.in_(RELATED_EVENT_TYPES),
         )
         .order_by(ActivityEvent.occurred_at.desc())
     )
     related_events = list(related_events_result.scalars().all())
+
+    # Месяцы, выгруженные из activity_events в архив, дочитываются из файлов.
+    actor_events.extend(await archived_activity_events(db, start, end, actor_ids=[user_id]))
+    archived_related = [
+        event
+        for event in await archived_activity_events(db, start, end, event_types=RELATED_EVENT_TYPES)
+        if event.actor_id != user_id and event.task_id
+    ]
+    if archived_related:
+        own_result = await db.execute(
+            select(Task.id).where(
+                Task.id.in_({event.task_id for event in archived_related}),
+                Task.assignee_id == user_id,
+            )
+        )
+        own_task_ids = set(own_result.scalars().all())
+        related_events.extend(event for event in archived_related if event.task_id in own_task_ids)
     events = sorted(actor_events + related_events, key=lambda event: event.occurred_at, reverse=True)
-    focus_counts = _task_focus_counts(events)
+    await report_stage(progress, 30)
+    focus_by_task = await focus_stats_by_task(db, user_id, start, end)
+    focus = (await focus_stats_by_user(db, [user_id], start, end)).get(user_id) or FocusStats()
+    await report_stage(progress, 45)
 
     completed_result = await db.execute(
         select(Task).where(
@@ -353,6 +372,7 @@ async def generate_employee_period_summary(
         ).order_by(Task.completed_at.desc().nullslast(), Task.created_at.desc())
     )
     review_tasks = list(review_result.scalars().all())
+    await report_stage(progress, 65)
 
     rejection_events = [event for event in events if event.event_type == "task_rejected" and event.task_id]
     rejected_task_ids = list(dict.fromkeys(event.task_id for event in rejection_events if event.task_id))
@@ -395,10 +415,10 @@ async def generate_employee_period_summary(
         review_tasks_count=len(review_tasks),
         rejected_tasks_count=len(rejection_events),
         absence_working_days=len(absence_dates),
-        focus=_summarize_focus(events),
-        completed_tasks=[_task_to_summary(task, focus_counts) for task in completed_tasks],
-        in_progress_tasks=[_task_to_summary(task, focus_counts) for task in in_progress_tasks],
-        review_tasks=[_task_to_summary(task, focus_counts) for task in review_tasks],
-        rejected_tasks=[_task_to_summary(task, focus_counts) for task in rejected_tasks],
+        focus=_summarize_focus(focus),
+        completed_tasks=[_task_to_summary(task, focus_by_task) for task in completed_tasks],
+        in_progress_tasks=[_task_to_summary(task, focus_by_task) for task in in_progress_tasks],
+        review_tasks=[_task_to_summary(task, focus_by_task) for task in review_tasks],
+        rejected_tasks=[_task_to_summary(task, focus_by_task) for task in rejected_tasks],
         recent_activity=recent_activity,
     )
@@ -1,18 +1,33 @@
 """Админка: закрытие периода (rollover), история периодов."""
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import delete, func, select
+from sqlalchemy import DateTime, Integer, Numeric, String, bindparam, cast, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.metrics import PERIOD_ROLLOVER_SECONDS, PERIOD_ROLLOVER_USERS, PERIOD_ROLLOVERS
 from app.models.shop import PeriodClosure, PeriodSnapshot
 from app.models.task import Task, TaskStatus
 from app.models.transaction import QTransaction, WalletType
 from app.models.user import User, UserRole
 from app.services.absences import absence_dates_by_user
 from app.services.planning import effective_plan_for_user
+from app.services.realtime import TOPIC_DASHBOARD, publish_after_commit
+
+logger = logging.getLogger("dpms.admin.rollover")
+
+Q_STEP = Decimal("0.1")
+# (stage, done, total) — этапы закрытия периода для вызывающего кода.
+RolloverProgress = Callable[[str, int, int], Awaitable[None]]
 
 
 def _round_q(value: float) -> float:
@@ -50,20 +65,45 @@ async def _ensure_admin(db: AsyncSession, admin_id: UUID) -> User:
     return admin
 
 
-async def rollover_period(db: AsyncSession, admin_id: UUID, period: str | None = None, mode: str = "manual") -> dict:
-    """
-    Смена месяца. Только для admin.
-    Закрывается выбранный период: создаются снимки, базовый план списывается из main.
-    Баллы сверх базового плана и Karma переносятся в следующий период.
-    """
-    await _ensure_admin(db, admin_id)
-    now = datetime.now(timezone.utc)
-    period = period or _previous_period(now)
+@dataclass(frozen=True)
+class RolloverRow:
+    """Итог закрытия периода для одного сотрудника (одинаков для preview и закрытия)."""
+    user_id: UUID
+    full_name: str
+    league: str
+    mpw: Decimal
+    earned_main: float
+    earned_karma: float
+    tasks_completed: int
+    rollover_burn: float
+    carry_over: float
+
+
+async def _report_progress(progress: RolloverProgress | None, stage: str, done: int, total: int) -> None:
+    logger.info("rollover_stage=%s done=%d total=%d", stage, done, total)
+    if progress is not None:
+        await progress(stage, done, total)
+
+
+def _unnest(**columns: tuple[list, Any]):
+    """unnest(CAST(:a AS t[]), ...) AS d(a, ...) — набор строк одним параметром на колонку."""
+    return (
+        func.unnest(
+            *(
+                cast(bindparam(name, values, type_=ARRAY(type_)), ARRAY(type_))
+                for name, (values, type_) in columns.items()
+            )
+        )
+        .table_valued(*columns)
+        .render_derived(name="d")
+    )
+
+
+async def _check_period_open(db: AsyncSession, period: str, now: datetime) -> tuple[datetime, datetime, PeriodClosure | None]:
     month_start, month_end = _period_bounds(period)
     current_month_start = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
     if month_start > current_month_start:
         raise HTTPException(status_code=400, detail="Нельзя закрыть будущий период")
-    mode = mode if mode in {"manual", "auto"} else "manual"
 
     closure_result = await db.execute(select(PeriodClosure).where(PeriodClosure.period == period))
     closure = closure_result.scalar_one_or_none()
@@ -72,71 +112,190 @@ async def rollover_period(db: AsyncSession, admin_id: UUID, period: str | None =
     snapshots_exists = await db.execute(select(PeriodSnapshot.id).where(PeriodSnapshot.period == period).limit(1))
     if snapshots_exists.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Период уже закрыт")
+    return month_start, month_end, closure
+
+
+async def _rollover_rows(
+    db: AsyncSession,
+    period: str,
+    month_start: datetime,
+    month_end: datetime,
+    *,
+    lock: bool,
+    progress: RolloverProgress | None = None,
+) -> list[RolloverRow]:
+    """
+    Снимки и списания по всем активным сотрудникам: три запроса вместо
+    запроса на сотрудника. При lock=True строки users блокируются в порядке
+    id до конца транзакции — кошельки не меняются между снимком и списанием.
+    """
+    users_stmt = select(User).where(User.is_active.is_(True)).order_by(User.id)
+    if lock:
+        users_stmt = users_stmt.with_for_update().execution_options(populate_existing=True)
+    users = list((await db.execute(users_stmt)).scalars().all())
+    await _report_progress(progress, "users_loaded", len(users), len(users))
 
-    users_result = await db.execute(
-        select(User).where(User.is_active.is_(True))
-    )
-    users = list(users_result.scalars().all())
     period_end_date = (month_end - timedelta(days=1)).date()
     absence_map = await absence_dates_by_user(db, [user.id for user in users], month_start.date(), period_end_date)
-    total_main_reset = 0.0
-    total_karma_burned = 0.0
+    tasks_completed = dict(
+        (
+            await db.execute(
+                select(Task.assignee_id, func.count(Task.id))
+                .where(
+                    Task.status == TaskStatus.done,
+                    Task.validated_at.is_not(None),
+                    Task.validated_at >= month_start,
+                    Task.validated_at < month_end,
+                    Task.assignee_id.is_not(None),
+                )
+                .group_by(Task.assignee_id)
+            )
+        ).all()
+    )
 
+    rows: list[RolloverRow] = []
     for user in users:
         earned_main = _round_q(float(user.wallet_main))
         earned_karma = _round_q(float(user.wallet_karma))
-
-        tasks_count_result = await db.execute(
-            select(func.count(Task.id)).where(
-                Task.assignee_id == user.id,
-                Task.status == TaskStatus.done,
-                Task.validated_at.is_not(None),
-                Task.validated_at >= month_start,
-                Task.validated_at < month_end,
-            )
-        )
-        tasks_completed = int(tasks_count_result.scalar() or 0)
-
         period_plan = effective_plan_for_user(user, month_start, absence_map.get(user.id, set()))
-
-        db.add(
-            PeriodSnapshot(
+        effective_target = _round_q(float(period_plan.effective_target or 0))
+        rollover_burn = min(earned_main, effective_target) if effective_target > 0 else 0.0
+        carry_over = _round_q(max(0.0, earned_main - rollover_burn))
+        rows.append(
+            RolloverRow(
                 user_id=user.id,
-                period=period,
-                mpw=period_plan.effective_target,
-                earned_main=Decimal(str(earned_main)),
-                earned_karma=Decimal(str(earned_karma)),
-                tasks_completed=tasks_completed,
+                full_name=user.full_name,
                 league=user.league.value,
+                mpw=Decimal(period_plan.effective_target).quantize(Q_STEP, rounding=ROUND_HALF_UP),
+                earned_main=earned_main,
+                earned_karma=earned_karma,
+                tasks_completed=int(tasks_completed.get(user.id, 0)),
+                rollover_burn=rollover_burn if rollover_burn > 0 else 0.0,
+                carry_over=carry_over if rollover_burn > 0 else earned_main,
             )
         )
+    await _report_progress(progress, "plans_computed", len(rows), len(users))
+    return rows
 
-        effective_target = _round_q(float(period_plan.effective_target or 0))
-        rollover_burn = min(earned_main, effective_target) if effective_target > 0 else 0.0
-        carry_over = _round_q(max(0.0, earned_main - rollover_burn))
 
-        if rollover_burn > 0:
-            user.wallet_main = Decimal(str(carry_over))
-            db.add(
-                QTransaction(
-                    user_id=user.id,
-                    amount=Decimal(str(-rollover_burn)),
-                    wallet_type=WalletType.main,
-                    reason=f"Rollover {period}: закрытие базового плана",
-                )
-            )
-            total_main_reset += rollover_burn
+async def preview_rollover_period(db: AsyncSession, admin_id: UUID, period: str | None = None) -> dict:
+    """Dry-run закрытия: те же снимки и списания, что запишет rollover_period, без записи."""
+    await _ensure_admin(db, admin_id)
+    now = datetime.now(timezone.utc)
+    period = period or _previous_period(now)
+    month_start, month_end, _ = await _check_period_open(db, period, now)
+    rows = await _rollover_rows(db, period, month_start, month_end, lock=False)
+    return {
+        "period": period,
+        "users_processed": len(rows),
+        "total_main_reset": _round_q(sum(row.rollover_burn for row in rows)),
+        "total_karma_burned": 0.0,
+        "rows": [asdict(row) for row in rows],
+    }
 
-    from app.services.notifications import create_notification
-    for user in users:
-        await create_notification(
-            db,
-            user.id,
-            "rollover",
-            "Период закрыт",
-            message=f"Период {period} завершён. Базовый план закрыт, сверхплан и Karma перенесены.",
-            link="/profile",
+
+async def rollover_period(
+    db: AsyncSession,
+    admin_id: UUID,
+    period: str | None = None,
+    mode: str = "manual",
+    *,
+    progress: RolloverProgress | None = None,
+) -> dict:
+    """
+    Смена месяца. Только для admin.
+    Закрывается выбранный период: создаются снимки, базовый план списывается из main.
+    Баллы сверх базового плана и Karma переносятся в следующий период.
+
+    Set-based: снимки — один INSERT … SELECT FROM unnest, списание — один
+    UPDATE … FROM unnest, журнал — один INSERT … SELECT, уведомления — одна
+    пакетная вставка. Блокировки users держатся только на эти запросы.
+    Исход и длительность попадают в /metrics (dpms_period_rollover*).
+    """
+    mode = mode if mode in {"manual", "auto"} else "manual"
+    started = time.perf_counter()
+    try:
+        result = await _close_period(db, admin_id, period, mode, progress=progress)
+    except HTTPException:
+        PERIOD_ROLLOVERS.inc(mode, "rejected")
+        raise
+    except Exception:
+        PERIOD_ROLLOVERS.inc(mode, "failed")
+        raise
+    PERIOD_ROLLOVERS.inc(mode, "closed")
+    PERIOD_ROLLOVER_USERS.inc(mode, amount=result["users_processed"])
+    PERIOD_ROLLOVER_SECONDS.observe(time.perf_counter() - started, mode)
+    return result
+
+
+async def _close_period(
+    db: AsyncSession,
+    admin_id: UUID,
+    period: str | None,
+    mode: str,
+    *,
+    progress: RolloverProgress | None,
+) -> dict:
+    await _ensure_admin(db, admin_id)
+    now = datetime.now(timezone.utc)
+    period = period or _previous_period(now)
+    month_start, month_end, closure = await _check_period_open(db, period, now)
+
+    rows = await _rollover_rows(db, period, month_start, month_end, lock=True, progress=progress)
+    total = len(rows)
+
+    if rows:
+        snapshot_rows = _unnest(
+            user_id=([row.user_id for row in rows], PG_UUID(as_uuid=True)),
+            mpw=([row.mpw for row in rows], Numeric(10, 1)),
+            earned_main=([Decimal(str(row.earned_main)) for row in rows], Numeric(10, 1)),
+            earned_karma=([Decimal(str(row.earned_karma)) for row in rows], Numeric(10, 1)),
+            tasks_completed=([row.tasks_completed for row in rows], Integer),
+            league=([row.league for row in rows], String(1)),
+        )
+        snapshots = PeriodSnapshot.__table__
+        await db.execute(
+            insert(snapshots).from_select(
+                ["id", "user_id", "period", "mpw", "earned_main", "earned_karma", "tasks_completed", "league", "created_at"],
+                select(
+                    func.gen_random_uuid(),
+                    snapshot_rows.c.user_id,
+                    literal(period, String(7)),
+                    snapshot_rows.c.mpw,
+                    snapshot_rows.c.earned_main,
+                    snapshot_rows.c.earned_karma,
+                    snapshot_rows.c.tasks_completed,
+                    snapshot_rows.c.league,
+                    literal(now, DateTime(timezone=True)),
+                ),
+                include_defaults=False,
+            )
         )
+    await _report_progress(progress, "snapshots_written", total, total)
+
+    debited = [row for row in rows if row.rollover_burn > 0]
+    await _apply_main_adjustments(
+        db,
+        [(row.user_id, row.carry_over, -row.rollover_burn) for row in debited],
+        reason=f"Rollover {period}: закрытие базового плана",
+        now=now,
+    )
+    total_main_reset = sum(row.rollover_burn for row in debited)
+    await _report_progress(progress, "wallets_debited", len(debited), total)
+
+    from app.services.notifications import create_notifications_bulk
+
+    await create_notifications_bulk(
+        db,
+        [row.user_id for row in rows],
+        "rollover",
+        "Период закрыт",
+        message=f"Период {period} завершён. Базовый план закрыт, сверхплан и Karma перенесены.",
+        link="/profile",
+        source_key=f"rollover:{period}",
+    )
+    await _report_progress(progress, "notified", total, total)
+
     if closure:
         closure.status = "closed"
         closure.mode = mode
@@ -144,9 +303,9 @@ async def rollover_period(db: AsyncSession, admin_id: UUID, period: str | None =
         closure.cancelled_by_id = None
         closure.closed_at = now
         closure.cancelled_at = None
-        closure.users_processed = len(users)
+        closure.users_processed = total
         closure.total_main_reset = Decimal(str(_round_q(total_main_reset)))
-        closure.total_karma_burned = Decimal(str(_round_q(total_karma_burned)))
+        closure.total_karma_burned = Decimal("0")
     else:
         db.add(
             PeriodClosure(
@@ -155,20 +314,68 @@ async def rollover_period(db: AsyncSession, admin_id: UUID, period: str | None =
                 mode=mode,
                 closed_by_id=admin_id,
                 closed_at=now,
-                users_processed=len(users),
+                users_processed=total,
                 total_main_reset=Decimal(str(_round_q(total_main_reset))),
-                total_karma_burned=Decimal(str(_round_q(total_karma_burned))),
+                total_karma_burned=Decimal("0"),
             )
         )
     await db.flush()
+    publish_after_commit(db, TOPIC_DASHBOARD)
     return {
         "period": period,
-        "users_processed": len(users),
+        "users_processed": total,
         "total_main_reset": _round_q(total_main_reset),
-        "total_karma_burned": _round_q(total_karma_burned),
+        "total_karma_burned": 0.0,
     }
 
 
+async def _apply_main_adjustments(
+    db: AsyncSession,
+    adjustments: list[tuple[UUID, float, float]],
+    *,
+    reason: str,
+    now: datetime,
+) -> None:
+    """(user_id, новый wallet_main, сумма транзакции): один UPDATE и один INSERT в журнал."""
+    if not adjustments:
+        return
+    wallets = _unnest(
+        user_id=([user_id for user_id, _, _ in adjustments], PG_UUID(as_uuid=True)),
+        wallet_main=([Decimal(str(value)) for _, value, _ in adjustments], Numeric(10, 1)),
+    )
+    users = User.__table__
+    updated = await db.execute(
+        update(users)
+        .where(users.c.id == wallets.c.user_id)
+        .values(wallet_main=wallets.c.wallet_main)
+        .returning(users.c.id, users.c.wallet_main)
+    )
+    for user_id, wallet_main in updated.all():
+        loaded = db.sync_session.identity_map.get(db.sync_session.identity_key(User, user_id))
+        if loaded is not None:
+            set_committed_value(loaded, "wallet_main", wallet_main)
+
+    entries = _unnest(
+        user_id=([user_id for user_id, _, _ in adjustments], PG_UUID(as_uuid=True)),
+        amount=([Decimal(str(amount)) for _, _, amount in adjustments], Numeric(5, 1)),
+    )
+    transactions = QTransaction.__table__
+    await db.execute(
+        insert(transactions).from_select(
+            ["id", "user_id", "amount", "wallet_type", "reason", "created_at"],
+            select(
+                func.gen_random_uuid(),
+                entries.c.user_id,
+                entries.c.amount,
+                literal(WalletType.main, transactions.c.wallet_type.type),
+                literal(reason, String(500)),
+                literal(now, DateTime(timezone=True)),
+            ),
+            include_defaults=False,
+        )
+    )
+
+
 async def auto_close_previous_period(db: AsyncSession, admin_id: UUID) -> dict:
     """Закрыть предыдущий месяц в режиме auto, если он еще открыт."""
     period = _previous_period(datetime.now(timezone.utc))
@@ -192,49 +399,48 @@ async def cancel_period_closure(db: AsyncSession, admin_id: UUID, period: str) -
             QTransaction.reason.in_([rollover_reason, cancel_reason]),
         ).group_by(QTransaction.user_id)
     )
-    reversal_rows = tx_result.all()
-    users_by_id: dict[UUID, User] = {}
-    if reversal_rows:
-        users_result = await db.execute(select(User).where(User.id.in_([row[0] for row in reversal_rows])))
-        users_by_id = {user.id: user for user in users_result.scalars().all()}
-
-    restored_main = 0.0
-    for user_id, amount in reversal_rows:
-        reversal = _round_q(max(0.0, -float(amount or 0)))
-        if reversal <= 0:
-            continue
-        user = users_by_id.get(user_id)
-        if not user:
-            continue
-        user.wallet_main += Decimal(str(reversal))
-        db.add(
-            QTransaction(
-                user_id=user.id,
-                amount=Decimal(str(reversal)),
-                wallet_type=WalletType.main,
-                reason=cancel_reason,
-            )
+    reversals = {
+        user_id: _round_q(max(0.0, -float(amount or 0)))
+        for user_id, amount in tx_result.all()
+    }
+    wallets: dict[UUID, Decimal] = {}
+    if reversals:
+        users_result = await db.execute(
+            select(User.id, User.wallet_main)
+            .where(User.id.in_(list(reversals)))
+            .order_by(User.id)
+            .with_for_update()
         )
-        restored_main += reversal
+        wallets = dict(users_result.all())
 
-    await db.execute(delete(PeriodSnapshot).where(PeriodSnapshot.period == period))
+    adjustments = [
+        (user_id, _round_q(float(wallets[user_id]) + reversal), reversal)
+        for user_id, reversal in reversals.items()
+        if reversal > 0 and user_id in wallets
+    ]
     now = datetime.now(timezone.utc)
+    await _apply_main_adjustments(db, adjustments, reason=cancel_reason, now=now)
+    restored_main = sum(reversal for _, _, reversal in adjustments)
+
+    await db.execute(delete(PeriodSnapshot).where(PeriodSnapshot.period == period))
     closure.status = "cancelled"
     closure.cancelled_by_id = admin_id
     closure.cancelled_at = now
 
-    from app.services.notifications import create_notification
-    for user in users_by_id.values():
-        await create_notification(
-            db,
-            user.id,
-            "rollover",
-            "Закрытие периода отменено",
-            message=f"Закрытие периода {period} отменено. Списанные по базовому плану баллы восстановлены.",
-            link="/profile",
-        )
+    from app.services.notifications import create_notifications_bulk
+
+    await create_notifications_bulk(
+        db,
+        list(wallets),
+        "rollover",
+        "Закрытие периода отменено",
+        message=f"Закрытие периода {period} отменено. Списанные по базовому плану баллы восстановлены.",
+        link="/profile",
+        source_key=f"rollover-cancel:{period}",
+    )
 
     await db.flush()
+    publish_after_commit(db, TOPIC_DASHBOARD)
     return {
         "period": period,
         "users_processed": closure.users_processed,
@@ -7,6 +7,7 @@ from uuid import UUID
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.single_flight import single_flight
 from app.models.task import Task, TaskStatus
 from app.models.transaction import QTransaction, WalletType
 from app.models.user import User
@@ -36,6 +37,7 @@ async def _absence_map_for_users(db: AsyncSession, users: list[User], now: datet
     month_start, month_end = month_bounds_for(now)
     return await absence_dates_by_user(db, [user.id for user in users], month_start, month_end)
 
+@single_flight("analytics.capacity_gauge")
 async def get_capacity_gauge(db: AsyncSession) -> CapacityGauge:
     """
     Стакан: capacity = сумма effective target активных пользователей,
@@ -101,6 +103,7 @@ async def get_user_progress(db: AsyncSession, user_id: UUID) -> UserProgress | N
     )
 
 
+@single_flight("analytics.team_summary")
 async def get_team_summary(db: AsyncSession) -> TeamSummary:
     """Сводка по команде: earned vs effective target, in_progress_q, is_at_risk."""
     users_result = await db.execute(
@@ -351,6 +354,7 @@ async def get_run_rate(db: AsyncSession, user_id: UUID) -> RunRate | None:
     )
 
 
+@single_flight("analytics.burndown")
 async def get_burndown_data(db: AsyncSession) -> BurndownData:
     """
     Данные для графика burn-down текущего месяца.
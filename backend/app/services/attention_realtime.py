@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from typing import Any
 from uuid import UUID
@@ -39,6 +40,12 @@ class AttentionHub:
         if not connections:
             self._connections.pop(user_id, None)
 
+    def connected(self, user_ids: Iterable[UUID]) -> list[UUID]:
+        return [user_id for user_id in dict.fromkeys(user_ids) if self._connections.get(user_id)]
+
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self._connections.values())
+
     async def _send(self, connection: AttentionConnection, payload: dict[str, Any]) -> None:
         try:
             async with connection.send_lock:
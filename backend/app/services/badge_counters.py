@@ -0,0 +1,281 @@
+"""
+Счётчики бейджей пользователя одной строкой (user_badge_counters).
+
+Непрочитанные уведомления, адресные (direct) и важные (important) события
+внимания, треды с непрочитанными сообщениями. Опрос бейджей раньше стоил
+четыре COUNT(*), теперь это чтение строки по первичному ключу.
+
+Пути записи (уведомления, события внимания, треды) отмечают затронутых
+пользователей touch_badges(). Перед коммитом их строки удаляются (блокировка
+в порядке user_id, без COUNT в транзакции писателя): нет строки — счётчик
+устарел. Чтение такой строки не пишет, а считает на лету; строки заново
+пересчитывает под блокировкой фоновый воркер (python -m app.workers.badge_counters),
+он же периодически сверяет все строки с пересчетом (verify_badge_counters).
+Пересчет берет блокировку строки до COUNT, поэтому удаление параллельного
+писателя либо ждет его, либо случается после, и устаревшее значение не
+остается в строке.
+
+После коммита вкладкам с открытым сокетом внимания уходят новые значения
+({"type": "badges.changed", "badges": {...}}), посчитанные в отдельной сессии.
+Как и AttentionHub, рассылка живет в процессе воркера.
+
+Изменения мимо touch_badges (ручной SQL) чинит verify_badge_counters:
+python -m app.maintenance.badge_counters --repair или тот же воркер.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, event as sa_event, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.badge_counter import UserBadgeCounter
+from app.models.messages import MessageThreadParticipant, UserAttentionItem
+from app.models.notification import Notification
+from app.models.user import User
+from app.services.attention_realtime import attention_hub
+
+# Пользователей в одном upsert и IN: 6 параметров на строку, лимит протокола — 32767.
+BADGE_CHUNK = 1000
+
+_TOUCHED_KEY = "badge_touched"
+_PUSH_KEY = "badge_push"
+
+
+@dataclass(frozen=True)
+class BadgeCounts:
+    unread_notifications: int = 0
+    unread_direct: int = 0
+    unread_important: int = 0
+    unread_threads: int = 0
+
+
+def touch_badges(db: AsyncSession | Session, user_ids: Iterable[UUID]) -> None:
+    """Пересчитать бейджи этих пользователей при коммите текущей транзакции."""
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    session.info.setdefault(_TOUCHED_KEY, set()).update(user_ids)
+
+
+def _chunks(user_ids: list[UUID]) -> Iterable[list[UUID]]:
+    for offset in range(0, len(user_ids), BADGE_CHUNK):
+        yield user_ids[offset:offset + BADGE_CHUNK]
+
+
+def _count_statements(user_ids: list[UUID] | None):
+    """(уведомления, внимание по kind, треды) — по пользователям или по всем."""
+    notifications = select(Notification.user_id, func.count()).where(Notification.is_read.is_(False))
+    attention = select(UserAttentionItem.user_id, UserAttentionItem.kind, func.count()).where(
+        UserAttentionItem.is_read.is_(False)
+    )
+    threads = select(MessageThreadParticipant.user_id, func.count()).where(
+        MessageThreadParticipant.unread_count > 0
+    )
+    if user_ids is not None:
+        notifications = notifications.where(Notification.user_id.in_(user_ids))
+        attention = attention.where(UserAttentionItem.user_id.in_(user_ids))
+        threads = threads.where(MessageThreadParticipant.user_id.in_(user_ids))
+    return (
+        notifications.group_by(Notification.user_id),
+        attention.group_by(UserAttentionItem.user_id, UserAttentionItem.kind),
+        threads.group_by(MessageThreadParticipant.user_id),
+    )
+
+
+def _collect(notification_rows, attention_rows, thread_rows) -> dict[UUID, dict[str, int]]:
+    values: dict[UUID, dict[str, int]] = {}
+    for user_id, count in notification_rows:
+        values.setdefault(user_id, {})["unread_notifications"] = int(count)
+    for user_id, kind, count in attention_rows:
+        if kind in ("direct", "important"):
+            values.setdefault(user_id, {})[f"unread_{kind}"] = int(count)
+    for user_id, count in thread_rows:
+        values.setdefault(user_id, {})["unread_threads"] = int(count)
+    return values
+
+
+async def count_badges(db: AsyncSession, user_ids: Iterable[UUID]) -> dict[UUID, BadgeCounts]:
+    """Пересчет без записи (чтение бейджей устаревшей строки, рассылка)."""
+    counted: dict[UUID, BadgeCounts] = {}
+    for chunk in _chunks(sorted(set(user_ids), key=str)):
+        values = _collect(*[(await db.execute(statement)).all() for statement in _count_statements(chunk)])
+        counted.update({user_id: BadgeCounts(**values.get(user_id, {})) for user_id in chunk})
+    return counted
+
+
+def _invalidate(session: Session, user_ids: Iterable[UUID]) -> None:
+    """Удалить строки пользователей (заблокировав их в порядке user_id)."""
+    table = UserBadgeCounter.__table__
+    connection = session.connection()
+    for chunk in _chunks(sorted(set(user_ids), key=str)):
+        connection.execute(
+            select(table.c.user_id).where(table.c.user_id.in_(chunk)).order_by(table.c.user_id).with_for_update()
+        )
+        connection.execute(delete(table).where(table.c.user_id.in_(chunk)))
+
+
+def _refresh(session: Session, user_ids: Iterable[UUID]) -> dict[UUID, BadgeCounts]:
+    """Заблокировать строки (в порядке user_id), пересчитать и записать."""
+    table = UserBadgeCounter.__table__
+    connection = session.connection()
+    refreshed: dict[UUID, BadgeCounts] = {}
+    for chunk in _chunks(sorted(set(user_ids), key=str)):
+        now = datetime.now(timezone.utc)
+        # Upsert с DO UPDATE берет блокировку строки и для существующих, и для новых.
+        lock = insert(table).values([{"user_id": user_id, "updated_at": now} for user_id in chunk])
+        connection.execute(
+            lock.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={"updated_at": lock.excluded.updated_at},
+            )
+        )
+        counted = _collect(*(connection.execute(statement).all() for statement in _count_statements(chunk)))
+        rows = {user_id: BadgeCounts(**counted.get(user_id, {})) for user_id in chunk}
+        write = insert(table).values(
+            [{"user_id": user_id, **asdict(counts), "updated_at": now} for user_id, counts in rows.items()]
+        )
+        connection.execute(
+            write.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={name: write.excluded[name] for name in (*asdict(BadgeCounts()), "updated_at")},
+            )
+        )
+        refreshed.update(rows)
+    return refreshed
+
+
+@sa_event.listens_for(Session, "before_commit")
+def _invalidate_before_commit(session: Session) -> None:
+    if not session.info.get(_TOUCHED_KEY):
+        return
+    # Несброшенные изменения пишутся до удаления строк, под теми же блокировками.
+    session.flush()
+    user_ids = session.info.pop(_TOUCHED_KEY, None)
+    if user_ids:
+        _invalidate(session, user_ids)
+        session.info.setdefault(_PUSH_KEY, set()).update(user_ids)
+
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def _push(user_ids: list[UUID]) -> None:
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        counted = await count_badges(db, user_ids)
+    await asyncio.gather(
+        *(
+            attention_hub.send_to_user(user_id, {"type": "badges.changed", "badges": asdict(counts)})
+            for user_id, counts in counted.items()
+        )
+    )
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _push_after_commit(session: Session) -> None:
+    user_ids = session.info.pop(_PUSH_KEY, None)
+    if not user_ids:
+        return
+    # Считать стоит только для тех, у кого открыта вкладка в этом процессе.
+    connected = attention_hub.connected(user_ids)
+    if not connected:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # синхронный контекст (миграции, скрипты) — сокетов нет
+    task = loop.create_task(_push(connected))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_TOUCHED_KEY, None)
+    session.info.pop(_PUSH_KEY, None)
+
+
+async def get_badge_counts(db: AsyncSession, user_id: UUID) -> BadgeCounts:
+    """Бейджи пользователя — чтение строки; строки нет (изменились, новый пользователь) — счет без записи."""
+    row = (
+        await db.execute(
+            select(
+                UserBadgeCounter.unread_notifications,
+                UserBadgeCounter.unread_direct,
+                UserBadgeCounter.unread_important,
+                UserBadgeCounter.unread_threads,
+            ).where(UserBadgeCounter.user_id == user_id)
+        )
+    ).one_or_none()
+    if row is not None:
+        return BadgeCounts(*row)
+    return (await count_badges(db, [user_id]))[user_id]
+
+
+async def recount_missing_badge_counters(db: AsyncSession, *, limit: int = BADGE_CHUNK) -> int:
+    """Пересчитать и записать строки пользователей, у которых их нет (после записи); сколько записано."""
+    user_ids = list(
+        (
+            await db.execute(
+                select(User.id)
+                .outerjoin(UserBadgeCounter, UserBadgeCounter.user_id == User.id)
+                .where(UserBadgeCounter.user_id.is_(None))
+                .limit(limit)
+            )
+        ).scalars()
+    )
+    if user_ids:
+        await db.run_sync(_refresh, user_ids)
+    return len(user_ids)
+
+
+@dataclass
+class BadgeCounterDrift:
+    user_id: UUID
+    field: str
+    stored: int
+    expected: int
+
+
+async def verify_badge_counters(
+    db: AsyncSession,
+    *,
+    repair: bool = False,
+) -> list[BadgeCounterDrift]:
+    """
+    Сравнить записанные счётчики с пересчетом; при repair — пересчитать расходящиеся под блокировкой.
+
+    Отсутствующие строки — не расхождение: их дописывает recount_missing_badge_counters.
+    """
+    expected = _collect(*[(await db.execute(statement)).all() for statement in _count_statements(None)])
+    stored = {
+        row.user_id: row
+        for row in (
+            await db.execute(
+                select(
+                    User.id.label("user_id"),
+                    UserBadgeCounter.unread_notifications,
+                    UserBadgeCounter.unread_direct,
+                    UserBadgeCounter.unread_important,
+                    UserBadgeCounter.unread_threads,
+                ).join(UserBadgeCounter, UserBadgeCounter.user_id == User.id)
+            )
+        ).all()
+    }
+    drifts: list[BadgeCounterDrift] = []
+    for user_id, row in stored.items():
+        counts = BadgeCounts(**expected.get(user_id, {}))
+        for field, value in asdict(counts).items():
+            current = getattr(row, field)
+            if current != value:
+                drifts.append(BadgeCounterDrift(user_id, field, current, value))
+    if repair and drifts:
+        # Пересчет, а не запись expected: счётчик могли изменить после чтения выше.
+        await db.run_sync(_refresh, {drift.user_id for drift in drifts})
+    return drifts
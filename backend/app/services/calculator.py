@@ -3,10 +3,9 @@ from datetime import datetime, timezone
 from decimal import Decimal
 
 from fastapi import HTTPException
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.catalog import CatalogItem, CatalogCategory, Complexity
+from app.models.catalog import CatalogCategory, Complexity
 from app.models.task import Task, TaskStatus, TaskType, TaskPriority
 from app.models.user import League, User
 from app.schemas.calculator import (
@@ -15,6 +14,7 @@ from app.schemas.calculator import (
     EstimateBreakdownItem,
     CreateTaskFromCalcRequest,
 )
+from app.services.reference_data import active_catalog_by_id
 from app.services.task_policy import ensure_critical_priority_allowed, resolve_task_estimator_id
 from app.services.task_acceptance import initialize_acceptance_plan
 
@@ -25,10 +25,14 @@ _COMPLEXITY_ORDER = {Complexity.S: 0, Complexity.M: 1, Complexity.L: 2, Complexi
 async def calculate_estimate(
     db: AsyncSession,
     request: EstimateRequest,
+    *,
+    revalidate: bool = False,
 ) -> EstimateResponse:
     """
         Рассчитать стоимость задачи по выбранным позициям каталога.
         total_q = round(Σ(subtotal_q), 1).
+        Каталог — из кеша справочников; revalidate=True сверяет его версию
+        с базой (расчет, который записывается в задачу).
     """
     if not request.items:
         return EstimateResponse(
@@ -37,14 +41,7 @@ async def calculate_estimate(
             breakdown=[],
         )
 
-    catalog_ids = [item.catalog_id for item in request.items]
-    result = await db.execute(
-        select(CatalogItem).where(
-            CatalogItem.id.in_(catalog_ids),
-            CatalogItem.is_active.is_(True),
-        )
-    )
-    catalog_by_id = {row.id: row for row in result.scalars().all()}
+    catalog_by_id = await active_catalog_by_id(db, revalidate=revalidate)
     missing_ids = [str(item.catalog_id) for item in request.items if item.catalog_id not in catalog_by_id]
     if missing_ids:
         raise HTTPException(
@@ -112,6 +109,7 @@ async def create_task_from_calc(
     estimate = await calculate_estimate(
         db,
         EstimateRequest(items=request.items),
+        revalidate=True,
     )
 
     categories = {b.category for b in estimate.breakdown}
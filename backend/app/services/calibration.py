@@ -2,24 +2,83 @@
 Калибровочный отчёт: сравнение оценки (estimated_q) и реального времени выполнения.
 На основе estimation_details.breakdown и завершённых задач.
 Точность тимлидов: по задачам, где validator_id = teamlead.
+
+Все суммы, распределения и популярность операций считаются агрегатами в SQL;
+в Python приходят только сгруппированные строки. Отчёты за закрытые месяцы
+кэшируются в процессе и перестраиваются, только если задачи месяца менялись;
+имена исполнителей и оценщиков кэш хранит как id и подставляет при чтении.
 """
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Float, Text, and_, case, cast, column, false, func, literal, or_, select, true
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.config import settings
 from app.models.catalog import CatalogItem
 from app.models.task import Task, TaskStatus
 from app.models.user import User, UserRole
-from app.schemas.calibration import CalibrationItem, CalibrationReport, TeamleadAccuracy
+from app.schemas.calibration import (
+    CalibrationItem,
+    CalibrationReport,
+    CalibrationReportNew,
+    DeviationDistribution,
+    EstimatorCalibration,
+    TaskCalibration,
+    TeamleadAccuracy,
+    WidgetPopularityItem,
+)
+
+_ESTIMATED = cast(Task.estimated_q, Float)
+# Wall-clock часы между стартом и сдачей
+_WALL_HOURS = cast(func.extract("epoch", Task.completed_at - Task.started_at), Float) / 3600.0
+# Продуктивное время: сначала active_seconds, для старых задач — wall-clock
+_PRODUCTIVE_HOURS = case(
+    (Task.active_seconds > 0, cast(Task.active_seconds, Float) / 3600.0),
+    else_=_WALL_HOURS,
+)
+# round(double precision) в Postgres округляет к четному, как round() в Python
+_DEVIATION_PCT = case(
+    (_ESTIMATED > 0, func.round((_PRODUCTIVE_HOURS - _ESTIMATED) / _ESTIMATED * 100)),
+    else_=0,
+)
+_BREAKDOWN = Task.estimation_details["breakdown"]
+_BREAKDOWN_ARRAY = case(
+    (func.jsonb_typeof(_BREAKDOWN) == "array", _BREAKDOWN),
+    else_=cast(literal("[]"), JSONB),
+)
+_HAS_BREAKDOWN = and_(
+    func.jsonb_typeof(Task.estimation_details) == "object",
+    func.jsonb_array_length(_BREAKDOWN_ARRAY) > 0,
+)
+
 
+@dataclass(frozen=True)
+class _NameRefs:
+    """Чьи имена стоят в отчёте: (assignee_id, estimator_id) по задачам, estimator_id по оценщикам."""
 
-def _task_actual_hours(task: Task) -> float | None:
-    """Фактическое время выполнения задачи в часах."""
-    if not task.started_at or not task.completed_at:
-        return None
-    delta = task.completed_at - task.started_at
-    return delta.total_seconds() / 3600.0
+    tasks: tuple[tuple[UUID | None, UUID | None], ...]
+    estimators: tuple[UUID, ...]
+
+
+_closed_month_cache: OrderedDict[str, tuple[tuple, CalibrationReportNew, _NameRefs]] = OrderedDict()
+
+
+def _breakdown_items():
+    """LATERAL jsonb_array_elements(breakdown) — одна строка на позицию оценки."""
+    return (
+        func.jsonb_array_elements(_BREAKDOWN_ARRAY)
+        .table_valued(column("value", JSONB))
+        .lateral("item")
+    )
+
+
+def _month_start(now: datetime) -> datetime:
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
 
 async def get_calibration_report(
@@ -42,7 +101,7 @@ async def get_calibration_report(
             else:
                 month_end = now.replace(year=year, month=month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
         except (ValueError, IndexError):
-            month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            month_start = _month_start(now)
             month_end = now
             period = now.strftime("%Y-%m")
     else:
@@ -50,57 +109,60 @@ async def get_calibration_report(
         month_end = None
         period = "all"
 
-    stmt = select(Task).where(
+    filters = [
         Task.status == TaskStatus.done,
         Task.estimation_details.is_not(None),
         Task.started_at.is_not(None),
         Task.completed_at.is_not(None),
-    )
+    ]
     if month_start is not None:
-        stmt = stmt.where(Task.completed_at >= month_start, Task.completed_at < month_end)
-    result = await db.execute(stmt)
-    tasks = list(result.scalars().all())
+        filters += [Task.completed_at >= month_start, Task.completed_at < month_end]
 
-    catalog_result = await db.execute(select(CatalogItem))
-    catalog_items = {str(item.id): item for item in catalog_result.scalars().all()}
+    tasks_analyzed = (
+        await db.execute(select(func.count(Task.id)).where(*filters, _HAS_BREAKDOWN))
+    ).scalar_one()
 
-    # По каждому catalog_id собираем: список (estimated_share, actual_hours_share)
-    item_data: dict[str, list[tuple[float, float]]] = {}
+    # По каждому catalog_id: число позиций, сумма оценок, сумма доли фактических часов
+    item = _breakdown_items()
+    subtotal = cast(item.c.value["subtotal_q"].astext, Float)
+    rows = (
+        select(
+            item.c.value["catalog_id"].astext.label("catalog_id"),
+            subtotal.label("subtotal"),
+            (_WALL_HOURS * subtotal / _ESTIMATED).label("hours_share"),
+        )
+        .select_from(Task)
+        .join(item, true())
+        .where(
+            *filters,
+            _ESTIMATED > 0,
+            func.jsonb_typeof(item.c.value) == "object",
+            item.c.value["catalog_id"].astext.is_not(None),
+            item.c.value["subtotal_q"].astext.is_not(None),
+        )
+        .subquery()
+    )
+    grouped = await db.execute(
+        select(
+            rows.c.catalog_id,
+            func.count(),
+            func.sum(rows.c.subtotal),
+            func.sum(rows.c.hours_share),
+        ).group_by(rows.c.catalog_id)
+    )
+    item_data = {
+        catalog_id: (int(count), float(estimated), float(hours))
+        for catalog_id, count, estimated, hours in grouped.all()
+    }
 
-    tasks_analyzed = 0
-    for task in tasks:
-        details = task.estimation_details or {}
-        breakdown = details.get("breakdown") or []
-        if not breakdown:
-            continue
-        actual_hours = _task_actual_hours(task)
-        if actual_hours is None:
-            continue
-        tasks_analyzed += 1
-        estimated_total = float(task.estimated_q)
-        if estimated_total <= 0:
-            continue
-        for row in breakdown:
-            if not isinstance(row, dict):
-                continue
-            cid = row.get("catalog_id")
-            subtotal = row.get("subtotal_q")
-            if cid is None or subtotal is None:
-                continue
-            cid_str = str(cid)
-            share = float(subtotal) / estimated_total
-            hours_share = actual_hours * share
-            if cid_str not in item_data:
-                item_data[cid_str] = []
-            item_data[cid_str].append((float(subtotal), hours_share))
+    catalog_result = await db.execute(select(CatalogItem))
+    catalog_items = {str(item.id): item for item in catalog_result.scalars().all()}
 
     items_out: list[CalibrationItem] = []
     total_ok = 0
-    total_with_deviation = 0
 
     for catalog_id, cat_item in catalog_items.items():
-        rows = item_data.get(catalog_id, [])
-        tasks_count = len(rows)
+        tasks_count, sum_estimated, sum_hours = item_data.get(catalog_id, (0, 0.0, 0.0))
         if tasks_count == 0:
             items_out.append(
                 CalibrationItem(
@@ -117,8 +179,8 @@ async def get_calibration_report(
                 )
             )
             continue
-        avg_estimated = sum(r[0] for r in rows) / tasks_count
-        avg_actual = sum(r[1] for r in rows) / tasks_count
+        avg_estimated = sum_estimated / tasks_count
+        avg_actual = sum_hours / tasks_count
         base_q = float(cat_item.base_cost_q)
         if base_q > 0:
             deviation = (avg_actual - base_q) / base_q * 100
@@ -129,10 +191,8 @@ async def get_calibration_report(
             total_ok += 1
         elif deviation < 0:
             recommendation = "Завышена"
-            total_with_deviation += 1
         else:
             recommendation = "Занижена"
-            total_with_deviation += 1
         items_out.append(
             CalibrationItem(
                 catalog_item_id=catalog_id,
@@ -161,6 +221,290 @@ async def get_calibration_report(
     )
 
 
+def _calibration_window(period: str, now: datetime) -> tuple[datetime | None, datetime | None]:
+    """Окно отчёта: "all" — без фильтра, "YYYY-MM" — месяц, иначе — текущий месяц по сейчас."""
+    if period and period.lower() == "all":
+        return None, None
+    if period:
+        try:
+            year, month = int(period[:4]), int(period[5:7])
+            start = datetime(year, month, 1, tzinfo=timezone.utc)
+            end = (
+                datetime(year, month + 1, 1, tzinfo=timezone.utc)
+                if month < 12
+                else datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+            )
+            return start, end
+        except (ValueError, IndexError):
+            pass
+    return _month_start(now), now
+
+
+async def _month_validator(db: AsyncSession, start: datetime, end: datetime) -> tuple:
+    """Дешевый отпечаток задач месяца: меняется при любом изменении или удалении."""
+    row = (
+        await db.execute(
+            select(func.count(Task.id), func.max(Task.updated_at)).where(
+                or_(
+                    and_(
+                        Task.status == TaskStatus.done,
+                        Task.completed_at >= start,
+                        Task.completed_at < end,
+                    ),
+                    and_(Task.created_at >= start, Task.created_at < end),
+                )
+            )
+        )
+    ).one()
+    return tuple(row)
+
+
+async def get_calibration_overview(db: AsyncSession, period: str = "") -> CalibrationReportNew:
+    """
+    Калибровочный отчёт для дашборда:
+    1. Отклонение по задачам (estimated_q vs actual_hours)
+    2. Точность оценщиков
+    3. Популярность операций каталога
+    Закрытый месяц отдаётся из кэша, пока не поменялись его задачи.
+    """
+    now = datetime.now(timezone.utc)
+    start, end = _calibration_window(period, now)
+    period_display = "all" if (period and period.lower() == "all") else (period or now.strftime("%Y-%m"))
+
+    cache_key = None
+    validator = None
+    if start is not None and end is not None and end <= _month_start(now):
+        cache_key = start.strftime("%Y-%m")
+        validator = await _month_validator(db, start, end)
+        cached = _closed_month_cache.get(cache_key)
+        if cached is not None and cached[0] == validator:
+            _closed_month_cache.move_to_end(cache_key)
+            report = await _with_current_names(db, cached[1], cached[2])
+            return report.model_copy(update={"period": period_display})
+
+    report, refs = await _build_calibration_overview(db, start, end, period_display)
+
+    if cache_key is not None and settings.CALIBRATION_CLOSED_MONTH_CACHE_ENTRIES > 0:
+        _closed_month_cache[cache_key] = (validator, report, refs)
+        _closed_month_cache.move_to_end(cache_key)
+        while len(_closed_month_cache) > settings.CALIBRATION_CLOSED_MONTH_CACHE_ENTRIES:
+            _closed_month_cache.popitem(last=False)
+    return report
+
+
+async def _with_current_names(
+    db: AsyncSession,
+    report: CalibrationReportNew,
+    refs: _NameRefs,
+) -> CalibrationReportNew:
+    """Подставить текущие имена: пользователя могли переименовать после расчета месяца."""
+    user_ids = {user_id for pair in refs.tasks for user_id in pair if user_id is not None}
+    user_ids.update(refs.estimators)
+    if not user_ids:
+        return report
+    names = dict((await db.execute(select(User.id, User.full_name).where(User.id.in_(user_ids)))).all())
+    return report.model_copy(
+        update={
+            "task_calibrations": [
+                item.model_copy(
+                    update={
+                        "assignee_name": names.get(assignee_id) or "—",
+                        "estimator_name": names.get(estimator_id) or "—",
+                    }
+                )
+                for item, (assignee_id, estimator_id) in zip(report.task_calibrations, refs.tasks)
+            ],
+            "estimator_calibrations": [
+                item.model_copy(update={"estimator_name": names.get(estimator_id) or "—"})
+                for item, estimator_id in zip(report.estimator_calibrations, refs.estimators)
+            ],
+        }
+    )
+
+
+async def _build_calibration_overview(
+    db: AsyncSession,
+    start: datetime | None,
+    end: datetime | None,
+    period_display: str,
+) -> tuple[CalibrationReportNew, _NameRefs]:
+    done_filters = [
+        Task.status == TaskStatus.done,
+        Task.started_at.isnot(None),
+        Task.completed_at.isnot(None),
+    ]
+    if start is not None and end is not None:
+        done_filters += [Task.completed_at >= start, Task.completed_at < end]
+
+    # --- 1. Калибровка по задачам ---
+    assignee = aliased(User)
+    estimator = aliased(User)
+    task_rows = await db.execute(
+        select(
+            Task.id,
+            Task.title,
+            Task.task_type,
+            Task.complexity,
+            Task.estimated_q,
+            Task.tags,
+            _PRODUCTIVE_HOURS.label("actual_hours"),
+            _DEVIATION_PCT.label("deviation_pct"),
+            Task.assignee_id,
+            Task.estimator_id,
+            assignee.full_name.label("assignee_name"),
+            estimator.full_name.label("estimator_name"),
+        )
+        .outerjoin(assignee, assignee.id == Task.assignee_id)
+        .outerjoin(estimator, estimator.id == Task.estimator_id)
+        .where(*done_filters)
+        .order_by(Task.completed_at.desc())
+    )
+    task_rows = task_rows.all()
+    task_refs = tuple((row.assignee_id, row.estimator_id) for row in task_rows)
+    task_calibrations = [
+        TaskCalibration(
+            task_id=str(row.id),
+            title=row.title,
+            task_type=row.task_type.value,
+            complexity=row.complexity.value,
+            estimated_q=float(row.estimated_q),
+            actual_hours=round(row.actual_hours, 1),
+            deviation_pct=int(row.deviation_pct),
+            assignee_name=row.assignee_name or "—",
+            estimator_name=row.estimator_name or "—",
+            tags=row.tags or [],
+        )
+        for row in task_rows
+    ]
+
+    deviation = _DEVIATION_PCT
+    summary = (
+        await db.execute(
+            select(
+                func.count(Task.id),
+                func.coalesce(func.sum(deviation), 0),
+                func.count(Task.id).filter(func.abs(deviation) <= 15),
+                func.percentile_cont(0.25).within_group(deviation),
+                func.percentile_cont(0.5).within_group(deviation),
+                func.percentile_cont(0.75).within_group(deviation),
+                func.percentile_cont(0.9).within_group(deviation),
+            ).where(*done_filters)
+        )
+    ).one()
+    total_tasks, deviation_sum, accurate_count, p25, p50, p75, p90 = summary
+
+    # --- 2. Калибровка по оценщикам ---
+    estimator_rows = await db.execute(
+        select(
+            User.id,
+            User.full_name,
+            func.count(Task.id),
+            func.sum(deviation),
+            func.count(Task.id).filter(deviation < -10),
+            func.count(Task.id).filter(deviation > 10),
+            func.percentile_cont(0.5).within_group(deviation),
+        )
+        .join(User, User.id == Task.estimator_id)
+        .where(*done_filters)
+        .group_by(User.id, User.full_name)
+        .order_by(func.max(Task.completed_at).desc())
+    )
+    estimator_ids: list[UUID] = []
+    estimator_calibrations = []
+    for estimator_id, name, tasks_count, total_deviation, overestimates, underestimates, median in estimator_rows.all():
+        avg_dev = round(float(total_deviation) / tasks_count, 0) if tasks_count > 0 else 0
+        accuracy = max(0, 100 - abs(avg_dev))
+        bias = "завышает" if avg_dev < -10 else "занижает" if avg_dev > 10 else "точно"
+        estimator_ids.append(estimator_id)
+        estimator_calibrations.append(
+            EstimatorCalibration(
+                estimator_name=name,
+                tasks_count=tasks_count,
+                avg_deviation_pct=int(avg_dev),
+                accuracy_pct=int(accuracy),
+                bias=bias,
+                overestimates=overestimates,
+                underestimates=underestimates,
+                median_deviation_pct=round(median) if median is not None else None,
+            )
+        )
+
+    # --- 3. Популярность операций каталога ---
+    created_filters = [Task.estimation_details.isnot(None)]
+    if start is not None and end is not None:
+        created_filters += [Task.created_at >= start, Task.created_at < end]
+    total_tasks_with_breakdown = (
+        await db.execute(select(func.count(Task.id)).where(*created_filters, _HAS_BREAKDOWN))
+    ).scalar_one()
+
+    item = _breakdown_items()
+    usage = (
+        select(
+            Task.id.label("task_id"),
+            func.coalesce(
+                func.nullif(item.c.value["name"].astext, ""),
+                CatalogItem.name,
+                "Unknown",
+            ).label("name"),
+        )
+        .select_from(Task)
+        .join(item, true())
+        .outerjoin(
+            CatalogItem,
+            and_(
+                func.nullif(item.c.value["name"].astext, "").is_(None),
+                cast(CatalogItem.id, Text) == item.c.value["catalog_id"].astext,
+            ),
+        )
+        .where(
+            *created_filters,
+            func.jsonb_typeof(Task.estimation_details) == "object",
+            func.jsonb_typeof(item.c.value) == "object",
+        )
+        .subquery()
+    )
+    usage_rows = await db.execute(
+        select(usage.c.name, func.count(func.distinct(usage.c.task_id)).label("tasks_count"))
+        .group_by(usage.c.name)
+        .order_by(func.count(func.distinct(usage.c.task_id)).desc(), usage.c.name)
+    )
+    widget_popularity = [
+        WidgetPopularityItem(
+            name=name,
+            tasks_count=count,
+            usage_percent=round(count / total_tasks_with_breakdown * 100, 0)
+            if total_tasks_with_breakdown > 0
+            else 0,
+        )
+        for name, count in usage_rows.all()
+    ]
+
+    avg_deviation = round(float(deviation_sum) / total_tasks, 0) if total_tasks > 0 else 0
+    accuracy_overall = round(accurate_count / total_tasks * 100, 0) if total_tasks > 0 else 0
+    distribution = (
+        DeviationDistribution(
+            p25=round(p25, 1),
+            p50=round(p50, 1),
+            p75=round(p75, 1),
+            p90=round(p90, 1),
+        )
+        if total_tasks > 0
+        else None
+    )
+    report = CalibrationReportNew(
+        period=period_display,
+        total_tasks_analyzed=total_tasks,
+        overall_accuracy_pct=int(accuracy_overall),
+        avg_deviation_pct=int(avg_deviation),
+        task_calibrations=task_calibrations,
+        estimator_calibrations=estimator_calibrations,
+        widget_popularity=widget_popularity,
+        total_tasks_with_breakdown=total_tasks_with_breakdown,
+        deviation_distribution=distribution,
+    )
+    return report, _NameRefs(tasks=task_refs, estimators=tuple(estimator_ids))
+
+
 async def get_teamlead_accuracy(db: AsyncSession) -> list[TeamleadAccuracy]:
     """
     Точность оценок тимлидов. Используем validator_id как прокси оценщика.
@@ -176,31 +520,56 @@ async def get_teamlead_accuracy(db: AsyncSession) -> list[TeamleadAccuracy]:
         return []
 
     now = datetime.now(timezone.utc)
-    this_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    this_month_start = _month_start(now)
     if now.month == 1:
         last_month_start = this_month_start.replace(year=now.year - 1, month=12)
     else:
         last_month_start = this_month_start.replace(month=now.month - 1)
 
-    all_done = await db.execute(
-        select(Task)
-        .where(
-            Task.status == TaskStatus.done,
-            Task.validator_id.is_not(None),
-            Task.started_at.is_not(None),
-            Task.completed_at.is_not(None),
+    done_filters = [
+        Task.status == TaskStatus.done,
+        Task.validator_id.is_not(None),
+        Task.started_at.is_not(None),
+        Task.completed_at.is_not(None),
+    ]
+    total_q, total_hours = (
+        await db.execute(
+            select(
+                func.coalesce(func.sum(_ESTIMATED), 0.0),
+                func.coalesce(func.sum(_WALL_HOURS), 0.0),
+            ).where(*done_filters)
         )
-    )
-    all_tasks = list(all_done.scalars().all())
-
-    total_q = sum(float(t.estimated_q) for t in all_tasks)
-    total_hours = sum(_task_actual_hours(t) or 0 for t in all_tasks)
+    ).one()
     avg_hours_per_q = total_hours / total_q if total_q > 0 else 0.0
 
+    proportional = _WALL_HOURS / avg_hours_per_q if avg_hours_per_q > 0 else literal(0.0)
+    abs_error = func.abs(_ESTIMATED - proportional)
+    this_month = Task.completed_at >= this_month_start
+    last_month = and_(Task.completed_at >= last_month_start, Task.completed_at < this_month_start)
+    # Ошибка за месяц учитывается только при известном среднем часов на Q
+    month_error_enabled = true() if avg_hours_per_q > 0 else false()
+    rows = await db.execute(
+        select(
+            Task.validator_id,
+            func.count(Task.id),
+            func.sum(_ESTIMATED),
+            func.sum(abs_error),
+            func.sum(_ESTIMATED - proportional),
+            func.count(Task.id).filter(this_month),
+            func.coalesce(func.sum(_ESTIMATED).filter(this_month), 0.0),
+            func.coalesce(func.sum(abs_error).filter(and_(this_month, month_error_enabled)), 0.0),
+            func.count(Task.id).filter(last_month),
+            func.coalesce(func.sum(_ESTIMATED).filter(last_month), 0.0),
+            func.coalesce(func.sum(abs_error).filter(and_(last_month, month_error_enabled)), 0.0),
+        )
+        .where(*done_filters, Task.validator_id.in_([uid for uid, _ in teamleads]))
+        .group_by(Task.validator_id)
+    )
+    stats = {row[0]: row[1:] for row in rows.all()}
+
     out: list[TeamleadAccuracy] = []
     for uid, full_name in teamleads:
-        my_tasks = [t for t in all_tasks if t.validator_id == uid]
-        if not my_tasks:
+        if uid not in stats:
             out.append(
                 TeamleadAccuracy(
                     user_id=str(uid),
@@ -214,17 +583,18 @@ async def get_teamlead_accuracy(db: AsyncSession) -> list[TeamleadAccuracy]:
                 )
             )
             continue
-        sum_estimated = sum(float(t.estimated_q) for t in my_tasks)
-        sum_abs_error = 0.0
-        sum_diff = 0.0
-        for t in my_tasks:
-            ah = _task_actual_hours(t)
-            if ah is None:
-                continue
-            eq = float(t.estimated_q)
-            proportional_q = ah / avg_hours_per_q if avg_hours_per_q > 0 else 0
-            sum_abs_error += abs(eq - proportional_q)
-            sum_diff += eq - proportional_q
+        (
+            tasks_evaluated,
+            sum_estimated,
+            sum_abs_error,
+            sum_diff,
+            this_count,
+            this_estimated,
+            this_error,
+            last_count,
+            last_estimated,
+            last_error,
+        ) = stats[uid]
         accuracy = (1 - sum_abs_error / sum_estimated) * 100 if sum_estimated > 0 else 0.0
         accuracy = max(0.0, min(100.0, accuracy))
         bias_pct = (sum_diff / sum_estimated * 100) if sum_estimated > 0 else 0.0
@@ -235,26 +605,12 @@ async def get_teamlead_accuracy(db: AsyncSession) -> list[TeamleadAccuracy]:
         else:
             bias = "neutral"
 
-        this_month_tasks = [t for t in my_tasks if t.completed_at and t.completed_at >= this_month_start]
-        last_month_tasks = [t for t in my_tasks if t.completed_at and last_month_start <= t.completed_at < this_month_start]
         acc_this = 0.0
-        if this_month_tasks:
-            s = sum(float(t.estimated_q) for t in this_month_tasks)
-            err = sum(
-                abs(float(t.estimated_q) - (_task_actual_hours(t) or 0) / avg_hours_per_q)
-                for t in this_month_tasks
-                if avg_hours_per_q > 0
-            )
-            acc_this = (1 - err / s * 100) if s > 0 else 0
+        if this_count:
+            acc_this = (1 - this_error / this_estimated * 100) if this_estimated > 0 else 0
         acc_last = 0.0
-        if last_month_tasks:
-            s = sum(float(t.estimated_q) for t in last_month_tasks)
-            err = sum(
-                abs(float(t.estimated_q) - (_task_actual_hours(t) or 0) / avg_hours_per_q)
-                for t in last_month_tasks
-                if avg_hours_per_q > 0
-            )
-            acc_last = (1 - err / s * 100) if s > 0 else 0
+        if last_count:
+            acc_last = (1 - last_error / last_estimated * 100) if last_estimated > 0 else 0
         trend_delta = acc_this - acc_last
         if trend_delta > 2:
             trend = "improving"
@@ -267,7 +623,7 @@ async def get_teamlead_accuracy(db: AsyncSession) -> list[TeamleadAccuracy]:
             TeamleadAccuracy(
                 user_id=str(uid),
                 full_name=full_name,
-                tasks_evaluated=len(my_tasks),
+                tasks_evaluated=tasks_evaluated,
                 accuracy_percent=round(accuracy, 1),
                 bias=bias,
                 bias_percent=round(bias_pct, 1),
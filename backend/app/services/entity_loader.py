@@ -0,0 +1,116 @@
+"""
+Request-scoped загрузчик сущностей по первичному ключу (в духе DataLoader).
+
+Живет в session.info: сессия на запрос одна (get_db), значит и кеш общий
+для всех обработчиков и сервисов этого запроса и умирает вместе с ним.
+load/load_many сначала смотрят в свой кеш и identity map сессии (например,
+текущий пользователь из get_current_user уже там), остальные ключи — вместе
+со всеми отложенными через prime — добираются одним запросом IN.
+
+Блокирующие чтения (FOR UPDATE) через загрузчик не идут: им нужна свежая
+строка и блокировка, а не кеш.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ModelT = TypeVar("ModelT")
+
+_INFO_KEY = "entity_loader"
+
+
+@dataclass
+class LoaderStats:
+    requested: int = 0
+    hits: int = 0
+    queries: int = 0
+    rows: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "requested": self.requested,
+            "hits": self.hits,
+            "queries": self.queries,
+            "rows": self.rows,
+        }
+
+
+class EntityLoader:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.stats = LoaderStats()
+        # None в кеше — строки нет; повторно не ищем.
+        self._cache: dict[type, dict[Any, Any]] = defaultdict(dict)
+        self._pending: dict[type, set[Any]] = defaultdict(set)
+
+    def prime(self, model: type[ModelT], keys: Iterable[Any]) -> None:
+        """Отложить ключи: они уйдут в ближайший запрос этой модели."""
+        cache = self._cache[model]
+        self._pending[model].update(key for key in keys if key is not None and key not in cache)
+
+    async def load(self, model: type[ModelT], key: Any) -> ModelT | None:
+        if key is None:
+            return None
+        return (await self.load_many(model, [key])).get(key)
+
+    async def load_many(self, model: type[ModelT], keys: Iterable[Any]) -> dict[Any, ModelT | None]:
+        wanted = [key for key in dict.fromkeys(keys) if key is not None]
+        self.stats.requested += len(wanted)
+        cache = self._cache[model]
+        missing = [key for key in wanted if not self._cached(model, cache, key)]
+        self.stats.hits += len(wanted) - len(missing)
+        if missing:
+            await self._fetch(model, {*missing, *self._pending.pop(model, set())})
+        return {key: cache.get(key) for key in wanted}
+
+    def _cached(self, model: type, cache: dict[Any, Any], key: Any) -> bool:
+        cached = cache.get(key)
+        if cached is not None and _usable(cached):
+            return True
+        # Identity map проверяется и для «не найденных»: строку могли добавить в этом же запросе.
+        instance = self.db.sync_session.identity_map.get(
+            inspect(model).identity_key_from_primary_key((key,))
+        )
+        if instance is not None and _usable(instance):
+            cache[key] = instance
+            return True
+        return key in cache and cached is None
+
+    async def _fetch(self, model: type, keys: set[Any]) -> None:
+        mapper = inspect(model)
+        if len(mapper.primary_key) != 1:
+            raise ValueError(f"{model.__name__} has a composite primary key")
+        column = mapper.primary_key[0]
+        attribute = mapper.get_property_by_column(column).key
+        result = await self.db.execute(select(model).where(column.in_(keys)))
+        found = {getattr(instance, attribute): instance for instance in result.scalars()}
+        cache = self._cache[model]
+        for key in keys:
+            cache[key] = found.get(key)
+        self.stats.queries += 1
+        self.stats.rows += len(found)
+
+
+def _usable(instance: Any) -> bool:
+    # После rollback/expire атрибуты пришлось бы догружать синхронно.
+    state = inspect(instance)
+    return not state.expired_attributes and not state.deleted and not state.detached
+
+
+def entity_loader(db: AsyncSession) -> EntityLoader:
+    """Загрузчик текущей сессии (создается при первом обращении)."""
+    loader = db.info.get(_INFO_KEY)
+    if loader is None:
+        loader = db.info[_INFO_KEY] = EntityLoader(db)
+    return loader
+
+
+def loader_stats(db: AsyncSession) -> LoaderStats | None:
+    loader = db.info.get(_INFO_KEY)
+    return loader.stats if loader is not None else None
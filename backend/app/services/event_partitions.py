@@ -0,0 +1,402 @@
+"""
+Помесячные секции журнальных таблиц и архив старых месяцев.
+
+Таблицы из PARTITIONED_TABLES секционированы по столбцу времени (миграция
+064): секция <table>_legacy со всем, что было до перехода, помесячные
+<table>_pYYYYMM и <table>_default как страховка. Запросы с окном по времени
+читают только свои месяцы, а индексы горячих секций остаются маленькими.
+
+ensure_partitions заранее создает будущие месяцы (строки, успевшие попасть в
+DEFAULT, переносятся в новую секцию). archive_partition выгружает месяц в
+gzip NDJSON (одна строка — row_to_json), отсоединяет и удаляет секцию и
+записывает файл в каталог event_archives; отчеты дочитывают такие месяцы
+через archived_rows, а ленты с keyset-пагинацией помечают окно через
+archived_until. Секция _legacy (открыта снизу) не архивируется: ее месяцы не
+разделены, и файл без границ месяца нельзя было бы читать по окнам.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.activity import ActivityEvent
+from app.models.event_archive import EventArchive
+from app.services.badge_counters import touch_badges
+
+# Таблица -> столбец времени (ключ секционирования).
+PARTITIONED_TABLES: dict[str, str] = {
+    "activity_events": "occurred_at",
+    "notifications": "created_at",
+    "task_review_events": "created_at",
+    "work_entity_events": "created_at",
+}
+
+_BOUND_RE = re.compile(r"^FOR VALUES FROM \((.+)\) TO \((.+)\)$")
+ARCHIVE_LOCK_TIMEOUT = "5s"
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    # None — MINVALUE/MAXVALUE (legacy-секция открыта снизу).
+    start: datetime | None
+    end: datetime | None
+    is_default: bool = False
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def month_start(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y%m}"
+
+
+def time_column(table: str) -> str:
+    try:
+        return PARTITIONED_TABLES[table]
+    except KeyError:
+        raise ValueError(f"Table {table} is not partitioned") from None
+
+
+def _literal(value: datetime) -> str:
+    # Только для DDL: границы секций не принимают bind-параметры.
+    return f"'{value.astimezone(timezone.utc).isoformat()}'"
+
+
+def _parse_bound(value: str) -> datetime | None:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'")).astimezone(timezone.utc)
+
+
+async def list_partitions(db: AsyncSession, table: str) -> list[Partition]:
+    """Секции таблицы по возрастанию границ; DEFAULT — последней."""
+    time_column(table)
+    result = await db.execute(
+        text(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:table AS regclass)
+            """
+        ),
+        {"table": table},
+    )
+    partitions: list[Partition] = []
+    for name, bound in result.all():
+        if bound == "DEFAULT":
+            partitions.append(Partition(name=name, start=None, end=None, is_default=True))
+            continue
+        match = _BOUND_RE.match(bound)
+        if match is None:
+            raise RuntimeError(f"Unexpected partition bound for {name}: {bound}")
+        partitions.append(
+            Partition(name=name, start=_parse_bound(match.group(1)), end=_parse_bound(match.group(2)))
+        )
+    partitions.sort(
+        key=lambda item: (
+            item.is_default,
+            item.start or datetime.min.replace(tzinfo=timezone.utc),
+        )
+    )
+    return partitions
+
+
+def planned_partitions(
+    partitions: Iterable[Partition],
+    *,
+    now: datetime,
+    months_ahead: int,
+) -> list[tuple[datetime, datetime]]:
+    """Недостающие месяцы от конца последней секции до now + months_ahead включительно."""
+    ends = [item.end for item in partitions if not item.is_default and item.end is not None]
+    start = max(ends) if ends else month_start(now)
+    target = add_months(month_start(now), months_ahead + 1)
+    planned: list[tuple[datetime, datetime]] = []
+    while start < target:
+        end = add_months(start, 1)
+        planned.append((start, end))
+        start = end
+    return planned
+
+
+async def _create_partition(
+    db: AsyncSession,
+    table: str,
+    start: datetime,
+    end: datetime,
+    default: Partition | None,
+) -> None:
+    column = time_column(table)
+    name = partition_name(table, start)
+    create = text(
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})"
+    )
+    spilled = 0
+    if default is not None:
+        spilled = await db.scalar(
+            text(f"SELECT count(*) FROM {default.name} WHERE {column} >= :start AND {column} < :end"),
+            {"start": start, "end": end},
+        )
+    if not spilled:
+        await db.execute(create)
+        return
+    # Месяц уже пишется в DEFAULT: новая секция конфликтовала бы с его строками.
+    await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default.name}"))
+    await db.execute(create)
+    await db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default.name} "
+            f"WHERE {column} >= :start AND {column} < :end RETURNING *) "
+            f"INSERT INTO {table} SELECT * FROM moved"
+        ),
+        {"start": start, "end": end},
+    )
+    await db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default.name} DEFAULT"))
+
+
+async def ensure_partitions(
+    db: AsyncSession,
+    table: str,
+    *,
+    now: datetime | None = None,
+    months_ahead: int | None = None,
+) -> list[str]:
+    """Создать секции на текущий и months_ahead следующих месяцев. Возвращает имена новых."""
+    now = now or utc_now()
+    if months_ahead is None:
+        months_ahead = settings.EVENT_PARTITION_PREMAKE_MONTHS
+    partitions = await list_partitions(db, table)
+    default = next((item for item in partitions if item.is_default), None)
+    created: list[str] = []
+    for start, end in planned_partitions(partitions, now=now, months_ahead=months_ahead):
+        await _create_partition(db, table, start, end, default)
+        created.append(partition_name(table, start))
+    return created
+
+
+async def partitions_to_archive(db: AsyncSession, table: str, *, before: datetime) -> list[Partition]:
+    """Помесячные секции, целиком лежащие раньше before (без _legacy и DEFAULT)."""
+    return [
+        item
+        for item in await list_partitions(db, table)
+        if not item.is_default and item.start is not None and item.end is not None and item.end <= before
+    ]
+
+
+def _archive_relative_path(table: str, partition: Partition) -> str:
+    return f"{table}/{partition.name}.ndjson.gz"
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def archive_partition(
+    db: AsyncSession,
+    table: str,
+    partition: Partition,
+    *,
+    archive_dir: str | None = None,
+) -> EventArchive | None:
+    """
+    Выгрузить секцию в gzip NDJSON, отсоединить и удалить ее.
+
+    Все в транзакции вызывающего: пока идет выгрузка, секция заблокирована от
+    записи (SHARE), и каталог с DROP фиксируются одним commit. Если commit не
+    случился, файл остается и перезаписывается при следующем запуске.
+    Пустая секция просто удаляется (None).
+    """
+    column = time_column(table)
+    await db.execute(text(f"LOCK TABLE {partition.name} IN SHARE MODE"))
+    if table == "notifications":
+        # Непрочитанные уведомления уходят вместе с секцией: бейджи владельцев
+        # пересчитываются при коммите, уже без этих строк.
+        touch_badges(
+            db,
+            (
+                await db.execute(
+                    text(f"SELECT DISTINCT user_id FROM {partition.name} WHERE NOT is_read")
+                )
+            ).scalars(),
+        )
+
+    relative_path = _archive_relative_path(table, partition)
+    final_path = Path(archive_dir or settings.EVENT_ARCHIVE_DIR) / relative_path
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = final_path.with_name(f"{final_path.name}.tmp")
+
+    row_count = 0
+    first_at: datetime | None = None
+    result = await db.stream(
+        text(
+            f"SELECT row_to_json(p)::text, p.{column} FROM {partition.name} AS p "
+            f"ORDER BY p.{column}, p.id"
+        )
+    )
+    with gzip.open(temp_path, "wt", encoding="utf-8") as handle:
+        async for line, occurred_at in result:
+            handle.write(line)
+            handle.write("\n")
+            row_count += 1
+            if first_at is None:
+                first_at = occurred_at
+
+    await db.execute(text(f"SET LOCAL lock_timeout = '{ARCHIVE_LOCK_TIMEOUT}'"))
+    await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name}"))
+    archive = None
+    if row_count:
+        os.replace(temp_path, final_path)
+        archive = EventArchive(
+            id=uuid.uuid4(),
+            table_name=table,
+            partition_name=partition.name,
+            range_start=partition.start or first_at,
+            range_end=partition.end,
+            path=relative_path,
+            row_count=row_count,
+            byte_size=final_path.stat().st_size,
+            sha256=_file_sha256(final_path),
+        )
+        db.add(archive)
+        await db.flush()
+    else:
+        temp_path.unlink(missing_ok=True)
+    await db.execute(text(f"DROP TABLE {partition.name}"))
+    return archive
+
+
+def _read_archive(
+    path: Path,
+    column: str,
+    start: datetime,
+    end: datetime,
+    where: Callable[[dict[str, Any]], bool] | None,
+) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            row = json.loads(line)
+            occurred_at = datetime.fromisoformat(row[column])
+            if start <= occurred_at < end and (where is None or where(row)):
+                rows.append(row)
+    return rows
+
+
+async def archived_rows(
+    db: AsyncSession,
+    table: str,
+    start: datetime,
+    end: datetime,
+    *,
+    where: Callable[[dict[str, Any]], bool] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Строки отсоединенных месяцев таблицы в окне [start, end) (dict из row_to_json).
+
+    Пока окно не заходит в архив, это один запрос к event_archives.
+    """
+    column = time_column(table)
+    archives = (
+        await db.execute(
+            select(EventArchive)
+            .where(
+                EventArchive.table_name == table,
+                EventArchive.range_start < end,
+                EventArchive.range_end > start,
+            )
+            .order_by(EventArchive.range_start)
+        )
+    ).scalars().all()
+    rows: list[dict[str, Any]] = []
+    for archive in archives:
+        path = Path(settings.EVENT_ARCHIVE_DIR) / archive.path
+        try:
+            rows.extend(await asyncio.to_thread(_read_archive, path, column, start, end, where))
+        except OSError as error:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Архив {archive.partition_name} недоступен",
+            ) from error
+    return rows
+
+
+async def archived_until(
+    db: AsyncSession,
+    table: str,
+    start: datetime | None,
+    end: datetime | None,
+) -> datetime | None:
+    """Конец последнего архивного месяца, пересекающего окно (None — окно целиком в БД)."""
+    time_column(table)
+    stmt = select(func.max(EventArchive.range_end)).where(EventArchive.table_name == table)
+    if start is not None:
+        stmt = stmt.where(EventArchive.range_end > start)
+    if end is not None:
+        stmt = stmt.where(EventArchive.range_start < end)
+    return await db.scalar(stmt)
+
+
+def _uuid_or_none(value: str | None) -> uuid.UUID | None:
+    return uuid.UUID(value) if value else None
+
+
+async def archived_activity_events(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    *,
+    event_types: Iterable[str] | None = None,
+    actor_ids: Iterable[uuid.UUID] | None = None,
+) -> list[ActivityEvent]:
+    """Архивные activity_events окна как несохраняемые ActivityEvent (для отчетов)."""
+    wanted_types = set(event_types) if event_types is not None else None
+    wanted_actors = {str(actor_id) for actor_id in actor_ids} if actor_ids is not None else None
+
+    def matches(row: dict[str, Any]) -> bool:
+        return (wanted_types is None or row["event_type"] in wanted_types) and (
+            wanted_actors is None or row["actor_id"] in wanted_actors
+        )
+
+    return [
+        ActivityEvent(
+            id=uuid.UUID(row["id"]),
+            actor_id=uuid.UUID(row["actor_id"]),
+            event_type=row["event_type"],
+            task_id=_uuid_or_none(row.get("task_id")),
+            event_data=row.get("metadata"),
+            occurred_at=datetime.fromisoformat(row["occurred_at"]),
+        )
+        for row in await archived_rows(db, "activity_events", start, end, where=matches)
+    ]
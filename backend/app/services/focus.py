@@ -7,18 +7,21 @@ from fastapi import HTTPException
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.single_flight import single_flight
 from app.models.task import Task, TaskStatus
 from app.models.user import User, UserRole
 from app.schemas.task import FocusStatus
 from app.services.activity import record_activity_event
+from app.services.entity_loader import entity_loader
+from app.services.focus_sessions import close_focus_session, open_focus_session, record_focus_correction
 from app.services.notifications import create_notification
+from app.services.realtime import TOPIC_FOCUS, publish_after_commit
 
 MAX_FOCUS_SECONDS = 4 * 3600
 
 
 async def _get_user(db: AsyncSession, user_id) -> User | None:
-    result = await db.execute(select(User).where(User.id == user_id))
-    return result.scalar_one_or_none()
+    return await entity_loader(db).load(User, user_id)
 
 
 def add_bounded_focus_time(task: Task, now: datetime) -> int:
@@ -33,6 +36,20 @@ def add_bounded_focus_time(task: Task, now: datetime) -> int:
     return added
 
 
+async def stop_focus(db: AsyncSession, task: Task, now: datetime, end_reason: str) -> int:
+    """Остановить таймер задачи и закрыть ее сессию фокуса; возвращает засчитанные секунды."""
+    added = add_bounded_focus_time(task, now)
+    await close_focus_session(db, task.id, now, seconds=added, end_reason=end_reason)
+    return added
+
+
+async def discard_focus(db: AsyncSession, task: Task, now: datetime) -> None:
+    """Снять задачу с фокуса без начисления времени (возврат с проверки)."""
+    if task.focus_started_at is not None:
+        await close_focus_session(db, task.id, now, seconds=0, end_reason="returned")
+    task.focus_started_at = None
+
+
 async def start_focus(db: AsyncSession, user_id, task_id) -> dict[str, Any]:
     now = datetime.now(timezone.utc)
     user = await _get_user(db, user_id)
@@ -63,7 +80,7 @@ async def start_focus(db: AsyncSession, user_id, task_id) -> dict[str, Any]:
     )
     current_focus = current_focus_result.scalar_one_or_none()
     if current_focus:
-        added = add_bounded_focus_time(current_focus, now)
+        added = await stop_focus(db, current_focus, now, "started_another_task")
         paused_task_id = current_focus.id
         await record_activity_event(
             db,
@@ -84,6 +101,7 @@ async def start_focus(db: AsyncSession, user_id, task_id) -> dict[str, Any]:
         # due_date / sla_hours могут быть пересчитаны отдельной логикой, здесь не трогаем
 
     task.focus_started_at = now
+    open_focus_session(db, user_id, task.id, now)
     await record_activity_event(
         db,
         user_id,
@@ -93,6 +111,7 @@ async def start_focus(db: AsyncSession, user_id, task_id) -> dict[str, Any]:
         occurred_at=now,
     )
     await db.flush()
+    publish_after_commit(db, TOPIC_FOCUS)
 
     active_hours = task.active_seconds / 3600
     return {
@@ -121,7 +140,7 @@ async def pause_focus(db: AsyncSession, user_id, task_id) -> dict[str, Any]:
     if task.focus_started_at is None:
         raise HTTPException(status_code=400, detail="Задача уже на паузе")
 
-    added = add_bounded_focus_time(task, now)
+    added = await stop_focus(db, task, now, "pause")
     await record_activity_event(
         db,
         user_id,
@@ -132,6 +151,7 @@ async def pause_focus(db: AsyncSession, user_id, task_id) -> dict[str, Any]:
     )
 
     await db.flush()
+    publish_after_commit(db, TOPIC_FOCUS)
     active_hours = task.active_seconds / 3600
     return {
         "task_id": task.id,
@@ -158,7 +178,7 @@ async def auto_pause_stale_focuses(db: AsyncSession) -> int:
         delta = (now - task.focus_started_at).total_seconds()
         if delta < MAX_FOCUS_SECONDS:
             continue
-        added = add_bounded_focus_time(task, now)
+        added = await stop_focus(db, task, now, "four_hour_limit")
         count += 1
         await record_activity_event(
             db,
@@ -180,6 +200,8 @@ async def auto_pause_stale_focuses(db: AsyncSession) -> int:
             )
 
     await db.flush()
+    if count:
+        publish_after_commit(db, TOPIC_FOCUS, delta={"auto_paused": count})
     return count
 
 
@@ -226,7 +248,16 @@ async def correct_active_time(
     task.estimation_details = details
 
     task.active_seconds = int(new_active_seconds)
+    # Разница — отдельной строкой, чтобы сумма сессий задачи осталась равна active_seconds.
+    record_focus_correction(
+        db,
+        task.assignee_id or corrector.id,
+        task.id,
+        now,
+        seconds=int(new_active_seconds) - int(old_seconds),
+    )
 
+    # Открытая сессия продолжается: при закрытии в нее попадет время после коррекции.
     if task.focus_started_at is not None:
         task.focus_started_at = now
 
@@ -254,6 +285,7 @@ async def correct_active_time(
     }
 
 
+@single_flight("focus.statuses")
 async def get_focus_statuses(db: AsyncSession) -> list[dict[str, Any]]:
     now = datetime.now(timezone.utc)
 
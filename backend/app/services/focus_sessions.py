@@ -0,0 +1,138 @@
+"""
+Материализованные сессии фокуса (focus_sessions) и аналитика по ним.
+
+Сессия открывается на focus_start и закрывается паузой любого рода в той же
+транзакции, что меняет Task.focus_started_at. Отчеты считают фокус
+агрегатами по индексам (user_id, started_at) / (user_id, ended_at), не
+разбирая activity_events: журнал остается журналом.
+
+Окно [start, end) учитывает сессию так же, как раньше учитывались события:
+старт — если started_at в окне, пауза и засчитанные секунды — если ended_at в окне.
+Строки коррекции (time_corrected) дают только секунды, стартом не считаются.
+"""
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import and_, distinct, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.focus_session import FocusSession
+
+PAUSE_REASONS = ("pause", "submit_for_review")
+AUTO_PAUSE_REASONS = ("started_another_task", "pulled_another_task", "four_hour_limit")
+# Строка коррекции: seconds — разница со старым active_seconds, не отрезок фокуса.
+CORRECTION_REASON = "time_corrected"
+
+
+@dataclass
+class FocusStats:
+    starts: int = 0
+    pauses: int = 0
+    auto_pauses: int = 0
+    seconds: int = 0
+    tasks: int = 0
+
+
+def open_focus_session(db: AsyncSession, user_id: uuid.UUID, task_id: uuid.UUID, started_at: datetime) -> None:
+    db.add(FocusSession(id=uuid.uuid4(), user_id=user_id, task_id=task_id, started_at=started_at))
+
+
+async def close_focus_session(
+    db: AsyncSession,
+    task_id: uuid.UUID,
+    ended_at: datetime,
+    *,
+    seconds: int,
+    end_reason: str,
+) -> None:
+    await db.execute(
+        update(FocusSession)
+        .where(FocusSession.task_id == task_id, FocusSession.ended_at.is_(None))
+        .values(ended_at=ended_at, seconds=max(int(seconds), 0), end_reason=end_reason)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_focus_correction(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    task_id: uuid.UUID,
+    corrected_at: datetime,
+    *,
+    seconds: int,
+) -> None:
+    if seconds:
+        db.add(
+            FocusSession(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                task_id=task_id,
+                started_at=corrected_at,
+                ended_at=corrected_at,
+                seconds=int(seconds),
+                end_reason=CORRECTION_REASON,
+            )
+        )
+
+
+async def _window_stats(
+    db: AsyncSession,
+    key,
+    start: datetime,
+    end: datetime,
+    *,
+    user_ids: list[uuid.UUID],
+) -> dict[uuid.UUID, FocusStats]:
+    started = and_(
+        FocusSession.started_at >= start,
+        FocusSession.started_at < end,
+        FocusSession.end_reason.is_distinct_from(CORRECTION_REASON),
+    )
+    ended = and_(FocusSession.ended_at >= start, FocusSession.ended_at < end)
+    paused = and_(ended, FocusSession.end_reason.in_(PAUSE_REASONS))
+    auto_paused = and_(ended, FocusSession.end_reason.in_(AUTO_PAUSE_REASONS))
+    result = await db.execute(
+        select(
+            key,
+            func.count().filter(started),
+            func.count().filter(paused),
+            func.count().filter(auto_paused),
+            func.coalesce(func.sum(FocusSession.seconds).filter(ended), 0),
+            func.count(distinct(FocusSession.task_id)).filter(or_(started, paused, auto_paused)),
+        )
+        .where(FocusSession.user_id.in_(user_ids), or_(started, ended))
+        .group_by(key)
+    )
+    return {
+        row[0]: FocusStats(
+            starts=int(row[1]),
+            pauses=int(row[2]),
+            auto_pauses=int(row[3]),
+            seconds=int(row[4]),
+            tasks=int(row[5]),
+        )
+        for row in result.all()
+    }
+
+
+async def focus_stats_by_user(
+    db: AsyncSession,
+    user_ids: list[uuid.UUID],
+    start: datetime,
+    end: datetime,
+) -> dict[uuid.UUID, FocusStats]:
+    if not user_ids:
+        return {}
+    return await _window_stats(db, FocusSession.user_id, start, end, user_ids=user_ids)
+
+
+async def focus_stats_by_task(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    start: datetime,
+    end: datetime,
+) -> dict[uuid.UUID, FocusStats]:
+    return await _window_stats(db, FocusSession.task_id, start, end, user_ids=[user_id])
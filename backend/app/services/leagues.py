@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from uuid import UUID
 
 from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.shop import PeriodSnapshot
@@ -175,6 +176,56 @@ async def get_league_progress(db: AsyncSession, user_id: UUID) -> LeagueProgress
     )
 
 
+def _suggested_league(current: str, history: list[LeagueHistory]) -> str:
+    # Логика повышения
+    if current == "C" and len(history) >= 3:
+        if all(h.percent >= 90 for h in history[:3]):
+            return "B"
+    elif current == "B" and len(history) >= 3:
+        if all(h.percent >= 95 for h in history[:3]):
+            return "A"
+    return current
+
+
+async def evaluate_league_changes(db: AsyncSession, users: list[User]) -> list[LeagueEvaluation]:
+    """Оценки смены лиги для списка пользователей: последние 3 снимка всех — одним запросом."""
+    if not users:
+        return []
+    ranked = (
+        select(
+            PeriodSnapshot,
+            func.row_number()
+            .over(partition_by=PeriodSnapshot.user_id, order_by=PeriodSnapshot.period.desc())
+            .label("rank"),
+        )
+        .where(PeriodSnapshot.user_id.in_([u.id for u in users]))
+        .subquery()
+    )
+    recent = aliased(PeriodSnapshot, ranked)
+    snap_result = await db.execute(
+        select(recent).where(ranked.c.rank <= 3).order_by(recent.user_id, recent.period.desc())
+    )
+    history_by_user: dict[UUID, list[LeagueHistory]] = {}
+    for s in snap_result.scalars().all():
+        pct = round(float(s.earned_main) / float(s.mpw) * 100, 1) if s.mpw else 0.0
+        history_by_user.setdefault(s.user_id, []).append(LeagueHistory(period=s.period, percent=pct))
+
+    evaluations = []
+    for user in users:
+        current = user.league.value if hasattr(user.league, "value") else str(user.league)
+        history = history_by_user.get(user.id, [])
+        evaluations.append(
+            LeagueEvaluation(
+                user_id=str(user.id),
+                full_name=user.full_name,
+                current_league=current,
+                suggested_league=_suggested_league(current, history),
+                history=history,
+            )
+        )
+    return evaluations
+
+
 async def evaluate_league_change(db: AsyncSession, user_id: UUID) -> LeagueEvaluation:
     """Оценить, нужно ли менять лигу сотруднику (для админки)."""
     result = await db.execute(select(User).where(User.id == user_id))
@@ -184,39 +235,7 @@ async def evaluate_league_change(db: AsyncSession, user_id: UUID) -> LeagueEvalu
             user_id=str(user_id), full_name="", current_league="C",
             suggested_league="C", history=[]
         )
-
-    current = user.league.value if hasattr(user.league, "value") else str(user.league)
-
-    # Последние 3 закрытых периода
-    snap_result = await db.execute(
-        select(PeriodSnapshot)
-        .where(PeriodSnapshot.user_id == user_id)
-        .order_by(PeriodSnapshot.period.desc())
-        .limit(3)
-    )
-    snaps = snap_result.scalars().all()
-
-    history = []
-    for s in snaps:
-        pct = round(float(s.earned_main) / float(s.mpw) * 100, 1) if s.mpw else 0.0
-        history.append(LeagueHistory(period=s.period, percent=pct))
-
-    # Логика повышения
-    suggested = current
-    if current == "C" and len(history) >= 3:
-        if all(h.percent >= 90 for h in history[:3]):
-            suggested = "B"
-    elif current == "B" and len(history) >= 3:
-        if all(h.percent >= 95 for h in history[:3]):
-            suggested = "A"
-
-    return LeagueEvaluation(
-        user_id=str(user_id),
-        full_name=user.full_name,
-        current_league=current,
-        suggested_league=suggested,
-        history=history,
-    )
+    return (await evaluate_league_changes(db, [user]))[0]
 
 
 async def apply_league_changes(db: AsyncSession, admin_id: UUID) -> list[LeagueChange]:
@@ -230,8 +249,7 @@ async def apply_league_changes(db: AsyncSession, admin_id: UUID) -> list[LeagueC
     users = result.scalars().all()
 
     changes: list[LeagueChange] = []
-    for u in users:
-        ev = await evaluate_league_change(db, u.id)
+    for u, ev in zip(users, await evaluate_league_changes(db, list(users))):
         if ev.suggested_league != ev.current_league:
             old = ev.current_league
             u.league = ev.suggested_league
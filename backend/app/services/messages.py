@@ -6,20 +6,23 @@ import uuid
 from datetime import datetime, timezone
 from uuid import UUID
 
-from sqlalchemy import func, select, update
+from sqlalchemy import select, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
 from app.models.messages import (
     CommunicationEvent,
-    MessageThreadParticipant,
     UserAttentionItem,
 )
 from app.models.notification import Notification
 from app.models.user import User
+from app.services.badge_counters import get_badge_counts, touch_badges
 
 
+# Строк в одном upsert адресатов: 9 параметров на строку, лимит протокола — 32767.
+ATTENTION_UPSERT_CHUNK = 1000
+
 IMPORTANT_NOTIFICATION_TYPES = frozenset(
     {
         "task_assigned",
@@ -134,19 +137,25 @@ async def emit_attention_event(
         event_id = event.id
 
     now = datetime.now(timezone.utc)
-    for user_id in targets:
+    # Один upsert на пачку адресатов (targets уже без повторов).
+    for offset in range(0, len(targets), ATTENTION_UPSERT_CHUNK):
         await db.execute(
             insert(UserAttentionItem)
             .values(
-                id=uuid.uuid4(),
-                user_id=user_id,
-                event_id=event_id,
-                kind=kind,
-                dedupe_key=dedupe_key,
-                is_read=False,
-                read_at=None,
-                created_at=now,
-                updated_at=now,
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "user_id": user_id,
+                        "event_id": event_id,
+                        "kind": kind,
+                        "dedupe_key": dedupe_key,
+                        "is_read": False,
+                        "read_at": None,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for user_id in targets[offset:offset + ATTENTION_UPSERT_CHUNK]
+                ]
             )
             .on_conflict_do_update(
                 constraint="uq_user_attention_items_user_dedupe",
@@ -159,6 +168,7 @@ async def emit_attention_event(
                 },
             )
         )
+    touch_badges(db, targets)
 
     return (
         await db.execute(
@@ -191,42 +201,9 @@ async def list_attention_items(
 
 
 async def get_attention_summary(db: AsyncSession, user_id: UUID) -> tuple[int, int]:
-    direct_items = int(
-        (
-            await db.execute(
-                select(func.count(UserAttentionItem.id)).where(
-                    UserAttentionItem.user_id == user_id,
-                    UserAttentionItem.kind == "direct",
-                    UserAttentionItem.is_read.is_(False),
-                )
-            )
-        ).scalar()
-        or 0
-    )
-    unread_threads = int(
-        (
-            await db.execute(
-                select(func.count(MessageThreadParticipant.id)).where(
-                    MessageThreadParticipant.user_id == user_id,
-                    MessageThreadParticipant.unread_count > 0,
-                )
-            )
-        ).scalar()
-        or 0
-    )
-    important_items = int(
-        (
-            await db.execute(
-                select(func.count(UserAttentionItem.id)).where(
-                    UserAttentionItem.user_id == user_id,
-                    UserAttentionItem.kind == "important",
-                    UserAttentionItem.is_read.is_(False),
-                )
-            )
-        ).scalar()
-        or 0
-    )
-    return direct_items + unread_threads, important_items
+    """(адресные события + треды с непрочитанным, важные) из user_badge_counters."""
+    counts = await get_badge_counts(db, user_id)
+    return counts.unread_direct + counts.unread_threads, counts.unread_important
 
 
 async def mark_attention_read(
@@ -244,6 +221,7 @@ async def mark_attention_read(
     ).scalar_one_or_none()
     if item is None:
         return None
+    touch_badges(db, [user_id])
     if not item.is_read:
         item.is_read = True
         item.read_at = datetime.now(timezone.utc)
@@ -298,6 +276,8 @@ async def mark_attention_context_read(
             updated_at=datetime.now(timezone.utc),
         )
     )
+    if result.rowcount:
+        touch_badges(db, [user_id])
     return int(result.rowcount or 0)
 
 
@@ -326,6 +306,8 @@ async def mark_notification_attention_read(
         )
         .values(is_read=True, read_at=now, updated_at=now)
     )
+    if result.rowcount:
+        touch_badges(db, [user_id])
     return int(result.rowcount or 0)
 
 
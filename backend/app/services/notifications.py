@@ -1,10 +1,15 @@
 """Сервис уведомлений: создание, список, пометка прочитанным."""
+import hashlib
+from datetime import datetime, timezone
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Boolean, DateTime, String, Text, bindparam, cast, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.notification import Notification
+from app.services.badge_counters import get_badge_counts, touch_badges
+from app.services.realtime import TOPIC_NOTIFICATIONS, publish_after_commit
 
 
 async def create_notification(
@@ -41,9 +46,73 @@ async def create_notification(
         source_key=source_key,
         dedupe_key=dedupe_key,
     )
+    touch_badges(db, [user_id])
+    publish_after_commit(db, TOPIC_NOTIFICATIONS, user_ids=[user_id], delta={"created": 1})
     return n
 
 
+async def create_notifications_bulk(
+    db: AsyncSession,
+    user_ids: list[UUID],
+    type: str,
+    title: str,
+    message: str = "",
+    link: str | None = None,
+    *,
+    source_key: str,
+) -> int:
+    """
+    Одинаковое уведомление многим пользователям: один INSERT … SELECT FROM unnest.
+
+    Для важных типов создается одно общее событие attention с адресатами
+    (а не событие на каждое уведомление, как в create_notification).
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return 0
+    recipients = (
+        func.unnest(cast(bindparam("user_ids", user_ids, type_=ARRAY(PG_UUID(as_uuid=True))), ARRAY(PG_UUID(as_uuid=True))))
+        .table_valued("user_id")
+        .render_derived(name="r")
+    )
+    notifications = Notification.__table__
+    await db.execute(
+        insert(notifications).from_select(
+            ["id", "user_id", "type", "title", "message", "is_read", "link", "created_at"],
+            select(
+                func.gen_random_uuid(),
+                recipients.c.user_id,
+                literal(type, String(50)),
+                literal(title, String(255)),
+                literal(message, Text),
+                literal(False, Boolean),
+                literal(link, String(255)),
+                literal(datetime.now(timezone.utc), DateTime(timezone=True)),
+            ),
+            include_defaults=False,
+        )
+    )
+    from app.services.messages import emit_attention_event, notification_is_important
+
+    if notification_is_important(type):
+        digest = hashlib.md5((link or source_key).encode("utf-8"), usedforsecurity=False).hexdigest()
+        await emit_attention_event(
+            db,
+            target_user_ids=user_ids,
+            kind="important",
+            event_type=type,
+            source_type="notification",
+            source_key=source_key,
+            title=title,
+            body=message,
+            link=link,
+            dedupe_key=f"important:{type}:{digest}",
+        )
+    touch_badges(db, user_ids)
+    publish_after_commit(db, TOPIC_NOTIFICATIONS, user_ids=user_ids, delta={"created": 1})
+    return len(user_ids)
+
+
 async def get_user_notifications(
     db: AsyncSession,
     user_id: UUID,
@@ -86,6 +155,8 @@ async def mark_as_read(
             user_id=user_id,
             notification_ids=[n.id],
         )
+        touch_badges(db, [user_id])
+        publish_after_commit(db, TOPIC_NOTIFICATIONS, user_ids=[user_id], delta={"read": 1})
 
 
 async def mark_all_as_read(db: AsyncSession, user_id: UUID) -> int:
@@ -108,17 +179,16 @@ async def mark_all_as_read(db: AsyncSession, user_id: UUID) -> int:
             user_id=user_id,
             notification_ids=[notification.id for notification in notifications],
         )
+        touch_badges(db, [user_id])
+        publish_after_commit(
+            db,
+            TOPIC_NOTIFICATIONS,
+            user_ids=[user_id],
+            delta={"read": len(notifications)},
+        )
     return len(notifications)
 
 
 async def get_unread_count(db: AsyncSession, user_id: UUID) -> int:
-    """Количество непрочитанных уведомлений."""
-    from sqlalchemy import func
-
-    result = await db.execute(
-        select(func.count(Notification.id)).where(
-            Notification.user_id == user_id,
-            Notification.is_read.is_(False),
-        )
-    )
-    return int(result.scalar() or 0)
+    """Количество непрочитанных уведомлений (строка user_badge_counters)."""
+    return (await get_badge_counts(db, user_id)).unread_notifications
@@ -0,0 +1,166 @@
+"""
+Keyset-пагинация лент истории по (время, id).
+
+Курсор — непрозрачная base64url-строка с временем и id последней строки
+страницы. Следующая страница — строки строго после нее в порядке ленты
+(row comparison по тому же составному индексу), поэтому сотая страница стоит
+столько же, сколько первая. Точный COUNT(*) не считается: feed_total отдает
+точное число только когда вся лента уместилась в первую страницу, иначе —
+оценку из pg_class (лента без фильтров) или EXPLAIN.
+
+Ленты со списком в теле ответа отдают курсор заголовком X-Next-Cursor,
+ленты с оберткой — полем next_cursor.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Generic, TypeVar
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+CURSOR_HEADER = "X-Next-Cursor"
+
+T = TypeVar("T")
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    rows: list[T]
+    next_cursor: str | None
+
+
+def encode_cursor(at: datetime, row_id: UUID) -> str:
+    raw = json.dumps([at.isoformat(), str(row_id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        at_text, id_text = json.loads(raw)
+        at = datetime.fromisoformat(at_text)
+        return (at if at.tzinfo else at.replace(tzinfo=timezone.utc)), UUID(id_text)
+    except (binascii.Error, TypeError, ValueError) as error:
+        raise HTTPException(status_code=400, detail="Некорректный курсор") from error
+
+
+def legacy_cursor(before_at: datetime | None, before_id: UUID | None) -> str | None:
+    """Курсор из прежних параметров before_*: без id — строго раньше before_at."""
+    if before_at is None:
+        return None
+    return encode_cursor(before_at, before_id or UUID(int=0))
+
+
+async def keyset_page(
+    db: AsyncSession,
+    stmt: Select,
+    *,
+    time_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    limit: int,
+    cursor: str | None = None,
+    descending: bool = True,
+    scalars: bool = False,
+    row_key: Callable[[Any], tuple[datetime, UUID]] | None = None,
+) -> KeysetPage:
+    """
+    Одна страница ленты stmt в порядке (time, id); stmt не должен иметь ORDER BY.
+
+    row_key достает (время, id) из строки результата; по умолчанию — из
+    первой сущности строки (или самой строки при scalars=True).
+    """
+    if cursor:
+        at, row_id = decode_cursor(cursor)
+        if descending:
+            # Отдельное условие по времени позволяет отсечь секции и сузить диапазон индекса.
+            stmt = stmt.where(time_column <= at, tuple_(time_column, id_column) < tuple_(at, row_id))
+        else:
+            stmt = stmt.where(time_column >= at, tuple_(time_column, id_column) > tuple_(at, row_id))
+    order = (time_column.desc(), id_column.desc()) if descending else (time_column.asc(), id_column.asc())
+    result = await db.execute(stmt.order_by(*order).limit(limit + 1))
+    rows = list(result.scalars().all()) if scalars else list(result.all())
+    if len(rows) <= limit:
+        return KeysetPage(rows=rows, next_cursor=None)
+
+    rows = rows[:limit]
+    if row_key is None:
+        last = rows[-1] if scalars else rows[-1][0]
+        at, row_id = getattr(last, time_column.key), getattr(last, id_column.key)
+    else:
+        at, row_id = row_key(rows[-1])
+    return KeysetPage(rows=rows, next_cursor=encode_cursor(at, row_id))
+
+
+def set_cursor_header(response: Response, page: KeysetPage) -> None:
+    if page.next_cursor:
+        response.headers[CURSOR_HEADER] = page.next_cursor
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimated_count(db: AsyncSession, stmt: Select) -> int:
+    """Оценка числа строк stmt планировщиком (без выполнения запроса)."""
+    plan = (await db.execute(_Explain(stmt.order_by(None).limit(None)))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def table_row_estimate(db: AsyncSession, table: str) -> int:
+    """reltuples таблицы; для секционированной — сумма по секциям."""
+    value = await db.scalar(
+        text(
+            """
+            SELECT COALESCE(sum(GREATEST(c.reltuples, 0)), 0)::bigint
+            FROM pg_class c
+            WHERE c.oid = CAST(:table AS regclass)
+               OR c.oid IN (
+                   SELECT inhrelid FROM pg_inherits
+                   WHERE inhparent = CAST(:table AS regclass)
+               )
+            """
+        ),
+        {"table": table},
+    )
+    return int(value or 0)
+
+
+async def feed_total(
+    db: AsyncSession,
+    stmt: Select,
+    page: KeysetPage,
+    *,
+    first_page: bool,
+    table: str | None = None,
+) -> tuple[int, bool]:
+    """
+    (total, is_estimate) для ленты stmt (без курсора).
+
+    Если первая страница вместила всю ленту, число точное и бесплатное;
+    иначе оценка по pg_class (когда передан table — лента без фильтров) или EXPLAIN.
+    """
+    if first_page and page.next_cursor is None:
+        return len(page.rows), False
+    estimate = await table_row_estimate(db, table) if table else await estimated_count(db, stmt)
+    return max(estimate, len(page.rows)), True
@@ -5,18 +5,21 @@ from decimal import Decimal
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.task import Task, TaskPriority, TaskReviewEvent, TaskReviewEventType, TaskStatus, TaskType
 from app.models.user import User, League, UserRole
 from app.models.transaction import QTransaction, WalletType
-from app.schemas.queue import QueueTaskResponse
-from app.schemas.task import compute_deadline_zone
-from app.services.focus import add_bounded_focus_time
+from app.schemas.queue import AssignBatchItem, QueueBatchItemResult, QueueTaskResponse, ValidateBatchItem
+from app.services.entity_loader import entity_loader
+from app.services.focus import discard_focus, stop_focus
+from app.services.focus_sessions import open_focus_session
 from app.services.activity import record_activity_event
-from app.services.wallet import credit_q
+from app.services.badge_counters import touch_badges
+from app.services.queue_counters import critical_in_queue
+from app.services.wallet import QCredit, credit_q_batch
 from app.services.task_acceptance import (
     ensure_criteria_ready_for_final_acceptance,
     ensure_criteria_ready_for_submission,
@@ -26,6 +29,7 @@ from app.services.task_acceptance import (
 _LEAGUE_ORDER = {League.C: 0, League.B: 1, League.A: 2}
 _PRIORITY_ORDER = {TaskPriority.low: 1, TaskPriority.medium: 2, TaskPriority.high: 3, TaskPriority.critical: 4}
 CRITICAL_BLOCK_REASON = "Сначала нужно взять или назначить критическую задачу"
+DUPLICATE_BATCH_ITEM = "Задача повторяется в пакете"
 
 def _add_review_event(
     db: AsyncSession,
@@ -76,15 +80,53 @@ async def run_dashboard_maintenance(db: AsyncSession) -> None:
         _maintenance_last_run = datetime.now(timezone.utc)
 
 
-async def _critical_queue_exists(db: AsyncSession, exclude_task_id: UUID | None = None) -> bool:
-    stmt = select(Task.id).where(
-        Task.status == TaskStatus.in_queue,
-        Task.priority == TaskPriority.critical,
+def _is_critical_in_queue(task: Task) -> bool:
+    return task.status == TaskStatus.in_queue and task.priority == TaskPriority.critical
+
+
+async def _critical_queue_exists(db: AsyncSession, exclude_task: Task | None = None) -> bool:
+    """Есть ли критические задачи в очереди (кроме exclude_task) — по счётчику queue_stats."""
+    count = await critical_in_queue(db)
+    if exclude_task is not None and _is_critical_in_queue(exclude_task):
+        count -= 1
+    return count > 0
+
+
+async def _locked_wip_count(db: AsyncSession, user_id: UUID) -> int:
+    """Текущий WIP под блокировкой строки пользователя (после блокировки задачи)."""
+    result = await db.execute(
+        select(User.wip_count).where(User.id == user_id).with_for_update()
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def _lock_tasks(db: AsyncSession, task_ids: set[UUID]) -> dict[UUID, Task]:
+    """FOR UPDATE на набор задач в детерминированном порядке (по id), чтобы пакеты не взаимоблокировались."""
+    if not task_ids:
+        return {}
+    result = await db.execute(
+        select(Task).where(Task.id.in_(task_ids)).order_by(Task.id).with_for_update()
+    )
+    return {task.id: task for task in result.scalars().all()}
+
+
+def _batch_failure(task_id: UUID, error: HTTPException) -> QueueBatchItemResult:
+    return QueueBatchItemResult(
+        task_id=task_id,
+        ok=False,
+        status_code=error.status_code,
+        detail=str(error.detail),
+    )
+
+
+def _batch_success(task: Task) -> QueueBatchItemResult:
+    return QueueBatchItemResult(
+        task_id=task.id,
+        ok=True,
+        status_code=200,
+        task_status=task.status.value,
+        assignee_id=task.assignee_id,
     )
-    if exclude_task_id is not None:
-        stmt = stmt.where(Task.id != exclude_task_id)
-    result = await db.execute(stmt.limit(1))
-    return result.scalar_one_or_none() is not None
 
 
 async def get_available_tasks(
@@ -95,138 +137,16 @@ async def get_available_tasks(
     """
     Все задачи in_queue. category: "proactive" — только проактивные,
     "!proactive" — только обычные, None — все.
+    Строится из общего снимка очереди (services/queue_snapshot).
     """
-    now = datetime.now(timezone.utc)
+    from app.services.queue_snapshot import load_queue_rows
+
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if not user:
         return []
-
-    stmt = (
-        select(Task)
-        .where(Task.status == TaskStatus.in_queue)
-        .order_by(Task.priority.desc(), Task.created_at.asc())
-    )
-    if category == "proactive":
-        stmt = stmt.where(Task.task_type == TaskType.proactive)
-    elif category == "!proactive":
-        stmt = stmt.where(Task.task_type != TaskType.proactive)
-    result = await db.execute(stmt)
-    tasks = list(result.scalars().all())
-    has_critical_queue = await _critical_queue_exists(db)
-
-    wip_count_result = await db.execute(
-        select(func.count(Task.id)).where(
-            Task.assignee_id == user_id,
-            Task.status == TaskStatus.in_progress,
-        )
-    )
-    wip_count = wip_count_result.scalar() or 0
-    user_league_order = _LEAGUE_ORDER.get(user.league, 0)
-    can_pull_by_wip = wip_count < user.wip_limit
-    is_manager = user.role in (UserRole.teamlead, UserRole.admin)
-
-    estimator_ids = {t.estimator_id for t in tasks if t.estimator_id}
-    assigned_by_ids = {t.assigned_by_id for t in tasks if getattr(t, "assigned_by_id", None)}
-    estimator_map: dict[UUID, str] = {}
-    if estimator_ids:
-        est_result = await db.execute(
-            select(User.id, User.full_name).where(User.id.in_(estimator_ids))
-        )
-        estimator_map = {row.id: row.full_name for row in est_result.all()}
-    assigned_by_map: dict[UUID, str] = {}
-    if assigned_by_ids:
-        ab_result = await db.execute(
-            select(User.id, User.full_name).where(User.id.in_(assigned_by_ids))
-        )
-        assigned_by_map = {row.id: row.full_name for row in ab_result.all()}
-
-    available_priorities: list[TaskPriority] = []
-    for task in tasks:
-        task_league_order = _LEAGUE_ORDER.get(task.min_league, 0)
-        if (
-            user_league_order >= task_league_order
-            and can_pull_by_wip
-            and (not has_critical_queue or task.priority == TaskPriority.critical)
-        ):
-            available_priorities.append(task.priority)
-    top_priority = max(available_priorities, key=lambda p: _PRIORITY_ORDER.get(p, 0), default=None)
-
-    out: list[QueueTaskResponse] = []
-    for task in tasks:
-        hours_in_queue = (now - task.created_at).total_seconds() / 3600
-        is_stale = hours_in_queue > 48
-        critical_blocked = has_critical_queue and task.priority != TaskPriority.critical
-        can_assign = (
-            is_manager
-            and (task.priority == TaskPriority.critical or hours_in_queue > 24)
-            and not critical_blocked
-        )
-
-        task_league_order = _LEAGUE_ORDER.get(task.min_league, 0)
-        league_ok = user_league_order >= task_league_order
-        if critical_blocked:
-            can_pull = False
-            locked = True
-            lock_reason = CRITICAL_BLOCK_REASON
-        elif not league_ok:
-            can_pull = False
-            locked = True
-            lock_reason = f"Требуется Лига {task.min_league.value}"
-        elif not can_pull_by_wip:
-            can_pull = False
-            locked = False
-            lock_reason = "WIP-лимит исчерпан"
-        else:
-            can_pull = True
-            locked = False
-            lock_reason = None
-        if task.acceptance_owner_id == user.id:
-            can_pull = False
-            locked = True
-            lock_reason = "Нельзя выполнять задачу, за приемку которой вы отвечаете"
-
-        recommended = (
-            can_pull
-            and not locked
-            and top_priority is not None
-            and task.priority == top_priority
-        )
-        estimator_name = estimator_map.get(task.estimator_id) if task.estimator_id else None
-        assigned_by_name = assigned_by_map.get(task.assigned_by_id) if getattr(task, "assigned_by_id", None) else None
-
-        is_proactive = task.task_type == TaskType.proactive or getattr(task, "is_proactive", False)
-        out.append(
-            QueueTaskResponse(
-                id=task.id,
-                task_number=task.task_number,
-                title=task.title,
-                description=task.description,
-                task_type=task.task_type.value,
-                complexity=task.complexity.value,
-                estimated_q=float(task.estimated_q),
-                priority=task.priority.value,
-                min_league=task.min_league.value,
-                created_at=task.created_at,
-                estimator_name=estimator_name,
-                due_date=task.due_date,
-                deadline_zone=compute_deadline_zone(task),
-                is_proactive=is_proactive,
-                can_pull=can_pull,
-                locked=locked,
-                lock_reason=lock_reason,
-                tags=getattr(task, "tags", None) or [],
-                is_stale=is_stale,
-                hours_in_queue=round(hours_in_queue, 1),
-                can_assign=can_assign,
-                recommended=recommended,
-                assigned_by_name=assigned_by_name,
-                acceptance_mode=task.acceptance_mode,
-                acceptance_total_count=task.acceptance_total_count,
-                acceptance_required_count=task.acceptance_required_count,
-            )
-        )
-    return out
+    rows = await load_queue_rows(db, user, category)
+    return [QueueTaskResponse.model_validate_json(row) for row in rows]
 
 
 async def pull_task(db: AsyncSession, user_id: UUID, task_id: UUID) -> Task:
@@ -249,17 +169,11 @@ async def pull_task(db: AsyncSession, user_id: UUID, task_id: UUID) -> Task:
             status_code=400,
             detail="Нельзя выполнять задачу, за приемку которой вы отвечаете",
         )
-    if task.priority != TaskPriority.critical and await _critical_queue_exists(db, exclude_task_id=task.id):
+    if task.priority != TaskPriority.critical and await _critical_queue_exists(db, exclude_task=task):
         raise HTTPException(status_code=400, detail=CRITICAL_BLOCK_REASON)
     if _LEAGUE_ORDER.get(user.league, 0) < _LEAGUE_ORDER.get(task.min_league, 0):
         raise HTTPException(status_code=400, detail="Недостаточный уровень лиги")
-    wip_count_result = await db.execute(
-        select(func.count(Task.id)).where(
-            Task.assignee_id == user_id,
-            Task.status == TaskStatus.in_progress,
-        )
-    )
-    wip_count = wip_count_result.scalar() or 0
+    wip_count = await _locked_wip_count(db, user_id)
     if wip_count >= user.wip_limit:
         raise HTTPException(status_code=400, detail="WIP-лимит исчерпан")
 
@@ -300,7 +214,7 @@ async def pull_task(db: AsyncSession, user_id: UUID, task_id: UUID) -> Task:
     )
     current_focus = current_focus_result.scalar_one_or_none()
     if current_focus and current_focus.focus_started_at is not None:
-        added = add_bounded_focus_time(current_focus, now)
+        added = await stop_focus(db, current_focus, now, "pulled_another_task")
         await record_activity_event(
             db,
             user_id,
@@ -315,6 +229,7 @@ async def pull_task(db: AsyncSession, user_id: UUID, task_id: UUID) -> Task:
         )
 
     task.focus_started_at = now
+    open_focus_session(db, user_id, task.id, now)
     await record_activity_event(
         db,
         user_id,
@@ -360,7 +275,7 @@ async def submit_for_review(
     # Если задача в фокусе — зафиксировать время и снять с фокуса
     now = datetime.now(timezone.utc)
     if task.focus_started_at:
-        added = add_bounded_focus_time(task, now)
+        added = await stop_focus(db, task, now, "submit_for_review")
         await record_activity_event(
             db,
             user_id,
@@ -407,86 +322,86 @@ async def submit_for_review(
     return task
 
 
-async def validate_task(
+async def _check_validation(
     db: AsyncSession,
-    validator_id: UUID,
-    task_id: UUID,
+    task: Task,
+    validator: User | None,
     approved: bool,
-    comment: str | None = None,
-) -> Task:
-    """
-    Принять или отклонить. Принимает назначенный владелец приемки;
-    admin может вмешаться только с обязательным объяснением.
-    """
-    result = await db.execute(select(Task).where(Task.id == task_id).with_for_update())
-    task = result.scalar_one_or_none()
-    if not task:
-        raise HTTPException(status_code=404, detail="Задача не найдена")
+    comment: str | None,
+) -> None:
+    """Проверки перед приемкой/возвратом; ничего не изменяют."""
     if task.status != TaskStatus.review:
         raise HTTPException(status_code=400, detail="Задача не на проверке")
-
-    validator_result = await db.execute(select(User).where(User.id == validator_id))
-    validator = validator_result.scalar_one_or_none()
     if not validator:
         raise HTTPException(status_code=404, detail="Валидатор не найден")
-    if task.assignee_id == validator_id:
+    if task.assignee_id == validator.id:
         raise HTTPException(status_code=400, detail="Нельзя валидировать свою задачу")
-    is_acceptance_owner = task.acceptance_owner_id == validator_id
+    is_acceptance_owner = task.acceptance_owner_id == validator.id
     if not is_acceptance_owner and validator.role != UserRole.admin:
         raise HTTPException(status_code=403, detail="Задачу принимает назначенный ответственный")
     if not is_acceptance_owner and not (comment and comment.strip()):
         raise HTTPException(status_code=400, detail="Admin override требует комментарий")
-
     if not approved:
         if not (comment and comment.strip()):
             raise HTTPException(status_code=400, detail="При возврате комментарий обязателен")
+        return
+    await ensure_criteria_ready_for_final_acceptance(db, task)
+
+
+async def _apply_validation(
+    db: AsyncSession,
+    task: Task,
+    validator_id: UUID,
+    assignee: User | None,
+    approved: bool,
+    comment: str | None,
+    credits: list[QCredit],
+) -> None:
+    """
+    Применить проверенное решение. assignee заблокирован вызывающим кодом,
+    начисления Q добавляются в credits и проводятся одним пакетом.
+    """
+    from app.services.notifications import create_notification
+
+    if not approved:
         task.status = TaskStatus.in_progress
         task.validator_id = None
         task.validated_at = None
         task.completed_at = None
         task.rejection_comment = comment.strip()
         task.acceptance_state = "returned"
+        rejected_at = datetime.now(timezone.utc)
         # При возврате задача не должна оставаться в фокусе
-        task.focus_started_at = None
+        await discard_focus(db, task, rejected_at)
         # Счётчик возвратов
         task.rejection_count = (getattr(task, "rejection_count", 0) or 0) + 1
-        rejected_at = datetime.now(timezone.utc)
 
         # Quality Score: штраф за возврат
-        if task.assignee_id:
-            assignee_result = await db.execute(
-                select(User).where(User.id == task.assignee_id).with_for_update()
-            )
-            assignee = assignee_result.scalar_one_or_none()
-            if assignee:
-                old_score = float(getattr(assignee, "quality_score", 100.0))
-                new_score = max(0.0, round(old_score - 5.0, 1))
-                assignee.quality_score = new_score
-
-                # Уведомление тимлидов при падении ниже 50
-                if new_score < 50.0 <= old_score:
-                    from app.services.notifications import create_notification
-
-                    teamleads_result = await db.execute(
-                        select(User).where(
-                            User.role.in_([UserRole.teamlead, UserRole.admin]),
-                            User.is_active.is_(True),
-                        )
+        if assignee:
+            old_score = float(getattr(assignee, "quality_score", 100.0))
+            new_score = max(0.0, round(old_score - 5.0, 1))
+            assignee.quality_score = new_score
+
+            # Уведомление тимлидов при падении ниже 50
+            if new_score < 50.0 <= old_score:
+                teamleads_result = await db.execute(
+                    select(User).where(
+                        User.role.in_([UserRole.teamlead, UserRole.admin]),
+                        User.is_active.is_(True),
+                    )
+                )
+                for tl in teamleads_result.scalars().all():
+                    await create_notification(
+                        db,
+                        tl.id,
+                        "quality_alert",
+                        "⚠️ Низкий Quality Score",
+                        message=f"{assignee.full_name}: Quality Score упал до {new_score:.0f}%",
+                        link=f"/profile?user_id={assignee.id}",
                     )
-                    for tl in teamleads_result.scalars().all():
-                        await create_notification(
-                            db,
-                            tl.id,
-                            "quality_alert",
-                            "⚠️ Низкий Quality Score",
-                            message=f"{assignee.full_name}: Quality Score упал до {new_score:.0f}%",
-                            link=f"/profile?user_id={assignee.id}",
-                        )
 
         await db.flush()
         if task.assignee_id:
-            from app.services.notifications import create_notification
-
             await create_notification(
                 db,
                 task.assignee_id,
@@ -515,11 +430,9 @@ async def validate_task(
             },
             occurred_at=rejected_at,
         )
-        await db.flush()
-        return task
+        return
 
     # Принятие задачи
-    await ensure_criteria_ready_for_final_acceptance(db, task)
     validated_at = datetime.now(timezone.utc)
     task.status = TaskStatus.done
     task.validator_id = validator_id
@@ -528,13 +441,6 @@ async def validate_task(
     task.is_overdue = False
     task.acceptance_state = "accepted"
 
-    assignee = None
-    if task.assignee_id:
-        assignee_result = await db.execute(
-            select(User).where(User.id == task.assignee_id).with_for_update()
-        )
-        assignee = assignee_result.scalar_one_or_none()
-
     if task.assignee_id:
         # Начисление Q
         if task.task_type == TaskType.bugfix and task.parent_task_id:
@@ -556,13 +462,14 @@ async def validate_task(
             # Если est_q == 0 — автор чинит бесплатно, без начисления Q
         else:
             # Обычная задача: начисление Q по стандартным правилам
-            await credit_q(
-                db,
-                task.assignee_id,
-                task.estimated_q,
-                reason=f"Задача #{task.id} принята",
-                task_id=task.id,
-                idempotency_prefix=f"task:{task.id}:acceptance:{task.acceptance_revision}",
+            credits.append(
+                QCredit(
+                    user_id=task.assignee_id,
+                    amount=task.estimated_q,
+                    reason=f"Задача #{task.id} принята",
+                    task_id=task.id,
+                    idempotency_prefix=f"task:{task.id}:acceptance:{task.acceptance_revision}",
+                )
             )
 
         # Quality Score: бонус за успешную валидацию
@@ -571,8 +478,6 @@ async def validate_task(
             new_score = min(100.0, round(old_score + 1.0, 1))
             assignee.quality_score = new_score
 
-        from app.services.notifications import create_notification
-
         await create_notification(
             db,
             task.assignee_id,
@@ -599,10 +504,99 @@ async def validate_task(
         occurred_at=validated_at,
     )
 
+
+async def validate_task(
+    db: AsyncSession,
+    validator_id: UUID,
+    task_id: UUID,
+    approved: bool,
+    comment: str | None = None,
+) -> Task:
+    """
+    Принять или отклонить. Принимает назначенный владелец приемки;
+    admin может вмешаться только с обязательным объяснением.
+    """
+    result = await db.execute(select(Task).where(Task.id == task_id).with_for_update())
+    task = result.scalar_one_or_none()
+    if not task:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    if task.status != TaskStatus.review:
+        raise HTTPException(status_code=400, detail="Задача не на проверке")
+
+    validator = await entity_loader(db).load(User, validator_id)
+    await _check_validation(db, task, validator, approved, comment)
+
+    assignee = None
+    if task.assignee_id:
+        assignee_result = await db.execute(
+            select(User).where(User.id == task.assignee_id).with_for_update()
+        )
+        assignee = assignee_result.scalar_one_or_none()
+
+    credits: list[QCredit] = []
+    await _apply_validation(db, task, validator_id, assignee, approved, comment, credits)
+    await credit_q_batch(db, credits)
     await db.flush()
     return task
 
 
+async def validate_tasks_batch(
+    db: AsyncSession,
+    validator_id: UUID,
+    items: list[ValidateBatchItem],
+) -> list[QueueBatchItemResult]:
+    """
+    Пакетная приемка/возврат. Задачи и кошельки исполнителей блокируются
+    один раз в порядке id, начисления Q проводятся одним пакетом. Ошибка
+    одной позиции не откатывает остальные: проверки выполняются до
+    изменений, результат возвращается по каждой позиции.
+    """
+    validator = await entity_loader(db).load(User, validator_id)
+    if not validator:
+        raise HTTPException(status_code=404, detail="Валидатор не найден")
+
+    tasks = await _lock_tasks(db, {item.task_id for item in items})
+    assignee_ids = {task.assignee_id for task in tasks.values() if task.assignee_id}
+    assignees: dict[UUID, User] = {}
+    if assignee_ids:
+        assignees_result = await db.execute(
+            select(User)
+            .where(User.id.in_(assignee_ids))
+            .order_by(User.id)
+            .with_for_update()
+        )
+        assignees = {user.id: user for user in assignees_result.scalars().all()}
+
+    credits: list[QCredit] = []
+    results: list[QueueBatchItemResult] = []
+    seen: set[UUID] = set()
+    for item in items:
+        task = tasks.get(item.task_id)
+        try:
+            if item.task_id in seen:
+                raise HTTPException(status_code=400, detail=DUPLICATE_BATCH_ITEM)
+            seen.add(item.task_id)
+            if not task:
+                raise HTTPException(status_code=404, detail="Задача не найдена")
+            await _check_validation(db, task, validator, item.approved, item.comment)
+        except HTTPException as error:
+            results.append(_batch_failure(item.task_id, error))
+            continue
+        await _apply_validation(
+            db,
+            task,
+            validator_id,
+            assignees.get(task.assignee_id) if task.assignee_id else None,
+            item.approved,
+            item.comment,
+            credits,
+        )
+        results.append(_batch_success(task))
+    await credit_q_batch(db, credits)
+    await db.flush()
+    return results
+
+
 async def create_bugfix(
     db: AsyncSession,
     reporter_id: UUID,
@@ -767,43 +761,24 @@ async def check_overdue_tasks(db: AsyncSession) -> None:
                     link="/queue",
                 )
             )
+    touch_badges(db, [tl.id for tl in teamleads])
 
 
-async def assign_task(
-    db: AsyncSession,
-    assigner_id: UUID,
-    task_id: UUID,
-    executor_id: UUID,
-    comment: str | None = None,
-) -> Task:
-    """
-    Тимлид назначает задачу на исполнителя. Админ может назначить на исполнителя или тимлида.
-    Задача должна быть in_queue; non-critical назначается после 24ч в очереди.
-    Исполнитель: league >= task.min_league, WIP свободен.
-    """
-    assigner_result = await db.execute(select(User).where(User.id == assigner_id))
-    assigner = assigner_result.scalar_one_or_none()
-    if not assigner or assigner.role not in (UserRole.teamlead, UserRole.admin):
-        raise HTTPException(status_code=403, detail="Только тимлид или админ может назначать задачи")
-
-    task_result = await db.execute(select(Task).where(Task.id == task_id).with_for_update())
-    task = task_result.scalar_one_or_none()
-    if not task:
-        raise HTTPException(status_code=404, detail="Задача не найдена")
+def _check_assignable_task(task: Task, *, critical_blocked: bool, now: datetime) -> None:
     if task.status != TaskStatus.in_queue:
         raise HTTPException(status_code=400, detail="Задача не в очереди")
-    if task.priority != TaskPriority.critical and await _critical_queue_exists(db, exclude_task_id=task.id):
+    if task.priority != TaskPriority.critical and critical_blocked:
         raise HTTPException(status_code=400, detail=CRITICAL_BLOCK_REASON)
 
-    hours_in_queue = (datetime.now(timezone.utc) - task.created_at).total_seconds() / 3600
+    hours_in_queue = (now - task.created_at).total_seconds() / 3600
     if task.priority != TaskPriority.critical and hours_in_queue < 24:
         raise HTTPException(
             status_code=400,
             detail="Назначить можно только задачу, которая в очереди более 24 часов",
         )
 
-    executor_result = await db.execute(select(User).where(User.id == executor_id))
-    executor = executor_result.scalar_one_or_none()
+
+def _check_executor(assigner: User, task: Task, executor: User | None, wip_count: int) -> None:
     if not executor:
         raise HTTPException(status_code=404, detail="Исполнитель не найден")
     allowed_executor_roles = (UserRole.executor,)
@@ -821,21 +796,21 @@ async def assign_task(
         )
     if _LEAGUE_ORDER.get(executor.league, 0) < _LEAGUE_ORDER.get(task.min_league, 0):
         raise HTTPException(status_code=400, detail="У исполнителя недостаточный уровень лиги")
-
-    wip_count_result = await db.execute(
-        select(func.count(Task.id)).where(
-            Task.assignee_id == executor_id,
-            Task.status == TaskStatus.in_progress,
-        )
-    )
-    wip_count = wip_count_result.scalar() or 0
     if wip_count >= executor.wip_limit:
         raise HTTPException(status_code=400, detail="У исполнителя исчерпан WIP-лимит")
 
+
+async def _apply_assignment(
+    db: AsyncSession,
+    assigner: User,
+    task: Task,
+    executor: User,
+    comment: str | None,
+) -> None:
     now = datetime.now(timezone.utc)
     task.status = TaskStatus.in_progress
-    task.assignee_id = executor_id
-    task.assigned_by_id = assigner_id
+    task.assignee_id = executor.id
+    task.assigned_by_id = assigner.id
     task.started_at = now
 
     if task.due_date is None:
@@ -852,41 +827,138 @@ async def assign_task(
 
     await record_activity_event(
         db,
-        assigner_id,
+        assigner.id,
         "task_assigned",
         task_id=task.id,
-        metadata={"executor_id": executor_id, "comment": comment, "estimated_q": float(task.estimated_q)},
+        metadata={"executor_id": executor.id, "comment": comment, "estimated_q": float(task.estimated_q)},
         occurred_at=now,
     )
 
     from app.services.notifications import create_notification
     await create_notification(
         db,
-        executor_id,
+        executor.id,
         "task_assigned",
         "Вам назначена задача",
         message=f"Вам назначена задача «{task.title}» тимлидом {assigner.full_name}",
         link="/my-tasks",
     )
+
+
+async def _load_assigner(db: AsyncSession, assigner_id: UUID) -> User:
+    assigner = await entity_loader(db).load(User, assigner_id)
+    if not assigner or assigner.role not in (UserRole.teamlead, UserRole.admin):
+        raise HTTPException(status_code=403, detail="Только тимлид или админ может назначать задачи")
+    return assigner
+
+
+async def assign_task(
+    db: AsyncSession,
+    assigner_id: UUID,
+    task_id: UUID,
+    executor_id: UUID,
+    comment: str | None = None,
+) -> Task:
+    """
+    Тимлид назначает задачу на исполнителя. Админ может назначить на исполнителя или тимлида.
+    Задача должна быть in_queue; non-critical назначается после 24ч в очереди.
+    Исполнитель: league >= task.min_league, WIP свободен.
+    """
+    assigner = await _load_assigner(db, assigner_id)
+
+    task_result = await db.execute(select(Task).where(Task.id == task_id).with_for_update())
+    task = task_result.scalar_one_or_none()
+    if not task:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    if task.status != TaskStatus.in_queue:
+        raise HTTPException(status_code=400, detail="Задача не в очереди")
+    critical_blocked = task.priority != TaskPriority.critical and await _critical_queue_exists(
+        db, exclude_task=task
+    )
+    _check_assignable_task(task, critical_blocked=critical_blocked, now=datetime.now(timezone.utc))
+
+    executor_result = await db.execute(
+        select(User)
+        .where(User.id == executor_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    executor = executor_result.scalar_one_or_none()
+    _check_executor(assigner, task, executor, executor.wip_count if executor else 0)
+
+    await _apply_assignment(db, assigner, task, executor, comment)
     return task
 
 
+async def assign_tasks_batch(
+    db: AsyncSession,
+    assigner_id: UUID,
+    items: list[AssignBatchItem],
+    comment: str | None = None,
+) -> list[QueueBatchItemResult]:
+    """
+    Пакетное назначение. Задачи, затем исполнители блокируются одним
+    запросом каждые в порядке id; WIP берется из users.wip_count, который
+    обновляется при каждом flush назначения. Критические задачи пакета
+    назначаются первыми, чтобы снять блокировку очереди для остальных.
+    Результаты — в порядке запроса.
+    """
+    assigner = await _load_assigner(db, assigner_id)
+    tasks = await _lock_tasks(db, {item.task_id for item in items})
+    executors_result = await db.execute(
+        select(User)
+        .where(User.id.in_({item.executor_id for item in items}))
+        .order_by(User.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    executors = {user.id: user for user in executors_result.scalars().all()}
+    critical_remaining = await critical_in_queue(db)
+
+    def critical_first(index: int) -> int:
+        task = tasks.get(items[index].task_id)
+        return 0 if task is not None and task.priority == TaskPriority.critical else 1
+
+    results: dict[int, QueueBatchItemResult] = {}
+    seen: set[UUID] = set()
+    now = datetime.now(timezone.utc)
+    for index in sorted(range(len(items)), key=critical_first):
+        item = items[index]
+        task = tasks.get(item.task_id)
+        executor = executors.get(item.executor_id)
+        try:
+            if item.task_id in seen:
+                raise HTTPException(status_code=400, detail=DUPLICATE_BATCH_ITEM)
+            seen.add(item.task_id)
+            if not task:
+                raise HTTPException(status_code=404, detail="Задача не найдена")
+            _check_assignable_task(
+                task,
+                critical_blocked=critical_remaining - int(_is_critical_in_queue(task)) > 0,
+                now=now,
+            )
+            _check_executor(assigner, task, executor, executor.wip_count if executor else 0)
+        except HTTPException as error:
+            results[index] = _batch_failure(item.task_id, error)
+            continue
+        critical_remaining -= int(_is_critical_in_queue(task))
+        await _apply_assignment(db, assigner, task, executor, comment)
+        results[index] = _batch_success(task)
+    return [results[index] for index in range(len(items))]
+
+
 async def get_assign_candidates(db: AsyncSession, task_id: UUID, assigner_id: UUID) -> list[dict]:
     """
     Список кандидатов для назначения задачи.
     Teamlead видит активных исполнителей, admin — исполнителей и тимлидов.
     """
-    result = await db.execute(select(Task).where(Task.id == task_id))
-    task = result.scalar_one_or_none()
+    task = await entity_loader(db).load(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Задача не найдена")
     if task.status != TaskStatus.in_queue:
         raise HTTPException(status_code=400, detail="Задача не в очереди")
 
-    assigner_result = await db.execute(select(User).where(User.id == assigner_id))
-    assigner = assigner_result.scalar_one_or_none()
-    if not assigner or assigner.role not in (UserRole.teamlead, UserRole.admin):
-        raise HTTPException(status_code=403, detail="Только тимлид или админ может назначать задачи")
+    assigner = await _load_assigner(db, assigner_id)
 
     candidate_roles = [UserRole.executor]
     if assigner.role == UserRole.admin:
@@ -906,13 +978,7 @@ async def get_assign_candidates(db: AsyncSession, task_id: UUID, assigner_id: UU
             continue
         if _LEAGUE_ORDER.get(u.league, 0) < task_league_order:
             continue
-        wip_result = await db.execute(
-            select(func.count(Task.id)).where(
-                Task.assignee_id == u.id,
-                Task.status == TaskStatus.in_progress,
-            )
-        )
-        wip_current = wip_result.scalar() or 0
+        wip_current = u.wip_count
         wip_limit = u.wip_limit or 2
         is_available = wip_current < wip_limit
         out.append({
@@ -968,11 +1034,13 @@ async def check_stale_tasks(db: AsyncSession) -> None:
     )
     recent_links = {link for link in recent_result.scalars().all() if link}
 
+    notified = False
     for task in stale_tasks:
         hours = int((now - task.created_at).total_seconds() / 3600)
         link = links_by_task_id[task.id]
         if link in recent_links:
             continue
+        notified = True
         for tl in teamleads:
             db.add(
                 Notification(
@@ -983,4 +1051,6 @@ async def check_stale_tasks(db: AsyncSession) -> None:
                     link=link,
                 )
             )
+    if notified:
+        touch_badges(db, [tl.id for tl in teamleads])
     await db.flush()
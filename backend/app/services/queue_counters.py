@@ -0,0 +1,262 @@
+"""Write-maintained queue counters: per-user WIP, critical tasks in queue, queue version."""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import event as sa_event, func, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.task import QueueStats, Task, TaskPriority, TaskStatus
+from app.models.user import User
+from app.services.realtime import TOPIC_DASHBOARD, TOPIC_QUEUE, publish_after_commit
+
+QUEUE_STATS_ID = 1
+_TRACKED_FIELDS = ("status", "assignee_id", "priority")
+
+
+def _contribution(values: dict) -> tuple[UUID | None, int]:
+    """(пользователь, которому задача добавляет WIP; 1 если задача критическая в очереди)."""
+    wip_user = values["assignee_id"] if values["status"] == TaskStatus.in_progress else None
+    critical = int(
+        values["status"] == TaskStatus.in_queue
+        and values["priority"] == TaskPriority.critical
+    )
+    return wip_user, critical
+
+
+def _current_values(task: Task) -> dict:
+    return {name: getattr(task, name) for name in _TRACKED_FIELDS}
+
+
+def _previous_values(task: Task) -> dict:
+    state = inspect(task)
+    values = {}
+    for name in _TRACKED_FIELDS:
+        history = state.attrs[name].history
+        values[name] = history.deleted[0] if history.deleted else getattr(task, name)
+    return values
+
+
+def _apply(deltas: Counter, critical: list[int], values: dict, sign: int) -> None:
+    wip_user, is_critical = _contribution(values)
+    if wip_user is not None:
+        deltas[wip_user] += sign
+    critical[0] += sign * is_critical
+
+
+def _changes_board(previous: dict, current: dict) -> bool:
+    """Смена статуса или исполнителя видна на дашборде (WIP, нагрузка, burndown)."""
+    return (
+        previous["status"] != current["status"]
+        or previous["assignee_id"] != current["assignee_id"]
+    )
+
+
+def _touches_queue(task: Task, previous: dict | None) -> bool:
+    """Изменение видно в очереди: задача в ней была или в нее попала."""
+    if task.status == TaskStatus.in_queue:
+        return True
+    return previous is not None and previous["status"] == TaskStatus.in_queue
+
+
+def _critical_count_statement():
+    return select(func.count(Task.id)).where(
+        Task.status == TaskStatus.in_queue,
+        Task.priority == TaskPriority.critical,
+    )
+
+
+@sa_event.listens_for(Session, "after_flush")
+def _maintain_queue_counters(session: Session, flush_context) -> None:
+    """
+    Apply WIP and critical-queue deltas for flushed task transitions.
+
+    Runs in the same transaction as the transition, after the task row is
+    already locked by the caller. User rows are updated in id order; loaded
+    User objects get the new value as committed state, so checks later in
+    the same session see it without a reload. Any change to a task that is
+    or was in the queue bumps queue_version, which invalidates the shared
+    queue snapshot and notifies "queue" subscribers after commit; status or
+    assignee changes also notify "dashboard" subscribers.
+    """
+    deltas: Counter[UUID] = Counter()
+    critical = [0]
+    queue_touched = False
+    board_touched = False
+    for task in session.new:
+        if isinstance(task, Task):
+            _apply(deltas, critical, _current_values(task), 1)
+            queue_touched = queue_touched or _touches_queue(task, None)
+            board_touched = True
+    for task in session.dirty:
+        if isinstance(task, Task) and session.is_modified(task):
+            previous = _previous_values(task)
+            current = _current_values(task)
+            _apply(deltas, critical, current, 1)
+            _apply(deltas, critical, previous, -1)
+            queue_touched = queue_touched or _touches_queue(task, previous)
+            board_touched = board_touched or _changes_board(previous, current)
+    for task in session.deleted:
+        if isinstance(task, Task):
+            previous = _previous_values(task)
+            _apply(deltas, critical, previous, -1)
+            queue_touched = queue_touched or previous["status"] == TaskStatus.in_queue
+            board_touched = True
+
+    if queue_touched:
+        publish_after_commit(session, TOPIC_QUEUE)
+    if board_touched:
+        publish_after_commit(session, TOPIC_DASHBOARD)
+
+    connection = session.connection()
+    users = User.__table__
+    for user_id in sorted((uid for uid, delta in deltas.items() if delta), key=str):
+        new_value = connection.execute(
+            update(users)
+            .where(users.c.id == user_id)
+            .values(wip_count=users.c.wip_count + deltas[user_id])
+            .returning(users.c.wip_count)
+        ).scalar_one_or_none()
+        loaded = session.identity_map.get(session.identity_key(User, user_id))
+        if loaded is not None and new_value is not None:
+            set_committed_value(loaded, "wip_count", new_value)
+
+    if critical[0] or queue_touched:
+        stats = QueueStats.__table__
+        now = datetime.now(timezone.utc)
+        updated = connection.execute(
+            update(stats)
+            .where(stats.c.id == QUEUE_STATS_ID)
+            .values(
+                critical_in_queue=stats.c.critical_in_queue + critical[0],
+                queue_version=stats.c.queue_version + 1,
+                updated_at=now,
+            )
+            .returning(stats.c.id)
+        ).scalar_one_or_none()
+        if updated is None:
+            # Строки нет (база поднята без миграции) — пересчитать: запрос уже видит flush.
+            recount = connection.execute(_critical_count_statement()).scalar_one()
+            connection.execute(
+                insert(stats)
+                .values(
+                    id=QUEUE_STATS_ID,
+                    critical_in_queue=recount,
+                    queue_version=1,
+                    updated_at=now,
+                )
+                .on_conflict_do_update(
+                    index_elements=[stats.c.id],
+                    set_={
+                        "critical_in_queue": recount,
+                        "queue_version": stats.c.queue_version + 1,
+                        "updated_at": now,
+                    },
+                )
+            )
+
+
+async def queue_state(db: AsyncSession) -> tuple[int, int]:
+    """(queue_version, critical_in_queue) одним чтением строки."""
+    row = (
+        await db.execute(
+            select(QueueStats.queue_version, QueueStats.critical_in_queue).where(
+                QueueStats.id == QUEUE_STATS_ID
+            )
+        )
+    ).one_or_none()
+    if row is None:
+        return 0, (await db.execute(_critical_count_statement())).scalar_one()
+    return int(row.queue_version), row.critical_in_queue
+
+
+async def critical_in_queue(db: AsyncSession) -> int:
+    """Критические задачи в очереди — чтение одной строки."""
+    result = await db.execute(
+        select(QueueStats.critical_in_queue).where(QueueStats.id == QUEUE_STATS_ID)
+    )
+    value = result.scalar_one_or_none()
+    if value is None:
+        return (await db.execute(_critical_count_statement())).scalar_one()
+    return value
+
+
+@dataclass
+class QueueCounterDrift:
+    scope: str
+    key: str
+    stored: int
+    expected: int
+
+
+async def verify_queue_counters(
+    db: AsyncSession,
+    *,
+    repair: bool = False,
+) -> list[QueueCounterDrift]:
+    """Сравнить счётчики с пересчетом по задачам; при repair — исправить."""
+    drifts: list[QueueCounterDrift] = []
+    expected_wip = {
+        assignee_id: int(count)
+        for assignee_id, count in (
+            await db.execute(
+                select(Task.assignee_id, func.count(Task.id))
+                .where(
+                    Task.status == TaskStatus.in_progress,
+                    Task.assignee_id.is_not(None),
+                )
+                .group_by(Task.assignee_id)
+            )
+        ).all()
+    }
+    stored_wip = (
+        await db.execute(select(User.id, User.wip_count).order_by(User.id))
+    ).all()
+    for user_id, stored in stored_wip:
+        expected = expected_wip.get(user_id, 0)
+        if stored == expected:
+            continue
+        drifts.append(QueueCounterDrift("user_wip", str(user_id), stored, expected))
+        if repair:
+            await db.execute(
+                update(User.__table__)
+                .where(User.__table__.c.id == user_id)
+                .values(wip_count=expected)
+            )
+
+    expected_critical = (await db.execute(_critical_count_statement())).scalar_one()
+    stored_critical = (
+        await db.execute(
+            select(QueueStats.critical_in_queue).where(QueueStats.id == QUEUE_STATS_ID)
+        )
+    ).scalar_one_or_none()
+    if stored_critical != expected_critical:
+        drifts.append(
+            QueueCounterDrift(
+                "queue_stats",
+                "critical_in_queue",
+                -1 if stored_critical is None else stored_critical,
+                expected_critical,
+            )
+        )
+        if repair:
+            now = datetime.now(timezone.utc)
+            await db.execute(
+                insert(QueueStats.__table__)
+                .values(id=QUEUE_STATS_ID, critical_in_queue=expected_critical, updated_at=now)
+                .on_conflict_do_update(
+                    index_elements=[QueueStats.__table__.c.id],
+                    set_={
+                        "critical_in_queue": expected_critical,
+                        "queue_version": QueueStats.__table__.c.queue_version + 1,
+                        "updated_at": now,
+                    },
+                )
+            )
+    return drifts
@@ -0,0 +1,268 @@
+"""
+Общий снимок очереди для /api/queue.
+
+Содержимое очереди одинаково для всех; от пользователя зависят только
+can_pull/locked/recommended (лига, WIP, роль), от времени — часы в очереди,
+stale, can_assign и зона дедлайна. Снимок хранит строки задач, уже
+сериализованные в JSON без этих полей, и пересобирается только когда
+queue_stats.queue_version меняется (см. services/queue_counters). На каждый
+запрос остается чтение одной строки queue_stats и дешевый проход overlay.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.task import Task, TaskPriority, TaskStatus, TaskType
+from app.models.user import User, UserRole
+from app.schemas.queue import QueueTaskResponse
+from app.schemas.task import compute_deadline_zone
+from app.services.queue_counters import queue_state
+
+# Поля ответа, вычисляемые на каждый запрос поверх снимка.
+OVERLAY_FIELDS = (
+    "deadline_zone",
+    "can_pull",
+    "locked",
+    "lock_reason",
+    "is_stale",
+    "hours_in_queue",
+    "can_assign",
+    "recommended",
+)
+
+
+@dataclass(slots=True)
+class SnapshotRow:
+    prefix: bytes  # JSON-объект статичных полей без закрывающей скобки
+    task_type: TaskType
+    priority: TaskPriority
+    min_league: object
+    acceptance_owner_id: UUID | None
+    created_at: datetime
+    due_date: datetime | None
+    started_at: datetime | None
+
+
+@dataclass(slots=True)
+class QueueSnapshot:
+    version: int
+    built_at: float
+    rows: list[SnapshotRow]
+
+
+def _serialize_row(task: Task, estimator_name: str | None, assigned_by_name: str | None) -> SnapshotRow:
+    is_proactive = task.task_type == TaskType.proactive or getattr(task, "is_proactive", False)
+    payload = QueueTaskResponse(
+        id=task.id,
+        task_number=task.task_number,
+        title=task.title,
+        description=task.description,
+        task_type=task.task_type.value,
+        complexity=task.complexity.value,
+        estimated_q=float(task.estimated_q),
+        priority=task.priority.value,
+        min_league=task.min_league.value,
+        created_at=task.created_at,
+        estimator_name=estimator_name,
+        due_date=task.due_date,
+        is_proactive=is_proactive,
+        can_pull=False,
+        locked=False,
+        lock_reason=None,
+        tags=getattr(task, "tags", None) or [],
+        assigned_by_name=assigned_by_name,
+        acceptance_mode=task.acceptance_mode,
+        acceptance_total_count=task.acceptance_total_count,
+        acceptance_required_count=task.acceptance_required_count,
+    ).model_dump(mode="json", exclude=set(OVERLAY_FIELDS))
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return SnapshotRow(
+        prefix=encoded[:-1].encode(),
+        task_type=task.task_type,
+        priority=task.priority,
+        min_league=task.min_league,
+        acceptance_owner_id=task.acceptance_owner_id,
+        created_at=task.created_at,
+        due_date=task.due_date,
+        started_at=task.started_at,
+    )
+
+
+async def _build_snapshot(db: AsyncSession, version: int) -> QueueSnapshot:
+    result = await db.execute(
+        select(Task)
+        .where(Task.status == TaskStatus.in_queue)
+        .order_by(Task.priority.desc(), Task.created_at.asc())
+    )
+    tasks = list(result.scalars().all())
+    user_ids = {t.estimator_id for t in tasks if t.estimator_id}
+    user_ids |= {t.assigned_by_id for t in tasks if getattr(t, "assigned_by_id", None)}
+    names: dict[UUID, str] = {}
+    if user_ids:
+        names_result = await db.execute(
+            select(User.id, User.full_name).where(User.id.in_(user_ids))
+        )
+        names = {row.id: row.full_name for row in names_result.all()}
+    rows = [
+        _serialize_row(
+            task,
+            names.get(task.estimator_id) if task.estimator_id else None,
+            names.get(task.assigned_by_id) if getattr(task, "assigned_by_id", None) else None,
+        )
+        for task in tasks
+    ]
+    return QueueSnapshot(version=version, built_at=time.monotonic(), rows=rows)
+
+
+class QueueSnapshotCache:
+    """Снимок очереди в процессе воркера; пересборка одна на версию (single-flight)."""
+
+    def __init__(self) -> None:
+        self._snapshot: QueueSnapshot | None = None
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.rebuilds = 0
+
+    def _fresh(self, version: int) -> QueueSnapshot | None:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != version:
+            return None
+        if time.monotonic() - snapshot.built_at > settings.QUEUE_SNAPSHOT_MAX_AGE_SECONDS:
+            return None
+        return snapshot
+
+    async def get(self, db: AsyncSession, version: int) -> QueueSnapshot:
+        snapshot = self._fresh(version)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+        async with self._lock:
+            snapshot = self._fresh(version)
+            if snapshot is None:
+                snapshot = await _build_snapshot(db, version)
+                self._snapshot = snapshot
+                self.rebuilds += 1
+            else:
+                self.hits += 1
+            return snapshot
+
+    def clear(self) -> None:
+        self._snapshot = None
+
+
+queue_snapshot_cache = QueueSnapshotCache()
+
+
+def _matches_category(row: SnapshotRow, category: str | None) -> bool:
+    if category == "proactive":
+        return row.task_type == TaskType.proactive
+    if category == "!proactive":
+        return row.task_type != TaskType.proactive
+    return True
+
+
+def render_queue_rows(
+    snapshot: QueueSnapshot,
+    user: User,
+    *,
+    has_critical_queue: bool,
+    category: str | None = None,
+    now: datetime | None = None,
+) -> list[bytes]:
+    """Per-user overlay: те же правила, что раньше считались на каждую задачу в get_available_tasks."""
+    from app.services.queue import CRITICAL_BLOCK_REASON, _LEAGUE_ORDER, _PRIORITY_ORDER
+
+    now = now or datetime.now(timezone.utc)
+    rows = [row for row in snapshot.rows if _matches_category(row, category)]
+    user_league_order = _LEAGUE_ORDER.get(user.league, 0)
+    can_pull_by_wip = user.wip_count < user.wip_limit
+    is_manager = user.role in (UserRole.teamlead, UserRole.admin)
+
+    available_priorities = [
+        row.priority
+        for row in rows
+        if user_league_order >= _LEAGUE_ORDER.get(row.min_league, 0)
+        and can_pull_by_wip
+        and (not has_critical_queue or row.priority == TaskPriority.critical)
+    ]
+    top_priority = max(available_priorities, key=lambda p: _PRIORITY_ORDER.get(p, 0), default=None)
+
+    out: list[bytes] = []
+    for row in rows:
+        hours_in_queue = (now - row.created_at).total_seconds() / 3600
+        critical_blocked = has_critical_queue and row.priority != TaskPriority.critical
+        can_assign = (
+            is_manager
+            and (row.priority == TaskPriority.critical or hours_in_queue > 24)
+            and not critical_blocked
+        )
+        league_ok = user_league_order >= _LEAGUE_ORDER.get(row.min_league, 0)
+        if critical_blocked:
+            can_pull, locked, lock_reason = False, True, CRITICAL_BLOCK_REASON
+        elif not league_ok:
+            can_pull, locked, lock_reason = False, True, f"Требуется Лига {row.min_league.value}"
+        elif not can_pull_by_wip:
+            can_pull, locked, lock_reason = False, False, "WIP-лимит исчерпан"
+        else:
+            can_pull, locked, lock_reason = True, False, None
+        if row.acceptance_owner_id == user.id:
+            can_pull = False
+            locked = True
+            lock_reason = "Нельзя выполнять задачу, за приемку которой вы отвечаете"
+        recommended = (
+            can_pull
+            and not locked
+            and top_priority is not None
+            and row.priority == top_priority
+        )
+        overlay = json.dumps(
+            {
+                "deadline_zone": compute_deadline_zone(row),
+                "can_pull": can_pull,
+                "locked": locked,
+                "lock_reason": lock_reason,
+                "is_stale": hours_in_queue > 48,
+                "hours_in_queue": round(hours_in_queue, 1),
+                "can_assign": can_assign,
+                "recommended": recommended,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        out.append(row.prefix + b"," + overlay[1:].encode())
+    return out
+
+
+async def load_queue_rows(
+    db: AsyncSession,
+    user: User,
+    category: str | None = None,
+) -> list[bytes]:
+    version, critical_count = await queue_state(db)
+    snapshot = await queue_snapshot_cache.get(db, version)
+    return render_queue_rows(
+        snapshot,
+        user,
+        has_critical_queue=critical_count > 0,
+        category=category,
+    )
+
+
+async def queue_view_response(
+    db: AsyncSession,
+    user: User,
+    category: str | None = None,
+) -> Response:
+    """Ответ /api/queue из снимка: тело склеивается из готовых JSON-строк."""
+    rows = await load_queue_rows(db, user, category)
+    return Response(content=b"[" + b",".join(rows) + b"]", media_type="application/json")
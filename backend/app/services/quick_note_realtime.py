@@ -39,6 +39,9 @@ class QuickNoteHub:
     def active_users(self) -> list[str]:
         return [str(user_id) for user_id in self._connections]
 
+    def connection_count(self) -> int:
+        return sum(len(conns) for conns in self._connections.values())
+
     def add(self, user_id: UUID, connection: QuickNoteConnection) -> None:
         self._connections.setdefault(user_id, []).append(connection)
 
@@ -124,6 +127,9 @@ class QuickNoteHubRegistry:
         async with self._lock:
             return self._hubs.get(note_id)
 
+    def connection_count(self) -> int:
+        return sum(hub.connection_count() for hub in list(self._hubs.values()))
+
     async def remove_if_empty(self, note_id: UUID) -> None:
         async with self._lock:
             hub = self._hubs.get(note_id)
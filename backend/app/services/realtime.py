@@ -0,0 +1,165 @@
+"""
+Process-local topic channel: версии/дельты для очереди, уведомлений, фокуса и дашборда.
+
+Сервисы не отправляют события сами: publish_after_commit() складывает их в
+session.info, а слушатель after_commit рассылает уже после фиксации
+транзакции. Откат транзакции события отбрасывает, поэтому клиент никогда
+не перечитывает данные, которых еще нет в базе. Как и AttentionHub, хаб
+живет в процессе воркера: при нескольких воркерах клиенты остальных
+воркеров узнают об изменении при следующем переподключении или опросе.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from fastapi import WebSocket
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.services.attention_realtime import SEND_TIMEOUT_SECONDS
+
+TOPIC_QUEUE = "queue"
+TOPIC_NOTIFICATIONS = "notifications"
+TOPIC_FOCUS = "focus"
+TOPIC_DASHBOARD = "dashboard"
+TOPICS = (TOPIC_QUEUE, TOPIC_NOTIFICATIONS, TOPIC_FOCUS, TOPIC_DASHBOARD)
+
+_PENDING_KEY = "realtime_pending"
+
+
+@dataclass(eq=False)
+class RealtimeConnection:
+    websocket: WebSocket
+    user_id: UUID
+    topics: set[str] = field(default_factory=set)
+    send_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class RealtimeHub:
+    """Рассылает topic.changed подписанным соединениям; версия темы растет с каждым событием."""
+
+    def __init__(self) -> None:
+        self._connections: dict[UUID, list[RealtimeConnection]] = {}
+        self._versions: dict[str, int] = {topic: 0 for topic in TOPICS}
+
+    def add(self, connection: RealtimeConnection) -> None:
+        self._connections.setdefault(connection.user_id, []).append(connection)
+
+    def remove(self, connection: RealtimeConnection) -> None:
+        connections = self._connections.get(connection.user_id)
+        if not connections:
+            return
+        try:
+            connections.remove(connection)
+        except ValueError:
+            pass
+        if not connections:
+            self._connections.pop(connection.user_id, None)
+
+    def versions(self, topics: Iterable[str]) -> dict[str, int]:
+        return {topic: self._versions[topic] for topic in topics}
+
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self._connections.values())
+
+    async def _send(self, connection: RealtimeConnection, payload: str) -> None:
+        try:
+            async with connection.send_lock:
+                await asyncio.wait_for(
+                    connection.websocket.send_text(payload),
+                    timeout=SEND_TIMEOUT_SECONDS,
+                )
+        except Exception:
+            pass
+
+    async def publish(
+        self,
+        topic: str,
+        *,
+        user_ids: Iterable[UUID] | None = None,
+        delta: dict[str, Any] | None = None,
+    ) -> int:
+        """
+        Поднять версию темы и разослать подписчикам.
+
+        user_ids=None — всем подписчикам темы (очередь, дашборд), иначе только
+        вкладкам этих пользователей (уведомления, собственный фокус).
+        """
+        self._versions[topic] += 1
+        version = self._versions[topic]
+        message: dict[str, Any] = {"type": "topic.changed", "topic": topic, "version": version}
+        if delta:
+            message["delta"] = delta
+        payload = json.dumps(message, ensure_ascii=False, default=str)
+        if user_ids is None:
+            targets = [
+                connection
+                for connections in self._connections.values()
+                for connection in connections
+                if topic in connection.topics
+            ]
+        else:
+            targets = [
+                connection
+                for user_id in dict.fromkeys(user_ids)
+                for connection in self._connections.get(user_id, [])
+                if topic in connection.topics
+            ]
+        if targets:
+            await asyncio.gather(*(self._send(connection, payload) for connection in targets))
+        return version
+
+
+realtime_hub = RealtimeHub()
+_background_tasks: set[asyncio.Task] = set()
+
+
+def publish_after_commit(
+    db: AsyncSession | Session,
+    topic: str,
+    *,
+    user_ids: Iterable[UUID] | None = None,
+    delta: dict[str, int] | None = None,
+) -> None:
+    """
+    Отложить событие до коммита текущей транзакции.
+
+    Повторные события одной темы для тех же получателей сливаются в одно,
+    целочисленные дельты суммируются: пакетная операция дает одно событие.
+    """
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    pending: dict[tuple[str, frozenset[UUID] | None], dict[str, int]] = session.info.setdefault(
+        _PENDING_KEY, {}
+    )
+    key = (topic, frozenset(user_ids) if user_ids is not None else None)
+    merged = pending.setdefault(key, {})
+    for name, value in (delta or {}).items():
+        merged[name] = merged.get(name, 0) + value
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _dispatch_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # синхронный контекст (миграции, скрипты) — слушателей нет
+    for (topic, user_ids), delta in pending.items():
+        task = loop.create_task(
+            realtime_hub.publish(topic, user_ids=user_ids, delta=delta or None)
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
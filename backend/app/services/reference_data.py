@@ -0,0 +1,268 @@
+"""
+Кеш справочников: каталог операций, товары магазина, праздники, база знаний.
+
+Справочники читаются почти каждым связанным запросом (калькулятор — на
+каждое нажатие клавиши), а меняются редко. У каждого есть строка в
+reference_versions; любое изменение его строк через ORM поднимает версию в
+той же транзакции (after_flush, как queue_version в services/queue_counters).
+
+Кеш живет в процессе воркера и хранит готовые неизменяемые копии строк на
+версию справочника. Версии всех справочников читаются одним запросом не
+чаще раза в REFERENCE_VERSION_CHECK_SECONDS; коммит изменения в этом же
+процессе сбрасывает кеш сразу, изменения из других воркеров видны с
+задержкой не больше интервала. revalidate=True — сверить версию сейчас (для
+операций, которые записывают цены из каталога).
+
+Сессия, которая сама меняла справочник и еще не зафиксировала транзакцию,
+читает мимо кеша: ее данные другим еще не видны и в кеш попасть не должны.
+
+Версия — и валидатор ETag для GET-ответов справочников (reference_etag).
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, TypeVar
+from uuid import UUID
+
+from sqlalchemy import event as sa_event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.http_cache import PayloadCache, weak_etag
+from app.core.metrics import REFERENCE_CACHE_READS
+from app.models.absence import GlobalHoliday
+from app.models.catalog import CatalogCategory, CatalogItem, Complexity
+from app.models.knowledge import KnowledgeArticle
+from app.models.reference_version import ReferenceVersion
+from app.models.shop import ShopItem
+from app.models.user import League
+from app.schemas.knowledge import KnowledgeArticleRead
+from app.schemas.shop import ShopItemResponse
+
+REFERENCE_CATALOG = "catalog"
+REFERENCE_SHOP = "shop"
+REFERENCE_HOLIDAYS = "holidays"
+REFERENCE_KNOWLEDGE = "knowledge"
+REFERENCES = (REFERENCE_CATALOG, REFERENCE_SHOP, REFERENCE_HOLIDAYS, REFERENCE_KNOWLEDGE)
+
+_TRACKED_MODELS: tuple[tuple[type, str], ...] = (
+    (CatalogItem, REFERENCE_CATALOG),
+    (ShopItem, REFERENCE_SHOP),
+    (GlobalHoliday, REFERENCE_HOLIDAYS),
+    (KnowledgeArticle, REFERENCE_KNOWLEDGE),
+)
+_TOUCHED_KEY = "reference_touched"
+
+T = TypeVar("T")
+
+
+def _reference_of(instance: object) -> str | None:
+    for model, name in _TRACKED_MODELS:
+        if isinstance(instance, model):
+            return name
+    return None
+
+
+@sa_event.listens_for(Session, "after_flush")
+def _bump_reference_versions(session: Session, flush_context) -> None:
+    """Поднять версию справочников, чьи строки вошли в flush (в той же транзакции)."""
+    names = {_reference_of(item) for item in session.new}
+    names.update(_reference_of(item) for item in session.dirty if session.is_modified(item))
+    names.update(_reference_of(item) for item in session.deleted)
+    names.discard(None)
+    if not names:
+        return
+    session.info.setdefault(_TOUCHED_KEY, set()).update(names)
+    table = ReferenceVersion.__table__
+    now = datetime.now(timezone.utc)
+    # Строки в порядке имен: параллельные правки разных справочников не ловят deadlock.
+    statement = insert(table).values(
+        [{"name": name, "version": 1, "updated_at": now} for name in sorted(names)]
+    )
+    session.connection().execute(
+        statement.on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={"version": table.c.version + 1, "updated_at": now},
+        )
+    )
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    names = session.info.pop(_TOUCHED_KEY, None)
+    if names:
+        reference_cache.invalidate(names)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_TOUCHED_KEY, None)
+
+
+@dataclass(slots=True)
+class _Entry:
+    version: int
+    value: Any
+
+
+class ReferenceCache:
+    """Неизменяемые копии справочников на версию; загрузка одна на версию."""
+
+    def __init__(self) -> None:
+        self._versions: dict[str, int] = {}
+        self._checked_at = float("-inf")
+        self._entries: dict[str, _Entry] = {}
+        self._locks = {name: asyncio.Lock() for name in REFERENCES}
+
+    async def versions(self, db: AsyncSession, *, revalidate: bool = False) -> dict[str, int]:
+        if revalidate or time.monotonic() - self._checked_at >= settings.REFERENCE_VERSION_CHECK_SECONDS:
+            rows = (await db.execute(select(ReferenceVersion.name, ReferenceVersion.version))).all()
+            self._versions = {name: int(version) for name, version in rows}
+            self._checked_at = time.monotonic()
+        return self._versions
+
+    async def version(self, db: AsyncSession, name: str, *, revalidate: bool = False) -> int:
+        return (await self.versions(db, revalidate=revalidate)).get(name, 0)
+
+    def _cached(self, name: str, version: int) -> _Entry | None:
+        entry = self._entries.get(name)
+        if entry is None or entry.version != version:
+            return None
+        return entry
+
+    async def get(
+        self,
+        db: AsyncSession,
+        name: str,
+        load: Callable[[AsyncSession], Awaitable[T]],
+        *,
+        revalidate: bool = False,
+    ) -> T:
+        if name in db.sync_session.info.get(_TOUCHED_KEY, ()):
+            REFERENCE_CACHE_READS.inc(name, "bypass")
+            return await load(db)
+        version = await self.version(db, name, revalidate=revalidate)
+        entry = self._cached(name, version)
+        if entry is None:
+            async with self._locks[name]:
+                entry = self._cached(name, version)
+                if entry is None:
+                    entry = _Entry(version=version, value=await load(db))
+                    self._entries[name] = entry
+                    REFERENCE_CACHE_READS.inc(name, "load")
+                    return entry.value
+        REFERENCE_CACHE_READS.inc(name, "hit")
+        return entry.value
+
+    def invalidate(self, names: Iterable[str]) -> None:
+        for name in names:
+            self._entries.pop(name, None)
+        self._checked_at = float("-inf")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._versions = {}
+        self._checked_at = float("-inf")
+
+
+reference_cache = ReferenceCache()
+reference_payload_cache = PayloadCache(settings.REFERENCE_PAYLOAD_CACHE_ENTRIES)
+
+
+async def reference_etag(db: AsyncSession, name: str, *parts: object) -> str:
+    """ETag ответа, который целиком определяется версией справочника и parts."""
+    return weak_etag(name, await reference_cache.version(db, name), *parts)
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogEntry:
+    """Копия строки каталога: те же поля и типы, что у CatalogItem, без сессии."""
+
+    id: UUID
+    category: CatalogCategory
+    name: str
+    complexity: Complexity
+    base_cost_q: Decimal
+    description: str | None
+    min_league: League
+    sort_order: int
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, item: CatalogItem) -> "CatalogEntry":
+        return cls(
+            id=item.id,
+            category=item.category,
+            name=item.name,
+            complexity=item.complexity,
+            base_cost_q=item.base_cost_q,
+            description=item.description,
+            min_league=item.min_league,
+            sort_order=item.sort_order,
+            is_active=item.is_active,
+            created_at=item.created_at,
+        )
+
+
+async def _load_catalog(db: AsyncSession) -> tuple[CatalogEntry, ...]:
+    result = await db.execute(
+        select(CatalogItem).order_by(CatalogItem.sort_order.asc(), CatalogItem.name.asc())
+    )
+    return tuple(CatalogEntry.from_model(item) for item in result.scalars().all())
+
+
+async def catalog_entries(db: AsyncSession, *, revalidate: bool = False) -> tuple[CatalogEntry, ...]:
+    """Весь каталог (и неактивные позиции) в порядке sort_order, name."""
+    return await reference_cache.get(db, REFERENCE_CATALOG, _load_catalog, revalidate=revalidate)
+
+
+async def active_catalog_by_id(db: AsyncSession, *, revalidate: bool = False) -> dict[UUID, CatalogEntry]:
+    return {
+        entry.id: entry
+        for entry in await catalog_entries(db, revalidate=revalidate)
+        if entry.is_active
+    }
+
+
+async def _load_shop(db: AsyncSession) -> tuple[ShopItemResponse, ...]:
+    result = await db.execute(
+        select(ShopItem).where(ShopItem.is_active.is_(True)).order_by(ShopItem.cost_q)
+    )
+    return tuple(ShopItemResponse.model_validate(item) for item in result.scalars().all())
+
+
+async def active_shop_items(db: AsyncSession) -> tuple[ShopItemResponse, ...]:
+    return await reference_cache.get(db, REFERENCE_SHOP, _load_shop)
+
+
+async def _load_holidays(db: AsyncSession) -> frozenset[date]:
+    result = await db.execute(
+        select(GlobalHoliday.holiday_date).where(GlobalHoliday.affects_plan.is_(True))
+    )
+    return frozenset(row.holiday_date for row in result.all())
+
+
+async def plan_holiday_dates(db: AsyncSession, start: date, end: date) -> set[date]:
+    """Будние праздники с affects_plan в [start, end]."""
+    holidays = await reference_cache.get(db, REFERENCE_HOLIDAYS, _load_holidays)
+    return {day for day in holidays if start <= day <= end and day.weekday() < 5}
+
+
+async def _load_knowledge(db: AsyncSession) -> tuple[KnowledgeArticleRead, ...]:
+    result = await db.execute(
+        select(KnowledgeArticle).order_by(KnowledgeArticle.sort_order.asc(), KnowledgeArticle.title.asc())
+    )
+    return tuple(KnowledgeArticleRead.model_validate(article) for article in result.scalars().all())
+
+
+async def knowledge_articles(db: AsyncSession) -> tuple[KnowledgeArticleRead, ...]:
+    """Все статьи (и черновики) в порядке sort_order, title."""
+    return await reference_cache.get(db, REFERENCE_KNOWLEDGE, _load_knowledge)
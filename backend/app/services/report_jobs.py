@@ -0,0 +1,408 @@
+"""
+Асинхронные отчеты: постановка с дедупликацией, lease-based выполнение, сжатый результат.
+
+Отчет определяется видом и нормализованными параметрами; их sha256 —
+dedup_key. Пока по ключу есть активная задача (pending/processing), новые
+запросы получают ее же (частичный уникальный индекс), а готовый результат
+переиспользуется REPORT_JOB_RESULT_TTL_SECONDS. Десять руководителей,
+открывших один квартальный отчет, запускают один расчет.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import delete, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.report_job import ReportJob
+from app.models.user import UserRole
+from app.schemas.reports import (
+    DateRangeParams,
+    DevelopmentPlanReportParams,
+    EmployeeSummaryParams,
+    PeriodReportParams,
+    TasksExportParams,
+)
+
+ACTIVE_STATUSES = ("pending", "processing")
+ProgressCallback = Callable[[int], Awaitable[None]]
+
+
+class ReportJobInputError(ValueError):
+    """Ошибка в параметрах отчета: повтор не поможет, задача сразу failed."""
+
+
+async def report_stage(progress: ProgressCallback | None, value: int) -> None:
+    """Этап построителя отчета; при синхронном вызове из роута progress нет."""
+    if progress is not None:
+        await progress(value)
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def _run_period_report(db: AsyncSession, params: PeriodReportParams, progress: ProgressCallback) -> BaseModel:
+    from app.services.reports import generate_period_report
+
+    return await generate_period_report(db, params.period, progress=progress)
+
+
+async def _run_employee_scorecard(db: AsyncSession, params: DateRangeParams, progress: ProgressCallback) -> BaseModel:
+    from app.services.reports import generate_employee_scorecard
+
+    return await generate_employee_scorecard(
+        db,
+        start_date=params.start_date,
+        end_date=params.end_date,
+        progress=progress,
+    )
+
+
+async def _run_employee_summary(db: AsyncSession, params: EmployeeSummaryParams, progress: ProgressCallback) -> BaseModel:
+    from app.services.activity import generate_employee_period_summary
+
+    try:
+        return await generate_employee_period_summary(
+            db,
+            user_id=params.user_id,
+            start_date=params.start_date,
+            end_date=params.end_date,
+            progress=progress,
+        )
+    except ValueError as exc:
+        if str(exc) == "user_not_found":
+            raise ReportJobInputError("Пользователь не найден") from exc
+        raise
+
+
+async def _run_development_plan_admin(
+    db: AsyncSession,
+    params: DevelopmentPlanReportParams,
+    progress: ProgressCallback,
+) -> BaseModel:
+    from app.services.competencies import build_development_plan_admin_report
+
+    return await build_development_plan_admin_report(db, params.user_id, progress=progress)
+
+
+async def _run_tasks_export(db: AsyncSession, params: TasksExportParams, progress: ProgressCallback) -> BaseModel:
+    from app.services.reports import generate_tasks_export
+
+    return await generate_tasks_export(
+        db,
+        params.period,
+        assignee_id=params.assignee_id,
+        category=params.category,
+        progress=progress,
+    )
+
+
+@dataclass(frozen=True)
+class ReportKind:
+    params_model: type[BaseModel]
+    run: Callable[[AsyncSession, Any, ProgressCallback], Awaitable[BaseModel]]
+    roles: frozenset[UserRole]
+    task_workspace: bool = True
+
+
+_MANAGERS = frozenset({UserRole.admin, UserRole.teamlead})
+
+# Права совпадают с синхронными эндпоинтами тех же отчетов.
+REPORT_KINDS: dict[str, ReportKind] = {
+    "period_report": ReportKind(PeriodReportParams, _run_period_report, _MANAGERS),
+    "employee_scorecard": ReportKind(DateRangeParams, _run_employee_scorecard, _MANAGERS),
+    "employee_summary": ReportKind(EmployeeSummaryParams, _run_employee_summary, _MANAGERS),
+    "development_plan_admin": ReportKind(
+        DevelopmentPlanReportParams,
+        _run_development_plan_admin,
+        frozenset({UserRole.admin}),
+        task_workspace=False,
+    ),
+    "tasks_export": ReportKind(TasksExportParams, _run_tasks_export, _MANAGERS),
+}
+
+
+def normalized_params(kind: str, params: dict[str, Any]) -> dict[str, Any]:
+    """Провалидировать параметры вида отчета (pydantic ValidationError наружу)."""
+    return REPORT_KINDS[kind].params_model.model_validate(params).model_dump(mode="json")
+
+
+def report_dedup_key(kind: str, params: dict[str, Any]) -> str:
+    canonical = json.dumps({"kind": kind, "params": params}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+async def _reusable_job(db: AsyncSession, dedup_key: str, now: datetime) -> ReportJob | None:
+    fresh_after = now - timedelta(seconds=max(settings.REPORT_JOB_RESULT_TTL_SECONDS, 0))
+    result = await db.execute(
+        select(ReportJob)
+        .where(
+            ReportJob.dedup_key == dedup_key,
+            or_(
+                ReportJob.status.in_(ACTIVE_STATUSES),
+                (ReportJob.status == "done") & (ReportJob.finished_at >= fresh_after),
+            ),
+        )
+        .order_by(ReportJob.created_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def submit_report_job(
+    db: AsyncSession,
+    *,
+    kind: str,
+    params: dict[str, Any],
+    requested_by_id: uuid.UUID | None,
+    now: datetime | None = None,
+) -> tuple[ReportJob, bool]:
+    """
+    Поставить отчет в очередь или вернуть уже идущий/свежий расчет.
+
+    Возвращает (задача, deduplicated). Гонку двух одновременных запросов
+    разрешает частичный уникальный индекс по активному dedup_key.
+    """
+    current = now or utc_now()
+    clean_params = normalized_params(kind, params)
+    dedup_key = report_dedup_key(kind, clean_params)
+
+    existing = await _reusable_job(db, dedup_key, current)
+    if existing is not None:
+        return existing, True
+
+    job_id = uuid.uuid4()
+    inserted_id = (
+        await db.execute(
+            insert(ReportJob)
+            .values(
+                id=job_id,
+                kind=kind,
+                params=clean_params,
+                dedup_key=dedup_key,
+                requested_by_id=requested_by_id,
+                status="pending",
+                progress=0,
+                attempt_count=0,
+                max_attempts=max(settings.REPORT_JOB_MAX_ATTEMPTS, 1),
+                available_at=current,
+            )
+            .on_conflict_do_nothing(
+                index_elements=[ReportJob.dedup_key],
+                # Литерал, а не bind-параметры: иначе Postgres не выведет частичный индекс.
+                index_where=text("status IN ('pending', 'processing')"),
+            )
+            .returning(ReportJob.id)
+        )
+    ).scalar_one_or_none()
+    if inserted_id is None:
+        existing = await _reusable_job(db, dedup_key, current)
+        if existing is not None:
+            return existing, True
+        raise RuntimeError("report_job_dedup_race")
+    return await db.get(ReportJob, inserted_id), False
+
+
+async def get_report_job(db: AsyncSession, job_id: uuid.UUID) -> ReportJob | None:
+    return await db.get(ReportJob, job_id)
+
+
+async def load_report_result(db: AsyncSession, job_id: uuid.UUID) -> bytes | None:
+    """Сжатый результат (колонка deferred и не грузится вместе со статусом)."""
+    result = await db.execute(select(ReportJob.result_gzip).where(ReportJob.id == job_id))
+    return result.scalar_one_or_none()
+
+
+async def claim_report_job(
+    db: AsyncSession,
+    *,
+    now: datetime | None = None,
+    lease_seconds: int | None = None,
+) -> ReportJob | None:
+    """Захватить одну задачу; вызывающий коммитит до расчета."""
+    current = now or utc_now()
+    lease_for = max(30, lease_seconds or settings.REPORT_JOB_LEASE_SECONDS)
+
+    await db.execute(
+        update(ReportJob)
+        .where(ReportJob.status == "processing", ReportJob.lease_expires_at <= current)
+        .values(
+            status="pending",
+            lease_token=None,
+            lease_expires_at=None,
+            available_at=current,
+            last_error="lease_expired",
+            updated_at=current,
+        )
+    )
+    await db.execute(
+        update(ReportJob)
+        .where(
+            ReportJob.status == "pending",
+            ReportJob.attempt_count >= ReportJob.max_attempts,
+        )
+        .values(status="failed", finished_at=current, updated_at=current)
+    )
+
+    job = (
+        await db.execute(
+            select(ReportJob)
+            .where(
+                ReportJob.status == "pending",
+                ReportJob.available_at <= current,
+                ReportJob.attempt_count < ReportJob.max_attempts,
+            )
+            .order_by(ReportJob.available_at.asc(), ReportJob.created_at.asc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+    ).scalar_one_or_none()
+    if job is None:
+        return None
+    job.status = "processing"
+    job.attempt_count += 1
+    job.progress = 0
+    job.lease_token = uuid.uuid4()
+    job.lease_expires_at = current + timedelta(seconds=lease_for)
+    job.started_at = current
+    job.updated_at = current
+    await db.flush()
+    return job
+
+
+async def update_report_progress(
+    db: AsyncSession,
+    job_id: uuid.UUID,
+    lease_token: uuid.UUID,
+    progress: int,
+    *,
+    now: datetime | None = None,
+) -> bool:
+    """Записать прогресс и продлить аренду; False — аренда потеряна."""
+    current = now or utc_now()
+    result = await db.execute(
+        update(ReportJob)
+        .where(
+            ReportJob.id == job_id,
+            ReportJob.status == "processing",
+            ReportJob.lease_token == lease_token,
+        )
+        .values(
+            progress=max(0, min(int(progress), 99)),
+            lease_expires_at=current + timedelta(seconds=max(30, settings.REPORT_JOB_LEASE_SECONDS)),
+            updated_at=current,
+        )
+    )
+    return bool(result.rowcount)
+
+
+def encode_report_result(report: BaseModel) -> tuple[bytes, str, int]:
+    """(gzip-данные, etag, размер JSON). ETag — хеш несжатого JSON."""
+    raw = report.model_dump_json().encode()
+    return gzip.compress(raw, compresslevel=6), hashlib.sha256(raw).hexdigest(), len(raw)
+
+
+async def execute_report(
+    db: AsyncSession,
+    kind: str,
+    params: dict[str, Any],
+    progress: ProgressCallback,
+) -> BaseModel:
+    spec = REPORT_KINDS.get(kind)
+    if spec is None:
+        raise ReportJobInputError("unknown_report_kind")
+    return await spec.run(db, spec.params_model.model_validate(params), progress)
+
+
+async def complete_report_job(
+    db: AsyncSession,
+    job_id: uuid.UUID,
+    lease_token: uuid.UUID,
+    *,
+    data: bytes,
+    etag: str,
+    size: int,
+    now: datetime | None = None,
+) -> bool:
+    current = now or utc_now()
+    result = await db.execute(
+        update(ReportJob)
+        .where(
+            ReportJob.id == job_id,
+            ReportJob.status == "processing",
+            ReportJob.lease_token == lease_token,
+        )
+        .values(
+            status="done",
+            progress=100,
+            result_gzip=data,
+            result_etag=etag,
+            result_size=size,
+            lease_token=None,
+            lease_expires_at=None,
+            last_error=None,
+            finished_at=current,
+            updated_at=current,
+        )
+    )
+    return bool(result.rowcount)
+
+
+async def fail_report_job(
+    db: AsyncSession,
+    job_id: uuid.UUID,
+    lease_token: uuid.UUID,
+    *,
+    error_code: str,
+    terminal: bool,
+    now: datetime | None = None,
+) -> bool:
+    """Повтор с backoff или failed; ошибки входных данных сразу terminal."""
+    current = now or utc_now()
+    job = await db.get(ReportJob, job_id)
+    if job is None or job.lease_token != lease_token:
+        return False
+    terminal = terminal or job.attempt_count >= job.max_attempts
+    delay_seconds = min(2 ** max(job.attempt_count, 1) * 5, 300)
+    result = await db.execute(
+        update(ReportJob)
+        .where(
+            ReportJob.id == job_id,
+            ReportJob.status == "processing",
+            ReportJob.lease_token == lease_token,
+        )
+        .values(
+            status="failed" if terminal else "pending",
+            available_at=current if terminal else current + timedelta(seconds=delay_seconds),
+            lease_token=None,
+            lease_expires_at=None,
+            last_error=(error_code or "ReportError")[:120],
+            finished_at=current if terminal else None,
+            updated_at=current,
+        )
+    )
+    return bool(result.rowcount)
+
+
+async def purge_report_jobs(db: AsyncSession, *, now: datetime | None = None) -> int:
+    """Удалить завершенные задачи старше REPORT_JOB_RETENTION_DAYS."""
+    current = now or utc_now()
+    cutoff = current - timedelta(days=max(settings.REPORT_JOB_RETENTION_DAYS, 1))
+    result = await db.execute(
+        delete(ReportJob).where(
+            ReportJob.status.in_(("done", "failed")),
+            ReportJob.finished_at < cutoff,
+        )
+    )
+    return int(result.rowcount or 0)
@@ -2,13 +2,15 @@
 from collections import defaultdict
 from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
+from uuid import UUID
 
+from fastapi import HTTPException
 from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.activity import ActivityEvent
 from app.models.shop import PeriodSnapshot, Purchase
-from app.models.task import Task, TaskPriority, TaskStatus
+from app.models.task import Task, TaskPriority, TaskStatus, TaskType
 from app.models.user import User, UserRole
 from app.schemas.reports import (
     CalibrationSummary,
@@ -19,10 +21,14 @@ from app.schemas.reports import (
     ShopActivity,
     TasksOverview,
 )
+from app.schemas.task import TaskExportRow, TasksExport
 from app.services.calibration import get_calibration_report
 from app.services.absences import absence_dates_by_user
 from app.services.activity import date_window, effective_target_for_date_range
+from app.services.event_partitions import archived_activity_events
+from app.services.focus_sessions import FocusStats, focus_stats_by_user
 from app.services.planning import effective_plan_for_user
+from app.services.report_jobs import ProgressCallback, report_stage
 
 SCORECARD_WEIGHTS = {
     "efficiency": 0.35,
@@ -32,19 +38,6 @@ SCORECARD_WEIGHTS = {
     "quality": 0.10,
 }
 
-FOCUS_START_EVENTS = {"focus_start"}
-FOCUS_PAUSE_EVENTS = {"focus_pause", "focus_auto_pause"}
-FOCUS_SECONDS_EVENTS = FOCUS_PAUSE_EVENTS | {"focus_time_corrected"}
-
-
-def _metadata_int(event: ActivityEvent, key: str) -> int:
-    data = event.event_data or {}
-    try:
-        return int(data.get(key) or 0)
-    except (TypeError, ValueError):
-        return 0
-
-
 def _score_efficiency(efficiency_percent: float) -> float:
     return round(min(max(efficiency_percent, 0.0), 150.0) / 1.5, 1)
 
@@ -78,7 +71,12 @@ def _weighted_score(
     return round(score, 1)
 
 
-async def generate_period_report(db: AsyncSession, period: str) -> PeriodReport:
+async def generate_period_report(
+    db: AsyncSession,
+    period: str,
+    *,
+    progress: ProgressCallback | None = None,
+) -> PeriodReport:
     """
     Полный отчёт за период.
     Если период закрыт — данные из PeriodSnapshot; иначе live из текущих пользователей и задач.
@@ -159,6 +157,7 @@ async def generate_period_report(db: AsyncSession, period: str) -> PeriodReport:
     sorted_members = sorted(team_members, key=lambda x: x.percent, reverse=True)
     top_performers = sorted_members[:3]
     underperformers = [m for m in team_members if m.percent < 50]
+    await report_stage(progress, 40)
 
     # Задачи за период
     created_q = await db.execute(
@@ -211,6 +210,7 @@ async def generate_period_report(db: AsyncSession, period: str) -> PeriodReport:
         avg_time_hours=avg_time_hours,
         by_category=by_category,
     )
+    await report_stage(progress, 60)
 
     # Магазин за период
     purchases_result = await db.execute(
@@ -236,6 +236,7 @@ async def generate_period_report(db: AsyncSession, period: str) -> PeriodReport:
         total_karma_spent=total_karma_spent,
         popular_items=popular_items,
     )
+    await report_stage(progress, 70)
 
     # Калибровка за период
     cal = await get_calibration_report(db, period=period)
@@ -270,6 +271,7 @@ async def generate_employee_scorecard(
     *,
     start_date: date,
     end_date: date,
+    progress: ProgressCallback | None = None,
 ) -> EmployeeScorecardResponse:
     """Рейтинг v1: прозрачная scorecard по активным исполнителям и тимлидам."""
     start, end = date_window(start_date, end_date)
@@ -310,6 +312,7 @@ async def generate_employee_scorecard(
     for task in completed_result.scalars().all():
         if task.assignee_id:
             completed_by_user[task.assignee_id].append(task)
+    await report_stage(progress, 30)
 
     active_overdue_result = await db.execute(
         select(Task.assignee_id, func.count(Task.id))
@@ -335,27 +338,25 @@ async def generate_employee_scorecard(
     )
     rejection_by_user = {row[0]: int(row[1] or 0) for row in rejection_result.all()}
 
-    focus_result = await db.execute(
-        select(ActivityEvent).where(
-            ActivityEvent.actor_id.in_(user_ids),
-            ActivityEvent.event_type.in_(FOCUS_START_EVENTS | FOCUS_PAUSE_EVENTS | FOCUS_SECONDS_EVENTS),
-            ActivityEvent.occurred_at >= start,
-            ActivityEvent.occurred_at < end,
+    # Месяцы, выгруженные из activity_events в архив, дочитываются из файлов.
+    archived_events = await archived_activity_events(db, start, end, event_types={"task_rejected"})
+    archived_rejected_task_ids = {event.task_id for event in archived_events if event.task_id}
+    if archived_rejected_task_ids:
+        assignee_result = await db.execute(
+            select(Task.id, Task.assignee_id).where(
+                Task.id.in_(archived_rejected_task_ids),
+                Task.assignee_id.in_(user_ids),
+            )
         )
-    )
-    focus_by_user: dict = defaultdict(lambda: {"seconds": 0, "starts": 0, "pauses": 0, "task_ids": set()})
-    for event in focus_result.scalars().all():
-        stats = focus_by_user[event.actor_id]
-        if event.event_type in FOCUS_START_EVENTS:
-            stats["starts"] += 1
-            if event.task_id:
-                stats["task_ids"].add(event.task_id)
-        if event.event_type in FOCUS_PAUSE_EVENTS:
-            stats["pauses"] += 1
-            if event.task_id:
-                stats["task_ids"].add(event.task_id)
-        if event.event_type in FOCUS_SECONDS_EVENTS:
-            stats["seconds"] += _metadata_int(event, "added_seconds")
+        assignee_by_task = dict(assignee_result.all())
+        for event in archived_events:
+            assignee_id = assignee_by_task.get(event.task_id)
+            if assignee_id:
+                rejection_by_user[assignee_id] = rejection_by_user.get(assignee_id, 0) + 1
+    await report_stage(progress, 55)
+
+    focus_by_user = await focus_stats_by_user(db, user_ids, start, end)
+    await report_stage(progress, 75)
 
     rows: list[EmployeeScorecardRow] = []
     for user in users:
@@ -374,13 +375,13 @@ async def generate_employee_scorecard(
         )
         high_priority_completed_count = sum(1 for task in completed_tasks if task.priority == TaskPriority.high)
         critical_completed_count = sum(1 for task in completed_tasks if task.priority == TaskPriority.critical)
-        focus_stats = focus_by_user.get(user.id, {"seconds": 0, "starts": 0, "pauses": 0, "task_ids": set()})
-        focus_task_ids = focus_stats["task_ids"]
+        focus_stats = focus_by_user.get(user.id) or FocusStats()
+        focus_pauses = focus_stats.pauses + focus_stats.auto_pauses
         focus_task_coverage_percent = round(
             sum(1 for task in completed_tasks if (task.active_seconds or 0) > 0) / completed_tasks_count * 100,
             1,
         ) if completed_tasks_count else 0.0
-        avg_pauses_per_task = round(focus_stats["pauses"] / len(focus_task_ids), 2) if focus_task_ids else 0.0
+        avg_pauses_per_task = round(focus_pauses / focus_stats.tasks, 2) if focus_stats.tasks else 0.0
 
         efficiency_score = _score_efficiency(efficiency_percent)
         acceptance_score = first_pass_rate
@@ -416,9 +417,9 @@ async def generate_employee_scorecard(
                 completed_late_count=completed_late_count,
                 high_priority_completed_count=high_priority_completed_count,
                 critical_completed_count=critical_completed_count,
-                focus_hours=round(float(focus_stats["seconds"]) / 3600, 2),
-                focus_start_count=int(focus_stats["starts"]),
-                focus_pause_count=int(focus_stats["pauses"]),
+                focus_hours=round(focus_stats.seconds / 3600, 2),
+                focus_start_count=focus_stats.starts,
+                focus_pause_count=focus_pauses,
                 avg_pauses_per_task=avg_pauses_per_task,
                 focus_task_coverage_percent=focus_task_coverage_percent,
                 quality_score=quality_score,
@@ -441,3 +442,72 @@ async def generate_employee_scorecard(
         weights=SCORECARD_WEIGHTS,
         rows=rows,
     )
+
+
+async def generate_tasks_export(
+    db: AsyncSession,
+    period: str,
+    *,
+    assignee_id: UUID | None = None,
+    category: str | None = None,
+    progress: ProgressCallback | None = None,
+) -> TasksExport:
+    """Завершённые задачи за период (YYYY-MM) с исполнителем и валидатором."""
+    try:
+        year, month = int(period[:4]), int(period[5:7])
+        start = datetime(year, month, 1, tzinfo=timezone.utc)
+        if month == 12:
+            end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+        else:
+            end = datetime(year, month + 1, 1, tzinfo=timezone.utc)
+    except (ValueError, IndexError):
+        raise HTTPException(status_code=400, detail="Некорректный период (ожидается YYYY-MM)")
+    stmt = (
+        select(Task)
+        .where(Task.completed_at >= start, Task.completed_at < end)
+        .order_by(Task.completed_at)
+    )
+    if assignee_id is not None:
+        stmt = stmt.where(Task.assignee_id == assignee_id)
+    if category is not None:
+        try:
+            stmt = stmt.where(Task.task_type == TaskType(category))
+        except ValueError:
+            pass
+    result = await db.execute(stmt)
+    tasks = list(result.scalars().all())
+    await report_stage(progress, 50)
+    user_ids = set()
+    for t in tasks:
+        if t.assignee_id:
+            user_ids.add(t.assignee_id)
+        if t.validator_id:
+            user_ids.add(t.validator_id)
+    users_map: dict[UUID, str] = {}
+    if user_ids:
+        u_res = await db.execute(select(User.id, User.full_name).where(User.id.in_(user_ids)))
+        users_map = {row.id: row.full_name for row in u_res.all()}
+    await report_stage(progress, 70)
+    rows: list[TaskExportRow] = []
+    total_q = 0.0
+    for t in tasks:
+        duration_hours = None
+        if t.started_at and t.completed_at:
+            delta = t.completed_at - t.started_at
+            duration_hours = round(delta.total_seconds() / 3600, 1)
+        rows.append(
+            TaskExportRow(
+                title=t.title,
+                category=t.task_type.value,
+                complexity=t.complexity.value,
+                estimated_q=float(t.estimated_q),
+                assignee_name=users_map.get(t.assignee_id) if t.assignee_id else "",
+                started_at=t.started_at.isoformat() if t.started_at else None,
+                completed_at=t.completed_at.isoformat() if t.completed_at else None,
+                duration_hours=duration_hours,
+                validator_name=users_map.get(t.validator_id) if t.validator_id else None,
+                status=t.status.value,
+            )
+        )
+        total_q += float(t.estimated_q)
+    return TasksExport(period=period, rows=rows, total_tasks=len(rows), total_q=round(total_q, 1))
@@ -0,0 +1,116 @@
+"""
+Хранилище профилей запросов (app.core.profiler) в PROFILE_DIR.
+
+Профиль — два файла: <id>.folded (collapsed stacks для flamegraph.pl,
+speedscope, inferno) и <id>.json (запрос, статус, длительность, SQL).
+Хранилище ограничено: при каждом сохранении удаляются профили старше
+PROFILE_RETENTION_HOURS и самые старые сверх PROFILE_MAX_ENTRIES.
+"""
+from __future__ import annotations
+
+import json
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.config import settings
+
+PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def profile_dir() -> Path:
+    return Path(settings.PROFILE_DIR).expanduser().resolve()
+
+
+def _paths(profile_id: str) -> tuple[Path, Path] | None:
+    if not PROFILE_ID_RE.fullmatch(profile_id):
+        return None
+    directory = profile_dir()
+    return directory / f"{profile_id}.json", directory / f"{profile_id}.folded"
+
+
+def save_profile(profile) -> str:
+    """Записать профиль (RequestProfile) и подрезать хранилище; вернуть id."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = uuid.uuid4().hex
+    meta_path, folded_path = _paths(profile_id)
+    folded_path.write_text(profile.folded(), encoding="utf-8")
+    # json последним: список профилей строится по json, полупрофиль в него не попадет.
+    meta_path.write_text(json.dumps({"id": profile_id, **profile.meta()}, ensure_ascii=False), encoding="utf-8")
+    prune_profiles()
+    return profile_id
+
+
+def _read_meta(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _remove(profile_id: str) -> None:
+    paths = _paths(profile_id)
+    if paths is None:
+        return
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def prune_profiles() -> int:
+    """Удалить просроченные и лишние профили; вернуть число удаленных."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return 0
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.PROFILE_RETENTION_HOURS)
+    entries = sorted(
+        (path for path in directory.glob("*.json") if PROFILE_ID_RE.fullmatch(path.stem)),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    removed = 0
+    for index, path in enumerate(entries):
+        modified = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+        if index >= settings.PROFILE_MAX_ENTRIES or modified < cutoff:
+            _remove(path.stem)
+            removed += 1
+    # .folded без json: сохранение оборвалось между файлами.
+    for path in directory.glob("*.folded"):
+        if PROFILE_ID_RE.fullmatch(path.stem) and not path.with_suffix(".json").exists():
+            modified = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+            if modified < datetime.now(timezone.utc) - timedelta(minutes=5):
+                path.unlink(missing_ok=True)
+    return removed
+
+
+def list_profiles() -> list[dict]:
+    """Сводки профилей, новые первыми (без SQL)."""
+    prune_profiles()
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    items = []
+    for path in directory.glob("*.json"):
+        if not PROFILE_ID_RE.fullmatch(path.stem):
+            continue
+        meta = _read_meta(path)
+        if meta is not None:
+            meta.pop("sql", None)
+            items.append(meta)
+    items.sort(key=lambda item: item.get("started_at") or "", reverse=True)
+    return items
+
+
+def load_profile(profile_id: str) -> dict | None:
+    paths = _paths(profile_id)
+    if paths is None or not paths[0].is_file():
+        return None
+    return _read_meta(paths[0])
+
+
+def load_folded(profile_id: str) -> str | None:
+    paths = _paths(profile_id)
+    if paths is None or not paths[1].is_file():
+        return None
+    return paths[1].read_text(encoding="utf-8")
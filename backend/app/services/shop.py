@@ -10,7 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.shop import Purchase, ShopItem
 from app.models.transaction import QTransaction, WalletType
 from app.models.user import User, UserRole
-from app.schemas.shop import PurchaseResponse
+from app.schemas.shop import PurchaseResponse, ShopItemResponse
+from app.services.reference_data import active_shop_items
 
 
 def _round_q(value: Decimal) -> Decimal:
@@ -37,12 +38,9 @@ def _purchase_response(
     )
 
 
-async def get_shop_items(db: AsyncSession) -> list[ShopItem]:
-    """Все активные товары."""
-    result = await db.execute(
-        select(ShopItem).where(ShopItem.is_active.is_(True)).order_by(ShopItem.cost_q)
-    )
-    return list(result.scalars().all())
+async def get_shop_items(db: AsyncSession) -> list[ShopItemResponse]:
+    """Все активные товары (кеш справочников, services/reference_data)."""
+    return list(await active_shop_items(db))
 
 
 async def purchase_item(
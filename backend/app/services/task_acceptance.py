@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.task import (
@@ -26,11 +26,16 @@ from app.schemas.task_acceptance import (
     TaskAcceptanceRead,
 )
 from app.services.activity import record_activity_event
+from app.services.focus import discard_focus
 from app.services.notifications import create_notification
+from app.services.pagination import KeysetPage, encode_cursor, keyset_page
 
 
 REQUIRED_CRITERION_KINDS = {"required", "quality_gate"}
 PLAN_EDITABLE_STATUSES = {TaskStatus.new, TaskStatus.estimated, TaskStatus.in_queue}
+# Последние события критерия, встроенные в план приемки; более ранние — через
+# list_criterion_events по events_next_cursor.
+CRITERION_EVENTS_INLINE = 20
 
 
 def acceptance_plan_locked(task: Task) -> bool:
@@ -250,6 +255,98 @@ async def _load_criteria(
     return list(result.scalars().all())
 
 
+def _criterion_event_read(
+    event: TaskAcceptanceCriterionEvent,
+    actor: User | None,
+) -> AcceptanceCriterionEventRead:
+    return AcceptanceCriterionEventRead(
+        id=event.id,
+        actor_id=event.actor_id,
+        actor_name=actor.full_name if actor else None,
+        event_type=event.event_type,
+        from_status=event.from_status,
+        to_status=event.to_status,
+        comment=event.comment,
+        evidence_url=event.evidence_url,
+        acceptance_revision=event.acceptance_revision,
+        created_at=event.created_at,
+    )
+
+
+async def _load_recent_criterion_events(
+    db: AsyncSession,
+    task_id: UUID,
+) -> tuple[dict[UUID, list[AcceptanceCriterionEventRead]], dict[UUID, str]]:
+    """Последние CRITERION_EVENTS_INLINE событий каждого критерия и курсоры на более ранние."""
+    ranked = (
+        select(
+            TaskAcceptanceCriterionEvent.id.label("event_id"),
+            func.row_number()
+            .over(
+                partition_by=TaskAcceptanceCriterionEvent.criterion_id,
+                order_by=(
+                    TaskAcceptanceCriterionEvent.created_at.desc(),
+                    TaskAcceptanceCriterionEvent.id.desc(),
+                ),
+            )
+            .label("recency"),
+        )
+        .where(TaskAcceptanceCriterionEvent.task_id == task_id)
+        .subquery()
+    )
+    events_result = await db.execute(
+        select(TaskAcceptanceCriterionEvent, User)
+        .join(ranked, ranked.c.event_id == TaskAcceptanceCriterionEvent.id)
+        .outerjoin(User, User.id == TaskAcceptanceCriterionEvent.actor_id)
+        .where(ranked.c.recency <= CRITERION_EVENTS_INLINE + 1)
+        .order_by(TaskAcceptanceCriterionEvent.created_at, TaskAcceptanceCriterionEvent.id)
+    )
+    rows_by_criterion: dict[UUID, list[tuple[TaskAcceptanceCriterionEvent, User | None]]] = {}
+    for event, event_actor in events_result.all():
+        rows_by_criterion.setdefault(event.criterion_id, []).append((event, event_actor))
+
+    events_by_criterion: dict[UUID, list[AcceptanceCriterionEventRead]] = {}
+    older_cursors: dict[UUID, str] = {}
+    for criterion_id, rows in rows_by_criterion.items():
+        if len(rows) > CRITERION_EVENTS_INLINE:
+            # Лишняя строка — признак, что есть более ранние события.
+            rows = rows[1:]
+            oldest = rows[0][0]
+            older_cursors[criterion_id] = encode_cursor(oldest.created_at, oldest.id)
+        events_by_criterion[criterion_id] = [_criterion_event_read(event, actor) for event, actor in rows]
+    return events_by_criterion, older_cursors
+
+
+async def list_criterion_events(
+    db: AsyncSession,
+    task_id: UUID,
+    criterion_id: UUID,
+    *,
+    limit: int,
+    cursor: str | None,
+) -> tuple[list[AcceptanceCriterionEventRead], KeysetPage]:
+    """События одного критерия от новых к старым, по страницам."""
+    criterion_exists = await db.scalar(
+        select(TaskAcceptanceCriterion.id).where(
+            TaskAcceptanceCriterion.id == criterion_id,
+            TaskAcceptanceCriterion.task_id == task_id,
+        )
+    )
+    if criterion_exists is None:
+        raise HTTPException(status_code=404, detail="Критерий не найден")
+    page = await keyset_page(
+        db,
+        select(TaskAcceptanceCriterionEvent, User)
+        .outerjoin(User, User.id == TaskAcceptanceCriterionEvent.actor_id)
+        .where(TaskAcceptanceCriterionEvent.criterion_id == criterion_id),
+        time_column=TaskAcceptanceCriterionEvent.created_at,
+        id_column=TaskAcceptanceCriterionEvent.id,
+        limit=limit,
+        cursor=cursor,
+    )
+    return [_criterion_event_read(event, actor) for event, actor in page.rows], page
+
+
 async def get_task_acceptance(
     db: AsyncSession,
     task_id: UUID,
@@ -265,28 +362,7 @@ async def get_task_acceptance(
         raise HTTPException(status_code=404, detail="Задача не найдена")
     task, owner = row
     criteria = await _load_criteria(db, task.id)
-    events_result = await db.execute(
-        select(TaskAcceptanceCriterionEvent, User)
-        .outerjoin(User, User.id == TaskAcceptanceCriterionEvent.actor_id)
-        .where(TaskAcceptanceCriterionEvent.task_id == task.id)
-        .order_by(TaskAcceptanceCriterionEvent.created_at, TaskAcceptanceCriterionEvent.id)
-    )
-    events_by_criterion: dict[UUID, list[AcceptanceCriterionEventRead]] = {}
-    for event, event_actor in events_result.all():
-        events_by_criterion.setdefault(event.criterion_id, []).append(
-            AcceptanceCriterionEventRead(
-                id=event.id,
-                actor_id=event.actor_id,
-                actor_name=event_actor.full_name if event_actor else None,
-                event_type=event.event_type,
-                from_status=event.from_status,
-                to_status=event.to_status,
-                comment=event.comment,
-                evidence_url=event.evidence_url,
-                acceptance_revision=event.acceptance_revision,
-                created_at=event.created_at,
-            )
-        )
+    events_by_criterion, older_cursors = await _load_recent_criterion_events(db, task.id)
     can_manage_plan = (
         not acceptance_plan_locked(task)
         and (
@@ -321,6 +397,7 @@ async def get_task_acceptance(
                 return_count=item.return_count,
                 decision_change_count=item.decision_change_count,
                 events=events_by_criterion.get(item.id, []),
+                events_next_cursor=older_cursors.get(item.id),
             )
         )
     return TaskAcceptanceRead(
@@ -478,7 +555,7 @@ async def review_acceptance_criteria(
         task.completed_at = None
         task.validator_id = None
         task.validated_at = None
-        task.focus_started_at = None
+        await discard_focus(db, task, now)
         comment = "Возвращены критерии: " + ", ".join(returned_titles)
         db.add(
             TaskReviewEvent(
@@ -589,7 +666,7 @@ async def revise_acceptance_decision(
         task.completed_at = None
         task.validator_id = None
         task.validated_at = None
-        task.focus_started_at = None
+        await discard_focus(db, task, now)
         db.add(
             TaskReviewEvent(
                 task_id=task.id,
@@ -10,11 +10,9 @@ from decimal import Decimal, ROUND_HALF_UP
 from uuid import UUID
 
 from fastapi import HTTPException, UploadFile
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.limits import TASK_TITLE_MAX_LENGTH
-from app.models.catalog import CatalogItem
 from app.models.task import Task, TaskPriority, TaskStatus, TaskType
 from app.models.user import User, UserRole
 from app.schemas.task import (
@@ -23,6 +21,7 @@ from app.schemas.task import (
     TaskImportPreview,
     TaskImportPreviewRow,
 )
+from app.services.reference_data import CatalogEntry, active_catalog_by_id
 
 MAX_IMPORT_BYTES = 256 * 1024
 MAX_IMPORT_ROWS = 200
@@ -50,7 +49,7 @@ class ValidImportRow:
     row_number: int
     title: str
     description: str | None
-    catalog_item: CatalogItem
+    catalog_item: CatalogEntry
     quantity: int
     priority: TaskPriority
     due_date: datetime | None
@@ -254,14 +253,14 @@ def _parse_quantity(value: str, row_number: int, errors: list[TaskImportIssue])
     return quantity
 
 
-def _task_q(catalog_item: CatalogItem, quantity: int) -> Decimal:
+def _task_q(catalog_item: CatalogEntry, quantity: int) -> Decimal:
     return (Decimal(catalog_item.base_cost_q) * Decimal(quantity)).quantize(
         Decimal("0.1"),
         rounding=ROUND_HALF_UP,
     )
 
 
-def _breakdown(catalog_item: CatalogItem, quantity: int, estimated_q: Decimal) -> dict:
+def _breakdown(catalog_item: CatalogEntry, quantity: int, estimated_q: Decimal) -> dict:
     return {
         "catalog_id": str(catalog_item.id),
         "name": catalog_item.name,
@@ -282,11 +281,10 @@ async def parse_task_import(
     content = await upload.read()
     headers, raw_rows = _parse_csv_table(content, upload.filename)
 
-    result = await db.execute(select(CatalogItem).where(CatalogItem.is_active.is_(True)))
-    catalog_items = list(result.scalars().all())
-    catalog_by_id = {item.id: item for item in catalog_items}
-    names: dict[str, list[CatalogItem]] = {}
-    for item in catalog_items:
+    # Оценки из превью записываются в задачи: версию каталога сверяем сейчас.
+    catalog_by_id = await active_catalog_by_id(db, revalidate=True)
+    names: dict[str, list[CatalogEntry]] = {}
+    for item in catalog_by_id.values():
         names.setdefault(item.name.strip().casefold(), []).append(item)
 
     preview_rows: list[TaskImportPreviewRow] = []
@@ -364,7 +362,7 @@ async def parse_task_import(
         due_date = _parse_due_date(values.get("due_date", ""), row_number, errors)
         tags = _parse_tags(values.get("tags", ""), row_number, errors)
 
-        catalog_item: CatalogItem | None = None
+        catalog_item: CatalogEntry | None = None
         catalog_id: UUID | None = None
         catalog_item_id_raw = values.get("catalog_item_id", "").strip()
         catalog_name_raw = values.get("catalog_item_name", "").strip()
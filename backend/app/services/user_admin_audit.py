@@ -6,7 +6,7 @@ from enum import Enum
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.activity import ActivityEvent
@@ -17,6 +17,7 @@ from app.schemas.user import (
     AdminUserAuditHistoryRead,
 )
 from app.services.activity import record_activity_event
+from app.services.pagination import feed_total, keyset_page
 
 
 USER_CREATED_EVENT = "authn_user_created"
@@ -136,6 +137,7 @@ async def list_admin_user_audit_history(
     *,
     target_user_id: UUID,
     limit: int,
+    cursor: str | None = None,
 ) -> AdminUserAuditHistoryRead:
     limit = min(max(limit, 1), 200)
     target_id_text = str(target_user_id)
@@ -146,15 +148,19 @@ async def list_admin_user_audit_history(
         select(ActivityEvent, User.full_name)
         .join(User, User.id == ActivityEvent.actor_id)
         .where(event_filter, target_filter)
-        .order_by(ActivityEvent.occurred_at.desc(), ActivityEvent.id.desc())
-        .limit(limit)
     )
-    count_stmt = select(func.count(ActivityEvent.id)).where(event_filter, target_filter)
-    rows = (await db.execute(stmt)).all()
-    total = int((await db.execute(count_stmt)).scalar() or 0)
+    page = await keyset_page(
+        db,
+        stmt,
+        time_column=ActivityEvent.occurred_at,
+        id_column=ActivityEvent.id,
+        limit=limit,
+        cursor=cursor,
+    )
+    total, total_is_estimate = await feed_total(db, stmt, page, first_page=cursor is None)
 
     items: list[AdminUserAuditEventRead] = []
-    for event, actor_name in rows:
+    for event, actor_name in page.rows:
         metadata = event.event_data or {}
         raw_fields = metadata.get("changed_fields")
         before = metadata.get("before") if isinstance(metadata.get("before"), dict) else {}
@@ -182,4 +188,10 @@ async def list_admin_user_audit_history(
             )
         )
 
-    return AdminUserAuditHistoryRead(items=items, total=total, limit=limit)
+    return AdminUserAuditHistoryRead(
+        items=items,
+        total=total,
+        limit=limit,
+        total_is_estimate=total_is_estimate,
+        next_cursor=page.next_cursor,
+    )
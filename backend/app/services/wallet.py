@@ -1,4 +1,5 @@
 """Начисления Q: split main/karma с округлением до 1 знака."""
+from dataclasses import dataclass
 from decimal import Decimal
 from uuid import UUID
 
@@ -7,6 +8,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 from app.models.transaction import QTransaction, WalletType
+from app.services.realtime import TOPIC_DASHBOARD, publish_after_commit
+
+
+@dataclass(frozen=True)
+class QCredit:
+    """Одно начисление Q для пакетной обработки."""
+    user_id: UUID
+    amount: Decimal
+    reason: str
+    task_id: UUID | None = None
+    idempotency_prefix: str | None = None
 
 
 def _round_q(value: Decimal) -> Decimal:
@@ -14,6 +26,21 @@ def _round_q(value: Decimal) -> Decimal:
     return Decimal(str(round(float(value), 1)))
 
 
+def _split_credit(user: User, amount: Decimal) -> tuple[Decimal, Decimal]:
+    """Разделить сумму между main (до плана mpw) и karma."""
+    mpw = Decimal(str(user.mpw))
+    wallet_main = user.wallet_main
+
+    if mpw == 0:
+        return amount, Decimal("0")
+    if wallet_main + amount <= mpw:
+        return amount, Decimal("0")
+    if wallet_main >= mpw:
+        return Decimal("0"), amount
+    to_main = _round_q(mpw - wallet_main)
+    return to_main, _round_q(amount - to_main)
+
+
 async def credit_q(
     db: AsyncSession,
     user_id: UUID,
@@ -29,62 +56,94 @@ async def credit_q(
     3) иначе → split: часть на main до плана, остаток на karma
     Все суммы округляются до 1 знака.
     """
-    result = await db.execute(select(User).where(User.id == user_id).with_for_update())
-    user = result.scalar_one_or_none()
-    if not user:
-        raise ValueError("User not found")
+    await credit_q_batch(
+        db,
+        [
+            QCredit(
+                user_id=user_id,
+                amount=amount,
+                reason=reason,
+                task_id=task_id,
+                idempotency_prefix=idempotency_prefix,
+            )
+        ],
+    )
+
+
+async def credit_q_batch(db: AsyncSession, credits: list[QCredit]) -> None:
+    """
+    Начислить Q нескольким пользователям за один проход.
 
-    transaction_keys = (
-        [f"{idempotency_prefix}:main", f"{idempotency_prefix}:karma"]
-        if idempotency_prefix
-        else []
+    Кошельки блокируются одним SELECT FOR UPDATE в порядке user_id (без
+    взаимных блокировок с другими пакетами), ключи идемпотентности
+    проверяются одним запросом. Начисления одному пользователю применяются
+    по порядку, поэтому split main/karma совпадает с последовательными
+    вызовами credit_q.
+    """
+    if not credits:
+        return
+    user_ids = {credit.user_id for credit in credits}
+    result = await db.execute(
+        select(User).where(User.id.in_(user_ids)).order_by(User.id).with_for_update()
     )
+    users = {user.id: user for user in result.scalars().all()}
+    if user_ids - users.keys():
+        raise ValueError("User not found")
+
+    transaction_keys = [
+        f"{credit.idempotency_prefix}:{suffix}"
+        for credit in credits
+        if credit.idempotency_prefix
+        for suffix in ("main", "karma")
+    ]
+    existing_keys: set[str] = set()
     if transaction_keys:
         existing_result = await db.execute(
-            select(QTransaction.id).where(QTransaction.idempotency_key.in_(transaction_keys)).limit(1)
+            select(QTransaction.idempotency_key).where(
+                QTransaction.idempotency_key.in_(transaction_keys)
+            )
         )
-        if existing_result.scalar_one_or_none() is not None:
-            return
+        existing_keys = {key for key in existing_result.scalars().all() if key}
 
-    amount = _round_q(amount)
-    mpw = Decimal(str(user.mpw))
-    wallet_main = user.wallet_main
-
-    if mpw == 0:
-        to_main = amount
-        to_karma = Decimal("0")
-    elif wallet_main + amount <= mpw:
-        to_main = amount
-        to_karma = Decimal("0")
-    elif wallet_main >= mpw:
-        to_main = Decimal("0")
-        to_karma = amount
-    else:
-        to_main = _round_q(mpw - wallet_main)
-        to_karma = _round_q(amount - to_main)
-
-    if to_main > 0:
-        user.wallet_main += to_main
-        db.add(
-            QTransaction(
-                user_id=user_id,
-                amount=to_main,
-                wallet_type=WalletType.main,
-                reason=reason,
-                task_id=task_id,
-                idempotency_key=f"{idempotency_prefix}:main" if idempotency_prefix else None,
+    applied_prefixes: set[str] = set()
+    applied = 0
+    for credit in credits:
+        prefix = credit.idempotency_prefix
+        if prefix:
+            if (
+                prefix in applied_prefixes
+                or f"{prefix}:main" in existing_keys
+                or f"{prefix}:karma" in existing_keys
+            ):
+                continue
+            applied_prefixes.add(prefix)
+        user = users[credit.user_id]
+        applied += 1
+        to_main, to_karma = _split_credit(user, _round_q(credit.amount))
+        if to_main > 0:
+            user.wallet_main += to_main
+            db.add(
+                QTransaction(
+                    user_id=user.id,
+                    amount=to_main,
+                    wallet_type=WalletType.main,
+                    reason=credit.reason,
+                    task_id=credit.task_id,
+                    idempotency_key=f"{prefix}:main" if prefix else None,
+                )
             )
-        )
-    if to_karma > 0:
-        user.wallet_karma += to_karma
-        db.add(
-            QTransaction(
-                user_id=user_id,
-                amount=to_karma,
-                wallet_type=WalletType.karma,
-                reason=reason,
-                task_id=task_id,
-                idempotency_key=f"{idempotency_prefix}:karma" if idempotency_prefix else None,
+        if to_karma > 0:
+            user.wallet_karma += to_karma
+            db.add(
+                QTransaction(
+                    user_id=user.id,
+                    amount=to_karma,
+                    wallet_type=WalletType.karma,
+                    reason=credit.reason,
+                    task_id=credit.task_id,
+                    idempotency_key=f"{prefix}:karma" if prefix else None,
+                )
             )
-        )
     await db.flush()
+    if applied:
+        publish_after_commit(db, TOPIC_DASHBOARD, delta={"credits": applied})
@@ -3,8 +3,9 @@ from collections import Counter
 from datetime import datetime, timezone
 from uuid import UUID
 
-from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy import and_, event as sa_event, or_, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.models.deadline_tracker import DeadlineTracker
 from app.models.personal_task import PersonalTask
@@ -14,12 +15,9 @@ from app.models.task import Task
 from app.models.user import User, UserRole
 from app.models.work_entity import (
     WorkEntity,
-    WorkEntityArtifact,
     WorkEntityEvent,
     WorkEntityLink,
     WorkEntityMember,
-    WorkEntityMilestone,
-    WorkEntityTask,
 )
 from app.schemas.work_entity import (
     WorkEntityAccessRole,
@@ -28,6 +26,7 @@ from app.schemas.work_entity import (
     WorkEntitySummary,
     WorkEntityTargetType,
 )
+from app.services.work_entity_rollups import load_entity_rollup, summary_counts
 
 STRUCTURAL_RELATIONS = {"contains", "contributes_to", "depends_on", "measures"}
 ENTITY_GRAPH_ADVISORY_LOCK_KEY = 460046
@@ -139,6 +138,31 @@ def record_entity_event(
     return event
 
 
+@sa_event.listens_for(Session, "after_flush")
+def _bump_workspace_revisions(session: Session, flush_context) -> None:
+    """
+    Advance workspace_revision for every entity that received an audit event.
+
+    Each workspace, member, link and contract mutation appends a
+    WorkEntityEvent, so the counter changes exactly when cached workspace and
+    map payloads may have become stale. The UPDATE runs inside the same flush
+    and transaction as the event itself.
+    """
+    entity_ids = {
+        item.entity_id
+        for item in session.new
+        if isinstance(item, WorkEntityEvent) and item.entity_id is not None
+    }
+    if not entity_ids:
+        return
+    table = WorkEntity.__table__
+    session.connection().execute(
+        update(table)
+        .where(table.c.id.in_(entity_ids))
+        .values(workspace_revision=table.c.workspace_revision + 1)
+    )
+
+
 def redact_entity_event_payload(
     payload: dict | None,
     *,
@@ -457,37 +481,10 @@ async def build_entity_summary(
     """Build a transparent summary of native work and accessible external links."""
     items = await serialize_links(db, links, user)
     accessible = [item for item in items if item.target_accessible]
-    native_tasks = list(
-        (
-            await db.execute(
-                select(WorkEntityTask).where(
-                    WorkEntityTask.entity_id == entity_id,
-                    WorkEntityTask.status != "cancelled",
-                )
-            )
-        ).scalars().all()
-    )
-    native_milestones = list(
-        (
-            await db.execute(
-                select(WorkEntityMilestone).where(
-                    WorkEntityMilestone.entity_id == entity_id,
-                    WorkEntityMilestone.status != "cancelled",
-                )
-            )
-        ).scalars().all()
-    )
-    artifacts_count = int(
-        (
-            await db.execute(
-                select(func.count(WorkEntityArtifact.id)).where(
-                    WorkEntityArtifact.entity_id == entity_id,
-                    WorkEntityArtifact.status != "archived",
-                )
-            )
-        ).scalar_one()
-    )
+    # Native tasks, milestones and artifacts come from the write-maintained
+    # rollup; links stay live because access and target state are per viewer.
     now = datetime.now(timezone.utc)
+    native = summary_counts(await load_entity_rollup(db, entity_id), now)
     work_types = {"task", "personal_task", "deadline_tracker"}
     excluded_statuses = {
         "task": {"cancelled"},
@@ -501,67 +498,41 @@ async def build_entity_summary(
         and item.target_status not in excluded_statuses.get(item.target_type, set())
     ]
     open_work_items = [item for item in work_items if item.target_status != "done"]
-    open_native_tasks = [task for task in native_tasks if task.status != "done"]
-    open_native_milestones = [
-        milestone
-        for milestone in native_milestones
-        if milestone.status != "achieved"
-    ]
-    due_dates = [
+    future_due_dates = [
         item.target_due_at
         for item in open_work_items
-        if item.target_due_at is not None
+        if item.target_due_at is not None and item.target_due_at >= now
     ]
-    due_dates.extend(
-        task.forecast_due_at
-        for task in open_native_tasks
-        if task.forecast_due_at is not None
-    )
-    due_dates.extend(
-        milestone.forecast_at for milestone in open_native_milestones
-    )
-    future_due_dates = [due for due in due_dates if due >= now]
+    if native["next_due_at"] is not None:
+        future_due_dates.append(native["next_due_at"])
     overdue = sum(
         1
         for item in open_work_items
         if item.target_due_at is not None
         and item.target_due_at < now
     )
-    overdue += sum(
-        1
-        for task in open_native_tasks
-        if task.forecast_due_at is not None and task.forecast_due_at < now
-    )
-    overdue += sum(
-        1
-        for milestone in open_native_milestones
-        if milestone.forecast_at < now
-    )
+    overdue += native["overdue"]
     counts_by_type = Counter(item.target_type for item in accessible)
-    counts_by_type.update("project_task" for _ in native_tasks)
-    counts_by_type.update("project_milestone" for _ in native_milestones)
+    if native["native_tasks"]:
+        counts_by_type["project_task"] += native["native_tasks"]
+    if native["native_milestones"]:
+        counts_by_type["project_milestone"] += native["native_milestones"]
     counts_by_status = Counter(
         item.target_status for item in accessible if item.target_status
     )
-    counts_by_status.update(task.status for task in native_tasks)
-    counts_by_status.update(milestone.status for milestone in native_milestones)
+    counts_by_status.update(native["counts_by_status"])
     return WorkEntitySummary(
         entity_id=entity_id,
         accessible_links=len(accessible),
         restricted_links=len(items) - len(accessible),
-        native_tasks=len(native_tasks),
-        artifacts=artifacts_count,
+        native_tasks=native["native_tasks"],
+        artifacts=native["artifacts"],
         work_items_total=(
-            len(work_items) + len(native_tasks) + len(native_milestones)
+            len(work_items) + native["native_tasks"] + native["native_milestones"]
         ),
         work_items_done=(
             sum(1 for item in work_items if item.target_status == "done")
-            + sum(1 for task in native_tasks if task.status == "done")
-            + sum(
-                1
-                for milestone in native_milestones
-                if milestone.status == "achieved"
-            )
+            + native["done_items"]
         ),
         overdue_items=overdue,
         next_due_at=min(future_due_dates) if future_due_dates else None,
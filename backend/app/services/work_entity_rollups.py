@@ -0,0 +1,352 @@
+"""Write-maintained counters behind the project summary."""
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import event as sa_event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.work_entity import (
+    WorkEntity,
+    WorkEntityArtifact,
+    WorkEntityMilestone,
+    WorkEntityRollup,
+    WorkEntityTask,
+)
+
+RollupKey = str | tuple[str, str]
+ROLLUP_MODELS = (WorkEntityTask, WorkEntityMilestone, WorkEntityArtifact)
+
+
+def _due_key(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def task_contribution(status: str, forecast_due_at: datetime | None) -> Counter:
+    """What one project task adds to its entity rollup."""
+    counter: Counter[RollupKey] = Counter()
+    if status == "cancelled":
+        return counter
+    counter["native_tasks"] += 1
+    counter[("status", status)] += 1
+    if status == "done":
+        counter["done_items"] += 1
+    elif forecast_due_at is not None:
+        counter[("due", _due_key(forecast_due_at))] += 1
+    return counter
+
+
+def milestone_contribution(status: str, forecast_at: datetime | None) -> Counter:
+    """What one milestone adds to its entity rollup."""
+    counter: Counter[RollupKey] = Counter()
+    if status == "cancelled":
+        return counter
+    counter["native_milestones"] += 1
+    counter[("status", status)] += 1
+    if status == "achieved":
+        counter["done_items"] += 1
+    elif forecast_at is not None:
+        counter[("due", _due_key(forecast_at))] += 1
+    return counter
+
+
+def artifact_contribution(status: str) -> Counter:
+    counter: Counter[RollupKey] = Counter()
+    if status != "archived":
+        counter["artifacts"] += 1
+    return counter
+
+
+def _contribution(item, values: dict) -> Counter:
+    if isinstance(item, WorkEntityTask):
+        return task_contribution(values["status"], values["forecast_due_at"])
+    if isinstance(item, WorkEntityMilestone):
+        return milestone_contribution(values["status"], values["forecast_at"])
+    return artifact_contribution(values["status"])
+
+
+def _tracked_fields(item) -> tuple[str, ...]:
+    if isinstance(item, WorkEntityTask):
+        return ("status", "forecast_due_at")
+    if isinstance(item, WorkEntityMilestone):
+        return ("status", "forecast_at")
+    return ("status",)
+
+
+def _current_values(item) -> dict:
+    return {name: getattr(item, name) for name in _tracked_fields(item)}
+
+
+def _previous_values(item) -> dict:
+    state = inspect(item)
+    values = {}
+    for name in _tracked_fields(item):
+        history = state.attrs[name].history
+        values[name] = history.deleted[0] if history.deleted else getattr(item, name)
+    return values
+
+
+def counter_to_row(counter: Counter) -> dict:
+    return {
+        "native_tasks": counter["native_tasks"],
+        "native_milestones": counter["native_milestones"],
+        "artifacts": counter["artifacts"],
+        "done_items": counter["done_items"],
+        "counts_by_status": {
+            key[1]: value
+            for key, value in sorted(counter.items(), key=lambda item: str(item[0]))
+            if isinstance(key, tuple) and key[0] == "status" and value
+        },
+        "open_due_counts": {
+            key[1]: value
+            for key, value in sorted(counter.items(), key=lambda item: str(item[0]))
+            if isinstance(key, tuple) and key[0] == "due" and value
+        },
+    }
+
+
+def counter_from_row(row) -> Counter:
+    counter: Counter[RollupKey] = Counter()
+    if row is None:
+        return counter
+    for name in ("native_tasks", "native_milestones", "artifacts", "done_items"):
+        counter[name] = row[name]
+    for status, value in (row["counts_by_status"] or {}).items():
+        counter[("status", status)] = value
+    for due, value in (row["open_due_counts"] or {}).items():
+        counter[("due", due)] = value
+    return counter
+
+
+def _recompute_statements(entity_ids: set[UUID]):
+    return (
+        select(
+            WorkEntityTask.entity_id,
+            WorkEntityTask.status,
+            WorkEntityTask.forecast_due_at,
+            func.count(WorkEntityTask.id),
+        )
+        .where(WorkEntityTask.entity_id.in_(entity_ids))
+        .group_by(
+            WorkEntityTask.entity_id,
+            WorkEntityTask.status,
+            WorkEntityTask.forecast_due_at,
+        ),
+        select(
+            WorkEntityMilestone.entity_id,
+            WorkEntityMilestone.status,
+            WorkEntityMilestone.forecast_at,
+            func.count(WorkEntityMilestone.id),
+        )
+        .where(WorkEntityMilestone.entity_id.in_(entity_ids))
+        .group_by(
+            WorkEntityMilestone.entity_id,
+            WorkEntityMilestone.status,
+            WorkEntityMilestone.forecast_at,
+        ),
+        select(
+            WorkEntityArtifact.entity_id,
+            WorkEntityArtifact.status,
+            func.count(WorkEntityArtifact.id),
+        )
+        .where(WorkEntityArtifact.entity_id.in_(entity_ids))
+        .group_by(WorkEntityArtifact.entity_id, WorkEntityArtifact.status),
+    )
+
+
+def _counters_from_aggregates(
+    entity_ids: set[UUID],
+    task_rows,
+    milestone_rows,
+    artifact_rows,
+) -> dict[UUID, Counter]:
+    counters: dict[UUID, Counter] = {entity_id: Counter() for entity_id in entity_ids}
+    for entity_id, status, due_at, count in task_rows:
+        for key, value in task_contribution(status, due_at).items():
+            counters[entity_id][key] += value * count
+    for entity_id, status, due_at, count in milestone_rows:
+        for key, value in milestone_contribution(status, due_at).items():
+            counters[entity_id][key] += value * count
+    for entity_id, status, count in artifact_rows:
+        for key, value in artifact_contribution(status).items():
+            counters[entity_id][key] += value * count
+    return counters
+
+
+def _upsert(entity_id: UUID, counter: Counter):
+    values = counter_to_row(counter)
+    values["updated_at"] = datetime.now(timezone.utc)
+    stmt = insert(WorkEntityRollup.__table__).values(entity_id=entity_id, **values)
+    return stmt.on_conflict_do_update(
+        index_elements=[WorkEntityRollup.__table__.c.entity_id],
+        set_=values,
+    )
+
+
+@sa_event.listens_for(Session, "after_flush")
+def _maintain_entity_rollups(session: Session, flush_context) -> None:
+    """
+    Apply per-item deltas for project tasks, milestones and artifacts.
+
+    Old values come from attribute history, so an update costs one locked
+    read and one write of the rollup row regardless of project size. A
+    missing row is rebuilt from grouped aggregates, which already see the
+    flushed change.
+    """
+    deltas: dict[UUID, Counter] = defaultdict(Counter)
+    for item in session.new:
+        if isinstance(item, ROLLUP_MODELS):
+            deltas[item.entity_id].update(_contribution(item, _current_values(item)))
+    for item in session.dirty:
+        if isinstance(item, ROLLUP_MODELS) and session.is_modified(item):
+            deltas[item.entity_id].update(_contribution(item, _current_values(item)))
+            deltas[item.entity_id].subtract(
+                _contribution(item, _previous_values(item))
+            )
+    for item in session.deleted:
+        if isinstance(item, ROLLUP_MODELS):
+            deltas[item.entity_id].subtract(
+                _contribution(item, _previous_values(item))
+            )
+    changed = {
+        entity_id: Counter({key: value for key, value in delta.items() if value})
+        for entity_id, delta in deltas.items()
+    }
+    changed = {entity_id: delta for entity_id, delta in changed.items() if delta}
+    if not changed:
+        return
+
+    connection = session.connection()
+    table = WorkEntityRollup.__table__
+    rows = {
+        row["entity_id"]: row
+        for row in connection.execute(
+            select(table)
+            .where(table.c.entity_id.in_(changed))
+            .order_by(table.c.entity_id)
+            .with_for_update()
+        ).mappings()
+    }
+    missing = set(changed) - set(rows)
+    if missing:
+        existing = set(
+            connection.execute(
+                select(WorkEntity.__table__.c.id).where(
+                    WorkEntity.__table__.c.id.in_(missing)
+                )
+            ).scalars()
+        )
+        if existing:
+            results = [
+                connection.execute(stmt).all()
+                for stmt in _recompute_statements(existing)
+            ]
+            rebuilt = _counters_from_aggregates(existing, *results)
+            for entity_id, counter in rebuilt.items():
+                connection.execute(_upsert(entity_id, counter))
+    for entity_id, row in rows.items():
+        counter = counter_from_row(row)
+        counter.update(changed[entity_id])
+        connection.execute(_upsert(entity_id, counter))
+
+
+async def load_entity_rollup(db: AsyncSession, entity_id: UUID) -> Counter:
+    """Primary-key read of the maintained counters; no row means no items."""
+    row = (
+        await db.execute(
+            select(WorkEntityRollup.__table__).where(
+                WorkEntityRollup.__table__.c.entity_id == entity_id
+            )
+        )
+    ).mappings().one_or_none()
+    return counter_from_row(row)
+
+
+async def recompute_entity_rollups(
+    db: AsyncSession,
+    entity_ids: set[UUID],
+) -> dict[UUID, Counter]:
+    """Rebuild counters for the given entities from their current rows."""
+    if not entity_ids:
+        return {}
+    results = [
+        (await db.execute(stmt)).all()
+        for stmt in _recompute_statements(entity_ids)
+    ]
+    return _counters_from_aggregates(entity_ids, *results)
+
+
+@dataclass
+class RollupDrift:
+    entity_id: UUID
+    stored: dict
+    expected: dict
+
+
+async def verify_entity_rollups(
+    db: AsyncSession,
+    *,
+    repair: bool = False,
+    batch_size: int = 500,
+) -> list[RollupDrift]:
+    """Compare stored rollups with a full recomputation, optionally repairing."""
+    drifts: list[RollupDrift] = []
+    entity_ids = list(
+        (await db.execute(select(WorkEntity.id).order_by(WorkEntity.id))).scalars()
+    )
+    for start in range(0, len(entity_ids), batch_size):
+        batch = set(entity_ids[start : start + batch_size])
+        expected = await recompute_entity_rollups(db, batch)
+        stored_rows = {
+            row["entity_id"]: row
+            for row in (
+                await db.execute(
+                    select(WorkEntityRollup.__table__).where(
+                        WorkEntityRollup.__table__.c.entity_id.in_(batch)
+                    )
+                )
+            ).mappings()
+        }
+        for entity_id in sorted(batch):
+            stored = counter_to_row(counter_from_row(stored_rows.get(entity_id)))
+            wanted = counter_to_row(expected[entity_id])
+            if stored == wanted:
+                continue
+            drifts.append(RollupDrift(entity_id, stored, wanted))
+            if repair:
+                await db.execute(_upsert(entity_id, expected[entity_id]))
+    return drifts
+
+
+def summary_counts(counter: Counter, now: datetime) -> dict:
+    """Derive summary fields from a rollup at read time."""
+    overdue = 0
+    next_due_at: datetime | None = None
+    for key, value in counter.items():
+        if not (isinstance(key, tuple) and key[0] == "due" and value):
+            continue
+        due_at = datetime.fromisoformat(key[1])
+        if due_at < now:
+            overdue += value
+        elif next_due_at is None or due_at < next_due_at:
+            next_due_at = due_at
+    return {
+        "native_tasks": counter["native_tasks"],
+        "native_milestones": counter["native_milestones"],
+        "artifacts": counter["artifacts"],
+        "done_items": counter["done_items"],
+        "overdue": overdue,
+        "next_due_at": next_due_at,
+        "counts_by_status": {
+            key[1]: value
+            for key, value in counter.items()
+            if isinstance(key, tuple) and key[0] == "status" and value
+        },
+    }
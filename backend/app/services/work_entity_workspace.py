@@ -7,9 +7,17 @@ from math import ceil
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import func, select, text
+from sqlalchemy import func, or_, select, text, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.core.http_cache import PayloadCache, weak_etag
+from app.models.deadline_tracker import DeadlineTracker
+from app.models.execution_contract import WorkEntityExecutionContract
+from app.models.personal_task import PersonalTask
+from app.models.quick_note import QuickNote
+from app.models.task import Task
 from app.models.user import User
 from app.models.work_entity import (
     WorkEntity,
@@ -36,6 +44,7 @@ from app.schemas.work_entity import (
     WorkEntityTaskRead,
     WorkEntityWorkspaceRead,
 )
+from app.services.entity_loader import entity_loader
 from app.services.work_entities import serialize_links
 from app.services.execution_contracts import load_active_execution_contracts
 
@@ -47,6 +56,8 @@ DEPENDENCY_GATED_TASK_STATUSES = {"in_progress", "review", "done"}
 AUTO_SHIFT_TASK_STATUSES = {"planned", "waiting", "blocked"}
 NodeKey = tuple[str, UUID]
 
+workspace_payload_cache = PayloadCache(settings.WORKSPACE_PAYLOAD_CACHE_ENTRIES)
+
 
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
@@ -221,15 +232,8 @@ async def validate_stage(
 ) -> WorkEntityStage | None:
     if stage_id is None:
         return None
-    stage = (
-        await db.execute(
-            select(WorkEntityStage).where(
-                WorkEntityStage.id == stage_id,
-                WorkEntityStage.entity_id == entity_id,
-            )
-        )
-    ).scalar_one_or_none()
-    if not stage:
+    stage = await entity_loader(db).load(WorkEntityStage, stage_id)
+    if not stage or stage.entity_id != entity_id:
         raise HTTPException(status_code=400, detail="Этап не относится к проекту")
     if stage.status == "cancelled":
         raise HTTPException(
@@ -246,12 +250,8 @@ async def validate_assignee(
 ) -> User | None:
     if assignee_id is None:
         return None
-    user = (
-        await db.execute(
-            select(User).where(User.id == assignee_id, User.is_active.is_(True))
-        )
-    ).scalar_one_or_none()
-    if not user:
+    user = await entity_loader(db).load(User, assignee_id)
+    if not user or not user.is_active:
         raise HTTPException(status_code=404, detail="Исполнитель не найден")
     if assignee_id == entity.owner_id:
         return user
@@ -503,9 +503,6 @@ async def _workspace_rows(db: AsyncSession, entity: WorkEntity):
             .order_by(User.full_name, User.email)
         )
     ).all()
-    owner = (
-        await db.execute(select(User).where(User.id == entity.owner_id))
-    ).scalar_one()
     stages = list(
         (
             await db.execute(
@@ -587,14 +584,15 @@ async def _workspace_rows(db: AsyncSession, entity: WorkEntity):
         for user_id in (item.created_by_id, item.waived_by_id)
         if user_id is not None
     )
-    user_ids.add(owner.id)
+    # The owner is resolved through the same batch instead of a separate query.
+    user_ids.add(entity.owner_id)
     user_ids.update(member.user_id for member, _ in member_rows)
     users = (
         await db.execute(select(User).where(User.id.in_(user_ids)))
     ).scalars().all()
     user_map = {item.id: item for item in users}
     return (
-        owner,
+        user_map[entity.owner_id],
         member_rows,
         stages,
         tasks,
@@ -605,6 +603,102 @@ async def _workspace_rows(db: AsyncSession, entity: WorkEntity):
     )
 
 
+def _link_targets_updated_at(entity_id: UUID):
+    """Latest change among objects linked to the entity, across target types."""
+    target_entity = aliased(WorkEntity)
+    targets = union_all(
+        select(target_entity.updated_at.label("updated_at"))
+        .join(WorkEntityLink, WorkEntityLink.target_entity_id == target_entity.id)
+        .where(WorkEntityLink.entity_id == entity_id),
+        select(Task.updated_at)
+        .join(WorkEntityLink, WorkEntityLink.task_id == Task.id)
+        .where(WorkEntityLink.entity_id == entity_id),
+        select(PersonalTask.updated_at)
+        .join(WorkEntityLink, WorkEntityLink.personal_task_id == PersonalTask.id)
+        .where(WorkEntityLink.entity_id == entity_id),
+        select(QuickNote.updated_at)
+        .join(WorkEntityLink, WorkEntityLink.quick_note_id == QuickNote.id)
+        .where(WorkEntityLink.entity_id == entity_id),
+        select(DeadlineTracker.updated_at)
+        .join(WorkEntityLink, WorkEntityLink.deadline_tracker_id == DeadlineTracker.id)
+        .where(WorkEntityLink.entity_id == entity_id),
+    ).subquery()
+    return select(func.max(targets.c.updated_at)).scalar_subquery()
+
+
+async def workspace_etag(
+    db: AsyncSession,
+    entity: WorkEntity,
+    access_role: str,
+    current_user: User,
+    *,
+    view: str,
+) -> str:
+    """
+    Validate a cached workspace or map payload with a single query.
+
+    workspace_revision covers every audited project mutation. The remaining
+    columns cover state the payload reads from outside the project: linked
+    queue tasks, participant profiles, milestones that became overdue since
+    the last change and, for the map, linked objects.
+    """
+    contract_tasks_updated_at = (
+        select(func.max(Task.updated_at))
+        .join(
+            WorkEntityExecutionContract,
+            WorkEntityExecutionContract.task_id == Task.id,
+        )
+        .where(
+            WorkEntityExecutionContract.entity_id == entity.id,
+            WorkEntityExecutionContract.status == "active",
+        )
+        .scalar_subquery()
+    )
+    participants_updated_at = (
+        select(func.max(User.updated_at))
+        .where(
+            or_(
+                User.id == entity.owner_id,
+                User.id.in_(
+                    select(WorkEntityMember.user_id).where(
+                        WorkEntityMember.entity_id == entity.id
+                    )
+                ),
+            )
+        )
+        .scalar_subquery()
+    )
+    overdue_milestones = (
+        select(func.count(WorkEntityMilestone.id))
+        .where(
+            WorkEntityMilestone.entity_id == entity.id,
+            WorkEntityMilestone.status.not_in(TERMINAL_MILESTONE_STATUSES),
+            WorkEntityMilestone.forecast_at < func.now(),
+        )
+        .scalar_subquery()
+    )
+    columns = [
+        WorkEntity.workspace_revision,
+        contract_tasks_updated_at,
+        participants_updated_at,
+        overdue_milestones,
+    ]
+    if view == "map":
+        columns.append(_link_targets_updated_at(entity.id))
+    state = (
+        await db.execute(select(*columns).where(WorkEntity.id == entity.id))
+    ).one()
+    return weak_etag(
+        view,
+        entity.id,
+        *state,
+        current_user.id,
+        current_user.role.value,
+        current_user.can_link_queue_tasks_to_projects,
+        access_role,
+    )
+
+
 async def build_workspace(
     db: AsyncSession,
     entity: WorkEntity,
@@ -621,19 +715,10 @@ async def build_workspace(
         artifacts,
         user_map,
     ) = await _workspace_rows(db, entity)
-    open_counts = dict(
-        (
-            await db.execute(
-                select(WorkEntityTask.assignee_id, func.count(WorkEntityTask.id))
-                .where(
-                    WorkEntityTask.entity_id == entity.id,
-                    WorkEntityTask.assignee_id.is_not(None),
-                    WorkEntityTask.status.not_in(TERMINAL_TASK_STATUSES),
-                )
-                .group_by(WorkEntityTask.assignee_id)
-            )
-        ).all()
-    )
+    open_counts: dict[UUID, int] = defaultdict(int)
+    for task in tasks:
+        if task.assignee_id and task.status not in TERMINAL_TASK_STATUSES:
+            open_counts[task.assignee_id] += 1
     participants = [
         WorkEntityParticipantRead(
             user_id=owner.id,
@@ -1452,5 +1537,4 @@ async def build_project_map(
         range_end=range_end,
         nodes=nodes,
         edges=edges,
-        generated_at=utc_now(),
     )
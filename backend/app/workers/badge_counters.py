@@ -0,0 +1,88 @@
+"""
+Standalone badge counter worker.
+
+Записи удаляют строки user_badge_counters затронутых пользователей; воркер
+каждые BADGE_COUNTER_RECOUNT_SECONDS пересчитывает недостающие строки под
+блокировкой, а раз в BADGE_COUNTER_VERIFY_SECONDS сверяет все строки с
+пересчетом и чинит расхождения (как app.maintenance.badge_counters --repair).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+import time
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services.badge_counters import BADGE_CHUNK, recount_missing_badge_counters, verify_badge_counters
+
+
+logger = logging.getLogger("dpms.badge_worker")
+
+
+async def recount_once() -> int:
+    """Дописать недостающие строки пачками по BADGE_CHUNK; сколько пересчитано."""
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            recounted = await recount_missing_badge_counters(db)
+            await db.commit()
+        total += recounted
+        if recounted < BADGE_CHUNK:
+            return total
+
+
+async def verify_once() -> int:
+    async with AsyncSessionLocal() as db:
+        drifts = await verify_badge_counters(db, repair=True)
+        await db.commit()
+    for drift in drifts:
+        logger.warning(
+            "badge_counter_drift user_id=%s field=%s stored=%d expected=%d",
+            drift.user_id,
+            drift.field,
+            drift.stored,
+            drift.expected,
+        )
+    return len(drifts)
+
+
+async def _sleep_until_stop(stop_event: asyncio.Event, timeout: float) -> None:
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout=max(timeout, 0.1))
+    except asyncio.TimeoutError:
+        pass
+
+
+async def run() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_name in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signal_name, stop_event.set)
+        except NotImplementedError:
+            pass
+
+    logger.info("badge_worker=started")
+    next_verify = time.monotonic()
+    while not stop_event.is_set():
+        try:
+            recounted = await recount_once()
+            if recounted:
+                logger.info("badge_counters_recounted=%d", recounted)
+            if time.monotonic() >= next_verify:
+                next_verify = time.monotonic() + settings.BADGE_COUNTER_VERIFY_SECONDS
+                logger.info("badge_counter_verify drift_count=%d", await verify_once())
+        except Exception as error:
+            logger.error(
+                "badge_worker_cycle=failed error_code=%s",
+                type(error).__name__,
+            )
+        await _sleep_until_stop(stop_event, settings.BADGE_COUNTER_RECOUNT_SECONDS)
+    logger.info("badge_worker=stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
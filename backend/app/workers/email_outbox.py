@@ -15,7 +15,7 @@ from urllib.parse import urlsplit
 from uuid import UUID
 
 from app.config import settings
-from app.database import AsyncSessionLocal
+from app.database import AuxSessionLocal
 from app.models.email_outbox import EmailOutbox
 from app.services.email_outbox import (
     claim_email_batch,
@@ -171,7 +171,7 @@ async def run_worker_once(
     now: datetime | None = None,
     recipient_user_id: UUID | None = None,
 ) -> int:
-    async with AsyncSessionLocal() as db:
+    async with AuxSessionLocal() as db:
         jobs = await claim_email_batch(
             db,
             now=now,
@@ -192,11 +192,11 @@ async def run_worker_once(
                 len(group),
                 error_code,
             )
-            async with AsyncSessionLocal() as db:
+            async with AuxSessionLocal() as db:
                 await mark_email_group_failed(db, group, error_code=error_code)
                 await db.commit()
         else:
-            async with AsyncSessionLocal() as db:
+            async with AuxSessionLocal() as db:
                 await mark_email_group_sent(
                     db,
                     group,
@@ -0,0 +1,176 @@
+"""
+Standalone lease-based report job worker.
+
+Пока отчет считается, аренда продлевается каждые REPORT_JOB_LEASE_SECONDS / 3
+(а не только на отметках прогресса): долгий расчет не забирает второй
+воркер. Если продление не нашло аренду, расчет отменяется.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import signal
+from datetime import datetime
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.database import AsyncSessionLocal, read_only_session
+from app.services.report_jobs import (
+    ReportJobInputError,
+    claim_report_job,
+    complete_report_job,
+    encode_report_result,
+    execute_report,
+    fail_report_job,
+    purge_report_jobs,
+    update_report_progress,
+)
+
+
+logger = logging.getLogger("dpms.report_worker")
+
+PURGE_EVERY_CYCLES = 500
+
+
+def _error_code(error: BaseException) -> str:
+    if isinstance(error, ReportJobInputError):
+        return str(error)[:120]
+    if isinstance(error, HTTPException):
+        return str(error.detail)[:120]
+    return (type(error).__name__ or "ReportError")[:120]
+
+
+def _heartbeat_seconds() -> float:
+    # Три попытки продления за срок аренды: один сбой БД не отдает задачу другому воркеру.
+    return max(30, settings.REPORT_JOB_LEASE_SECONDS) / 3
+
+
+async def run_worker_once(*, now: datetime | None = None) -> int:
+    async with AsyncSessionLocal() as db:
+        job = await claim_report_job(db, now=now)
+        if job is None:
+            await db.commit()
+            return 0
+        job_id, lease_token = job.id, job.lease_token
+        kind, params = job.kind, dict(job.params)
+        await db.commit()
+
+    state = {"progress": 0, "lease_lost": False}
+    work: asyncio.Task | None = None
+
+    async def progress(value: int) -> None:
+        state["progress"] = value
+        async with AsyncSessionLocal() as progress_db:
+            renewed = await update_report_progress(progress_db, job_id, lease_token, value)
+            await progress_db.commit()
+        if not renewed and not state["lease_lost"]:
+            # Задачу забрал другой воркер (или ее отменили): этот расчет не нужен.
+            state["lease_lost"] = True
+            work.cancel()
+
+    async def heartbeat() -> None:
+        while True:
+            await asyncio.sleep(_heartbeat_seconds())
+            try:
+                await progress(state["progress"])
+            except Exception as error:
+                logger.warning(
+                    "report_job=heartbeat_failed job_id=%s error_code=%s",
+                    job_id,
+                    type(error).__name__,
+                )
+
+    async def compute() -> tuple[bytes, str, int]:
+        await progress(10)
+        # Расчет только читает: один снимок, на реплике при DATABASE_REPLICA_URL.
+        async with read_only_session(snapshot=True) as db:
+            report = await execute_report(db, kind, params, progress)
+        await progress(90)
+        return encode_report_result(report)
+
+    work = asyncio.create_task(compute())
+    renewer = asyncio.create_task(heartbeat())
+    try:
+        data, etag, size = await work
+    except asyncio.CancelledError:
+        if not state["lease_lost"]:
+            raise
+        logger.warning("report_job=lease_lost job_id=%s kind=%s", job_id, kind)
+        return 1
+    except Exception as error:
+        error_code = _error_code(error)
+        terminal = isinstance(error, (ReportJobInputError, HTTPException))
+        logger.warning(
+            "report_job=failed job_id=%s kind=%s terminal=%s error_code=%s",
+            job_id,
+            kind,
+            terminal,
+            error_code,
+        )
+        async with AsyncSessionLocal() as db:
+            await fail_report_job(db, job_id, lease_token, error_code=error_code, terminal=terminal)
+            await db.commit()
+        return 1
+    finally:
+        renewer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await renewer
+
+    async with AsyncSessionLocal() as db:
+        stored = await complete_report_job(db, job_id, lease_token, data=data, etag=etag, size=size)
+        await db.commit()
+    logger.info(
+        "report_job=%s job_id=%s kind=%s size=%d compressed=%d",
+        "done" if stored else "lease_lost",
+        job_id,
+        kind,
+        size,
+        len(data),
+    )
+    return 1
+
+
+async def _sleep_until_stop(stop_event: asyncio.Event, timeout: float) -> None:
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout=max(timeout, 0.1))
+    except asyncio.TimeoutError:
+        pass
+
+
+async def run() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_name in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signal_name, stop_event.set)
+        except NotImplementedError:
+            pass
+
+    logger.info("report_worker=started")
+    cycles = 0
+    while not stop_event.is_set():
+        try:
+            processed = await run_worker_once()
+            if cycles % PURGE_EVERY_CYCLES == 0:
+                async with AsyncSessionLocal() as db:
+                    purged = await purge_report_jobs(db)
+                    await db.commit()
+                if purged:
+                    logger.info("report_jobs_purged=%d", purged)
+        except Exception as error:
+            logger.error(
+                "report_worker_cycle=failed error_code=%s",
+                type(error).__name__,
+            )
+            processed = 0
+        cycles += 1
+        if processed == 0:
+            await _sleep_until_stop(stop_event, settings.REPORT_WORKER_POLL_SECONDS)
+    logger.info("report_worker=stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
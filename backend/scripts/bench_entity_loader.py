@@ -0,0 +1,88 @@
+"""Transactional check of the request-scoped entity loader.
+
+Creates disposable users inside one transaction, resolves them repeatedly
+one id at a time (as label helpers do) and checks that the loader issues a
+single IN query for the primed batch, answers repeats from its cache and
+reports matching hit statistics, then rolls everything back.
+
+    python scripts/bench_entity_loader.py --users 200
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.database import AsyncSessionLocal, engine
+from app.models.user import League, User, UserRole
+from app.services.entity_loader import entity_loader
+
+_statements = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count_statement(*_args) -> None:
+    global _statements
+    _statements += 1
+
+
+async def run(user_count: int, repeats: int) -> None:
+    global _statements
+    async with AsyncSessionLocal() as db:
+        users = [
+            User(
+                full_name=f"Loader bench {index}",
+                email=f"loader-bench-{index}-{uuid.uuid4()}@dpms-demo.ru",
+                league=League.B,
+                role=UserRole.executor,
+                mpw=100,
+                wallet_main=Decimal("0"),
+                wallet_karma=Decimal("0"),
+                is_active=True,
+            )
+            for index in range(user_count)
+        ]
+        db.add_all(users)
+        await db.flush()
+        ids = [user.id for user in users]
+        missing_id = uuid.uuid4()
+        # Свежие объекты уже в identity map; очищаем, чтобы мерить именно запросы.
+        db.expunge_all()
+
+        loader = entity_loader(db)
+        loader.prime(User, [*ids, missing_id])
+        _statements = 0
+        started = time.perf_counter()
+        for _ in range(repeats):
+            for user_id in ids:
+                user = await loader.load(User, user_id)
+                assert user is not None and user.id == user_id, user_id
+            assert await loader.load(User, missing_id) is None
+        elapsed = time.perf_counter() - started
+
+        stats = loader.stats
+        lookups = repeats * (user_count + 1)
+        assert _statements == 1, _statements
+        assert stats.queries == 1, stats
+        assert stats.rows == user_count, stats
+        assert stats.requested == lookups, stats
+        assert stats.hits == lookups - 1, stats
+        assert entity_loader(db) is loader
+        print(f"lookups={lookups} statements={_statements} {elapsed * 1000:.1f} ms stats={stats.as_dict()}")
+
+        await db.rollback()
+        print("Entity loader check OK: one IN query per primed batch, repeats served from cache; changes rolled back.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Transactional benchmark: preview, close and cancel a period for many users.
+
+Creates disposable users inside one transaction, checks that the written
+snapshots and debits match the dry-run preview exactly and that cancelling
+restores every wallet, prints wall time and SQL statement count per step,
+then rolls everything back.
+
+    python scripts/bench_period_rollover.py --users 1000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from decimal import Decimal
+
+from sqlalchemy import event, select
+
+from app.database import AsyncSessionLocal, engine
+from app.models.shop import PeriodSnapshot
+from app.models.user import League, User, UserRole
+from app.services.admin import cancel_period_closure, preview_rollover_period, rollover_period
+
+BENCH_PERIOD = "2001-01"
+_statements = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count_statement(*_args) -> None:
+    global _statements
+    _statements += 1
+
+
+def bench_user(role: UserRole, index: int) -> User:
+    return User(
+        full_name=f"Rollover bench {index}",
+        email=f"rollover-bench-{index}-{uuid.uuid4()}@dpms-demo.ru",
+        league=League.B,
+        role=role,
+        mpw=100 + index % 50,
+        wallet_main=Decimal(str(60 + index % 90)),
+        wallet_karma=Decimal(str(index % 7)),
+        is_active=True,
+    )
+
+
+async def measure(label: str, action: Callable[[], Awaitable[object]]) -> object:
+    global _statements
+    _statements = 0
+    started = time.perf_counter()
+    result = await action()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<12} {elapsed * 1000:9.1f} ms  {_statements:6d} statements")
+    return result
+
+
+async def run(user_count: int) -> None:
+    async with AsyncSessionLocal() as db:
+        admin = bench_user(UserRole.admin, -1)
+        users = [bench_user(UserRole.executor, n) for n in range(user_count)]
+        db.add_all([admin, *users])
+        await db.flush()
+        before = {user.id: user.wallet_main for user in [admin, *users]}
+
+        preview = await measure("preview", lambda: preview_rollover_period(db, admin.id, BENCH_PERIOD))
+        await measure("rollover", lambda: rollover_period(db, admin.id, BENCH_PERIOD))
+
+        snapshots = {
+            snapshot.user_id: snapshot
+            for snapshot in (
+                await db.execute(select(PeriodSnapshot).where(PeriodSnapshot.period == BENCH_PERIOD))
+            ).scalars()
+        }
+        assert len(snapshots) == preview["users_processed"], (len(snapshots), preview["users_processed"])
+        for row in preview["rows"]:
+            snapshot = snapshots[row["user_id"]]
+            assert snapshot.mpw == row["mpw"], row
+            assert float(snapshot.earned_main) == row["earned_main"], row
+            assert snapshot.tasks_completed == row["tasks_completed"], row
+        by_id = {row["user_id"]: row for row in preview["rows"]}
+        for user in users:
+            assert float(user.wallet_main) == by_id[user.id]["carry_over"], user.id
+
+        await measure("cancel", lambda: cancel_period_closure(db, admin.id, BENCH_PERIOD))
+        for user in [admin, *users]:
+            assert user.wallet_main == before[user.id], (user.id, user.wallet_main, before[user.id])
+
+        await db.rollback()
+        print("Period rollover benchmark OK: closure matched the preview, cancel restored wallets; changes rolled back.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.users))
+
+
+if __name__ == "__main__":
+    main()
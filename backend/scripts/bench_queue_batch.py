@@ -0,0 +1,150 @@
+"""Transactional benchmark: per-task assign/validate loop vs the batch endpoints' services.
+
+Creates disposable users and tasks inside one transaction, measures wall time
+and SQL statement count for both paths, then rolls everything back.
+
+    python scripts/bench_queue_batch.py --tasks 50 --executors 10
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.database import AsyncSessionLocal, engine
+from app.models.catalog import Complexity
+from app.models.task import Task, TaskPriority, TaskStatus, TaskType
+from app.models.user import League, User, UserRole
+from app.schemas.queue import AssignBatchItem, ValidateBatchItem
+from app.services.queue import (
+    assign_task,
+    assign_tasks_batch,
+    validate_task,
+    validate_tasks_batch,
+)
+
+_statements = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count_statement(*_args) -> None:
+    global _statements
+    _statements += 1
+
+
+def bench_user(role: UserRole, label: str) -> User:
+    return User(
+        full_name=f"Queue bench {label}",
+        email=f"queue-bench-{label}-{uuid.uuid4()}@dpms-demo.ru",
+        league=League.A,
+        role=role,
+        mpw=0,
+        wip_limit=1000,
+        task_workspace_enabled=True,
+        is_active=True,
+    )
+
+
+def bench_task(owner: User, index: int) -> Task:
+    # critical: не зависит от 24ч-правила и блокировки очереди чужими критическими задачами
+    return Task(
+        title=f"BENCH: queue batch #{index}",
+        task_type=TaskType.docs,
+        complexity=Complexity.S,
+        estimated_q=Decimal("2.0"),
+        priority=TaskPriority.critical,
+        status=TaskStatus.in_queue,
+        min_league=League.C,
+        estimator_id=owner.id,
+        acceptance_owner_id=owner.id,
+        created_at=datetime.now(timezone.utc) - timedelta(days=2),
+    )
+
+
+async def measure(label: str, action: Callable[[], Awaitable[object]]) -> tuple[float, int]:
+    global _statements
+    _statements = 0
+    started = time.perf_counter()
+    await action()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<24} {elapsed * 1000:9.1f} ms  {_statements:6d} statements")
+    return elapsed, _statements
+
+
+async def run(task_count: int, executor_count: int) -> None:
+    async with AsyncSessionLocal() as db:
+        owner = bench_user(UserRole.teamlead, "owner")
+        executors = [bench_user(UserRole.executor, f"executor-{n}") for n in range(executor_count)]
+        db.add_all([owner, *executors])
+        await db.flush()
+        loop_tasks = [bench_task(owner, n) for n in range(task_count)]
+        batch_tasks = [bench_task(owner, task_count + n) for n in range(task_count)]
+        db.add_all([*loop_tasks, *batch_tasks])
+        await db.flush()
+
+        def executor_for(index: int) -> User:
+            return executors[index % executor_count]
+
+        async def assign_loop() -> None:
+            for index, task in enumerate(loop_tasks):
+                await assign_task(db, owner.id, task.id, executor_for(index).id)
+
+        async def assign_batch() -> None:
+            results = await assign_tasks_batch(
+                db,
+                owner.id,
+                [
+                    AssignBatchItem(task_id=task.id, executor_id=executor_for(index).id)
+                    for index, task in enumerate(batch_tasks)
+                ],
+            )
+            failed = [result for result in results if not result.ok]
+            assert not failed, failed[:3]
+
+        await measure("assign: per-task loop", assign_loop)
+        await measure("assign: batch", assign_batch)
+        assert sum(executor.wip_count for executor in executors) == 2 * task_count
+
+        for task in [*loop_tasks, *batch_tasks]:
+            task.status = TaskStatus.review
+            task.acceptance_state = "submitted"
+        await db.flush()
+
+        async def validate_loop() -> None:
+            for task in loop_tasks:
+                await validate_task(db, owner.id, task.id, approved=True)
+
+        async def validate_batch() -> None:
+            results = await validate_tasks_batch(
+                db,
+                owner.id,
+                [ValidateBatchItem(task_id=task.id, approved=True) for task in batch_tasks],
+            )
+            failed = [result for result in results if not result.ok]
+            assert not failed, failed[:3]
+
+        await measure("validate: per-task loop", validate_loop)
+        await measure("validate: batch", validate_batch)
+
+        expected = Decimal("2.0") * 2 * task_count
+        credited = sum((executor.wallet_main + executor.wallet_karma for executor in executors), Decimal("0"))
+        assert credited == expected, (credited, expected)
+
+        await db.rollback()
+        print("Queue batch benchmark OK: both paths produced identical payouts; changes rolled back.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--executors", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.executors))
+
+
+if __name__ == "__main__":
+    main()
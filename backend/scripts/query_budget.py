@@ -0,0 +1,122 @@
+"""Query budgets for in-process smoke suites.
+
+Smoke scripts call route functions directly; wrapping a call in
+``budgets.measure("<route>")`` counts the SQL statements it issues on
+app.database.engine. Budgets are declared in query_budgets.json next to
+this file. A route over its budget (or without one) fails the suite, and
+the report lists its statement fingerprints, most repeated first, which
+is where an N+1 loop shows up.
+
+    budgets = QueryBudgets()
+    async with budgets.measure("admin.league_evaluation"):
+        await league_evaluation_route(user_id=None, user=admin, db=db)
+    budgets.finish()
+"""
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlalchemy import event
+
+from app.database import engine
+
+BUDGET_FILE = Path(__file__).with_name("query_budgets.json")
+FINGERPRINT_WIDTH = 160
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"\$\d+(?:::[\w ]+(?:\[\])?)?|%\(\w+\)s|%s|:\w+|\?")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """SQL without literals and parameters: same query shape — same fingerprint."""
+    text = _STRING_RE.sub("?", statement)
+    text = _PARAM_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _LIST_RE.sub("(?...)", text)
+    text = _SPACE_RE.sub(" ", text).strip()
+    return text if len(text) <= FINGERPRINT_WIDTH else text[: FINGERPRINT_WIDTH - 1] + "…"
+
+
+@dataclass
+class QueryLog:
+    statements: list[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def fingerprints(self) -> list[tuple[str, int]]:
+        return Counter(fingerprint(statement) for statement in self.statements).most_common()
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryLog]:
+    """Collect every statement executed on the application engine inside the block."""
+    log = QueryLog()
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        log.statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield log
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@dataclass
+class _Measurement:
+    route: str
+    budget: int | None
+    log: QueryLog
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is None or self.log.count > self.budget
+
+
+class QueryBudgets:
+    def __init__(self, path: Path = BUDGET_FILE):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        self.path = path
+        self.budgets: dict[str, int] = {
+            route: int(entry["max_queries"]) for route, entry in data["routes"].items()
+        }
+        self.measurements: list[_Measurement] = []
+
+    @asynccontextmanager
+    async def measure(self, route: str) -> AsyncIterator[QueryLog]:
+        with count_queries() as log:
+            yield log
+        self.measurements.append(_Measurement(route=route, budget=self.budgets.get(route), log=log))
+
+    def report(self) -> bool:
+        print(f"{'route':<40} {'queries':>7} {'budget':>7}")
+        for item in self.measurements:
+            budget = "-" if item.budget is None else str(item.budget)
+            mark = "  OVER" if item.over_budget else ""
+            print(f"{item.route:<40} {item.log.count:>7} {budget:>7}{mark}")
+        failures = [item for item in self.measurements if item.over_budget]
+        for item in failures:
+            reason = (
+                f"no budget in {self.path.name}"
+                if item.budget is None
+                else f"{item.log.count} statements > budget {item.budget}"
+            )
+            print(f"\n{item.route}: {reason}")
+            for text, repeats in item.log.fingerprints():
+                print(f"  {repeats:>4}x {text}")
+        return not failures
+
+    def finish(self) -> None:
+        if not self.report():
+            raise SystemExit("Query budget exceeded; see fingerprints above.")
@@ -0,0 +1,172 @@
+"""Run the backend smoke suites in parallel, each in its own template clone.
+
+Every suite gets a CREATE DATABASE ... TEMPLATE copy of the migrated and
+seeded template (scripts/template_databases.py), so suites no longer share
+state and run in parallel processes. --serial runs them one by one in the
+configured database, as the regression script used to, which gives the
+"before" timing. The report prints per-suite time, wall time and the
+serial sum. --timings saves the same numbers as JSON.
+
+    DPMS_TEST_DATABASES_ALLOW_CREATE=1 python scripts/run_smoke_suites.py --jobs 6
+    python scripts/run_smoke_suites.py --serial
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from template_databases import TemplateDatabases
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = SCRIPTS_DIR.parent
+
+# Порядок — как в scripts/dpms-local-regression.sh до параллельного запуска.
+SUITES: list[tuple[str, tuple[str, ...]]] = [
+    ("smoke_messages.py", ("--allow-compose-db",)),
+    ("smoke_email_outbox.py", ()),
+    ("smoke_auth_session.py", ()),
+    ("smoke_admin_user_audit.py", ()),
+    ("smoke_personal_task_execution_guard.py", ()),
+    ("smoke_personal_task_artifacts.py", ()),
+    ("smoke_task_acceptance.py", ()),
+    ("smoke_execution_contracts.py", ()),
+    ("smoke_work_entities.py", ()),
+    ("smoke_work_entity_workspace.py", ()),
+    ("smoke_project_cockpit.py", ()),
+    ("smoke_quick_note_collaboration.py", ()),
+    ("smoke_query_budgets.py", ()),
+]
+
+
+@dataclass
+class SuiteResult:
+    script: str
+    returncode: int
+    seconds: float
+    output: str
+    database: str | None = None
+
+
+async def run_suite(
+    script: str,
+    args: tuple[str, ...],
+    *,
+    databases: TemplateDatabases | None,
+    semaphore: asyncio.Semaphore,
+) -> SuiteResult:
+    async with semaphore:
+        env = dict(os.environ)
+        database = None
+        started = time.perf_counter()
+        if databases is not None:
+            database = await databases.clone(Path(script).stem.removeprefix("smoke_"))
+            env["DATABASE_URL"] = databases.url_for(database).render_as_string(hide_password=False)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                str(SCRIPTS_DIR / script),
+                *args,
+                cwd=BACKEND_DIR,
+                env=env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            output, _ = await process.communicate()
+        finally:
+            if databases is not None and database is not None:
+                await databases.drop(database)
+        return SuiteResult(
+            script=script,
+            returncode=process.returncode or 0,
+            seconds=time.perf_counter() - started,
+            output=output.decode(errors="replace"),
+            database=database,
+        )
+
+
+async def run(args: argparse.Namespace) -> int:
+    selected = [item for item in SUITES if not args.only or item[0] in args.only]
+    started = time.perf_counter()
+    template_seconds = 0.0
+    template_state = "none"
+    databases: TemplateDatabases | None = None
+    if not args.serial:
+        databases = TemplateDatabases()
+        template_started = time.perf_counter()
+        name, built = await databases.ensure_template(max_age_hours=args.max_age_hours)
+        template_seconds = time.perf_counter() - template_started
+        template_state = "built" if built else "reused"
+        print(f"==> template {name} {template_state} in {template_seconds:.1f} s", flush=True)
+
+    jobs = 1 if args.serial else max(1, min(args.jobs, len(selected)))
+    semaphore = asyncio.Semaphore(jobs)
+    results: list[SuiteResult] = []
+    tasks = [
+        asyncio.create_task(run_suite(script, suite_args, databases=databases, semaphore=semaphore))
+        for script, suite_args in selected
+    ]
+    for finished in asyncio.as_completed(tasks):
+        result = await finished
+        results.append(result)
+        state = "ok" if result.returncode == 0 else f"FAILED ({result.returncode})"
+        print(f"==> backend/scripts/{result.script} {state} in {result.seconds:.1f} s", flush=True)
+        if result.returncode != 0 or args.verbose:
+            print(result.output, flush=True)
+    wall = time.perf_counter() - started
+
+    results.sort(key=lambda item: [script for script, _ in selected].index(item.script))
+    serial_sum = sum(item.seconds for item in results)
+    print(f"\n{'suite':<44} {'seconds':>8}  status")
+    for item in results:
+        print(f"{item.script:<44} {item.seconds:>8.1f}  {'ok' if item.returncode == 0 else 'FAILED'}")
+    mode = "serial, shared database" if args.serial else f"{jobs} jobs, template clones"
+    print(
+        f"\nSmoke suites ({mode}): wall {wall:.1f} s, serial sum {serial_sum:.1f} s, "
+        f"template {template_state} {template_seconds:.1f} s."
+    )
+    if args.timings:
+        args.timings.write_text(
+            json.dumps(
+                {
+                    "mode": "serial" if args.serial else "parallel",
+                    "jobs": jobs,
+                    "wall_seconds": round(wall, 2),
+                    "serial_sum_seconds": round(serial_sum, 2),
+                    "template": {"state": template_state, "seconds": round(template_seconds, 2)},
+                    "suites": {item.script: {"seconds": round(item.seconds, 2), "returncode": item.returncode} for item in results},
+                },
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+    failed = [item.script for item in results if item.returncode != 0]
+    if failed:
+        print(f"Failed suites: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--serial", action="store_true", help="one by one in the configured database")
+    parser.add_argument("--only", action="append", metavar="SCRIPT", help="run only these suites")
+    parser.add_argument("--max-age-hours", type=float, default=24.0, help="rebuild an older template")
+    parser.add_argument("--timings", type=Path, help="save timings as JSON")
+    parser.add_argument("--verbose", action="store_true", help="print output of passing suites too")
+    args = parser.parse_args()
+    unknown = set(args.only or []) - {script for script, _ in SUITES}
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Transactional smoke test: SQL statement budgets of list/report routes.
+
+Seeds disposable users with period snapshots and Q transactions inside one
+transaction, calls the routes directly and checks their statement counts
+against scripts/query_budgets.json. The budgets do not depend on data size,
+so an N+1 loop fails the suite on any seed; offending statement
+fingerprints are printed. Everything is rolled back.
+
+    python scripts/smoke_query_budgets.py --users 25
+"""
+import argparse
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from app.api.routes.activity import activity_events
+from app.api.routes.admin import league_evaluation_route
+from app.api.routes.dashboard import capacity_history
+from app.database import AsyncSessionLocal
+from app.models.shop import PeriodSnapshot
+from app.models.transaction import QTransaction, WalletType
+from app.models.user import League, User, UserRole
+from app.services.activity import generate_employee_period_summary
+from app.services.focus import get_focus_statuses
+from query_budget import QueryBudgets
+
+
+def _user(index: int, role: UserRole) -> User:
+    return User(
+        full_name=f"Budget smoke {index}",
+        email=f"budget-smoke-{index}-{uuid.uuid4()}@dpms-demo.ru",
+        league=League.C,
+        role=role,
+        mpw=100,
+        wallet_main=Decimal("0"),
+        wallet_karma=Decimal("0"),
+        is_active=True,
+    )
+
+
+async def run(user_count: int) -> None:
+    budgets = QueryBudgets()
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        admin = _user(0, UserRole.admin)
+        users = [_user(index, UserRole.executor) for index in range(1, user_count + 1)]
+        db.add_all([admin, *users])
+        await db.flush()
+        for user in users:
+            for months_ago in range(1, 5):
+                db.add(PeriodSnapshot(
+                    user_id=user.id,
+                    period=f"{now.year - 1}-{months_ago:02d}",
+                    mpw=Decimal("100"),
+                    earned_main=Decimal("95"),
+                    earned_karma=Decimal("0"),
+                    tasks_completed=3,
+                    league="C",
+                ))
+            for days_ago in (1, 9, 17, 30):
+                db.add(QTransaction(
+                    user_id=user.id,
+                    amount=Decimal("2.5"),
+                    wallet_type=WalletType.main,
+                    reason="Budget smoke",
+                    created_at=now - timedelta(days=days_ago),
+                ))
+        await db.flush()
+        # Сбрасываем identity map, чтобы считать запросы холодного обработчика.
+        db.expunge_all()
+
+        async with budgets.measure("admin.league_evaluation"):
+            evaluations = await league_evaluation_route(user_id=None, user=admin, db=db)
+        seeded = {str(user.id) for user in users}
+        assert seeded <= {item.user_id for item in evaluations}
+        assert all(
+            len(item.history) == 3 for item in evaluations if item.user_id in seeded
+        ), "history must hold the three latest snapshots"
+
+        async with budgets.measure("admin.league_evaluation.one_user"):
+            await league_evaluation_route(user_id=users[0].id, user=admin, db=db)
+
+        async with budgets.measure("dashboard.capacity_history"):
+            history = await capacity_history(weeks=6, user=admin, db=db)
+        assert len(history) == 6, history
+
+        async with budgets.measure("activity.events"):
+            await activity_events(
+                user_id=None,
+                start_date=None,
+                end_date=None,
+                event_type=None,
+                limit=200,
+                cursor=None,
+                user=admin,
+                db=db,
+            )
+
+        async with budgets.measure("focus.statuses"):
+            await get_focus_statuses(db)
+
+        async with budgets.measure("reports.employee_summary"):
+            await generate_employee_period_summary(
+                db,
+                user_id=users[0].id,
+                start_date=date.today() - timedelta(days=30),
+                end_date=date.today(),
+            )
+
+        await db.rollback()
+
+    budgets.finish()
+    print(f"Query budget smoke OK on {user_count} seeded users; changes rolled back.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=25)
+    args = parser.parse_args()
+    asyncio.run(run(args.users))
+
+
+if __name__ == "__main__":
+    main()
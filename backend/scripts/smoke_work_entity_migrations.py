@@ -269,7 +269,7 @@ async def verify_head_schema(database_url: URL) -> None:
                     text("SELECT version_num FROM alembic_version")
                 )
             ).scalar_one()
-            assert revision == "057_email_outbox"
+            assert revision == "071_focus_session_corrections"
             admin_audit_index = (
                 await connection.execute(
                     text(
@@ -305,7 +305,11 @@ async def verify_head_schema(database_url: URL) -> None:
                                 'message_threads',
                                 'message_thread_participants',
                                 'message_posts',
-                                'email_outbox'
+                                'email_outbox',
+                                'focus_sessions',
+                                'rate_limit_buckets',
+                                'reference_versions',
+                                'user_badge_counters'
                               )
                             """
                         )
@@ -327,6 +331,35 @@ async def verify_head_schema(database_url: URL) -> None:
                 "message_thread_participants",
                 "message_posts",
                 "email_outbox",
+                "focus_sessions",
+                "rate_limit_buckets",
+                "reference_versions",
+                "user_badge_counters",
+            }
+            partitioned_tables = set(
+                (
+                    await connection.execute(
+                        text(
+                            """
+                            SELECT relname
+                            FROM pg_class
+                            WHERE relkind = 'p'
+                              AND relname IN (
+                                'activity_events',
+                                'notifications',
+                                'task_review_events',
+                                'work_entity_events'
+                              )
+                            """
+                        )
+                    )
+                ).scalars()
+            )
+            assert partitioned_tables == {
+                "activity_events",
+                "notifications",
+                "task_review_events",
+                "work_entity_events",
             }
             quick_note_columns = set(
                 (
@@ -379,6 +412,7 @@ async def verify_head_schema(database_url: URL) -> None:
                 ).scalars()
             )
             assert "can_link_queue_tasks_to_projects" in user_columns
+            assert "profiling_until" in user_columns
             contract_indexes = set(
                 (
                     await connection.execute(
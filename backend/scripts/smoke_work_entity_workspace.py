@@ -55,6 +55,28 @@ def request(
         return error.code, json.loads(raw) if raw else None
 
 
+def conditional_get(
+    path: str,
+    token: str,
+    etag: str | None = None,
+) -> tuple[int, str | None]:
+    headers = {"Authorization": f"Bearer {token}"}
+    if etag:
+        headers["If-None-Match"] = etag
+    api_request = urllib.request.Request(
+        f"{API_BASE}{path}",
+        headers=headers,
+        method="GET",
+    )
+    try:
+        with urllib.request.urlopen(api_request, timeout=15) as response:
+            response.read()
+            return response.status, response.headers.get("ETag")
+    except urllib.error.HTTPError as error:
+        error.read()
+        return error.code, error.headers.get("ETag")
+
+
 def expect(status: int, expected: int, payload: Any, label: str) -> Any:
     if status != expected:
         raise AssertionError(
@@ -383,6 +405,23 @@ async def run() -> None:
                 "dependencies",
                 "artifacts",
             }.issubset(workspace)
+        status, workspace_etag = conditional_get(
+            f"/api/work-entities/{entity_id}/workspace",
+            tokens["owner"],
+        )
+        expect(status, 200, workspace_etag, "workspace carries ETag")
+        assert workspace_etag
+        status, _ = conditional_get(
+            f"/api/work-entities/{entity_id}/workspace",
+            tokens["owner"],
+            workspace_etag,
+        )
+        expect(status, 304, None, "unchanged workspace revalidates")
+        status, viewer_etag = conditional_get(
+            f"/api/work-entities/{entity_id}/workspace",
+            tokens["viewer"],
+        )
+        assert viewer_etag and viewer_etag != workspace_etag
         status, payload = request(
             "GET",
             f"/api/work-entities/{entity_id}/workspace",
@@ -890,6 +929,12 @@ async def run() -> None:
             tokens["owner"],
         )
         workspace = expect(status, 200, workspace, "read shifted workspace")
+        status, _ = conditional_get(
+            f"/api/work-entities/{entity_id}/workspace",
+            tokens["owner"],
+            workspace_etag,
+        )
+        expect(status, 200, None, "workspace mutation invalidates ETag")
         shifted_source = next(
             item for item in workspace["milestones"] if item["id"] == source["id"]
         )
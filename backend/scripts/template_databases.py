@@ -0,0 +1,246 @@
+"""Template databases for smoke suites: migrate once, clone per suite.
+
+The template is built by the same steps as the backend container
+(alembic upgrade head, python -m app.seed) in a scratch database, then
+renamed to dpms_template_<key> and marked IS_TEMPLATE. The key hashes the
+Alembic migration files and app/seed.py, so a new migration or seed
+change builds a new template and drops the old one. Seed dates are
+relative to "now", so a template older than --max-age-hours is rebuilt.
+Each suite gets its own CREATE DATABASE ... TEMPLATE clone.
+
+    DPMS_TEST_DATABASES_ALLOW_CREATE=1 python scripts/template_databases.py ensure
+    DPMS_TEST_DATABASES_ALLOW_CREATE=1 python scripts/template_databases.py prune
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.config import settings
+
+
+OPT_IN_ENV = "DPMS_TEST_DATABASES_ALLOW_CREATE"
+SAFE_DATABASE_HOSTS = {"localhost", "127.0.0.1", "::1", "db"}
+TEMPLATE_PREFIX = "dpms_template_"
+BUILD_PREFIX = "dpms_template_build_"
+CLONE_PREFIX = "dpms_smoke_"
+MANAGED_DATABASE_RE = re.compile(r"^dpms_(template_[0-9a-f]{16}|template_build_[0-9a-f]{12}|smoke_[a-z0-9_]{1,32}_[0-9a-f]{8})$")
+# Любое число: ключ advisory lock на сборку шаблона.
+TEMPLATE_LOCK_KEY = 7_410_042
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def ensure_safe_target(database_url: URL) -> None:
+    if os.environ.get(OPT_IN_ENV) != "1":
+        raise RuntimeError(
+            f"Template databases are disabled. Set {OPT_IN_ENV}=1 only "
+            "for a disposable local PostgreSQL server."
+        )
+    if database_url.get_backend_name() != "postgresql":
+        raise RuntimeError("Template databases support only PostgreSQL")
+    if (database_url.host or "") not in SAFE_DATABASE_HOSTS:
+        raise RuntimeError("Template databases refuse a non-local database host")
+
+
+def ensure_managed_name(database_name: str) -> None:
+    if not MANAGED_DATABASE_RE.fullmatch(database_name):
+        raise RuntimeError(f"Refusing an unexpected database name: {database_name}")
+
+
+def template_key() -> str:
+    """Хеш миграций и seed: тот же код — тот же шаблон."""
+    digest = hashlib.sha256()
+    sources = sorted((BACKEND_DIR / "alembic" / "versions").glob("*.py"))
+    sources.append(BACKEND_DIR / "app" / "seed.py")
+    for path in sources:
+        digest.update(path.relative_to(BACKEND_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _slug(label: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+    return slug[:32] or "suite"
+
+
+class TemplateDatabases:
+    def __init__(self, database_url: str | URL | None = None):
+        self.base_url = make_url(database_url or settings.DATABASE_URL)
+        ensure_safe_target(self.base_url)
+        self.admin_url = self.base_url.set(database="postgres")
+        self.key = template_key()
+        self.template_name = f"{TEMPLATE_PREFIX}{self.key}"
+
+    def url_for(self, database_name: str) -> URL:
+        return self.base_url.set(database=database_name)
+
+    def _admin(self):
+        return create_async_engine(self.admin_url, isolation_level="AUTOCOMMIT")
+
+    async def ensure_template(self, *, max_age_hours: float = 24.0) -> tuple[str, bool]:
+        """Готовый шаблон текущего ключа; (имя, собран ли сейчас)."""
+        engine = self._admin()
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": TEMPLATE_LOCK_KEY})
+                try:
+                    built_at = await self._template_built_at(connection, self.template_name)
+                    fresh = built_at is not None and (
+                        datetime.now(timezone.utc) - built_at < timedelta(hours=max_age_hours)
+                    )
+                    if fresh:
+                        return self.template_name, False
+                    await self._build(connection)
+                    await self._drop_stale_templates(connection)
+                    return self.template_name, True
+                finally:
+                    await connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": TEMPLATE_LOCK_KEY})
+        finally:
+            await engine.dispose()
+
+    async def _template_built_at(self, connection: AsyncConnection, name: str) -> datetime | None:
+        row = (
+            await connection.execute(
+                text(
+                    "SELECT datistemplate, shobj_description(oid, 'pg_database') "
+                    "FROM pg_database WHERE datname = :name"
+                ),
+                {"name": name},
+            )
+        ).first()
+        if row is None or not row[0]:
+            return None
+        try:
+            return datetime.fromisoformat(json.loads(row[1] or "{}")["built_at"])
+        except (KeyError, ValueError):
+            return None
+
+    async def _build(self, connection: AsyncConnection) -> None:
+        build_name = f"{BUILD_PREFIX}{uuid.uuid4().hex[:12]}"
+        ensure_managed_name(build_name)
+        await connection.execute(text(f'CREATE DATABASE "{build_name}"'))
+        try:
+            env = {**os.environ, "DATABASE_URL": self.url_for(build_name).render_as_string(hide_password=False)}
+            for command in (["alembic", "upgrade", "head"], [sys.executable, "-m", "app.seed"]):
+                subprocess.run(command, cwd=BACKEND_DIR, env=env, check=True)
+            await self._drop(connection, self.template_name)
+            await connection.execute(text(f'ALTER DATABASE "{build_name}" RENAME TO "{self.template_name}"'))
+        except BaseException:
+            await self._drop(connection, build_name)
+            raise
+        comment = json.dumps({"key": self.key, "built_at": datetime.now(timezone.utc).isoformat()})
+        await connection.execute(text(f'ALTER DATABASE "{self.template_name}" IS_TEMPLATE true'))
+        await connection.execute(
+            text(f"COMMENT ON DATABASE \"{self.template_name}\" IS '{comment}'")
+        )
+
+    async def _managed_databases(self, connection: AsyncConnection, prefix: str) -> list[str]:
+        rows = await connection.execute(
+            text("SELECT datname FROM pg_database WHERE datname LIKE :pattern"),
+            {"pattern": prefix.replace("_", r"\_") + "%"},
+        )
+        return [name for (name,) in rows if MANAGED_DATABASE_RE.fullmatch(name)]
+
+    async def _drop_stale_templates(self, connection: AsyncConnection) -> list[str]:
+        stale = [
+            name
+            for name in await self._managed_databases(connection, TEMPLATE_PREFIX)
+            if name != self.template_name and not name.startswith(BUILD_PREFIX)
+        ]
+        for name in stale:
+            await self._drop(connection, name)
+        return stale
+
+    async def _drop(self, connection: AsyncConnection, name: str) -> None:
+        ensure_managed_name(name)
+        exists = await connection.scalar(text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": name})
+        if not exists:
+            return
+        await connection.execute(text(f'ALTER DATABASE "{name}" IS_TEMPLATE false'))
+        await connection.execute(
+            text(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE datname = :name AND pid <> pg_backend_pid()"
+            ),
+            {"name": name},
+        )
+        await connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+
+    async def clone(self, label: str) -> str:
+        name = f"{CLONE_PREFIX}{_slug(label)}_{uuid.uuid4().hex[:8]}"
+        ensure_managed_name(name)
+        engine = self._admin()
+        try:
+            async with engine.connect() as connection:
+                # FILE_COPY копирует файлы целиком: для небольшого шаблона это быстрее WAL_LOG.
+                await connection.execute(
+                    text(f'CREATE DATABASE "{name}" TEMPLATE "{self.template_name}" STRATEGY FILE_COPY')
+                )
+        finally:
+            await engine.dispose()
+        return name
+
+    async def drop(self, name: str) -> None:
+        engine = self._admin()
+        try:
+            async with engine.connect() as connection:
+                await self._drop(connection, name)
+        finally:
+            await engine.dispose()
+
+    async def prune(self, *, include_template: bool = False) -> list[str]:
+        """Удалить клоны, брошенные упавшими прогонами, и шаблоны прошлых ключей."""
+        engine = self._admin()
+        dropped: list[str] = []
+        try:
+            async with engine.connect() as connection:
+                dropped.extend(await self._drop_stale_templates(connection))
+                leftovers = await self._managed_databases(connection, CLONE_PREFIX)
+                leftovers += await self._managed_databases(connection, BUILD_PREFIX)
+                if include_template:
+                    leftovers.append(self.template_name)
+                for name in leftovers:
+                    await self._drop(connection, name)
+                    dropped.append(name)
+        finally:
+            await engine.dispose()
+        return dropped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    ensure = subcommands.add_parser("ensure", help="build the template if missing or stale")
+    ensure.add_argument("--max-age-hours", type=float, default=24.0)
+    prune = subcommands.add_parser("prune", help="drop leftover clones and old templates")
+    prune.add_argument("--all", action="store_true", help="drop the current template too")
+    args = parser.parse_args()
+
+    databases = TemplateDatabases()
+    if args.command == "ensure":
+        started = time.perf_counter()
+        name, built = asyncio.run(databases.ensure_template(max_age_hours=args.max_age_hours))
+        state = "built" if built else "reused"
+        print(f"Template {name} {state} in {time.perf_counter() - started:.1f} s.")
+    else:
+        for name in asyncio.run(databases.prune(include_template=args.all)):
+            print(f"Dropped {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -135,11 +135,11 @@ async function fetchWithRetry(url: string, options: RequestInit, timeoutMs: numb
   throw new ApiUnavailableError(unavailableMessage(false))
 }
 
-async function request<T>(
+async function requestWithHeaders<T>(
   path: string,
   options: RequestInit = {},
   jsonRequest = true
-): Promise<T> {
+): Promise<{ data: T; headers: Headers }> {
   const url = path.startsWith('http') ? path : `${API_BASE}${path}`
   const token = getToken()
   const requestOptions: RequestInit = {
@@ -165,7 +165,21 @@ async function request<T>(
     throw new Error(errorMessage(err, fallback))
   }
   const text = await res.text()
-  return (text ? JSON.parse(text) : null) as T
+  return { data: (text ? JSON.parse(text) : null) as T, headers: res.headers }
+}
+
+async function request<T>(
+  path: string,
+  options: RequestInit = {},
+  jsonRequest = true
+): Promise<T> {
+  return (await requestWithHeaders<T>(path, options, jsonRequest)).data
+}
+
+/** Страница ленты со списком в теле: курсор следующей — в заголовке X-Next-Cursor. */
+export interface CursorPage<T> {
+  items: T[]
+  nextCursor: string | null
 }
 
 async function requestBlob(path: string): Promise<Blob> {
@@ -199,6 +213,13 @@ export const api = {
       : path
     return request<T>(url)
   },
+  getPage: async <T>(path: string, params?: Record<string, string>): Promise<CursorPage<T>> => {
+    const url = params && Object.keys(params).length
+      ? `${path}?${new URLSearchParams(params).toString()}`
+      : path
+    const { data, headers } = await requestWithHeaders<T[]>(url)
+    return { items: data ?? [], nextCursor: headers.get('X-Next-Cursor') }
+  },
   post: <T>(path: string, body: unknown) =>
     request<T>(path, { method: 'POST', body: JSON.stringify(body) }),
   put: <T>(path: string, body: unknown) =>
@@ -150,6 +150,8 @@ export interface AdminUserAuditHistory {
   items: AdminUserAuditEvent[]
   total: number
   limit: number
+  total_is_estimate?: boolean
+  next_cursor?: string | null
 }
 
 export interface QuickNote {
@@ -1016,7 +1018,6 @@ export interface WorkEntityMap {
   range_end: string
   nodes: WorkEntityMapNode[]
   edges: WorkEntityMapEdge[]
-  generated_at: string
 }
 
 export interface GuidedProjectMember {
@@ -1176,6 +1177,7 @@ export interface TaskAcceptanceCriterion {
   return_count: number
   decision_change_count: number
   events: TaskAcceptanceCriterionEvent[]
+  events_next_cursor?: string | null
 }
 
 export interface TaskAcceptanceCriterionEvent {
@@ -2126,6 +2128,7 @@ export interface ActivityEventListResponse {
   items: ActivityEvent[]
   total: number
   limit: number
+  archived_until?: string | null
 }
 
 export interface FocusActivitySummary {
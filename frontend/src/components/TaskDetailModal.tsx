@@ -82,6 +82,8 @@ export const TaskDetailModal: FC<TaskDetailModalProps> = ({
   const [attachmentsLoading, setAttachmentsLoading] = useState(false)
   const [reviewEvents, setReviewEvents] = useState<TaskReviewEvent[]>([])
   const [reviewEventsLoading, setReviewEventsLoading] = useState(false)
+  const [reviewEventsCursor, setReviewEventsCursor] = useState<string | null>(null)
+  const [reviewEventsLoadingMore, setReviewEventsLoadingMore] = useState(false)
   const [acceptanceDraftDirty, setAcceptanceDraftDirty] = useState(false)
   const [acceptanceMutationBusy, setAcceptanceMutationBusy] = useState(false)
   const [discardDialogOpen, setDiscardDialogOpen] = useState(false)
@@ -189,6 +191,23 @@ export const TaskDetailModal: FC<TaskDetailModalProps> = ({
     closeAndRestoreFocus()
   }
 
+  const loadMoreReviewEvents = async () => {
+    if (!taskId || !reviewEventsCursor) return
+    setReviewEventsLoadingMore(true)
+    try {
+      // События идут по возрастанию: следующая страница — более поздние.
+      const page = await api.getPage<TaskReviewEvent>(`/api/tasks/${taskId}/review-events`, {
+        cursor: reviewEventsCursor,
+      })
+      setReviewEvents((prev) => [...prev, ...page.items])
+      setReviewEventsCursor(page.nextCursor)
+    } catch {
+      // кнопка остается: можно повторить
+    } finally {
+      setReviewEventsLoadingMore(false)
+    }
+  }
+
   const handleAcceptanceDraftState = useCallback((state: { dirty: boolean; busy: boolean }) => {
     setAcceptanceDraftDirty(state.dirty)
     setAcceptanceMutationBusy(state.busy)
@@ -199,6 +218,7 @@ export const TaskDetailModal: FC<TaskDetailModalProps> = ({
       setAttachments([])
       setAttachmentUrls({})
       setReviewEvents([])
+      setReviewEventsCursor(null)
       return
     }
 
@@ -238,9 +258,12 @@ export const TaskDetailModal: FC<TaskDetailModalProps> = ({
     async function loadReviewEvents() {
       setReviewEventsLoading(true)
       setReviewEvents([])
+      setReviewEventsCursor(null)
       try {
-        const list = await api.get<TaskReviewEvent[]>(`/api/tasks/${taskId}/review-events`)
-        if (active) setReviewEvents(list)
+        const page = await api.getPage<TaskReviewEvent>(`/api/tasks/${taskId}/review-events`)
+        if (!active) return
+        setReviewEvents(page.items)
+        setReviewEventsCursor(page.nextCursor)
       } catch {
         if (active) setReviewEvents([])
       } finally {
@@ -615,6 +638,16 @@ export const TaskDetailModal: FC<TaskDetailModalProps> = ({
                       </div>
                     )
                   })}
+                  {reviewEventsCursor && (
+                    <button
+                      type="button"
+                      onClick={() => void loadMoreReviewEvents()}
+                      disabled={reviewEventsLoadingMore}
+                      className="text-sm font-medium text-primary hover:underline disabled:opacity-50"
+                    >
+                      {reviewEventsLoadingMore ? 'Загрузка...' : 'Показать более поздние'}
+                    </button>
+                  )}
                 </div>
               )}
             </div>
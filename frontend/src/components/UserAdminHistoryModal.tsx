@@ -290,7 +290,8 @@ export function UserAdminHistoryModal({ user, open, onClose }: UserAdminHistoryM
 
         {history && history.total > history.items.length && (
           <footer className="border-t border-slate-200 px-4 py-3 text-xs text-slate-500 sm:px-5">
-            Показаны последние {history.items.length} из {history.total} событий.
+            Показаны последние {history.items.length} из {history.total_is_estimate ? 'примерно ' : ''}
+            {history.total} событий.
           </footer>
         )}
       </div>
@@ -0,0 +1,147 @@
+/** Topic subscriptions over /api/realtime/live: refetch only when the server reports a change. */
+import { useEffect, useRef } from 'react'
+import { getToken } from '@/lib/auth'
+
+export type RealtimeTopic = 'queue' | 'notifications' | 'focus' | 'dashboard'
+
+export interface RealtimeTopicEvent {
+  type: 'topic.changed'
+  topic: RealtimeTopic
+  version: number
+  delta?: Record<string, number>
+}
+
+const MIN_BACKOFF_MS = 1000
+const MAX_BACKOFF_MS = 30_000
+const HEARTBEAT_MS = 25_000
+const COALESCE_MS = 250
+// Пока канал недоступен — редкий опрос, чтобы данные не застыли.
+const FALLBACK_POLL_MS = 60_000
+
+function realtimeWsUrl(): string {
+  const apiBase =
+    import.meta.env.VITE_API_URL ||
+    (typeof window !== 'undefined' ? window.location.origin : '')
+  return `${apiBase.replace(/^http/i, 'ws')}/api/realtime/live`
+}
+
+/**
+ * Подписка на темы. onChange вызывается один раз на пачку событий
+ * (coalesce), а также после переподключения — события, пропущенные во
+ * время разрыва, не теряются.
+ */
+export function useRealtimeTopics(
+  topics: RealtimeTopic[],
+  onChange: (events: RealtimeTopicEvent[]) => void,
+  enabled = true,
+): void {
+  const onChangeRef = useRef(onChange)
+  onChangeRef.current = onChange
+  const topicsKey = [...topics].sort().join(',')
+
+  useEffect(() => {
+    if (!enabled || !topicsKey) return
+    let stopped = false
+    let socket: WebSocket | null = null
+    let reconnectTimer: number | null = null
+    let heartbeatTimer: number | null = null
+    let coalesceTimer: number | null = null
+    let fallbackTimer: number | null = null
+    let backoff = MIN_BACKOFF_MS
+    let connectedOnce = false
+    let pending: RealtimeTopicEvent[] = []
+
+    const flush = () => {
+      coalesceTimer = null
+      const events = pending
+      pending = []
+      onChangeRef.current(events)
+    }
+
+    const schedule = (event?: RealtimeTopicEvent) => {
+      if (event) pending.push(event)
+      if (coalesceTimer === null) coalesceTimer = window.setTimeout(flush, COALESCE_MS)
+    }
+
+    const startFallback = () => {
+      if (fallbackTimer === null) fallbackTimer = window.setInterval(() => schedule(), FALLBACK_POLL_MS)
+    }
+
+    const stopFallback = () => {
+      if (fallbackTimer !== null) window.clearInterval(fallbackTimer)
+      fallbackTimer = null
+    }
+
+    const scheduleReconnect = () => {
+      if (stopped || reconnectTimer !== null) return
+      const delay = backoff
+      backoff = Math.min(backoff * 2, MAX_BACKOFF_MS)
+      reconnectTimer = window.setTimeout(() => {
+        reconnectTimer = null
+        connect()
+      }, delay)
+    }
+
+    const connect = () => {
+      if (stopped || !navigator.onLine) return
+      const token = getToken()
+      if (!token) return
+      try {
+        socket = new WebSocket(realtimeWsUrl())
+      } catch {
+        startFallback()
+        scheduleReconnect()
+        return
+      }
+      socket.onopen = () => {
+        socket?.send(JSON.stringify({ type: 'auth', token }))
+        heartbeatTimer = window.setInterval(() => {
+          if (socket?.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify({ type: 'ping' }))
+          }
+        }, HEARTBEAT_MS)
+      }
+      socket.onmessage = (message) => {
+        try {
+          const event = JSON.parse(message.data as string) as { type?: string }
+          if (event.type === 'ready') {
+            socket?.send(JSON.stringify({ type: 'subscribe', topics: topicsKey.split(',') }))
+          } else if (event.type === 'subscribed') {
+            backoff = MIN_BACKOFF_MS
+            stopFallback()
+            if (connectedOnce) schedule()
+            connectedOnce = true
+          } else if (event.type === 'topic.changed') {
+            schedule(event as RealtimeTopicEvent)
+          }
+        } catch {
+          // Ignore malformed transport frames; REST remains authoritative.
+        }
+      }
+      socket.onerror = () => socket?.close()
+      socket.onclose = (event) => {
+        if (heartbeatTimer !== null) window.clearInterval(heartbeatTimer)
+        heartbeatTimer = null
+        socket = null
+        if (stopped) return
+        startFallback()
+        if (event.code !== 1008) scheduleReconnect()
+      }
+    }
+
+    const handleOnline = () => {
+      if (!socket || socket.readyState === WebSocket.CLOSED) connect()
+    }
+    connect()
+    window.addEventListener('online', handleOnline)
+    return () => {
+      stopped = true
+      if (reconnectTimer !== null) window.clearTimeout(reconnectTimer)
+      if (heartbeatTimer !== null) window.clearInterval(heartbeatTimer)
+      if (coalesceTimer !== null) window.clearTimeout(coalesceTimer)
+      stopFallback()
+      window.removeEventListener('online', handleOnline)
+      socket?.close()
+    }
+  }, [enabled, topicsKey])
+}
@@ -17,6 +17,7 @@ import { BurndownChart } from '@/components/BurndownChart'
 import { TaskDetailModal } from '@/components/TaskDetailModal'
 import { SkeletonCard } from '@/components/Skeleton'
 import { exportTeamCSV } from '@/lib/csv'
+import { useRealtimeTopics } from '@/lib/realtimeTopics'
 
 export function DashboardPage() {
   const { user: currentUser } = useAuth()
@@ -74,10 +75,14 @@ export function DashboardPage() {
     load()
   }, [load])
 
+  useRealtimeTopics(['dashboard', 'focus'], () => void load(), isTeamleadOrAdmin)
+
+  // Темы dashboard/focus сервер выдает только руководителям — остальным прежний опрос.
   useEffect(() => {
-    const t = setInterval(load, 30000)
-    return () => clearInterval(t)
-  }, [load])
+    if (isTeamleadOrAdmin) return
+    const interval = setInterval(load, 30000)
+    return () => clearInterval(interval)
+  }, [load, isTeamleadOrAdmin])
 
   if (loading) {
     return (
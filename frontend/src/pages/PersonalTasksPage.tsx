@@ -417,6 +417,8 @@ export function PersonalTasksPage() {
   const [deadlines, setDeadlines] = useState<PersonalTaskDeadline[]>([])
   const [deadlineTrackers, setDeadlineTrackers] = useState<DeadlineTracker[]>([])
   const [events, setEvents] = useState<Record<string, PersonalTaskEvent[]>>({})
+  const [eventCursors, setEventCursors] = useState<Record<string, string | null>>({})
+  const [eventsLoadingMoreId, setEventsLoadingMoreId] = useState<string | null>(null)
   const [checkpoints, setCheckpoints] = useState<Record<string, PersonalTaskCheckpoint[]>>({})
   const [filter, setFilter] = useState<TaskFilter>(requestedTaskId ? 'all' : 'active')
   const [search, setSearch] = useState('')
@@ -472,13 +474,29 @@ export function PersonalTasksPage() {
 
   const loadTaskDetails = useCallback(async (taskId: string) => {
     const [eventData, checkpointData] = await Promise.all([
-      api.get<PersonalTaskEvent[]>(`/api/personal-tasks/${taskId}/events`),
+      api.getPage<PersonalTaskEvent>(`/api/personal-tasks/${taskId}/events`),
       api.get<PersonalTaskCheckpoint[]>(`/api/personal-tasks/${taskId}/checkpoints`),
     ])
-    setEvents((prev) => ({ ...prev, [taskId]: eventData }))
+    setEvents((prev) => ({ ...prev, [taskId]: eventData.items }))
+    setEventCursors((prev) => ({ ...prev, [taskId]: eventData.nextCursor }))
     setCheckpoints((prev) => ({ ...prev, [taskId]: checkpointData }))
   }, [])
 
+  const loadMoreEvents = async (taskId: string) => {
+    const cursor = eventCursors[taskId]
+    if (!cursor) return
+    setEventsLoadingMoreId(taskId)
+    try {
+      const page = await api.getPage<PersonalTaskEvent>(`/api/personal-tasks/${taskId}/events`, { cursor })
+      setEvents((prev) => ({ ...prev, [taskId]: [...(prev[taskId] || []), ...page.items] }))
+      setEventCursors((prev) => ({ ...prev, [taskId]: page.nextCursor }))
+    } catch (e) {
+      toast.error(e instanceof Error ? e.message : 'Не удалось загрузить журнал')
+    } finally {
+      setEventsLoadingMoreId(null)
+    }
+  }
+
   const removeCheckpointFromDeadlines = useCallback((checkpointId: string) => {
     setDeadlines((current) => current.filter((item) => item.item_type !== 'checkpoint' || item.item_id !== checkpointId))
   }, [])
@@ -1658,7 +1676,7 @@ export function PersonalTasksPage() {
                             <History className="h-4 w-4" />
                             Журнал
                           </h4>
-                          <span className="text-xs text-slate-400">{events[task.id]?.length || 0}</span>
+                          <span className="text-xs text-slate-400">{events[task.id]?.length || 0}{eventCursors[task.id] ? '+' : ''}</span>
                         </div>
                         <div className="max-h-72 space-y-3 overflow-auto pr-1">
                           {(events[task.id] || []).map((event) => {
@@ -1692,6 +1710,16 @@ export function PersonalTasksPage() {
                           {(events[task.id] || []).length === 0 && (
                             <p className="rounded-lg border border-dashed border-slate-200 p-3 text-xs text-slate-400">Журнал пока пуст.</p>
                           )}
+                          {eventCursors[task.id] && (
+                            <button
+                              type="button"
+                              onClick={() => void loadMoreEvents(task.id)}
+                              disabled={eventsLoadingMoreId === task.id}
+                              className="text-xs font-medium text-primary hover:underline disabled:opacity-50"
+                            >
+                              {eventsLoadingMoreId === task.id ? 'Загрузка...' : 'Показать более ранние'}
+                            </button>
+                          )}
                         </div>
                         {eventFormTaskId === task.id && (
                         <div className="mt-3 grid gap-2">
@@ -1,6 +1,6 @@
 import { useCallback, useEffect, useState } from 'react'
 import { useSearchParams } from 'react-router-dom'
-import { api } from '@/api/client'
+import { api, type CursorPage } from '@/api/client'
 //import type { User, UserProgress, Task, QTransactionRead, LeagueEvaluation, LeagueProgress } from '@/api/types'
 import type { User, UserProgress, Task, QTransactionRead, LeagueProgress, RunRate } from '@/api/types'
 import { useAuth } from '@/contexts/AuthContext'
@@ -28,6 +28,8 @@ export function ProfilePage() {
   const [activeTasks, setActiveTasks] = useState<Task[]>([])
   const [transactions, setTransactions] = useState<QTransactionRead[]>([])
   const [transLimit, setTransLimit] = useState(PAGE_SIZE)
+  const [transCursor, setTransCursor] = useState<string | null>(null)
+  const [transLoadingMore, setTransLoadingMore] = useState(false)
   const [walletFilter, setWalletFilter] = useState<'all' | 'main' | 'karma'>('all')
   const [directionFilter, setDirectionFilter] = useState<'all' | 'credit' | 'debit'>('all')
   // const [leagueEval, setLeagueEval] = useState<LeagueEvaluation | null>(null)
@@ -41,6 +43,37 @@ export function ProfilePage() {
 
   const isOwnProfile = !urlUserId || urlUserId === currentUser?.id
 
+  const transactionParams = useCallback(
+    (cursor?: string): Record<string, string> => ({
+      ...(walletFilter !== 'all' && { wallet_type: walletFilter }),
+      ...(directionFilter !== 'all' && { direction: directionFilter }),
+      ...(cursor ? { cursor } : {}),
+    }),
+    [walletFilter, directionFilter],
+  )
+
+  const showMoreTransactions = async () => {
+    // Сначала показываем уже загруженное, потом берем следующую страницу с сервера.
+    if (transactions.length > transLimit || !transCursor) {
+      setTransLimit((n) => n + PAGE_SIZE)
+      return
+    }
+    setTransLoadingMore(true)
+    try {
+      const page = await api.getPage<QTransactionRead>(
+        `/api/users/${currentId}/transactions`,
+        transactionParams(transCursor),
+      )
+      setTransactions((prev) => [...prev, ...page.items])
+      setTransCursor(page.nextCursor)
+      setTransLimit((n) => n + PAGE_SIZE)
+    } catch {
+      // кнопка остается: можно повторить
+    } finally {
+      setTransLoadingMore(false)
+    }
+  }
+
   const loadProfile = useCallback(async () => {
     if (!currentId) {
       setUser(null)
@@ -48,29 +81,28 @@ export function ProfilePage() {
       setDoneTasks([])
       setActiveTasks([])
       setTransactions([])
+      setTransCursor(null)
       setProfileError(null)
       return
     }
     setProfileError(null)
     setProfileLoading(true)
     try {
-      const promises: [Promise<User>, Promise<UserProgress>, Promise<Task[]>, Promise<Task[]>, Promise<Task[]>, Promise<QTransactionRead[]>] = [
+      const promises: [Promise<User>, Promise<UserProgress>, Promise<Task[]>, Promise<Task[]>, Promise<Task[]>, Promise<CursorPage<QTransactionRead>>] = [
         api.get<User>(`/api/users/${currentId}`),
         api.get<UserProgress>(`/api/users/${currentId}/progress`),
         api.get<Task[]>(`/api/tasks?assignee_id=${currentId}&status=done`),
         api.get<Task[]>(`/api/tasks?assignee_id=${currentId}&status=in_progress`),
         api.get<Task[]>(`/api/tasks?assignee_id=${currentId}&status=review`),
-        api.get<QTransactionRead[]>(`/api/users/${currentId}/transactions`, {
-          ...(walletFilter !== 'all' && { wallet_type: walletFilter }),
-          ...(directionFilter !== 'all' && { direction: directionFilter }),
-        }),
+        api.getPage<QTransactionRead>(`/api/users/${currentId}/transactions`, transactionParams()),
       ]
       const [u, p, tasks, inProgress, review, trans] = await Promise.all(promises)
       setUser(u)
       setProgress(p)
       setDoneTasks(tasks)
       setActiveTasks([...inProgress, ...review])
-      setTransactions(trans)
+      setTransactions(trans.items)
+      setTransCursor(trans.nextCursor)
       /*
       if (currentUser?.role === 'admin' || currentUser?.role === 'teamlead') {
         api.get<LeagueEvaluation[]>('/api/admin/league-evaluation', { user_id: currentId })
@@ -103,6 +135,7 @@ export function ProfilePage() {
       setDoneTasks([])
       setActiveTasks([])
       setTransactions([])
+      setTransCursor(null)
       // setLeagueEval(null)
       setLeagueProgress(null)
       setRunRate(null)
@@ -110,7 +143,7 @@ export function ProfilePage() {
     } finally {
       setProfileLoading(false)
     }
-  }, [currentId, walletFilter, directionFilter, currentUser?.role])
+  }, [currentId, transactionParams, currentUser?.role])
 
   useEffect(() => {
     loadProfile()
@@ -126,7 +159,7 @@ export function ProfilePage() {
   const progressColor =
     progressPercent < 50 ? 'bg-red-500' : progressPercent < 80 ? 'bg-amber-500' : 'bg-emerald-500'
   const shownTransactions = transactions.slice(0, transLimit)
-  const hasMoreTransactions = transactions.length > transLimit
+  const hasMoreTransactions = transactions.length > transLimit || transCursor !== null
 
   const avgCompletionHours =
     doneTasks.length > 0
@@ -344,10 +377,11 @@ export function ProfilePage() {
               <div className="p-4 border-t border-slate-200 text-center">
                 <button
                   type="button"
-                  onClick={() => setTransLimit((n) => n + PAGE_SIZE)}
-                  className="text-sm font-medium text-primary hover:underline"
+                  onClick={() => void showMoreTransactions()}
+                  disabled={transLoadingMore}
+                  className="text-sm font-medium text-primary hover:underline disabled:opacity-50"
                 >
-                  Показать ещё
+                  {transLoadingMore ? 'Загрузка...' : 'Показать ещё'}
                 </button>
               </div>
             )}
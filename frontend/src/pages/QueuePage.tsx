@@ -13,6 +13,7 @@ import { DeadlineBadge } from '@/components/DeadlineBadge'
 import { TaskDetailModal } from '@/components/TaskDetailModal'
 import { BugfixModal } from '@/components/BugfixModal'
 import { TaskImportModal } from '@/components/TaskImportModal'
+import { useRealtimeTopics } from '@/lib/realtimeTopics'
 
 const complexityStyles: Record<string, string> = {
   S: 'bg-gray-50 text-gray-400 ring-1 ring-gray-100',
@@ -114,6 +115,11 @@ export function QueuePage() {
       .finally(() => setLoading(false))
   }, [currentUser])
 
+  // Фоновое обновление по событию канала — без скелетона поверх таблицы.
+  useRealtimeTopics(['queue'], () => {
+    api.get<QueueTaskResponse[]>('/api/queue').then(setTasks).catch(() => undefined)
+  }, Boolean(currentUser))
+
   const loadDeadlineTrackers = useCallback(async () => {
     try {
       const list = await api.get<DeadlineTracker[]>('/api/deadline-trackers?include_archived=true&limit=300')
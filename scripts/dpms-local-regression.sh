@@ -26,13 +26,6 @@ step() {
   printf '\n==> %s\n' "$1"
 }
 
-run_backend_smoke() {
-  local script="$1"
-  shift
-  step "backend/$script"
-  "${compose[@]}" exec -T backend python "scripts/$script" "$@"
-}
-
 cd "$ROOT_DIR"
 
 step "Build and start canonical local stack"
@@ -62,18 +55,16 @@ curl --fail --silent --show-error "$health_url"
 step "Python syntax"
 "${compose[@]}" exec -T backend python -m compileall -q app alembic scripts
 
-run_backend_smoke smoke_messages.py --allow-compose-db
-run_backend_smoke smoke_email_outbox.py
-run_backend_smoke smoke_auth_session.py
-run_backend_smoke smoke_admin_user_audit.py
-run_backend_smoke smoke_personal_task_execution_guard.py
-run_backend_smoke smoke_personal_task_artifacts.py
-run_backend_smoke smoke_task_acceptance.py
-run_backend_smoke smoke_execution_contracts.py
-run_backend_smoke smoke_work_entities.py
-run_backend_smoke smoke_work_entity_workspace.py
-run_backend_smoke smoke_project_cockpit.py
-run_backend_smoke smoke_quick_note_collaboration.py
+# DPMS_SMOKE_SERIAL=1 — прежний последовательный прогон в общей базе (для сравнения времени).
+if [[ "${DPMS_SMOKE_SERIAL:-0}" == "1" ]]; then
+  step "Backend smoke suites (serial, shared database)"
+  "${compose[@]}" exec -T backend python scripts/run_smoke_suites.py --serial
+else
+  step "Backend smoke suites (parallel, template database clones)"
+  "${compose[@]}" exec -T \
+    -e DPMS_TEST_DATABASES_ALLOW_CREATE=1 \
+    backend python scripts/run_smoke_suites.py --jobs "${DPMS_SMOKE_JOBS:-6}"
+fi
 
 if [[ "$PROFILE" == "full" ]]; then
   step "Migration upgrade/downgrade contract"
@@ -108,5 +99,5 @@ fi
 step "Working tree whitespace check"
 git diff --check
 
-printf '\nDPMS local regression (%s) OK on frontend %s, backend %s, database %s.\n' \
-  "$PROFILE" "$DPMS_FRONTEND_PORT" "$DPMS_BACKEND_PORT" "$DPMS_DB_PORT"
+printf '\nDPMS local regression (%s) OK on frontend %s, backend %s, database %s in %ds.\n' \
+  "$PROFILE" "$DPMS_FRONTEND_PORT" "$DPMS_BACKEND_PORT" "$DPMS_DB_PORT" "$SECONDS"